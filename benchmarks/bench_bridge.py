@@ -0,0 +1,68 @@
+# benchmarks/bench_bridge.py
+
+"""
+Cold-start time of the Electron bridge wrappers.
+
+Electron runs every bridge call as a fresh `python -u <wrapper>.py` process, so interpreter
+start-up and imports are paid on each click. Each wrapper is timed to its first line of
+output (what the UI waits for) and to process exit, against an empty temporary HOME.
+"""
+
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import BRIDGE_DIR, isolated_home, make_result, make_skipped, subprocess_env
+
+SUITE = "bridge_cold_start"
+
+# Wrapper -> arguments. Wrappers that need a live parallel run (get_file_content, create_zip_archive) are not timed.
+WRAPPERS = {
+    "get_active_model_wrapper.py": [],
+    "get_available_models_wrapper.py": [],
+    "set_active_model_wrapper.py": ["ollama_default_local"],
+    "get_chat_history_wrapper.py": [],
+    "save_chat_message_wrapper.py": [json.dumps({"sender": "user", "text": "benchmark message"})],
+    "clear_chat_history_wrapper.py": [],
+    "get_metrics_wrapper.py": [],
+    # 'ollama_default_local' takes the simulated-stream path, so no provider is contacted.
+    "send_prompt_wrapper.py": ["benchmark prompt", "ollama_default_local"],
+}
+
+
+def _time_process(command: List[str], env: Dict[str, str]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    first_line = process.stdout.readline()
+    first_output = time.perf_counter() - started
+    process.stdout.read()
+    stderr = process.stderr.read()
+    process.wait()
+    total = time.perf_counter() - started
+    return {"first_output": first_output if first_line else total, "exit": total,
+            "returncode": process.returncode, "stderr": stderr.decode(errors="replace")[-500:]}
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    repeat = 3 if quick else 10
+    results = []
+
+    with isolated_home() as home:
+        env = subprocess_env(home)
+        baseline = [_time_process([sys.executable, "-c", "pass"], env)["exit"] for _ in range(repeat)]
+        results.append(make_result(SUITE, "python_startup", baseline, extra={"note": "Bare interpreter start-up, for reference."}))
+
+        for wrapper, args in WRAPPERS.items():
+            script = BRIDGE_DIR / wrapper
+            if not script.exists():
+                results.append(make_skipped(SUITE, wrapper, "Wrapper not found in this tree."))
+                continue
+            runs = [_time_process([sys.executable, "-u", str(script), *args], env) for _ in range(repeat)]
+            failures = [r for r in runs if r["returncode"] != 0]
+            extra = {"exit": make_result(SUITE, wrapper, [r["exit"] for r in runs])["stats"], "failed_runs": len(failures)}
+            if failures:
+                extra["last_error"] = failures[-1]["stderr"]
+            results.append(make_result(SUITE, wrapper, [r["first_output"] for r in runs], extra=extra))
+    return results
@@ -0,0 +1,98 @@
+# benchmarks/bench_connectors.py
+
+"""
+Connector throughput and latency against the local mock provider server.
+
+Each connector sends a fixed number of generate_code calls through one shared
+connector instance (so its HTTP connection pool is exercised) at several concurrency
+levels. The mock server adds no latency by default, so the numbers reflect
+client-side overhead; pass a latency to model a real provider.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+from benchmarks.common import make_result, silenced_stdout
+
+SUITE = "connectors"
+
+CONCURRENCY = (1, 4, 16, 64)
+QUICK_CONCURRENCY = (1, 8)
+
+
+def _factories(server) -> Dict[str, Callable[[], Any]]:
+    from jarules_agent.connectors.claude_connector import ClaudeConnector
+    from jarules_agent.connectors.gemini_api import GeminiClient
+    from jarules_agent.connectors.ollama_connector import OllamaConnector
+    from jarules_agent.connectors.openrouter_connector import OpenRouterConnector
+
+    return {
+        "ollama": lambda: OllamaConnector(model_name="mock-model", api_base_url=server.url),
+        "openrouter": lambda: OpenRouterConnector(model_name="mock-model", api_base_url=server.openai_base_url),
+        "claude": lambda: ClaudeConnector(model_name="mock-model", api_base_url=server.anthropic_base_url),
+        "gemini": lambda: GeminiClient(model_name="mock-model", api_endpoint=server.gemini_endpoint),
+    }
+
+
+async def _drive(connector, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Sends `requests` prompts with at most `concurrency` in flight; returns latencies and wall time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    is_async = asyncio.iscoroutinefunction(connector.generate_code)
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if is_async:
+                    await connector.generate_code(f"benchmark prompt {index}")
+                else:  # Gemini's SDK is synchronous
+                    await asyncio.to_thread(connector.generate_code, f"benchmark prompt {index}")
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return {"latencies": latencies, "wall": time.perf_counter() - started, "errors": errors}
+
+
+async def _run_async(quick: bool, latency: float, completion_tokens: int) -> List[Dict[str, Any]]:
+    from jarules_agent.testing.mock_provider_server import MockProviderConfig, MockProviderServer
+
+    requests = 50 if quick else 200
+    results = []
+    config = MockProviderConfig(latency=latency, completion_tokens=completion_tokens, seed=0)
+    server = MockProviderServer(config).start_in_thread()  # Own loop, so server work does not skew client timings
+    try:
+        for name, factory in _factories(server).items():
+            for concurrency in (QUICK_CONCURRENCY if quick else CONCURRENCY):
+                connector = factory()
+                try:
+                    await _drive(connector, min(concurrency, requests), concurrency)  # Warm-up: open pooled connections
+                    outcome = await _drive(connector, requests, concurrency)
+                finally:
+                    close = getattr(connector, "close", None)
+                    if close is not None and asyncio.iscoroutinefunction(close):
+                        await close()
+                params = {"connector": name, "concurrency": concurrency, "requests": requests,
+                          "mock_latency": latency, "completion_tokens": completion_tokens}
+                extra = {"throughput_rps": len(outcome["latencies"]) / outcome["wall"], "errors": outcome["errors"],
+                         "wall_seconds": outcome["wall"]}
+                if outcome["latencies"]:
+                    results.append(make_result(SUITE, "generate_code_latency", outcome["latencies"], params, extra=extra))
+    finally:
+        server.stop_thread()
+    return results
+
+
+def run(quick: bool = False, latency: float = 0.0, completion_tokens: int = 32) -> List[Dict[str, Any]]:
+    keys = {"OPENROUTER_API_KEY": "benchmark", "ANTHROPIC_API_KEY": "benchmark", "GEMINI_API_KEY": "benchmark"}
+    with mock.patch.dict(os.environ, keys), silenced_stdout():  # GeminiClient prints every prompt
+        return asyncio.run(_run_async(quick, latency, completion_tokens))
@@ -0,0 +1,75 @@
+# benchmarks/bench_history.py
+
+"""
+Chat history save and load at increasing history sizes.
+
+Times the functions the bridge wrappers call: save_chat_message_wrapper.save_message,
+get_chat_history_wrapper.get_history and send_prompt_wrapper.load_chat_history.
+The history file is re-seeded before every save, because saving trims it.
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+from benchmarks.common import isolated_home, make_result, silenced_stdout, time_call
+
+SUITE = "history"
+
+SIZES = (1_000, 10_000, 100_000)
+QUICK_SIZES = (1_000, 10_000)
+
+
+def _write_history(path: Path, count: int) -> None:
+    messages = [
+        {"sender": "user" if i % 2 == 0 else "assistant",
+         "text": f"Message {i}: " + "lorem ipsum dolor sit amet " * 6,
+         "timestamp": f"2024-01-01T00:00:{i % 60:02d}Z"}
+        for i in range(count)
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(messages, f, indent=2)
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    from jarules_agent.electron_bridge import get_chat_history_wrapper, save_chat_message_wrapper, send_prompt_wrapper
+
+    results = []
+    repeat = 3 if quick else 10
+    new_message = json.dumps({"sender": "user", "text": "benchmark message"})
+
+    with isolated_home() as home:
+        history_path = home / ".jarules" / "chat_history.json"
+        seed_path = home / "seed_history.json"
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        patches = [
+            mock.patch.object(get_chat_history_wrapper, "CHAT_HISTORY_PATH", history_path),
+            mock.patch.object(save_chat_message_wrapper, "CHAT_HISTORY_PATH", history_path),
+        ]
+        for patcher in patches:
+            patcher.start()
+        try:
+            for size in (QUICK_SIZES if quick else SIZES):
+                _write_history(seed_path, size)
+                reseed = lambda: shutil.copyfile(seed_path, history_path)
+                params = {"messages": size}
+                file_size = seed_path.stat().st_size
+
+                with silenced_stdout():
+                    samples = time_call(lambda: save_chat_message_wrapper.save_message(new_message), repeat, setup=reseed)
+                results.append(make_result(SUITE, "save_message", samples, params, extra={"file_bytes": file_size}))
+
+                reseed()
+                with silenced_stdout():
+                    samples = time_call(get_chat_history_wrapper.get_history, repeat)
+                results.append(make_result(SUITE, "get_history", samples, params, extra={"file_bytes": file_size}))
+
+                samples = time_call(lambda: send_prompt_wrapper.load_chat_history(history_path, 10), repeat)
+                results.append(make_result(SUITE, "load_prompt_context", samples, params, extra={"context_messages": 10}))
+        finally:
+            for patcher in patches:
+                patcher.stop()
+    return results
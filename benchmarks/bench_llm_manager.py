@@ -0,0 +1,39 @@
+# benchmarks/bench_llm_manager.py
+
+"""LLMManager construction time: cold (fresh interpreter, including imports) and warm (in-process)."""
+
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import LLM_CONFIG_PATH, isolated_home, make_result, silenced_stdout, subprocess_env, time_call
+
+SUITE = "llm_manager"
+
+_COLD_SNIPPET = (
+    "import sys; from jarules_agent.core.llm_manager import LLMManager; "
+    "LLMManager(config_path=sys.argv[1])"
+)
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    repeat_cold = 3 if quick else 10
+    repeat_warm = 20 if quick else 200
+    results = []
+
+    with isolated_home() as home:
+        env = subprocess_env(home)
+        cold = []
+        for _ in range(repeat_cold):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", _COLD_SNIPPET, str(LLM_CONFIG_PATH)], env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            cold.append(time.perf_counter() - started)
+        results.append(make_result(SUITE, "construct_cold_process", cold))
+
+        from jarules_agent.core.llm_manager import LLMManager
+        with silenced_stdout():
+            warm = time_call(lambda: LLMManager(config_path=str(LLM_CONFIG_PATH)), repeat_warm)
+        results.append(make_result(SUITE, "construct_warm", warm))
+    return results
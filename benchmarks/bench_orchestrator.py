@@ -0,0 +1,93 @@
+# benchmarks/bench_orchestrator.py
+
+"""
+ParallelTaskManager.start_run wall time for 1 to 32 agents, with a cold and a warm worker pool.
+
+Runs against a throwaway git repository with the agents' own (mock LLM) task script,
+so the numbers cover worktree creation, subprocess start-up, git commit work and cleanup.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+from benchmarks.common import isolated_home, make_result, make_skipped, silenced_stdout
+
+SUITE = "orchestrator"
+
+AGENT_COUNTS = (1, 2, 4, 8, 16, 32)
+QUICK_AGENT_COUNTS = (1, 4)
+
+
+def _init_repo(path: Path) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+
+    def git(*args):
+        subprocess.run(["git", *args], cwd=path, check=True, capture_output=True)
+    git("init", "-q", "-b", "main")
+    git("config", "user.email", "bench@example.com")
+    git("config", "user.name", "Benchmark")
+    (path / "README.md").write_text("benchmark repository\n")
+    for i in range(50):
+        (path / "src").mkdir(exist_ok=True)
+        (path / "src" / f"module_{i}.py").write_text(f"VALUE = {i}\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "initial")
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    try:
+        from jarules_agent.git_task_runners import parallel_task_orchestrator
+    except Exception as e:  # The orchestrator must at least import for this suite to mean anything
+        return [make_skipped(SUITE, "start_run", f"Could not import parallel_task_orchestrator: {type(e).__name__}: {e}")]
+
+    results = []
+    repeat = 1 if quick else 3
+    # Agent scripts log to stdout at INFO by default; keep the benchmark output to JSON updates.
+    with isolated_home(), mock.patch.dict(os.environ, {"LOG_LEVEL": "WARNING"}):
+        for agent_count in (QUICK_AGENT_COUNTS if quick else AGENT_COUNTS):
+            samples = {"start_run": [], "start_run_warm": []}
+            completed = {"start_run": [], "start_run_warm": []}
+            for _ in range(repeat):
+                with tempfile.TemporaryDirectory(prefix="jarules-bench-repo-") as repo_dir:
+                    _init_repo(Path(repo_dir) / "repo")
+                    manager = parallel_task_orchestrator.ParallelTaskManager(
+                        repo_path=Path(repo_dir) / "repo", worktree_root=Path(repo_dir) / "worktrees")
+                    agents = [{"id": f"bench{i}"} for i in range(agent_count)]
+                    # A cold run starts the worker pool; a second run on the same manager reuses it.
+                    asyncio.run(_timed_runs(manager, agents, samples, completed))
+            for name in samples:
+                results.append(make_result(SUITE, name, samples[name], {"agents": agent_count},
+                                           extra={"agents_completed": completed[name]}))
+    return results
+
+
+async def _timed_runs(manager, agents, samples, completed) -> None:
+    try:
+        for name in ("start_run", "start_run_warm"):
+            with silenced_stdout() as output:
+                started = time.perf_counter()
+                await manager.start_run("Benchmark task", agents, "main")
+                samples[name].append(time.perf_counter() - started)
+            completed[name].append(_count_completed_agents(output.getvalue()))
+    finally:
+        await manager.close()
+
+
+def _count_completed_agents(output: str) -> int:
+    completed = set()
+    for line in output.splitlines():
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        data = message.get("data", message) if isinstance(message, dict) else {}
+        if isinstance(data, dict) and data.get("status") == "completed" and data.get("agentId"):
+            completed.add(data["agentId"])
+    return len(completed)
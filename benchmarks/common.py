@@ -0,0 +1,132 @@
+# benchmarks/common.py
+
+"""Shared helpers for the benchmark suites: timing, statistics, result records and isolation."""
+
+import contextlib
+import io
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BRIDGE_DIR = PROJECT_ROOT / "jarules_agent" / "electron_bridge"
+LLM_CONFIG_PATH = PROJECT_ROOT / "config" / "llm_config.yaml"
+
+RESULTS_SCHEMA_VERSION = 1
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100), matching numpy's default method."""
+    if not values:
+        raise ValueError("percentile() of empty sequence")
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Summary statistics for a list of samples (seconds unless the result says otherwise)."""
+    return {
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "p50": percentile(samples, 50),
+        "p90": percentile(samples, 90),
+        "p99": percentile(samples, 99),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def make_result(suite: str, name: str, samples: Sequence[float], params: Optional[Dict[str, Any]] = None,
+                unit: str = "s", extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Builds one result record. Comparison keys on (suite, name, params)."""
+    return {
+        "suite": suite,
+        "name": name,
+        "params": params or {},
+        "unit": unit,
+        "samples": len(samples),
+        "stats": summarize(samples),
+        "extra": extra or {},
+    }
+
+
+def make_skipped(suite: str, name: str, reason: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Records a benchmark that could not run in this tree, so the gap shows up in the JSON."""
+    return {"suite": suite, "name": name, "params": params or {}, "skipped": True, "reason": reason}
+
+
+def time_call(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """Runs func `repeat` times, returning wall-clock durations. `setup` runs untimed before each call."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@contextlib.contextmanager
+def isolated_home() -> Iterator[Path]:
+    """
+    Points HOME (and Path.home()) at a temporary directory so benchmarks never touch
+    the user's ~/.jarules state.
+    """
+    with tempfile.TemporaryDirectory(prefix="jarules-bench-home-") as tmp_dir:
+        home = Path(tmp_dir)
+        with mock.patch.dict(os.environ, {"HOME": str(home), "USERPROFILE": str(home)}), \
+                mock.patch("pathlib.Path.home", return_value=home):
+            yield home
+
+
+@contextlib.contextmanager
+def silenced_stdout() -> Iterator[io.StringIO]:
+    """Captures stdout for code that reports by printing JSON (the bridge wrappers, the orchestrator)."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        yield buffer
+
+
+def subprocess_env(home: Optional[Path] = None) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    if home is not None:
+        env["HOME"] = str(home)
+        env["USERPROFILE"] = str(home)
+    return env
+
+
+def environment_metadata() -> Dict[str, Any]:
+    """Describes the machine and commit a result file was produced on."""
+    return {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": _git(["rev-parse", "HEAD"]),
+        "git_dirty": bool(_git(["status", "--porcelain", "--untracked-files=no"])),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _git(args: List[str]) -> Optional[str]:
+    try:
+        result = subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
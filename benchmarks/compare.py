@@ -0,0 +1,78 @@
+# benchmarks/compare.py
+
+"""
+Compares two benchmark result files and flags regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json [--metric p50] [--threshold 0.10]
+
+Exits with status 1 if any benchmark present in both files got slower by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+Key = Tuple[str, str, str]
+
+
+def _index(report: Dict[str, Any]) -> Dict[Key, Dict[str, Any]]:
+    return {
+        (r["suite"], r["name"], json.dumps(r.get("params", {}), sort_keys=True)): r
+        for r in report.get("results", [])
+        if not r.get("skipped")
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], candidate: Dict[str, Any], metric: str = "p50",
+                    threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Pairs up results by (suite, name, params) and computes the relative change of `metric`.
+
+    Returns:
+        One row per shared benchmark with 'baseline', 'candidate', 'change' (fraction, positive = slower)
+        and 'status' ('regression', 'improvement' or 'unchanged').
+    """
+    old, new = _index(baseline), _index(candidate)
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        before = old[key]["stats"][metric]
+        after = new[key]["stats"][metric]
+        change = (after - before) / before if before else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        rows.append({"suite": key[0], "name": key[1], "params": json.loads(key[2]),
+                     "baseline": before, "candidate": after, "change": change, "status": status})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p50", choices=["min", "mean", "p50", "p90", "p99", "max"])
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression (default 0.10).")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = compare_reports(baseline, candidate, args.metric, args.threshold)
+    print(f"Baseline:  {baseline['meta'].get('git_commit')}  Candidate: {candidate['meta'].get('git_commit')}  Metric: {args.metric}")
+    for row in rows:
+        params = json.dumps(row["params"], sort_keys=True) if row["params"] else ""
+        print(f"  {row['status']:<11} {row['change'] * 100:+7.1f}%  {row['suite']}.{row['name']} {params}  "
+              f"{row['baseline'] * 1000:.2f}ms -> {row['candidate'] * 1000:.2f}ms")
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print(f"{len(rows)} compared, {len(regressions)} regression(s).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# benchmarks/run.py
+
+"""
+Runs the benchmark suites and writes the results to JSON.
+
+    python -m benchmarks                      # all suites, results in benchmarks/results/
+    python -m benchmarks --quick --suite history --suite connectors
+    python -m benchmarks --output before.json
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import bench_bridge, bench_connectors, bench_history, bench_llm_manager, bench_orchestrator
+from benchmarks.common import PROJECT_ROOT, environment_metadata, make_skipped
+
+DEFAULT_RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+SUITES: Dict[str, Callable[..., List[Dict[str, Any]]]] = {
+    "bridge": bench_bridge.run,
+    "llm_manager": bench_llm_manager.run,
+    "history": bench_history.run,
+    "connectors": bench_connectors.run,
+    "orchestrator": bench_orchestrator.run,
+}
+
+
+def run_suites(names: List[str], quick: bool, connector_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    durations: Dict[str, float] = {}
+    for name in names:
+        print(f"[benchmarks] Running suite '{name}'{' (quick)' if quick else ''}...", file=sys.stderr)
+        started = time.perf_counter()
+        try:
+            if name == "connectors":
+                suite_results = SUITES[name](quick=quick, **(connector_options or {}))
+            else:
+                suite_results = SUITES[name](quick=quick)
+        except Exception as e:
+            traceback.print_exc()
+            suite_results = [make_skipped(name, "suite", f"Suite failed: {type(e).__name__}: {e}")]
+        durations[name] = time.perf_counter() - started
+        results.extend(suite_results)
+    meta = environment_metadata()
+    meta.update({"quick": quick, "suites": names, "suite_durations": durations})
+    return {"meta": meta, "results": results}
+
+
+def default_output_path(meta: Dict[str, Any]) -> Path:
+    commit = (meta.get("git_commit") or "nogit")[:10]
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+    return DEFAULT_RESULTS_DIR / f"{stamp}-{commit}{'-quick' if meta.get('quick') else ''}.json"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run JaRules performance benchmarks and write results as JSON.")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Suite to run (repeatable). Default: all.")
+    parser.add_argument("--quick", action="store_true", help="Fewer sizes, repetitions and concurrency levels.")
+    parser.add_argument("--output", type=Path, help="Result file. Default: benchmarks/results/<time>-<commit>.json")
+    parser.add_argument("--mock-latency", type=float, default=0.0, help="Mock provider time to first byte, seconds (connectors suite).")
+    parser.add_argument("--completion-tokens", type=int, default=32, help="Tokens per mock response (connectors suite).")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    names = args.suite or list(SUITES)
+    report = run_suites(names, args.quick, {"latency": args.mock_latency, "completion_tokens": args.completion_tokens})
+
+    output = args.output or default_output_path(report["meta"])
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for result in report["results"]:
+        label = f"{result['suite']}.{result['name']} {json.dumps(result['params'], sort_keys=True) if result['params'] else ''}"
+        if result.get("skipped"):
+            print(f"  SKIPPED {label}: {result['reason']}")
+        else:
+            stats = result["stats"]
+            print(f"  {label}: p50={stats['p50'] * 1000:.2f}ms p99={stats['p99'] * 1000:.2f}ms (n={result['samples']})")
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
 # jarules_agent/connectors/base_llm_connector.py
 
+import contextlib
 from abc import ABC, abstractmethod
-from typing import Optional, Any
+from typing import Optional, Any, Iterator
+
+from jarules_agent.core.metrics import RequestObservation, observe_request
 
 class LLMConnectorError(Exception):
     """Base exception for all LLM connector errors."""
@@ -15,6 +18,9 @@ class BaseLLMConnector(ABC):
     Defines a common interface for interacting with different LLMs.
     """
 
+    # Provider label used for metrics; subclasses override it.
+    PROVIDER_NAME: Optional[str] = None
+
     def __init__(self, model_name: Optional[str] = None, **kwargs: Any):
         """
         Initializes the LLM connector.
@@ -27,8 +33,35 @@ class BaseLLMConnector(ABC):
         # Allow subclasses to use additional configuration via kwargs
         # For example, api_key, base_url, etc.
         self._config = kwargs
+        self._inflight_requests = 0
         super().__init__()
 
+    @property
+    def inflight_requests(self) -> int:
+        """Number of provider requests currently in flight on this connector."""
+        return getattr(self, "_inflight_requests", 0)
+
+    @contextlib.contextmanager
+    def _track_request(self, operation: str = "generate") -> Iterator[RequestObservation]:
+        """
+        Marks a provider request as in flight for the duration of the block and records
+        its latency, outcome and token usage in the metrics registry.
+        The in-flight count is used by LLMManager to drain a connector before closing it on config reload.
+
+        Args:
+            operation: Label describing the call (e.g. 'generate', 'availability_check').
+
+        Yields:
+            A RequestObservation; call `record_usage` on it with the provider's usage fields.
+        """
+        provider = self.PROVIDER_NAME or type(self).__name__.lower()
+        self._inflight_requests = self.inflight_requests + 1
+        try:
+            with observe_request(provider, self.model_name or "unknown", operation) as observation:
+                yield observation
+        finally:
+            self._inflight_requests -= 1
+
     @abstractmethod
     def generate_code(self, user_prompt: str, system_instruction: Optional[str] = None, history: Optional[list[dict[str, str]]] = None, **kwargs: Any) -> Optional[str]:
         """
@@ -20,6 +20,7 @@ class ClaudeConnector(BaseLLMConnector):
     Connector for interacting with Anthropic's Claude models.
     """
 
+    PROVIDER_NAME = "claude"
     DEFAULT_MODEL_NAME = "claude-3-opus-20240229"
     DEFAULT_MAX_TOKENS = 2048 # Default max tokens for Claude, can be overridden by config
 
@@ -39,6 +40,7 @@ class ClaudeConnector(BaseLLMConnector):
                       - 'request_timeout' (int, optional): Timeout for API requests in seconds.
                                                            Defaults to 60.
                       - 'anthropic_version_header' (str, optional): Value for the 'anthropic-version' header.
+                      - 'api_base_url' (str, optional): Overrides the Anthropic API URL (e.g. a local mock server).
                       - 'generation_params' (dict, optional): Additional generation parameters like temperature.
         """
         effective_model_name = model_name or kwargs.get("model_name") or self.DEFAULT_MODEL_NAME
@@ -59,11 +61,17 @@ class ClaudeConnector(BaseLLMConnector):
         if anthropic_version:
             custom_headers["anthropic-version"] = anthropic_version
 
+        client_kwargs: Dict[str, Any] = {}
+        api_base_url = self._config.get("api_base_url")
+        if api_base_url:
+            client_kwargs["base_url"] = api_base_url
+
         try:
             self.client = anthropic.AsyncAnthropic(
                 api_key=self.api_key,
                 timeout=request_timeout,
-                custom_headers=custom_headers if custom_headers else None
+                default_headers=custom_headers if custom_headers else None,
+                **client_kwargs
             )
         except Exception as e:
             logger.error(f"Failed to initialize Anthropic client: {e}")
@@ -119,7 +127,13 @@ class ClaudeConnector(BaseLLMConnector):
             if current_system_prompt: # Only add system if it's not None or empty
                 request_params["system"] = current_system_prompt
 
-            response = await self.client.messages.create(**request_params)
+            with self._track_request() as observation:
+                response = await self.client.messages.create(**request_params)
+                usage = getattr(response, "usage", None)
+                observation.record_usage(
+                    prompt_tokens=getattr(usage, "input_tokens", None),
+                    completion_tokens=getattr(usage, "output_tokens", None),
+                )
 
             if response.content and isinstance(response.content, list) and len(response.content) > 0:
                 # Assuming the first content block is the primary text response
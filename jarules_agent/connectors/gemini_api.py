@@ -37,6 +37,7 @@ class GeminiClient(BaseLLMConnector):
     """
     A client for interacting with the Google Gemini API.
     """
+    PROVIDER_NAME = "gemini"
     DEFAULT_MODEL_NAME = 'gemini-1.5-flash-latest' # A good default, you can change if needed
 
     @staticmethod
@@ -54,7 +55,9 @@ class GeminiClient(BaseLLMConnector):
             model_name: Optional. The name of the Gemini model to use. 
                         Defaults to 'gemini-1.5-flash-latest'.
             **kwargs: Additional keyword arguments for connector-specific configuration,
-                      including 'api_key', 'default_system_prompt', 'generation_params'.
+                      including 'api_key', 'default_system_prompt', 'generation_params',
+                      and 'api_endpoint' (switches to the REST transport against that URL,
+                      e.g. a local mock server).
 
         Raises:
             GeminiApiKeyError: If the API key is not found.
@@ -71,8 +74,13 @@ class GeminiClient(BaseLLMConnector):
                 "set GEMINI_API_KEY environment variable."
             )
         
+        configure_kwargs: Dict[str, Any] = {}
+        api_endpoint = self._config.get('api_endpoint')
+        if api_endpoint:
+            configure_kwargs = {"transport": "rest", "client_options": {"api_endpoint": api_endpoint}}
+
         try:
-            genai.configure(api_key=self.api_key)
+            genai.configure(api_key=self.api_key, **configure_kwargs)
         except Exception as e:
             raise GeminiClientError(f"Failed to configure Gemini API: {e}", underlying_exception=e)
 
@@ -130,11 +138,17 @@ class GeminiClient(BaseLLMConnector):
 
         print(f"Sending prompt to Gemini: {prompt_parts}. Config: {final_generation_config}")
         try:
-            response = self.model.generate_content(
-                contents=prompt_parts,
-                generation_config=final_generation_config,
-                safety_settings=safety_settings
-            )
+            with self._track_request() as observation:
+                response = self.model.generate_content(
+                    contents=prompt_parts,
+                    generation_config=final_generation_config,
+                    safety_settings=safety_settings
+                )
+                usage = getattr(response, "usage_metadata", None)
+                observation.record_usage(
+                    prompt_tokens=getattr(usage, "prompt_token_count", None),
+                    completion_tokens=getattr(usage, "candidates_token_count", None),
+                )
             return response
         except google_exceptions.GoogleAPIError as e:
             error_message = f"Gemini API error during content generation: {e}"
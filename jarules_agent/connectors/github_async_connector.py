@@ -0,0 +1,454 @@
+# jarules_agent/connectors/github_async_connector.py
+
+"""
+Asynchronous GitHub client for use inside an event loop (the orchestrator, the UI bridge).
+
+It has the same method surface and return values as GitHubClient, but sends
+requests through one pooled httpx.AsyncClient: connections are kept alive and
+reused, HTTP/2 is used when the optional `h2` package is installed (so
+concurrent requests share a single connection), and many calls can be awaited
+together. It shares GitHubClient's HTTP cache, rate-limit scheduler and
+commit_files strategy.
+"""
+
+import asyncio
+import importlib.util
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+import httpx
+
+from jarules_agent.connectors.github_connector import GitHubClient
+from jarules_agent.connectors.github_http_cache import GitHubHttpCache
+from jarules_agent.connectors.github_rate_limiter import (
+    PRIORITY_LOW, PRIORITY_NORMAL, RateLimitScheduler, RateLimitWaitError, resource_for_url)
+from jarules_agent.connectors.github_tree_index import RepoTreeIndex
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_CONCURRENCY = 10  # Calls in flight at once in gather()
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+T = TypeVar("T")
+
+
+async def _aiter(chunks: Iterable[bytes]):
+    for chunk in chunks:
+        yield chunk
+
+
+class AsyncGitHubRateLimitError(httpx.HTTPError):
+    """Raised when a request would wait longer than AsyncGitHubClient.MAX_RATE_LIMIT_WAIT for rate-limit budget."""
+    pass
+
+
+class AsyncGitHubClient:
+    """
+    An asyncio client for the GitHub API. Use it as an async context manager, or call aclose() when done,
+    to release its pooled connections.
+    """
+    BASE_API_URL = GitHubClient.BASE_API_URL
+    BLOB_UPLOAD_WORKERS = GitHubClient.BLOB_UPLOAD_WORKERS
+    CONTENTS_LISTING_LIMIT = GitHubClient.CONTENTS_LISTING_LIMIT
+    INLINE_CONTENT_MAX_BYTES = GitHubClient.INLINE_CONTENT_MAX_BYTES
+    MAX_RATE_LIMIT_RETRIES = GitHubClient.MAX_RATE_LIMIT_RETRIES
+    MAX_RATE_LIMIT_WAIT = GitHubClient.MAX_RATE_LIMIT_WAIT
+
+    def __init__(self, token: Optional[str] = None, tokens: Optional[List[str]] = None,
+                 rate_limiter: Optional[RateLimitScheduler] = None, http_cache: Optional[GitHubHttpCache] = None,
+                 use_cache: bool = True, max_connections: int = DEFAULT_MAX_CONNECTIONS, http2: Optional[bool] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initializes the AsyncGitHubClient.
+
+        Args:
+            token: Optional. A GitHub personal access token (PAT) for authentication.
+            tokens: Optional. More tokens to spread requests across (see GitHubClient).
+            rate_limiter: Optional. Scheduler to share with other clients using the same tokens.
+            http_cache: Optional. Cache for GET responses. Defaults to the shared on-disk cache in ~/.jarules.
+            use_cache: Optional. Set to False to send every GET unconditionally. Defaults to True.
+            max_connections: Optional. Size of the connection pool.
+            http2: Optional. Whether to negotiate HTTP/2. Defaults to True if `h2` is installed.
+            transport: Optional. An httpx transport, e.g. httpx.MockTransport in tests.
+        """
+        self.token = token or (tokens[0] if tokens else None)
+        self.headers = {
+            "Accept": "application/vnd.github.v3+json",
+        }
+        if self.token:
+            self.headers["Authorization"] = f"token {self.token}"
+        self.http_cache = (http_cache or GitHubHttpCache()) if use_cache else None
+        self.rate_limiter = rate_limiter or RateLimitScheduler([self.token] + list(tokens or []))
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE if http2 is None else http2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=DEFAULT_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "AsyncGitHubClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections."""
+        await self._client.aclose()
+
+    async def gather(self, calls: Iterable[Callable[[], Awaitable[T]]], concurrency: int = DEFAULT_CONCURRENCY) -> List[T]:
+        """
+        Runs many client calls concurrently, at most `concurrency` at a time, and returns their results in order.
+
+        Example:
+            await client.gather([lambda p=p: client.read_repo_file(owner, repo, p) for p in paths])
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(call):
+            async with semaphore:
+                return await call()
+        return list(await asyncio.gather(*(run(call) for call in calls)))
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Makes an HTTP request to the GitHub API, with the same caching, rate limiting and retries as
+        GitHubClient._request.
+
+        Args:
+            method: HTTP method (e.g., "GET", "POST").
+            url: The full URL for the API endpoint.
+            **kwargs: Additional keyword arguments for httpx.AsyncClient.request, plus `priority`.
+
+        Returns:
+            An httpx.Response object.
+
+        Raises:
+            AsyncGitHubRateLimitError: If the request would wait longer than MAX_RATE_LIMIT_WAIT for budget.
+            httpx.HTTPError: For network or HTTP errors.
+        """
+        cache_key = None
+        cached = None
+        priority = kwargs.pop("priority", PRIORITY_NORMAL)
+        extra_headers = kwargs.pop("headers", None)
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        if self.http_cache is not None and method.upper() == "GET":
+            cache_key = self.http_cache.cache_key(url, kwargs.get("params"), headers)
+            # The cache is SQLite on disk (with a busy timeout), so its calls run off the event loop.
+            cached = await asyncio.to_thread(self.http_cache.get, cache_key)
+            if cached is not None:
+                headers = {**headers, **cached.conditional_headers()}
+        resource = resource_for_url(url)
+        attempts = 1 if "content" in kwargs else 1 + self.MAX_RATE_LIMIT_RETRIES
+        max_wait = None if priority == PRIORITY_LOW else self.MAX_RATE_LIMIT_WAIT
+        try:
+            for attempt in range(attempts):
+                try:
+                    token = await self.rate_limiter.acquire_async(resource, priority, max_wait=max_wait)
+                except RateLimitWaitError as e:
+                    raise AsyncGitHubRateLimitError(str(e)) from e
+                request_headers = headers if token == self.token else {**headers, "Authorization": f"token {token}"}
+                response = await self._client.request(method, url, headers=request_headers, **kwargs)
+                message = response.text if response.status_code in (403, 429) else ""
+                retry_after = self.rate_limiter.update(token, resource, response.status_code, response.headers, message)
+                if retry_after is None or attempt == attempts - 1:
+                    break
+                print(f"Rate limited by GitHub ({resource}); retrying {method} {url} in {retry_after:.0f}s if no other token has budget.")
+            if cached is not None and response.status_code == 304:
+                await asyncio.to_thread(self.http_cache.touch, cache_key, response.headers)
+                # The stored body is already decoded, so the headers describing its transfer encoding no longer apply.
+                headers = {name: value for name, value in cached.headers.items()
+                           if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+                return httpx.Response(cached.status_code, headers=headers, content=cached.body, request=response.request)
+            response.raise_for_status()  # Raises HTTPStatusError for bad responses (4XX or 5XX)
+            if cache_key is not None and response.status_code == 200:
+                await asyncio.to_thread(self.http_cache.put, cache_key, url, response.status_code, response.headers, response.content)
+            return response
+        except httpx.HTTPStatusError as e:
+            print(f"HTTP error occurred: {e} - {e.response.text}")
+            raise
+        except httpx.HTTPError as e:
+            print(f"Error during request to {url}: {e}")
+            raise
+
+    async def list_repo_files(self, owner: str, repo: str, path: str = '') -> List[str]:
+        """
+        Lists files and directories in a GitHub repository path, or returns an empty list on error.
+
+        Unlike GitHubClient.list_repo_files, this client keeps no local mirror or tree index, so every
+        listing is one contents request. Directories with CONTENTS_LISTING_LIMIT or more entries, which
+        the contents API cuts short, are listed from the default branch's recursive tree instead when
+        GitHub returns it untruncated.
+        """
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/contents/{path.lstrip('/')}"
+        try:
+            contents = (await self._request("GET", url)).json()
+            if isinstance(contents, list):
+                if len(contents) >= self.CONTENTS_LISTING_LIMIT:
+                    print(f"Directory '{path}' in '{owner}/{repo}' has {self.CONTENTS_LISTING_LIMIT}+ entries; listing it from the git tree.")
+                    index = await self._default_branch_tree_index(owner, repo)
+                    names = index.list_dir(path.strip('/')) if index is not None else None
+                    if names is not None:
+                        return names
+                    print(f"Could not list '{path}' in '{owner}/{repo}' from the git tree; the listing may be incomplete.")
+                return [item['name'] for item in contents]
+            print(f"Path '{path}' in '{owner}/{repo}' is not a directory or not found.")
+            return []
+        except httpx.HTTPError as e:
+            print(f"Error listing repository files for {owner}/{repo}/{path}: {e}")
+            return []
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Error parsing response for {owner}/{repo}/{path}: {e}")
+            return []
+
+    async def read_repo_file(self, owner: str, repo: str, file_path: str, ref: Optional[str] = None) -> Optional[str]:
+        """Reads the content of a file from a GitHub repository. See GitHubClient.read_repo_file."""
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/contents/{file_path.lstrip('/')}"
+        try:
+            file_data = (await self._request("GET", url, params={"ref": ref} if ref else None)).json()
+            if not isinstance(file_data, dict) or file_data.get('type') != 'file':
+                print(f"Path '{file_path}' in '{owner}/{repo}' is not a file.")
+                return None
+            # Files over 1 MB come with empty content and encoding 'none'; those are read from download_url
+            if 'content' in file_data and file_data.get('encoding') != 'none':
+                decoded = GitHubClient._decode_file_content(file_data['content'])
+                if decoded is not None:
+                    return decoded
+                print(f"Error decoding base64 content for {owner}/{repo}/{file_path}. Will try download_url if available.")
+            if file_data.get('download_url'):
+                try:
+                    return (await self._request("GET", file_data['download_url'])).text
+                except httpx.HTTPError as download_e:
+                    print(f"Error downloading file from download_url for {owner}/{repo}/{file_path}: {download_e}")
+                    return None
+            print(f"No content found and no usable download_url (or download failed) for {owner}/{repo}/{file_path}.")
+            return None
+        except httpx.HTTPError as e:
+            print(f"Error reading repository file {owner}/{repo}/{file_path}: {e}")
+            return None
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Error parsing response for {owner}/{repo}/{file_path}: {e}")
+            return None
+
+    async def read_repo_files(self, owner: str, repo: str, file_paths: List[str], ref: Optional[str] = None,
+                              concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, Optional[str]]:
+        """Reads many files concurrently over the pooled connections. Returns {path: content or None}."""
+        paths = list(dict.fromkeys(file_paths))
+        contents = await self.gather([lambda path=path: self.read_repo_file(owner, repo, path, ref=ref) for path in paths],
+                                     concurrency=concurrency)
+        return dict(zip(paths, contents))
+
+    async def get_default_branch(self, owner: str, repo: str) -> Optional[str]:
+        """Retrieves the name of the repository's default branch, or None if an error occurs."""
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}"
+        try:
+            return (await self._request("GET", url)).json().get("default_branch")
+        except httpx.HTTPError as e:
+            print(f"Error fetching repository details for {owner}/{repo}: {e}")
+            return None
+        except (AttributeError, TypeError, ValueError) as e:
+            print(f"Error parsing repository details for {owner}/{repo}: {e}")
+            return None
+
+    async def _default_branch_tree_index(self, owner: str, repo: str) -> Optional[RepoTreeIndex]:
+        """
+        Indexes the default branch from one recursive tree request. Returns None on error or if the tree
+        is truncated; large trees are never read level by level just to list a directory.
+        """
+        branch_name = await self.get_default_branch(owner, repo)
+        commit_sha = await self.get_branch_sha(owner, repo, branch_name) if branch_name else None
+        if not commit_sha:
+            return None
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/trees/{commit_sha}"
+        try:
+            data = (await self._request("GET", url, params={"recursive": "1"})).json()
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Could not read the tree of {owner}/{repo}@{commit_sha}: {e}")
+            return None
+        if data.get("truncated"):
+            print(f"Tree for {owner}/{repo}@{commit_sha} is too large for one request; not reading it directory by directory.")
+            return None
+        return RepoTreeIndex(commit_sha, data.get("tree", []), tree_sha=data.get("sha"))
+
+    async def get_branch_sha(self, owner: str, repo: str, branch_name: str) -> Optional[str]:
+        """Retrieves the SHA of the latest commit on a given branch, or None if it is not found."""
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/refs/heads/{branch_name.lstrip('/')}"
+        try:
+            return (await self._request("GET", url)).json()['object']['sha']
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                print(f"Branch '{branch_name}' not found in {owner}/{repo}.")
+            else:
+                print(f"HTTP error fetching SHA for branch '{branch_name}' in {owner}/{repo}: {e}")
+            return None
+        except httpx.HTTPError as e:
+            print(f"Request error fetching SHA for branch '{branch_name}' in {owner}/{repo}: {e}")
+            return None
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Error parsing response for branch SHA {owner}/{repo}/refs/heads/{branch_name}: {e}")
+            return None
+
+    async def create_branch(self, owner: str, repo: str, new_branch_name: str, source_branch_name: str = 'main') -> tuple[bool, Optional[Dict[str, Any]]]:
+        """Creates a new branch in the repository. Returns (success_status, data) like GitHubClient.create_branch."""
+        source_sha = await self.get_branch_sha(owner, repo, source_branch_name)
+        if not source_sha:
+            error_msg = f"Could not retrieve SHA for source branch '{source_branch_name}'."
+            print(error_msg)
+            return False, {"error": error_msg, "reason": "source_branch_not_found_or_sha_retrieval_failed"}
+
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/refs"
+        payload = {"ref": f"refs/heads/{new_branch_name.lstrip('/')}", "sha": source_sha}
+        try:
+            data = (await self._request("POST", url, json=payload)).json()
+            print(f"Branch '{new_branch_name}' created successfully in {owner}/{repo}.")
+            return True, data
+        except httpx.HTTPStatusError as e:
+            error_details = self._error_details(e)
+            if e.response.status_code == 422:
+                error_details["reason"] = "branch_already_exists_or_invalid_sha"
+            else:
+                error_details["reason"] = "http_error"
+            print(f"Failed to create branch '{new_branch_name}' in {owner}/{repo}. Details: {error_details}")
+            return False, error_details
+        except httpx.HTTPError as e:
+            error_msg = f"Request error creating branch '{new_branch_name}' in {owner}/{repo}: {e}"
+            print(error_msg)
+            return False, {"error": error_msg, "reason": "request_exception"}
+
+    async def _base_tree_index(self, owner: str, repo: str, commit_sha: str, base_tree_sha: str) -> Optional[RepoTreeIndex]:
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/trees/{base_tree_sha}"
+        try:
+            data = (await self._request("GET", url, params={"recursive": "1"})).json()
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Could not read base tree of {owner}/{repo}@{commit_sha}; uploading every blob: {e}")
+            return None
+        if data.get("truncated"):
+            return None  # Too large to check in one request; uploading is cheaper than reading it level by level
+        return RepoTreeIndex(commit_sha, data.get("tree", []), tree_sha=data.get("sha"))
+
+    async def _create_blob(self, blobs_url: str, file_change: Dict[str, Any]) -> str:
+        content = file_change.get("content")
+        if isinstance(content, str):
+            response = await self._request("POST", blobs_url, json={"content": content, "encoding": "utf-8"}, priority=PRIORITY_LOW)
+        else:
+            _, open_stream = GitHubClient._change_source(file_change)
+            with open_stream() as stream:
+                response = await self._request("POST", blobs_url, content=_aiter(GitHubClient._base64_blob_body(stream)),
+                                               headers={"Content-Type": "application/json"}, priority=PRIORITY_LOW)
+        return response.json()["sha"]
+
+    async def _post_for_sha(self, url: str, payload: Dict[str, Any], step: str) -> tuple[bool, Dict[str, Any]]:
+        """POSTs a git object; returns (True, response data) or (False, error dict) as commit_files reports it."""
+        try:
+            data = (await self._request("POST", url, json=payload)).json()
+        except httpx.HTTPError as e:
+            return False, {"error": f"API error in {step}: {e}", "step": f"{step}_request"}
+        except ValueError as e:
+            return False, {"error": f"Error parsing {step} response: {e}", "step": f"{step}_parse"}
+        if not isinstance(data, dict) or not data.get("sha"):
+            return False, {"error": f"Could not retrieve SHA from {step} response.", "step": f"{step}_get_sha", "details": data}
+        return True, data
+
+    async def commit_files(self, owner: str, repo: str, branch_name: str, file_changes: List[Dict[str, Any]], commit_message: str) -> tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Commits multiple file changes to a specified branch, like GitHubClient.commit_files: small text files
+        are inlined in the tree, blobs already in the base tree are reused, and the rest are uploaded
+        concurrently (at most BLOB_UPLOAD_WORKERS at a time).
+
+        Returns:
+            A tuple: (success_status, data).
+        """
+        latest_commit_sha = await self.get_branch_sha(owner, repo, branch_name)
+        if not latest_commit_sha:
+            return False, {"error": f"Branch '{branch_name}' not found or SHA could not be retrieved.", "step": "get_branch_sha"}
+
+        base = f"{self.BASE_API_URL}/repos/{owner}/{repo}"
+        try:
+            base_tree_sha = (await self._request("GET", f"{base}/git/commits/{latest_commit_sha}")).json().get("tree", {}).get("sha")
+            if not base_tree_sha:
+                return False, {"error": "Could not retrieve base tree SHA from commit.", "step": "get_base_tree_sha"}
+        except httpx.HTTPError as e:
+            return False, {"error": f"API error getting commit details for SHA '{latest_commit_sha}': {e}", "step": "get_base_tree_sha_request"}
+        except (AttributeError, TypeError, ValueError) as e:
+            return False, {"error": f"Error parsing commit details response: {e}", "step": "get_base_tree_sha_parse"}
+
+        try:
+            tree_elements, candidates = await asyncio.to_thread(GitHubClient._classify_file_changes, file_changes, self.INLINE_CONTENT_MAX_BYTES)
+            index = await self._base_tree_index(owner, repo, latest_commit_sha, base_tree_sha) if candidates else None
+            uploads = await asyncio.to_thread(GitHubClient._reuse_existing_blobs, tree_elements, candidates, file_changes, index)
+        except (OSError, KeyError, TypeError) as e:
+            return False, {"error": f"Error reading file changes: {e}", "step": "prepare_blobs"}
+
+        semaphore = asyncio.Semaphore(self.BLOB_UPLOAD_WORKERS)
+
+        async def upload(i):
+            async with semaphore:
+                tree_elements[i]["sha"] = await self._create_blob(f"{base}/git/blobs", file_changes[i])
+
+        tasks = {i: asyncio.ensure_future(upload(i)) for i in uploads}
+        for i, task in tasks.items():
+            file_path = file_changes[i]["path"]
+            try:
+                await task
+                continue
+            except httpx.HTTPError as e:
+                error = {"error": f"API error creating blob for file '{file_path}': {e}", "step": "create_blob_request", "file_path": file_path}
+            except (OSError, KeyError, TypeError, ValueError) as e:
+                error = {"error": f"Error parsing blob creation response for '{file_path}': {e}", "step": "create_blob_parse", "file_path": file_path}
+            for pending in tasks.values():
+                pending.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            return False, error
+
+        success, new_tree_data = await self._post_for_sha(f"{base}/git/trees", {"base_tree": base_tree_sha, "tree": tree_elements}, "create_tree")
+        if not success:
+            return False, new_tree_data
+        commit_payload = {"message": commit_message, "tree": new_tree_data["sha"], "parents": [latest_commit_sha]}
+        success, new_commit_data = await self._post_for_sha(f"{base}/git/commits", commit_payload, "create_commit")
+        if not success:
+            return False, new_commit_data
+
+        ref_update_url = f"{base}/git/refs/heads/{branch_name.lstrip('/')}"
+        try:
+            await self._request("PATCH", ref_update_url, json={"sha": new_commit_data["sha"]})
+        except httpx.HTTPStatusError as e:
+            error_details = self._error_details(e)
+            error_details["step"] = "update_ref_http_error"
+            if e.response.status_code == 422:
+                error_details["reason"] = "not_a_fast_forward_or_other_issue"
+            print(f"HTTP error updating branch reference for '{branch_name}': {error_details}")
+            return False, error_details
+        except httpx.HTTPError as e:
+            return False, {"error": f"API error updating branch reference for '{branch_name}': {e}", "step": "update_ref_request"}
+        print(f"Successfully committed to {owner}/{repo}/{branch_name}. New commit SHA: {new_commit_data['sha']}")
+        return True, new_commit_data
+
+    async def create_pull_request(self, owner: str, repo: str, head_branch: str, base_branch: str, title: str, body: str = '') -> tuple[bool, Optional[Dict[str, Any]]]:
+        """Creates a new pull request. Returns (success_status, data) like GitHubClient.create_pull_request."""
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/pulls"
+        payload = {"title": title, "head": head_branch, "base": base_branch, "body": body}
+        try:
+            pr_data = (await self._request("POST", url, json=payload)).json()
+            print(f"Pull request '{title}' created successfully in {owner}/{repo}. URL: {pr_data.get('html_url')}")
+            return True, pr_data
+        except httpx.HTTPStatusError as e:
+            error_details = self._error_details(e)
+            error_details["step"] = "create_pull_request_http_error"
+            error_details.update(GitHubClient._pull_request_error_reason(error_details, e.response.status_code))
+            print(f"Failed to create pull request '{title}' in {owner}/{repo}. Details: {error_details}")
+            return False, error_details
+        except httpx.HTTPError as e:
+            error_msg = f"Request error creating pull request '{title}' in {owner}/{repo}: {e}"
+            print(error_msg)
+            return False, {"error": error_msg, "reason": "request_exception", "step": "create_pull_request_request_exception"}
+
+    @staticmethod
+    def _error_details(error: httpx.HTTPStatusError) -> Dict[str, Any]:
+        details: Dict[str, Any] = {"error": str(error)}
+        try:
+            body = error.response.json()
+            if isinstance(body, dict):
+                details.update(body)
+        except ValueError:
+            details["response_text"] = error.response.text
+        return details
@@ -1,47 +1,141 @@
 # jarules_agent/connectors/github_connector.py
 
 import requests
+import urllib3
 import base64
-from typing import Optional, List, Dict, Any
+import hashlib
+import io
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any, BinaryIO, Callable, Iterator, Tuple, Union
+
+from jarules_agent.connectors.github_graphql import (
+    DEFAULT_MAX_QUERY_COST, LOOKUP_OBJECT, LOOKUP_REF, GitHubGraphQLError, build_lookup_query, parse_lookup_response,
+    split_by_cost)
+from jarules_agent.connectors.github_http_cache import GitHubHttpCache
+from jarules_agent.connectors.github_mirror import GitMirrorBackend, MirrorError
+from jarules_agent.connectors.github_rate_limiter import (
+    PRIORITY_LOW, PRIORITY_NORMAL, RateLimitScheduler, RateLimitWaitError, resource_for_url)
+from jarules_agent.connectors.github_snapshot_cache import RepoSnapshotCache, SnapshotError
+from jarules_agent.connectors.github_tree_index import RepoTreeIndex
+
+BASE64_CHUNK_BYTES = 3 * 64 * 1024  # A multiple of 3, so chunks base64-encode without padding
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+class GitHubRateLimitError(requests.exceptions.RequestException):
+    """Raised when a request would wait longer than GitHubClient.MAX_RATE_LIMIT_WAIT for rate-limit budget."""
+    pass
+
 
 class GitHubClient:
     """
     A client for interacting with the GitHub API.
     """
     BASE_API_URL = "https://api.github.com"
+    GRAPHQL_URL = f"{BASE_API_URL}/graphql"
+    GRAPHQL_MAX_QUERY_COST = DEFAULT_MAX_QUERY_COST  # Estimated cost per batched query (see github_graphql)
+    BLOB_UPLOAD_WORKERS = 8  # Concurrent blob creations in commit_files
+    INLINE_CONTENT_MAX_BYTES = 64 * 1024  # Text files up to this size are sent inside the tree request
+    MAX_RATE_LIMIT_RETRIES = 3  # Times a request rejected by a rate limit is sent again
+    MAX_RATE_LIMIT_WAIT = 60.0  # Seconds a normal or high priority request waits for budget before failing (None: no limit)
+    PAGE_SIZE = 100  # per_page for paginated list endpoints (GitHub's maximum)
+    CONTENTS_LISTING_LIMIT = 1000  # The contents API lists at most this many entries of a directory
 
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: Optional[str] = None, http_cache: Optional[GitHubHttpCache] = None, use_cache: bool = True,
+                 snapshot_cache: Optional[RepoSnapshotCache] = None, tokens: Optional[List[str]] = None,
+                 rate_limiter: Optional[RateLimitScheduler] = None, mirror_backend: Optional[GitMirrorBackend] = None):
         """
         Initializes the GitHubClient.
 
         Args:
             token: Optional. A GitHub personal access token (PAT) for authentication.
+            http_cache: Optional. Cache for GET responses. Defaults to the shared on-disk cache in ~/.jarules.
+            use_cache: Optional. Set to False to send every GET unconditionally. Defaults to True.
+            snapshot_cache: Optional. Where fetch_repo_snapshot extracts tarballs. Defaults to ~/.jarules/github_snapshots.
+            tokens: Optional. More tokens (for the same user) to spread requests across when a budget runs low.
+            rate_limiter: Optional. Scheduler that paces requests by rate-limit budget; share one between clients
+                          that use the same tokens. Defaults to a new scheduler for this client's tokens.
+            mirror_backend: Optional. Local bare mirrors that serve listings and reads for the repositories
+                            mirrored with mirror_repo. Defaults to ~/.jarules/github_mirrors, using this client's token.
         """
-        self.token = token
+        self.token = token or (tokens[0] if tokens else None)
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
         }
         if self.token:
             self.headers["Authorization"] = f"token {self.token}"
+        self.http_cache = (http_cache or GitHubHttpCache()) if use_cache else None
+        self._tree_indexes: Dict[tuple, RepoTreeIndex] = {}  # (owner, repo, branch) -> index of the branch's tree
+        self.snapshot_cache = snapshot_cache or RepoSnapshotCache()
+        self._snapshots: Dict[tuple, str] = {}  # (owner, repo) -> commit SHA that read_repo_file serves from disk
+        self.rate_limiter = rate_limiter or RateLimitScheduler([self.token] + list(tokens or []))
+        self.mirror_backend = mirror_backend or GitMirrorBackend(token=self.token)
 
     def _request(self, method: str, url: str, **kwargs) -> requests.Response:
         """
         Makes an HTTP request to the GitHub API.
 
+        GET requests go through the HTTP cache: a stored response is revalidated with
+        If-None-Match / If-Modified-Since, and on 304 Not Modified (which costs no rate-limit
+        quota) the stored response is returned with status 200 and `from_cache` set to True.
+
+        Every request first waits for the rate limiter, which picks the token to send it with and
+        paces requests as a budget runs low. A request rejected by a primary or secondary rate limit
+        is sent again (up to MAX_RATE_LIMIT_RETRIES times, unless its body is a one-shot iterator)
+        once the limiter says the budget allows it. Only PRIORITY_LOW requests wait for as long as that
+        takes; others fail with GitHubRateLimitError if budget is not free within MAX_RATE_LIMIT_WAIT.
+
         Args:
             method: HTTP method (e.g., "GET", "POST").
             url: The full URL for the API endpoint.
-            **kwargs: Additional keyword arguments to pass to requests.request.
+            **kwargs: Additional keyword arguments to pass to requests.request. Any `headers` are
+                      added to the client's default headers. `priority` (a PRIORITY_* constant from
+                      github_rate_limiter) orders this request among others waiting for budget.
 
         Returns:
             A requests.Response object.
 
         Raises:
+            GitHubRateLimitError: If the request would wait longer than MAX_RATE_LIMIT_WAIT for budget.
             requests.exceptions.RequestException: For network or HTTP errors.
         """
+        cache_key = None
+        cached = None
+        priority = kwargs.pop("priority", PRIORITY_NORMAL)
+        extra_headers = kwargs.pop("headers", None)
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        if self.http_cache is not None and method.upper() == "GET" and not kwargs.get("stream"):
+            # Keyed by the client's own token: the tokens it rotates through are treated as one identity.
+            cache_key = self.http_cache.cache_key(url, kwargs.get("params"), headers)
+            cached = self.http_cache.get(cache_key)
+            if cached is not None:
+                headers = {**headers, **cached.conditional_headers()}
+        resource = resource_for_url(url)
+        attempts = 1 if isinstance(kwargs.get("data"), Iterator) else 1 + self.MAX_RATE_LIMIT_RETRIES
+        max_wait = None if priority == PRIORITY_LOW else self.MAX_RATE_LIMIT_WAIT
         try:
-            response = requests.request(method, url, headers=self.headers, **kwargs)
+            for attempt in range(attempts):
+                try:
+                    token = self.rate_limiter.acquire(resource, priority, max_wait=max_wait)
+                except RateLimitWaitError as e:
+                    raise GitHubRateLimitError(str(e)) from e
+                request_headers = headers if token == self.token else {**headers, "Authorization": f"token {token}"}
+                response = requests.request(method, url, headers=request_headers, **kwargs)
+                status_code = response.status_code
+                message = getattr(response, "text", "") if status_code in (403, 429) else ""
+                retry_after = self.rate_limiter.update(token, resource, status_code, getattr(response, "headers", None) or {}, message)
+                if retry_after is None or attempt == attempts - 1:
+                    break
+                print(f"Rate limited by GitHub ({resource}); retrying {method} {url} in {retry_after:.0f}s if no other token has budget.")
+            if cached is not None and response.status_code == 304:
+                self.http_cache.touch(cache_key, getattr(response, "headers", None))
+                return self._response_from_cache(cached)
             response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
+            if cache_key is not None and response.status_code == 200:
+                self.http_cache.put(cache_key, url, response.status_code, getattr(response, "headers", None) or {}, response.content)
             return response
         except requests.exceptions.HTTPError as e:
             print(f"HTTP error occurred: {e} - {e.response.text}")
@@ -50,6 +144,75 @@ class GitHubClient:
             print(f"Error during request to {url}: {e}")
             raise
 
+    @staticmethod
+    def _response_from_cache(cached) -> requests.Response:
+        """Builds a requests.Response from a stored response."""
+        response = requests.Response()
+        response.status_code = cached.status_code
+        response.url = cached.url
+        response.headers = requests.structures.CaseInsensitiveDict(cached.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = cached.body
+        response.from_cache = True
+        return response
+
+    def iter_pages(self, url: str, params: Optional[Dict[str, Any]] = None, per_page: Optional[int] = None,
+                   prefetch: bool = True, items_key: Optional[str] = None) -> Iterator[List[Any]]:
+        """
+        Lazily yields the pages of a paginated GitHub list endpoint, following `Link: rel="next"` until
+        the last page. Only the page being consumed (and, with prefetch, the next one) is held in memory.
+
+        With prefetch, the request for the next page is sent on a background thread as soon as the current
+        page arrives, so it downloads while the caller works through the current one. Stopping early
+        (break, or closing the generator) sends no requests beyond the one already in flight.
+
+        Args:
+            url: The full URL of the first page.
+            params: Optional. Query parameters for the first page. Later pages use the URLs GitHub links to,
+                    which carry the parameters forward.
+            per_page: Optional. Items per page. Defaults to PAGE_SIZE.
+            prefetch: Optional. Fetch the next page while the current one is consumed. Defaults to True.
+            items_key: Optional. For endpoints that wrap each page in an object (e.g. search results under
+                       "items"), the key holding the page's list.
+
+        Yields:
+            Each page's list of items, as decoded from JSON.
+
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched, so a listing is never
+                                                  silently cut short.
+            ValueError: If a page is not a list.
+        """
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        pending = None
+        try:
+            response = self._request("GET", url, params={**(params or {}), "per_page": per_page or self.PAGE_SIZE})
+            while True:
+                next_url = response.links.get("next", {}).get("url")
+                if next_url and executor is not None:
+                    pending = executor.submit(self._request, "GET", next_url)
+                page = response.json()
+                if items_key is not None and isinstance(page, dict):
+                    page = page.get(items_key)
+                if not isinstance(page, list):
+                    raise ValueError(f"Expected a list of items from {response.url or url}, got {type(page).__name__}.")
+                response = None  # Hold one page at a time while the caller consumes it
+                yield page
+                if not next_url:
+                    return
+                response = pending.result() if pending is not None else self._request("GET", next_url)
+                pending = None
+        finally:
+            if pending is not None:
+                pending.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def iter_items(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Iterator[Any]:
+        """Lazily yields every item of a paginated GitHub list endpoint. Takes the arguments of iter_pages."""
+        for page in self.iter_pages(url, params, **kwargs):
+            yield from page
+
     def list_repo_files(self, owner: str, repo: str, path: str = '') -> List[str]:
         """
         Lists files and directories in a GitHub repository path.
@@ -62,12 +225,36 @@ class GitHubClient:
         Returns:
             A list of names of files and directories in the specified path.
             Returns an empty list if an error occurs or the path is invalid.
+
+        A tree index already built for the default branch (by gh_find, or by an earlier large listing)
+        answers listings locally while the branch has not moved. Otherwise a directory is listed with one
+        contents request; no index is built just to list a directory, except for directories with
+        CONTENTS_LISTING_LIMIT or more entries, which the contents API cuts short.
         """
+        served, names = self._from_mirror(owner, repo, lambda: self.mirror_backend.list_dir(owner, repo, path))
+        if not served:
+            index = self._cached_tree_index(owner, repo)
+            if index is not None:
+                served, names = True, index.list_dir(path)
+        if served:
+            if names is None:
+                print(f"Path '{path}' in '{owner}/{repo}' is not a directory or not found.")
+                return []
+            return names
+
         url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/contents/{path.lstrip('/')}"
         try:
             response = self._request("GET", url)
             contents = response.json()
             if isinstance(contents, list): # Ensure contents is a list (directory listing)
+                if len(contents) >= self.CONTENTS_LISTING_LIMIT:
+                    # The contents API stops at its limit without saying so; the tree lists everything.
+                    print(f"Directory '{path}' in '{owner}/{repo}' has {self.CONTENTS_LISTING_LIMIT}+ entries; listing it from the git tree.")
+                    index = self.get_repo_tree_index(owner, repo, walk_truncated=False)
+                    names = index.list_dir(path.strip('/')) if index is not None else None
+                    if names is not None:
+                        return names
+                    print(f"Could not list '{path}' in '{owner}/{repo}' from the git tree; the listing may be incomplete.")
                 return [item['name'] for item in contents]
             else: # Could be a single file if path pointed to a file, or an error object
                 print(f"Path '{path}' in '{owner}/{repo}' is not a directory or not found.")
@@ -80,7 +267,7 @@ class GitHubClient:
             return []
 
 
-    def read_repo_file(self, owner: str, repo: str, file_path: str) -> Optional[str]:
+    def read_repo_file(self, owner: str, repo: str, file_path: str, ref: Optional[str] = None) -> Optional[str]:
         """
         Reads the content of a file from a GitHub repository.
 
@@ -88,13 +275,29 @@ class GitHubClient:
             owner: The owner of the repository.
             repo: The name of the repository.
             file_path: The path to the file in the repository.
+            ref: Optional. The branch, tag or commit to read from. Defaults to the default branch
+                 (or the fetched snapshot, see fetch_repo_snapshot).
 
         Returns:
             The content of the file as a string, or None if an error occurs.
         """
+        commit_sha = self._snapshots.get((owner, repo)) if ref is None else None
+        if commit_sha is not None:
+            if self.snapshot_cache.has(owner, repo, commit_sha):
+                return self._read_snapshot_file(owner, repo, commit_sha, file_path)
+            print(f"Snapshot of {owner}/{repo}@{commit_sha} is no longer cached; reading through the API.")
+            del self._snapshots[(owner, repo)]
+
+        served, contents = self._from_mirror(owner, repo, lambda: self.mirror_backend.read_file(owner, repo, file_path, ref=ref))
+        if served:
+            if contents is None:
+                print(f"Path '{file_path}' in '{owner}/{repo}@{ref or 'HEAD'}' is not a file or does not exist.")
+                return None
+            return contents.decode('utf-8', errors='replace')
+
         url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/contents/{file_path.lstrip('/')}"
         try:
-            response = self._request("GET", url)
+            response = self._request("GET", url, params={"ref": ref}) if ref else self._request("GET", url)
             file_data = response.json()
 
             if not isinstance(file_data, dict):
@@ -108,19 +311,13 @@ class GitHubClient:
                 print(f"Path '{file_path}' in '{owner}/{repo}' is not a file (type is '{file_data.get('type')}').")
                 return None
 
-            # Attempt to decode 'content' if present
-            if 'content' in file_data:
-                content_base64 = file_data['content']
-                # Ensure padding for base64 decoding
-                missing_padding = len(content_base64) % 4
-                if missing_padding:
-                    content_base64 += '=' * (4 - missing_padding)
-                try:
-                    decoded_content = base64.b64decode(content_base64).decode('utf-8')
+            # Attempt to decode 'content' if present (files over 1 MB come with empty content and encoding 'none')
+            if 'content' in file_data and file_data.get('encoding') != 'none':
+                decoded_content = self._decode_file_content(file_data['content'])
+                if decoded_content is not None:
                     return decoded_content # Successfully decoded
-                except (base64.binascii.Error, UnicodeDecodeError) as decode_error:
-                    print(f"Error decoding base64 content for {owner}/{repo}/{file_path}: {decode_error}. Will try download_url if available.")
-                    # Fallthrough to download_url logic if decoding fails
+                print(f"Error decoding base64 content for {owner}/{repo}/{file_path}. Will try download_url if available.")
+                # Fallthrough to download_url logic if decoding fails
             
             # Try download_url if content was not present or decoding failed
             if 'download_url' in file_data and file_data['download_url']:
@@ -143,6 +340,307 @@ class GitHubClient:
             print(f"Error parsing response for {owner}/{repo}/{file_path}: {e}")
             return None
 
+    @staticmethod
+    def _decode_file_content(content_base64: str) -> Optional[str]:
+        """Decodes a contents API 'content' field (base64 of UTF-8 text), or returns None if it is not text."""
+        # Ensure padding for base64 decoding
+        missing_padding = len(content_base64) % 4
+        if missing_padding:
+            content_base64 += '=' * (4 - missing_padding)
+        try:
+            return base64.b64decode(content_base64).decode('utf-8')
+        except (base64.binascii.Error, UnicodeDecodeError):
+            return None
+
+    def _stream_to(self, url: str, output: BinaryIO, chunk_size: int, params: Optional[Dict[str, str]] = None) -> int:
+        """GETs url as raw bytes and writes the body to output chunk by chunk. Returns the number of bytes written."""
+        response = self._request("GET", url, params=params, headers={"Accept": RAW_MEDIA_TYPE}, stream=True)
+        written = 0
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            response.close()
+        return written
+
+    def _download_raw(self, owner: str, repo: str, file_path: str, output: BinaryIO, ref: Optional[str], chunk_size: int) -> int:
+        """
+        Streams a file's raw bytes into output: through the contents API, or for files it refuses as too large,
+        through the git blobs API using the blob SHA from the branch's tree index.
+        """
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/contents/{file_path.lstrip('/')}"
+        start = output.tell() if output.seekable() else None
+        try:
+            return self._stream_to(url, output, chunk_size, params={"ref": ref} if ref else None)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code not in (403, 422) or start is None:
+                raise
+            output.seek(start)
+            output.truncate()
+        print(f"{owner}/{repo}/{file_path} is too large for the contents API; downloading it through the blobs API.")
+        index = self.get_repo_tree_index(owner, repo, ref)
+        entry = index.get(file_path) if index is not None else None
+        if entry is None or entry["type"] != "blob":
+            raise FileNotFoundError(f"'{file_path}' is not a file in {owner}/{repo}.")
+        return self._stream_to(f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/blobs/{entry['sha']}", output, chunk_size)
+
+    def download_repo_file(self, owner: str, repo: str, file_path: str,
+                           destination: Union[str, os.PathLike, BinaryIO, None] = None, ref: Optional[str] = None,
+                           as_text: bool = False, encoding: str = 'utf-8',
+                           chunk_size: int = DOWNLOAD_CHUNK_BYTES) -> Union[int, bytes, str, None]:
+        """
+        Downloads a file of any size or type, streaming its raw bytes in chunks of chunk_size, so memory use
+        does not depend on the file size when writing to a destination. Unlike read_repo_file, this works for
+        binary files and for files over 1 MB (which the contents API returns without content).
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+            file_path: The path to the file in the repository.
+            destination: Optional. A local path (written to a temporary file and renamed into place when complete)
+                         or a writable binary file object. If omitted, the contents are returned.
+            ref: Optional. The branch, tag or commit to read from. Defaults to the default branch.
+            as_text: Optional. Without a destination, return the contents decoded as text instead of bytes.
+            encoding: Optional. The text encoding used when as_text is True. Defaults to UTF-8.
+            chunk_size: Optional. Bytes read and written at a time.
+
+        Returns:
+            The number of bytes written if a destination was given, otherwise the contents (bytes, or str if
+            as_text). None if an error occurs.
+        """
+        try:
+            if destination is None:
+                buffer = io.BytesIO()
+                self._download_raw(owner, repo, file_path, buffer, ref, chunk_size)
+                contents = buffer.getvalue()
+                return contents.decode(encoding) if as_text else contents
+            if not isinstance(destination, (str, os.PathLike)):
+                return self._download_raw(owner, repo, file_path, destination, ref, chunk_size)
+
+            directory = os.path.dirname(os.path.abspath(destination))
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".download.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as output:
+                    written = self._download_raw(owner, repo, file_path, output, ref, chunk_size)
+                os.replace(temp_path, destination)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+            return written
+        except requests.exceptions.RequestException as e:
+            print(f"Error downloading repository file {owner}/{repo}/{file_path}: {e}")
+            return None
+        except UnicodeDecodeError as e:
+            print(f"{owner}/{repo}/{file_path} is not valid {encoding} text: {e}")
+            return None
+        except OSError as e:
+            print(f"Error downloading repository file {owner}/{repo}/{file_path}: {e}")
+            return None
+
+    def _graphql_lookups(self, owner: str, repo: str, lookups: List[tuple]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Answers (kind, value) repository lookups with as few GraphQL queries as their cost allows.
+
+        Raises:
+            GitHubGraphQLError: If GitHub cannot answer a lookup even in a query of its own.
+            requests.exceptions.RequestException: For network or HTTP errors.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(lookups)
+        for batch in split_by_cost(lookups, self.GRAPHQL_MAX_QUERY_COST):
+            self._graphql_lookup_batch(owner, repo, lookups, batch, results)
+        return results
+
+    def _graphql_lookup_batch(self, owner: str, repo: str, lookups: List[tuple], batch: List[int], results: list) -> None:
+        body = build_lookup_query(owner, repo, [lookups[i] for i in batch])
+        try:
+            try:
+                response = self._request("POST", self.GRAPHQL_URL, json=body)
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code in (502, 504):  # GitHub gave up on the query
+                    raise GitHubGraphQLError(f"GraphQL query timed out: {e}", splittable=True) from e
+                raise
+            answers = parse_lookup_response(response.json(), len(batch))
+        except GitHubGraphQLError as e:
+            if not e.splittable or len(batch) == 1:
+                raise
+            print(f"GraphQL query of {len(batch)} lookups in {owner}/{repo} was too large; splitting it in two.")
+            middle = len(batch) // 2
+            self._graphql_lookup_batch(owner, repo, lookups, batch[:middle], results)
+            self._graphql_lookup_batch(owner, repo, lookups, batch[middle:], results)
+            return
+        for i, answer in zip(batch, answers):
+            results[i] = answer
+
+    def read_repo_files(self, owner: str, repo: str, file_paths: List[str], ref: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """
+        Reads many files from a GitHub repository, batching them into GraphQL queries.
+
+        Files GraphQL cannot return as text (binary or truncated blobs) are read with read_repo_file, as is
+        everything when there is no token (GraphQL requires authentication), a snapshot of the repository
+        has been fetched, or the GraphQL queries fail. A mirrored repository is read in one local git call.
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+            file_paths: Paths of the files in the repository.
+            ref: Optional. The branch, tag or commit to read from. Defaults to the default branch.
+
+        Returns:
+            A dict mapping each path to its content as a string (as read_repo_file returns it), or None
+            if the file could not be read.
+        """
+        paths = list(dict.fromkeys(file_paths))
+        if paths and not (ref is None and (owner, repo) in self._snapshots):
+            served, blobs = self._from_mirror(owner, repo, lambda: self.mirror_backend.read_files(owner, repo, paths, ref=ref))
+            if served:
+                return {path: blob.decode('utf-8', errors='replace') if blob is not None else None for path, blob in blobs.items()}
+
+        contents: Dict[str, Optional[str]] = {}
+        rest_paths = paths
+        if self.token and paths and not (ref is None and (owner, repo) in self._snapshots):
+            expression_ref = ref or "HEAD"
+            try:
+                blobs = self._graphql_lookups(owner, repo, [(LOOKUP_OBJECT, f"{expression_ref}:{path.lstrip('/')}") for path in paths])
+                rest_paths = []
+                for path, blob in zip(paths, blobs):
+                    if not blob:  # Missing, or not a blob (a directory or submodule)
+                        print(f"Path '{path}' in '{owner}/{repo}@{expression_ref}' is not a file or does not exist.")
+                        contents[path] = None
+                    elif blob.get("text") is None or blob.get("isBinary") or blob.get("isTruncated"):
+                        rest_paths.append(path)
+                    else:
+                        contents[path] = blob["text"]
+            except (GitHubGraphQLError, requests.exceptions.RequestException, AttributeError, TypeError, ValueError) as e:
+                print(f"GraphQL batch read failed for {owner}/{repo}; reading files one at a time: {e}")
+                rest_paths = paths
+        for path in rest_paths:
+            contents[path] = self.read_repo_file(owner, repo, path, ref=ref)
+        return {path: contents[path] for path in paths}
+
+    def get_branch_shas(self, owner: str, repo: str, branch_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Retrieves the SHA of the latest commit on each of several branches, batching them into GraphQL
+        queries. Without a token, or if the queries fail, each branch is looked up with get_branch_sha.
+
+        Returns:
+            A dict mapping each branch name to its HEAD SHA, or None if the branch was not found.
+        """
+        names = list(dict.fromkeys(branch_names))
+        if not self.token or not names:
+            return {name: self.get_branch_sha(owner, repo, name) for name in names}
+        try:
+            refs = self._graphql_lookups(owner, repo, [(LOOKUP_REF, f"refs/heads/{name.lstrip('/')}") for name in names])
+        except (GitHubGraphQLError, requests.exceptions.RequestException, AttributeError, TypeError, ValueError) as e:
+            print(f"GraphQL batch lookup failed for {owner}/{repo}; looking up branches one at a time: {e}")
+            return {name: self.get_branch_sha(owner, repo, name) for name in names}
+        shas: Dict[str, Optional[str]] = {}
+        for name, ref_data in zip(names, refs):
+            shas[name] = ((ref_data or {}).get("target") or {}).get("oid")
+            if shas[name] is None:
+                print(f"Branch '{name}' not found in {owner}/{repo}.")
+        return shas
+
+    def _from_mirror(self, owner: str, repo: str, read: Callable[[], Any]) -> Tuple[bool, Any]:
+        """
+        Answers a read from the local mirror of a repository, fetching first if the mirror is stale. A
+        failed fetch serves the mirror as last fetched.
+
+        Returns:
+            (True, result of read) if the mirror answered, or (False, None) if the repository is not mirrored
+            or the mirror could not answer (for example, the ref has not been fetched), so the API should.
+        """
+        try:
+            if not self.mirror_backend.has_mirror(owner, repo):
+                return False, None
+        except MirrorError:
+            return False, None
+        try:
+            self.mirror_backend.refresh(owner, repo)
+        except MirrorError as e:
+            print(f"Could not refresh the mirror of {owner}/{repo}; serving it as last fetched: {e}")
+        try:
+            return True, read()
+        except MirrorError as e:
+            print(f"Error reading the mirror of {owner}/{repo}; using the API instead: {e}")
+            return False, None
+
+    def mirror_repo(self, owner: str, repo: str) -> Optional[str]:
+        """
+        Creates or updates a local bare mirror of a repository (see GitMirrorBackend). From then on
+        list_repo_files, read_repo_file and read_repo_files serve this repository through git, with an
+        incremental fetch when the mirror is older than the backend's refresh interval.
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+
+        Returns:
+            The commit SHA of the repository's default branch in the mirror, or None if an error occurs.
+        """
+        try:
+            self.mirror_backend.refresh(owner, repo, force=True)
+            return self.mirror_backend.resolve(owner, repo)
+        except MirrorError as e:
+            print(f"Error mirroring {owner}/{repo}: {e}")
+            return None
+
+    def _read_snapshot_file(self, owner: str, repo: str, commit_sha: str, file_path: str) -> Optional[str]:
+        try:
+            contents = self.snapshot_cache.read_file(owner, repo, commit_sha, file_path)
+        except SnapshotError as e:
+            print(f"Error reading {owner}/{repo}/{file_path} from snapshot: {e}")
+            return None
+        if contents is None:
+            print(f"Path '{file_path}' in '{owner}/{repo}@{commit_sha}' is not a file or does not exist.")
+            return None
+        return contents.decode('utf-8', errors='replace')
+
+    def fetch_repo_snapshot(self, owner: str, repo: str, ref: Optional[str] = None) -> Optional[str]:
+        """
+        Downloads a repository's tarball for a ref once and extracts it into the local snapshot cache,
+        after which read_repo_file serves this repository from disk instead of making one or two
+        requests per file. Snapshots are keyed by commit SHA, so a ref whose commit is already cached
+        costs only the (conditional) request that resolves it.
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+            ref: Optional. A branch name or full commit SHA. Defaults to the repository's default branch.
+
+        Returns:
+            The commit SHA of the snapshot, or None if an error occurs.
+        """
+        if ref and re.fullmatch(r"[0-9a-f]{40}", ref):
+            commit_sha = ref
+        else:
+            ref = ref or self.get_default_branch(owner, repo)
+            commit_sha = self.get_branch_sha(owner, repo, ref) if ref else None
+        if not commit_sha:
+            return None
+
+        if not self.snapshot_cache.has(owner, repo, commit_sha):
+            url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/tarball/{commit_sha}"
+            try:
+                response = self._request("GET", url, stream=True)
+                try:
+                    response.raw.decode_content = True
+                    self.snapshot_cache.store_tarball(owner, repo, commit_sha, response.raw)
+                finally:
+                    response.close()
+            except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+                print(f"Error downloading tarball for {owner}/{repo}@{commit_sha}: {e}")
+                return None
+            except SnapshotError as e:
+                print(f"Error storing snapshot for {owner}/{repo}@{commit_sha}: {e}")
+                return None
+        self._snapshots[(owner, repo)] = commit_sha
+        return commit_sha
+
     def get_branch_sha(self, owner: str, repo: str, branch_name: str) -> Optional[str]:
         """
         Retrieves the SHA of the latest commit on a given branch.
@@ -183,6 +681,160 @@ class GitHubClient:
             print(f"Error parsing response for branch SHA {owner}/{repo}/refs/heads/{branch_name}: {e}")
             return None
 
+    def get_default_branch(self, owner: str, repo: str) -> Optional[str]:
+        """
+        Retrieves the name of the repository's default branch.
+
+        Returns:
+            The default branch name, or None if an error occurs.
+        """
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}"
+        try:
+            return self._request("GET", url).json().get("default_branch")
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching repository details for {owner}/{repo}: {e}")
+            return None
+        except (AttributeError, TypeError, ValueError) as e:
+            print(f"Error parsing repository details for {owner}/{repo}: {e}")
+            return None
+
+    def iter_branches(self, owner: str, repo: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields every branch of a repository (dicts with "name", "commit" and "protected"),
+        fetching pages as they are consumed. Keyword arguments are passed to iter_pages.
+
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched.
+        """
+        return self.iter_items(f"{self.BASE_API_URL}/repos/{owner}/{repo}/branches", **kwargs)
+
+    def iter_pull_requests(self, owner: str, repo: str, state: str = 'open', base: Optional[str] = None,
+                           **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields the pull requests of a repository, newest first.
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+            state: Optional. 'open', 'closed' or 'all'. Defaults to 'open'.
+            base: Optional. Only pull requests into this branch.
+            **kwargs: Passed to iter_pages.
+
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched.
+        """
+        params = {"state": state, **({"base": base} if base else {})}
+        return self.iter_items(f"{self.BASE_API_URL}/repos/{owner}/{repo}/pulls", params, **kwargs)
+
+    def iter_commits(self, owner: str, repo: str, ref: Optional[str] = None, path: Optional[str] = None,
+                     **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields the commits reachable from a ref, newest first.
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+            ref: Optional. The branch, tag or commit to start from. Defaults to the default branch.
+            path: Optional. Only commits touching this path.
+            **kwargs: Passed to iter_pages.
+
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be fetched.
+        """
+        params = {**({"sha": ref} if ref else {}), **({"path": path.lstrip('/')} if path else {})}
+        return self.iter_items(f"{self.BASE_API_URL}/repos/{owner}/{repo}/commits", params, **kwargs)
+
+    def _fetch_tree_entries(self, owner: str, repo: str, tree_ish: str, walk_truncated: bool = True) -> Optional[tuple]:
+        """
+        Fetches every entry of a tree with one recursive trees API call. If GitHub truncates the
+        response (very large trees), the tree is read again level by level, one call per directory.
+
+        Args:
+            walk_truncated: Optional. Set to False to return None for a truncated tree instead of
+                            reading it level by level.
+
+        Returns:
+            A tuple (root_tree_sha, entries), or None if the tree is truncated and walk_truncated is False.
+        """
+        url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/trees/{tree_ish}"
+        data = self._request("GET", url, params={"recursive": "1"}).json()
+        if not data.get("truncated"):
+            return data.get("sha"), data.get("tree", [])
+        if not walk_truncated:
+            print(f"Tree for {owner}/{repo}@{tree_ish} is too large for one request; not reading it directory by directory.")
+            return None
+
+        print(f"Tree for {owner}/{repo}@{tree_ish} is too large for one request; reading it directory by directory.")
+        entries = []
+        pending = [("", data.get("sha"))]
+        while pending:
+            prefix, tree_sha = pending.pop()
+            level = self._request("GET", f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/trees/{tree_sha}", priority=PRIORITY_LOW).json()
+            for entry in level.get("tree", []):
+                entry = dict(entry, path=f"{prefix}{entry['path']}")
+                entries.append(entry)
+                if entry.get("type") == "tree":
+                    pending.append((f"{entry['path']}/", entry["sha"]))
+        return data.get("sha"), entries
+
+    def _cached_tree_index(self, owner: str, repo: str) -> Optional[RepoTreeIndex]:
+        """
+        The tree index already built for the repository's default branch, if the branch has not moved
+        since. Sends no request when no index is held for the repository, and never builds one.
+        """
+        if not any(key[:2] == (owner, repo) for key in self._tree_indexes):
+            return None
+        branch_name = self.get_default_branch(owner, repo)
+        index = self._tree_indexes.get((owner, repo, branch_name))
+        if index is None or index.commit_sha != self.get_branch_sha(owner, repo, branch_name):
+            return None
+        return index
+
+    def get_repo_tree_index(self, owner: str, repo: str, branch_name: Optional[str] = None,
+                            walk_truncated: bool = True) -> Optional[RepoTreeIndex]:
+        """
+        Returns an index of every path on a branch, for local listing, globbing and existence checks.
+
+        The index is kept in memory and reused until the branch moves: each call checks the branch SHA
+        (a conditional request, answered 304 while the branch is unchanged) and only refetches the tree
+        when it differs.
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+            branch_name: Optional. The branch to index. Defaults to the repository's default branch.
+            walk_truncated: Optional. Set to False to give up (return None) on trees too large for one
+                            recursive request, rather than reading them one directory per request.
+
+        Returns:
+            A RepoTreeIndex, or None if an error occurs.
+        """
+        branch_name = branch_name or self.get_default_branch(owner, repo)
+        if not branch_name:
+            return None
+        commit_sha = self.get_branch_sha(owner, repo, branch_name)
+        if not commit_sha:
+            return None
+
+        key = (owner, repo, branch_name)
+        index = self._tree_indexes.get(key)
+        if index is not None and index.commit_sha == commit_sha:
+            return index
+        try:
+            fetched = self._fetch_tree_entries(owner, repo, commit_sha, walk_truncated=walk_truncated)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching tree for {owner}/{repo}@{branch_name}: {e}")
+            return None
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            print(f"Error parsing tree for {owner}/{repo}@{branch_name}: {e}")
+            return None
+        if fetched is None:
+            return None
+        tree_sha, entries = fetched
+        index = RepoTreeIndex(commit_sha, entries, tree_sha=tree_sha)
+        self._tree_indexes[key] = index
+        return index
+
     def create_branch(self, owner: str, repo: str, new_branch_name: str, source_branch_name: str = 'main') -> tuple[bool, Optional[Dict[str, Any]]]:
         """
         Creates a new branch in the repository.
@@ -238,7 +890,7 @@ class GitHubClient:
             print(error_msg)
             return False, {"error": error_msg, "reason": "unknown_error"}
 
-    def commit_files(self, owner: str, repo: str, branch_name: str, file_changes: List[Dict[str, str]], commit_message: str) -> tuple[bool, Optional[Dict[str, Any]]]:
+    def commit_files(self, owner: str, repo: str, branch_name: str, file_changes: List[Dict[str, Any]], commit_message: str) -> tuple[bool, Optional[Dict[str, Any]]]:
         """
         Commits multiple file changes to a specified branch.
 
@@ -246,7 +898,9 @@ class GitHubClient:
             owner: The owner of the repository.
             repo: The name of the repository.
             branch_name: The branch to commit to.
-            file_changes: A list of dictionaries, each with "path" and "content" keys.
+            file_changes: A list of dictionaries, each with a "path" and either "content" (str or bytes) or
+                          "source_path" (a local file, streamed rather than read into memory), and optionally
+                          a "mode" (defaults to "100644").
                           Example: [{"path": "src/main.py", "content": "print('hello')"}]
             commit_message: The message for the commit.
 
@@ -273,33 +927,32 @@ class GitHubClient:
         except (KeyError, TypeError, ValueError) as e:
             return False, {"error": f"Error parsing commit details response: {e}", "step": "get_base_tree_sha_parse"}
 
-        # 3. Create Blobs for each file change
-        blob_shas = []
+        # 3. Build the tree entries: small text files are inlined in the tree request, files whose blob
+        #    already exists at the same path in the base tree reuse it, and the rest are uploaded concurrently.
+        try:
+            tree_elements, uploads = self._prepare_tree_elements(owner, repo, branch_name, latest_commit_sha, base_tree_sha, file_changes)
+        except (OSError, KeyError, TypeError) as e:
+            return False, {"error": f"Error reading file changes: {e}", "step": "prepare_blobs"}
+
         blobs_url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/blobs"
-        for file_change in file_changes:
-            payload = {
-                "content": file_change["content"], # Already a string, GitHub API expects UTF-8 string for content
-                "encoding": "utf-8" # GitHub default is utf-8 if content is string
-            }
-            try:
-                blob_response = self._request("POST", blobs_url, json=payload)
-                blob_data = blob_response.json()
-                blob_shas.append({"path": file_change["path"], "sha": blob_data["sha"]})
-            except requests.exceptions.RequestException as e:
-                return False, {"error": f"API error creating blob for file '{file_change['path']}': {e}", "step": "create_blob_request", "file_path": file_change['path']}
-            except (KeyError, TypeError, ValueError) as e:
-                 return False, {"error": f"Error parsing blob creation response for '{file_change['path']}': {e}", "step": "create_blob_parse", "file_path": file_change['path']}
+        if uploads:
+            with ThreadPoolExecutor(max_workers=min(self.BLOB_UPLOAD_WORKERS, len(uploads))) as pool:
+                futures = {pool.submit(self._create_blob, blobs_url, file_changes[i]): i for i in uploads}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    file_path = file_changes[i]["path"]
+                    try:
+                        tree_elements[i]["sha"] = future.result()
+                        continue
+                    except requests.exceptions.RequestException as e:
+                        error = {"error": f"API error creating blob for file '{file_path}': {e}", "step": "create_blob_request", "file_path": file_path}
+                    except (OSError, KeyError, TypeError, ValueError) as e:
+                        error = {"error": f"Error parsing blob creation response for '{file_path}': {e}", "step": "create_blob_parse", "file_path": file_path}
+                    for pending in futures:
+                        pending.cancel()
+                    return False, error
 
         # 4. Create New Tree
-        tree_elements = []
-        for blob_info in blob_shas:
-            tree_elements.append({
-                "path": blob_info["path"],
-                "mode": "100644",  # normal file
-                "type": "blob",
-                "sha": blob_info["sha"]
-            })
-        
         trees_url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/git/trees"
         tree_payload = {
             "base_tree": base_tree_sha,
@@ -360,6 +1013,137 @@ class GitHubClient:
         except requests.exceptions.RequestException as e:
             return False, {"error": f"API error updating branch reference for '{branch_name}': {e}", "step": "update_ref_request"}
 
+    @staticmethod
+    def _change_source(file_change: Dict[str, Any]) -> tuple:
+        """Returns (size, open_stream) for a file change given as 'content' (str or bytes) or 'source_path'."""
+        if "source_path" in file_change:
+            source_path = file_change["source_path"]
+            return os.path.getsize(source_path), lambda: open(source_path, "rb")
+        content = file_change["content"]
+        data = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+        return len(data), lambda: io.BytesIO(data)
+
+    @staticmethod
+    def _git_blob_sha(size: int, stream) -> str:
+        """The SHA git gives a blob with these contents, computed without holding them in memory."""
+        digest = hashlib.sha1(f"blob {size}\0".encode("ascii"))
+        for chunk in iter(lambda: stream.read(BASE64_CHUNK_BYTES), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _classify_file_changes(file_changes: List[Dict[str, Any]], inline_max_bytes: int) -> tuple:
+        """
+        Builds one tree element per file change, in order, inlining text files up to inline_max_bytes.
+
+        Returns:
+            A tuple (tree_elements, candidates): candidates lists the indexes of elements that need a blob.
+        """
+        tree_elements, candidates = [], []
+        for i, file_change in enumerate(file_changes):
+            element = {"path": file_change["path"], "mode": file_change.get("mode", "100644"), "type": "blob"}
+            tree_elements.append(element)
+            content = file_change.get("content")
+            if isinstance(content, bytes) and b"\0" not in content:
+                try:
+                    content = content.decode("utf-8")
+                except UnicodeDecodeError:
+                    pass
+            if isinstance(content, str) and len(content.encode("utf-8")) <= inline_max_bytes:
+                element["content"] = content
+            else:
+                candidates.append(i)
+        return tree_elements, candidates
+
+    @classmethod
+    def _reuse_existing_blobs(cls, tree_elements: List[Dict[str, Any]], candidates: List[int], file_changes: List[Dict[str, Any]],
+                              index: Optional[RepoTreeIndex]) -> List[int]:
+        """
+        Points candidates whose git blob SHA matches the blob at the same path in the base tree at that blob.
+
+        Returns:
+            The indexes of the candidates that still need a blob created.
+        """
+        uploads = []
+        for i in candidates:
+            existing = index.get(tree_elements[i]["path"]) if index is not None else None
+            if existing is not None and existing["type"] == "blob":
+                size, open_stream = cls._change_source(file_changes[i])
+                with open_stream() as stream:
+                    if cls._git_blob_sha(size, stream) == existing["sha"]:
+                        tree_elements[i]["sha"] = existing["sha"]
+                        continue
+            uploads.append(i)
+        return uploads
+
+    def _prepare_tree_elements(self, owner: str, repo: str, branch_name: str, commit_sha: str, base_tree_sha: str,
+                               file_changes: List[Dict[str, Any]]) -> tuple:
+        """
+        Builds one tree element per file change, in order.
+
+        Returns:
+            A tuple (tree_elements, uploads): uploads lists the indexes of elements that still need a blob
+            created (and their "sha" filled in).
+        """
+        tree_elements, candidates = self._classify_file_changes(file_changes, self.INLINE_CONTENT_MAX_BYTES)
+        if not candidates:
+            return tree_elements, []
+
+        index = self._tree_indexes.get((owner, repo, branch_name))
+        if index is None or index.commit_sha != commit_sha:
+            try:
+                tree_sha, entries = self._fetch_tree_entries(owner, repo, base_tree_sha)
+                index = RepoTreeIndex(commit_sha, entries, tree_sha=tree_sha)
+                self._tree_indexes[(owner, repo, branch_name)] = index
+            except (requests.exceptions.RequestException, AttributeError, KeyError, TypeError, ValueError) as e:
+                print(f"Could not read base tree of {owner}/{repo}@{branch_name}; uploading every blob: {e}")
+                index = None
+        return tree_elements, self._reuse_existing_blobs(tree_elements, candidates, file_changes, index)
+
+    @staticmethod
+    def _base64_blob_body(stream):
+        """Yields a blob creation request body, base64-encoding the stream one chunk at a time."""
+        yield b'{"encoding": "base64", "content": "'
+        for chunk in iter(lambda: stream.read(BASE64_CHUNK_BYTES), b""):
+            yield base64.b64encode(chunk)
+        yield b'"}'
+
+    def _create_blob(self, blobs_url: str, file_change: Dict[str, Any]) -> str:
+        """Creates a blob and returns its SHA. Runs in the commit_files upload pool."""
+        content = file_change.get("content")
+        if isinstance(content, str):
+            response = self._request("POST", blobs_url, json={"content": content, "encoding": "utf-8"}, priority=PRIORITY_LOW)
+        else:
+            _, open_stream = self._change_source(file_change)
+            with open_stream() as stream:
+                response = self._request("POST", blobs_url, data=self._base64_blob_body(stream),
+                                         headers={"Content-Type": "application/json"}, priority=PRIORITY_LOW)
+        return response.json()["sha"]
+
+    @staticmethod
+    def _pull_request_error_reason(error_details: Dict[str, Any], status_code: int) -> Dict[str, str]:
+        """The 'reason' (and 'specific_error', if GitHub gave one) for a failed pull request creation."""
+        result = {}
+        errors = error_details.get("errors")
+        # Check for specific error messages if available in the response's errors
+        if isinstance(errors, list) and errors and isinstance(errors[0], dict) and "message" in errors[0]:
+            # Example: "A pull request already exists for..."
+            # Example: "No commits between 'base_branch' and 'head_branch'"
+            # Example: "Head branch or Base branch does not exist"
+            message = errors[0]["message"]
+            result["specific_error"] = message
+            if "A pull request already exists" in message:
+                result["reason"] = "pr_already_exists"
+            elif "No commits between" in message:
+                result["reason"] = "no_diff"
+            elif "does not exist" in message:
+                result["reason"] = "branch_not_found"
+        if status_code != 422:
+            result["reason"] = "http_error_general"
+        elif "reason" not in result:
+            result["reason"] = "unprocessable_entity_general"
+        return result
+
     def create_pull_request(self, owner: str, repo: str, head_branch: str, base_branch: str, title: str, body: str = '') -> tuple[bool, Optional[Dict[str, Any]]]:
         """
         Creates a new pull request.
@@ -393,35 +1177,15 @@ class GitHubClient:
         except requests.exceptions.HTTPError as e:
             error_details = {"error": str(e), "step": "create_pull_request_http_error"}
             try:
-                response_json = e.response.json()
-                error_details.update(response_json)
-                # Check for specific error messages if available in response_json.errors
-                if "errors" in response_json and isinstance(response_json["errors"], list):
-                    first_error = response_json["errors"][0]
-                    if isinstance(first_error, dict):
-                        if "message" in first_error:
-                            # Example: "A pull request already exists for..."
-                            # Example: "No commits between 'base_branch' and 'head_branch'"
-                            # Example: "Head branch or Base branch does not exist"
-                            error_details["specific_error"] = first_error["message"]
-                            if "A pull request already exists" in first_error["message"]:
-                                error_details["reason"] = "pr_already_exists"
-                            elif "No commits between" in first_error["message"]:
-                                error_details["reason"] = "no_diff"
-                            elif "does not exist" in first_error["message"]:
-                                 error_details["reason"] = "branch_not_found"
-
+                error_details.update(e.response.json())
             except ValueError: # If response is not JSON
                 error_details["response_text"] = e.response.text
-            
+            error_details.update(self._pull_request_error_reason(error_details, e.response.status_code))
+
             if e.response.status_code == 422: # Unprocessable Entity
-                # Reason might have been set above based on specific error message
-                if "reason" not in error_details:
-                    error_details["reason"] = "unprocessable_entity_general"
                 print(f"Failed to create pull request '{title}' in {owner}/{repo} (422 Unprocessable Entity). Details: {error_details}")
             else:
                 print(f"HTTP error creating pull request '{title}' in {owner}/{repo}. Details: {error_details}")
-                error_details["reason"] = "http_error_general"
             return False, error_details
         except requests.exceptions.RequestException as e: # Network errors, etc.
             error_msg = f"Request error creating pull request '{title}' in {owner}/{repo}: {e}"
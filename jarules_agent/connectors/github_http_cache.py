@@ -0,0 +1,212 @@
+# jarules_agent/connectors/github_http_cache.py
+
+"""
+On-disk HTTP cache for GitHubClient GET requests.
+
+Responses that carry an ETag or Last-Modified header are stored with their
+validators in a SQLite database under ~/.jarules, shared by every process and
+CLI session. The next request for the same URL is sent as a conditional request
+(If-None-Match / If-Modified-Since); GitHub answers an unchanged resource with
+304 Not Modified, which transfers no body and does not count against the rate
+limit, and the stored response is served instead.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".jarules" / "github_http_cache.sqlite3"
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_MAX_ITEM_BYTES = 10 * 1024 * 1024  # Larger bodies are not cached
+BUSY_TIMEOUT_SECONDS = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    status_code INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+"""
+
+
+class CachedResponse:
+    """A stored response and the validators to revalidate it with."""
+
+    def __init__(self, url: str, etag: Optional[str], last_modified: Optional[str], status_code: int,
+                 headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that ask the server to answer 304 if the resource is unchanged."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class GitHubHttpCache:
+    """
+    LRU cache of GET responses, keyed by URL, query parameters and the headers that select the
+    representation (Accept, and Authorization so private responses are never shared between tokens).
+
+    The database is opened lazily and is not created until there is a response worth storing. Any
+    database error is logged and treated as a miss: the cache never makes a request fail.
+    """
+
+    def __init__(self, path: Optional[os.PathLike] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_item_bytes: int = DEFAULT_MAX_ITEM_BYTES):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.max_bytes = max_bytes
+        self.max_item_bytes = min(max_item_bytes, max_bytes)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(url: str, params: Any = None, headers: Optional[Mapping[str, str]] = None) -> str:
+        headers = headers or {}
+        parts = [
+            url,
+            json.dumps(params, sort_keys=True, default=str) if params else "",
+            headers.get("Accept", ""),
+            hashlib.sha256(headers.get("Authorization", "").encode("utf-8")).hexdigest(),
+        ]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _connect(self, create: bool) -> Optional[sqlite3.Connection]:
+        if self._conn is None:
+            if not create and not self.path.exists():
+                return None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Returns the stored response for key, or None."""
+        try:
+            with self._lock:
+                conn = self._connect(create=False)
+                row = conn.execute(
+                    "SELECT url, etag, last_modified, status_code, headers, body FROM responses WHERE cache_key = ?",
+                    (key,)).fetchone() if conn else None
+        except sqlite3.Error as e:
+            logger.warning(f"GitHub HTTP cache lookup failed: {e}")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        url, etag, last_modified, status_code, headers, body = row
+        return CachedResponse(url, etag, last_modified, status_code, json.loads(headers), bytes(body))
+
+    def put(self, key: str, url: str, status_code: int, headers: Mapping[str, str], body: bytes) -> bool:
+        """
+        Stores a response if it has a validator and fits; then evicts least recently used entries
+        until the cache is within max_bytes.
+
+        Returns:
+            True if the response was stored.
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not (etag or last_modified) or len(body) > self.max_item_bytes:
+            return False
+        try:
+            with self._lock:
+                conn = self._connect(create=True)
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses "
+                        "(cache_key, url, etag, last_modified, status_code, headers, body, size, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, url, etag, last_modified, status_code, json.dumps(dict(headers)),
+                         sqlite3.Binary(body), len(body), time.time()))
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"GitHub HTTP cache store failed: {e}")
+            return False
+        return True
+
+    def touch(self, key: str, headers: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Marks an entry as used after a successful revalidation, taking any refreshed validators
+        from the 304 response's headers.
+        """
+        headers = headers or {}
+        try:
+            with self._lock:
+                conn = self._connect(create=False)
+                if conn is None:
+                    return
+                with conn:
+                    conn.execute(
+                        "UPDATE responses SET last_used = ?, etag = COALESCE(?, etag), "
+                        "last_modified = COALESCE(?, last_modified) WHERE cache_key = ?",
+                        (time.time(), headers.get("ETag"), headers.get("Last-Modified"), key))
+        except sqlite3.Error as e:
+            logger.warning(f"GitHub HTTP cache update failed: {e}")
+            return
+        self.hits += 1
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT cache_key, size FROM responses ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE cache_key = ?", (key,))
+            total -= size
+
+    def clear(self) -> None:
+        try:
+            with self._lock:
+                conn = self._connect(create=False)
+                if conn is not None:
+                    with conn:
+                        conn.execute("DELETE FROM responses")
+        except sqlite3.Error as e:
+            logger.warning(f"GitHub HTTP cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        entries, size = 0, 0
+        try:
+            with self._lock:
+                conn = self._connect(create=False)
+                if conn is not None:
+                    entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"GitHub HTTP cache stats failed: {e}")
+        return {"entries": entries, "bytes": size, "maxBytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
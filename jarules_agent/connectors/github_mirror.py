@@ -0,0 +1,265 @@
+# jarules_agent/connectors/github_mirror.py
+
+"""
+Local bare-repository mirrors of GitHub repositories.
+
+For repositories that are read constantly, a bare clone under
+~/.jarules/github_mirrors/<owner>/<repo>.git answers listings and file reads
+through `git ls-tree` and `git cat-file` without spending API requests, and
+is kept current with incremental `git fetch --prune` (only new objects cross
+the network). Fetches are single-flight per repository: callers that ask for
+a refresh while one is running wait for it and share its outcome instead of
+starting their own.
+"""
+
+import base64
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIRROR_DIR = Path.home() / ".jarules" / "github_mirrors"
+DEFAULT_REMOTE_URL_TEMPLATE = "https://github.com/{owner}/{repo}.git"
+DEFAULT_REFRESH_INTERVAL_SECONDS = 60.0  # Reads within this long of the last fetch do not fetch again
+GIT_TIMEOUT_SECONDS = 600
+# Branches and tags only; a plain `clone --mirror` would also download every refs/pull/* head GitHub publishes.
+FETCH_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+class MirrorError(Exception):
+    """Custom exception for local repository mirror errors."""
+    pass
+
+
+class _MirrorState:
+    __slots__ = ("lock", "in_flight", "last_fetch")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight: Optional[Future] = None  # The clone or fetch currently running, if any
+        self.last_fetch: Optional[float] = None  # When the last successful clone or fetch started
+
+
+class GitMirrorBackend:
+    """Bare mirrors of GitHub repositories, read with git plumbing commands and refreshed by fetching."""
+
+    def __init__(self, root: Optional[os.PathLike] = None, remote_url_template: str = DEFAULT_REMOTE_URL_TEMPLATE,
+                 token: Optional[str] = None, refresh_interval: float = DEFAULT_REFRESH_INTERVAL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            root: Optional. Directory holding the mirrors. Defaults to ~/.jarules/github_mirrors.
+            remote_url_template: Optional. URL of a repository's remote, formatted with owner and repo.
+                                 A file:// template mirrors local repositories.
+            token: Optional. A GitHub token for private repositories. It is handed to git through the
+                   environment for each clone and fetch, never written to the mirror's config.
+            refresh_interval: Optional. Seconds after a fetch during which refresh() does not fetch again.
+            clock: Optional. Source of the current time for refresh_interval.
+        """
+        self.root = Path(root) if root else DEFAULT_MIRROR_DIR
+        self.remote_url_template = remote_url_template
+        self.token = token
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._states: Dict[Tuple[str, str], _MirrorState] = {}
+        self._states_lock = threading.Lock()
+
+    def path_for(self, owner: str, repo: str) -> Path:
+        for part in (owner, repo):
+            if not part or part in (".", "..") or "/" in part or "\\" in part:
+                raise MirrorError(f"Invalid mirror key component: {part!r}")
+        return self.root / owner / f"{repo}.git"
+
+    def has_mirror(self, owner: str, repo: str) -> bool:
+        return (self.path_for(owner, repo) / "HEAD").exists()
+
+    def _state(self, owner: str, repo: str) -> _MirrorState:
+        with self._states_lock:
+            state = self._states.get((owner, repo))
+            if state is None:
+                state = self._states[(owner, repo)] = _MirrorState()
+            return state
+
+    def _git_env(self) -> Dict[str, str]:
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        if self.token:
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode("utf-8")).decode("ascii")
+            env.update(GIT_CONFIG_COUNT="1", GIT_CONFIG_KEY_0="http.extraHeader",
+                       GIT_CONFIG_VALUE_0=f"Authorization: Basic {credentials}")
+        return env
+
+    def _git(self, args: Sequence[str], cwd: Optional[os.PathLike] = None, input_bytes: Optional[bytes] = None,
+             network: bool = False) -> bytes:
+        """Runs git and returns its stdout. Raises MirrorError if git is missing or exits non-zero."""
+        try:
+            result = subprocess.run(["git", *args], cwd=cwd, input=input_bytes, capture_output=True,
+                                    env=self._git_env() if network else None, timeout=GIT_TIMEOUT_SECONDS)
+        except FileNotFoundError:
+            raise MirrorError("Git command not found. Ensure Git is installed and in PATH.")
+        except subprocess.TimeoutExpired:
+            raise MirrorError(f"'git {args[0]}' timed out after {GIT_TIMEOUT_SECONDS} seconds.")
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", errors="replace").strip()
+            raise MirrorError(f"'git {args[0]}' failed with exit code {result.returncode}: {stderr}")
+        return result.stdout
+
+    def _clone(self, owner: str, repo: str, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_dir = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{repo}.", suffix=".tmp"))
+        try:
+            remote_url = self.remote_url_template.format(owner=owner, repo=repo)
+            self._git(["clone", "--bare", "--quiet", remote_url, str(temp_dir)], network=True)
+            self._git(["config", "--replace-all", "remote.origin.fetch", FETCH_REFSPECS[0]], cwd=temp_dir)
+            for refspec in FETCH_REFSPECS[1:]:
+                self._git(["config", "--add", "remote.origin.fetch", refspec], cwd=temp_dir)
+            os.replace(temp_dir, path)
+        except OSError as e:
+            raise MirrorError(f"Could not create the mirror of {owner}/{repo} at {path}: {e}")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.info(f"Mirrored {owner}/{repo} into {path}")
+
+    def _fetch(self, owner: str, repo: str, path: Path) -> None:
+        self._git(["fetch", "--prune", "--quiet", "origin"], cwd=path, network=True)
+        logger.info(f"Fetched {owner}/{repo} into {path}")
+
+    def refresh(self, owner: str, repo: str, force: bool = False) -> bool:
+        """
+        Brings the mirror of a repository up to date, cloning it if it does not exist yet.
+
+        Unless force is set, nothing is fetched if the last fetch started less than refresh_interval ago.
+        If a clone or fetch of this repository is already running, waits for it and shares its outcome.
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+            force: Optional. Fetch even if the mirror was refreshed recently.
+
+        Returns:
+            True if git was run (by this call or the one it waited for), False if the mirror was fresh.
+
+        Raises:
+            MirrorError: If the clone or fetch fails.
+        """
+        path = self.path_for(owner, repo)
+        state = self._state(owner, repo)
+        with state.lock:
+            future = state.in_flight
+            if future is None:
+                if (not force and state.last_fetch is not None and path.exists()
+                        and self.clock() - state.last_fetch < self.refresh_interval):
+                    return False
+                future = state.in_flight = Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return future.result()
+
+        started = self.clock()
+        try:
+            if self.has_mirror(owner, repo):
+                self._fetch(owner, repo, path)
+            else:
+                self._clone(owner, repo, path)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(True)
+            with state.lock:
+                state.last_fetch = started
+            return True
+        finally:
+            with state.lock:
+                state.in_flight = None
+
+    def _batch(self, path: Path, object_names: Sequence[str]) -> List[Optional[Tuple[str, bytes]]]:
+        """Looks up objects with one `git cat-file --batch`: (type, contents) for each, or None if missing."""
+        for name in object_names:
+            if "\n" in name:
+                raise MirrorError(f"Invalid object name: {name!r}")
+        output = self._git(["cat-file", "--batch"], cwd=path, input_bytes="".join(f"{name}\n" for name in object_names).encode("utf-8"))
+        results: List[Optional[Tuple[str, bytes]]] = []
+        position = 0
+        for _ in object_names:
+            header_end = output.index(b"\n", position)
+            header = output[position:header_end].decode("utf-8", errors="replace")
+            position = header_end + 1
+            if header.endswith(" missing") or header.endswith(" ambiguous"):
+                results.append(None)
+                continue
+            _, object_type, size = header.rsplit(" ", 2)
+            results.append((object_type, output[position:position + int(size)]))
+            position += int(size) + 1  # Contents are followed by a newline
+        return results
+
+    def _lookup(self, owner: str, repo: str, paths: Sequence[str], ref: Optional[str]) -> List[Optional[Tuple[str, bytes]]]:
+        path = self.path_for(owner, repo)
+        if not self.has_mirror(owner, repo):
+            raise MirrorError(f"No mirror of {owner}/{repo}.")
+        revision = ref or "HEAD"
+        found = self._batch(path, [f"{revision}^{{commit}}"] + [f"{revision}:{p.strip('/')}" for p in paths])
+        if found[0] is None:
+            raise MirrorError(f"Ref '{revision}' not found in the mirror of {owner}/{repo}.")
+        return found[1:]
+
+    def resolve(self, owner: str, repo: str, ref: Optional[str] = None) -> str:
+        """
+        Returns the commit SHA a ref (default: HEAD, the default branch) points to in the mirror.
+
+        Raises:
+            MirrorError: If there is no mirror or the ref is not in it.
+        """
+        self._lookup(owner, repo, [], ref)
+        return self._git(["rev-parse", "--verify", f"{ref or 'HEAD'}^{{commit}}"],
+                         cwd=self.path_for(owner, repo)).decode("ascii").strip()
+
+    def read_files(self, owner: str, repo: str, file_paths: Sequence[str], ref: Optional[str] = None) -> Dict[str, Optional[bytes]]:
+        """
+        Reads files from the mirror with a single `git cat-file --batch`.
+
+        Args:
+            owner: The owner of the repository.
+            repo: The name of the repository.
+            file_paths: Paths of the files in the repository.
+            ref: Optional. The branch, tag or commit to read from. Defaults to HEAD (the default branch).
+
+        Returns:
+            A dict mapping each path to the file's bytes, or None if it does not exist or is not a file.
+
+        Raises:
+            MirrorError: If there is no mirror, the ref is not in it, or git fails.
+        """
+        paths = list(dict.fromkeys(file_paths))
+        found = self._lookup(owner, repo, paths, ref)
+        return {p: entry[1] if entry and entry[0] == "blob" else None for p, entry in zip(paths, found)}
+
+    def read_file(self, owner: str, repo: str, file_path: str, ref: Optional[str] = None) -> Optional[bytes]:
+        """Reads one file from the mirror. See read_files."""
+        return self.read_files(owner, repo, [file_path], ref=ref)[file_path]
+
+    def list_dir(self, owner: str, repo: str, dir_path: str = '', ref: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Lists the names of the entries of a directory in the mirror with `git ls-tree`.
+
+        Returns:
+            The entry names, or None if the path does not exist or is not a directory.
+
+        Raises:
+            MirrorError: If there is no mirror, the ref is not in it, or git fails.
+        """
+        entry = self._lookup(owner, repo, [dir_path], ref)[0]
+        if entry is None or entry[0] != "tree":
+            return None
+        output = self._git(["ls-tree", "-z", "--name-only", f"{ref or 'HEAD'}:{dir_path.strip('/')}"],
+                           cwd=self.path_for(owner, repo))
+        return [name.decode("utf-8", errors="replace") for name in output.split(b"\0") if name]
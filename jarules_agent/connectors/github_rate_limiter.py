@@ -0,0 +1,287 @@
+# jarules_agent/connectors/github_rate_limiter.py
+
+"""
+Rate-limit-aware scheduling of GitHub API requests.
+
+GitHub gives each token a separate request budget per resource class (core
+REST calls, search and GraphQL), reported on every response in the
+X-RateLimit-Limit / -Remaining / -Reset / -Resource headers. Secondary limits
+(too many concurrent or too rapid requests) are signalled by a 403 or 429 with
+Retry-After. The scheduler tracks these budgets, hands each request the token
+that can send it soonest, paces requests once a budget runs low so it lasts
+until the window resets, and lets waiting requests through in priority order.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+RESOURCE_CORE = "core"
+RESOURCE_SEARCH = "search"
+RESOURCE_GRAPHQL = "graphql"
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2  # Bulk work that should yield to interactive requests
+
+PACE_BELOW_FRACTION = 0.25  # Start spreading requests out once less than this share of a budget is left
+SECONDARY_LIMIT_BACKOFF_SECONDS = 60.0  # GitHub's advice when a secondary limit comes without Retry-After
+ASYNC_POLL_SECONDS = 0.05  # How often a coroutine waiting in acquire_async() checks whether it may go
+
+
+class RateLimitWaitError(Exception):
+    """Raised by acquire() when a request would have to wait for budget longer than its max_wait."""
+
+    def __init__(self, resource: str, wait: float, max_wait: float):
+        super().__init__(f"GitHub '{resource}' rate limit would delay this request by {wait:.0f}s "
+                         f"(more than the {max_wait:.0f}s allowed).")
+        self.resource = resource
+        self.wait = wait
+        self.max_wait = max_wait
+
+
+def resource_for_url(url: str) -> str:
+    """The rate-limit resource class a request to url is counted against."""
+    path = urlparse(url).path
+    if path == "/graphql":
+        return RESOURCE_GRAPHQL
+    if path.startswith("/search/"):
+        return RESOURCE_SEARCH
+    return RESOURCE_CORE
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class _Budget:
+    __slots__ = ("limit", "remaining", "reset_at", "blocked_until", "last_sent")
+
+    def __init__(self):
+        self.limit: Optional[float] = None  # Unknown until a response reports it
+        self.remaining: Optional[float] = None
+        self.reset_at: Optional[float] = None
+        self.blocked_until = 0.0
+        self.last_sent = 0.0
+
+
+class RateLimitScheduler:
+    """
+    Hands out tokens for GitHub requests according to each token's remaining budget.
+
+    Callers take a token with acquire() (or acquire_async() in a coroutine) before sending a request,
+    which waits until some token may send without running into a limit, and report the response with
+    update(). Requests waiting on the same resource class are released highest priority first, then in
+    arrival order. Safe to share between threads and event loops.
+    """
+
+    def __init__(self, tokens: Iterable[Optional[str]] = (), pace_below: float = PACE_BELOW_FRACTION,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            tokens: The tokens to spread requests across. Empty means unauthenticated requests.
+            pace_below: Fraction of a budget below which requests are paced evenly until the reset.
+            clock: Source of the current time (epoch seconds, as used by X-RateLimit-Reset).
+        """
+        self.tokens: List[Optional[str]] = list(dict.fromkeys(tokens)) or [None]
+        self.pace_below = pace_below
+        self.clock = clock
+        self._budgets: Dict[Tuple[Optional[str], str], _Budget] = {}
+        self._waiting: Dict[str, list] = {}  # resource -> heap of (priority, arrival) entries
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+
+    def _budget(self, token: Optional[str], resource: str) -> _Budget:
+        budget = self._budgets.get((token, resource))
+        if budget is None:
+            budget = self._budgets[(token, resource)] = _Budget()
+        return budget
+
+    def _delay(self, budget: _Budget, now: float) -> float:
+        """Seconds until a request may be sent against budget."""
+        if budget.blocked_until > now:
+            return budget.blocked_until - now
+        if budget.remaining is None or budget.reset_at is None or budget.reset_at <= now:
+            return 0.0  # Unknown, or the window has reset and the budget is full again
+        if budget.remaining < 1:
+            return budget.reset_at - now
+        if budget.limit and budget.remaining < budget.limit * self.pace_below:
+            interval = (budget.reset_at - now) / budget.remaining
+            return max(0.0, budget.last_sent + interval - now)
+        return 0.0
+
+    def _choose(self, resource: str, now: float) -> Tuple[Optional[str], float]:
+        """The token that can send soonest (the one with the most budget left on ties) and its delay."""
+        def rank(token):
+            budget = self._budget(token, resource)
+            remaining = budget.remaining if budget.remaining is not None else float("inf")
+            return self._delay(budget, now), -remaining
+        token = min(self.tokens, key=rank)
+        return token, rank(token)[0]
+
+    def _try_take(self, resource: str, entry: Optional[tuple]) -> Tuple[bool, Optional[str], Optional[float]]:
+        """
+        With the lock held: if the waiter `entry` (or, for None, a caller that has not queued) is next and
+        a token may send now, debits that token's budget and returns (True, token, None). Otherwise returns
+        (False, None, seconds to wait), where None means waiting for the waiters ahead.
+        """
+        queue = self._waiting.setdefault(resource, [])
+        if queue and queue[0] != entry:
+            return False, None, None
+        now = self.clock()
+        token, delay = self._choose(resource, now)
+        if delay > 0:
+            return False, None, delay
+        if entry is not None:
+            heapq.heappop(queue)
+            self._condition.notify_all()
+        budget = self._budget(token, resource)
+        budget.last_sent = now
+        if budget.remaining is not None and budget.reset_at is not None and budget.reset_at > now:
+            budget.remaining -= 1  # Debited right away, so concurrent callers do not all spend the last request
+        return True, token, None
+
+    def _bounded_delay(self, resource: str, delay: Optional[float], give_up_at: Optional[float],
+                       max_wait: Optional[float]) -> Optional[float]:
+        """
+        With the lock held: the delay from _try_take, capped so the caller wakes up by give_up_at.
+        Raises RateLimitWaitError if no token has budget before then.
+        """
+        if give_up_at is None:
+            return delay
+        now = self.clock()
+        soonest = delay if delay is not None else self._choose(resource, now)[1]
+        if now + soonest >= give_up_at:
+            raise RateLimitWaitError(resource, soonest, max_wait)
+        return give_up_at - now if delay is None else min(delay, give_up_at - now)
+
+    def _leave(self, resource: str, entry: tuple) -> None:
+        queue = self._waiting.get(resource, [])
+        if entry in queue:
+            queue.remove(entry)
+            heapq.heapify(queue)
+            self._condition.notify_all()
+
+    def acquire(self, resource: str = RESOURCE_CORE, priority: int = PRIORITY_NORMAL,
+                max_wait: Optional[float] = None) -> Optional[str]:
+        """
+        Waits until a request against resource may be sent, and returns the token to send it with.
+
+        Args:
+            resource: The rate-limit resource class of the request.
+            priority: A PRIORITY_* constant; waiting requests are released lowest value first.
+            max_wait: Optional. Longest time in seconds to wait. If no token has budget within it,
+                      RateLimitWaitError is raised straight away rather than after sleeping. None waits
+                      for as long as it takes (up to the window reset, which can be an hour).
+
+        Raises:
+            RateLimitWaitError: If max_wait is set and would be exceeded.
+        """
+        with self._condition:
+            give_up_at = self.clock() + max_wait if max_wait is not None else None
+            taken, token, delay = self._try_take(resource, None)
+            if taken:
+                return token
+            self._bounded_delay(resource, delay, give_up_at, max_wait)
+            entry = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting[resource], entry)
+            try:
+                while True:
+                    taken, token, delay = self._try_take(resource, entry)
+                    if taken:
+                        return token
+                    self._condition.wait(self._bounded_delay(resource, delay, give_up_at, max_wait))
+            except BaseException:
+                self._leave(resource, entry)
+                raise
+
+    async def acquire_async(self, resource: str = RESOURCE_CORE, priority: int = PRIORITY_NORMAL,
+                            max_wait: Optional[float] = None) -> Optional[str]:
+        """Like acquire(), but waits with asyncio.sleep so the event loop keeps running."""
+        with self._condition:
+            give_up_at = self.clock() + max_wait if max_wait is not None else None
+            taken, token, delay = self._try_take(resource, None)
+            if taken:
+                return token
+            delay = self._bounded_delay(resource, delay, give_up_at, max_wait)
+            entry = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting[resource], entry)
+        try:
+            while True:
+                await asyncio.sleep(min(delay, ASYNC_POLL_SECONDS) if delay else ASYNC_POLL_SECONDS)
+                with self._condition:
+                    taken, token, delay = self._try_take(resource, entry)
+                    if not taken:
+                        delay = self._bounded_delay(resource, delay, give_up_at, max_wait)
+                if taken:
+                    return token
+        except BaseException:
+            with self._condition:
+                self._leave(resource, entry)
+            raise
+
+    def update(self, token: Optional[str], resource: str, status_code: int, headers: Mapping[str, str],
+               message: str = "") -> Optional[float]:
+        """
+        Records the rate-limit state reported by a response.
+
+        Args:
+            token: The token the request was sent with.
+            resource: The resource class it was acquired for. X-RateLimit-Resource takes precedence.
+            status_code: The response status.
+            headers: The response headers.
+            message: Optional. The response body, checked for a secondary rate limit message on 403/429.
+
+        Returns:
+            Seconds to wait before retrying if the request was rejected by a rate limit, otherwise None.
+        """
+        headers = headers or {}
+        reported = headers.get("X-RateLimit-Resource")
+        resource = reported if isinstance(reported, str) and reported else resource
+        limit = _header_number(headers, "X-RateLimit-Limit")
+        remaining = _header_number(headers, "X-RateLimit-Remaining")
+        reset_at = _header_number(headers, "X-RateLimit-Reset")
+        retry_after = _header_number(headers, "Retry-After")
+        with self._condition:
+            now = self.clock()
+            budget = self._budget(token, resource)
+            if limit is not None:
+                budget.limit = limit
+            if remaining is not None:
+                budget.remaining = remaining
+            if reset_at is not None:
+                budget.reset_at = reset_at
+
+            wait = None
+            if status_code in (403, 429):
+                if retry_after is not None:
+                    wait = retry_after
+                elif remaining is not None and remaining < 1 and reset_at is not None:
+                    wait = max(0.0, reset_at - now)
+                elif "rate limit" in (message or "").lower():
+                    wait = SECONDARY_LIMIT_BACKOFF_SECONDS
+            if wait is not None:
+                budget.blocked_until = max(budget.blocked_until, now + wait)
+            self._condition.notify_all()
+            return wait
+
+    def status(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Known budgets, keyed 'resource' (or 'resource:#n' for the nth token after the first)."""
+        with self._condition:
+            report = {}
+            for (token, resource), budget in self._budgets.items():
+                index = self.tokens.index(token) if token in self.tokens else 0
+                key = resource if index == 0 else f"{resource}:#{index}"
+                report[key] = {"limit": budget.limit, "remaining": budget.remaining, "resetAt": budget.reset_at,
+                               "blockedUntil": budget.blocked_until or None}
+            return report
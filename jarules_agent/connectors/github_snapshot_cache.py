@@ -0,0 +1,165 @@
+# jarules_agent/connectors/github_snapshot_cache.py
+
+"""
+Local cache of whole-repository snapshots extracted from GitHub tarballs.
+
+One tarball download replaces a contents-API request per file: the archive is
+streamed straight into `tarfile` and extracted under
+~/.jarules/github_snapshots/<owner>/<repo>/<commit sha>/. A commit's contents
+never change, so a snapshot is valid for as long as it is kept; least recently
+used snapshots are deleted once the cache grows past its size limit.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = Path.home() / ".jarules" / "github_snapshots"
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+MARKER_FILENAME = ".jarules_snapshot.json"  # Written last; a snapshot without it is incomplete
+
+
+class SnapshotError(Exception):
+    """Custom exception for repository snapshot errors."""
+    pass
+
+
+class RepoSnapshotCache:
+    """Extracted repository tarballs keyed by commit SHA, bounded by total size."""
+
+    def __init__(self, root: Optional[os.PathLike] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root else DEFAULT_SNAPSHOT_DIR
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, owner: str, repo: str, commit_sha: str) -> Path:
+        for part in (owner, repo, commit_sha):
+            if not part or part in (".", "..") or "/" in part or "\\" in part:
+                raise SnapshotError(f"Invalid snapshot key component: {part!r}")
+        return self.root / owner / repo / commit_sha
+
+    def has(self, owner: str, repo: str, commit_sha: str) -> bool:
+        return (self.path_for(owner, repo, commit_sha) / MARKER_FILENAME).exists()
+
+    def store_tarball(self, owner: str, repo: str, commit_sha: str, stream: BinaryIO) -> Path:
+        """
+        Extracts a gzipped tarball (as served by GitHub's tarball endpoint) from a file object, reading
+        it sequentially so the archive is never held in memory or written to disk whole. The single
+        top-level directory GitHub wraps the contents in is stripped. Links, devices and paths leaving
+        the snapshot are skipped.
+
+        Returns:
+            The snapshot directory.
+
+        Raises:
+            SnapshotError: If the stream is not a valid gzipped tarball.
+        """
+        target = self.path_for(owner, repo, commit_sha)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_dir = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{commit_sha}.", suffix=".tmp"))
+        total_bytes, file_count = 0, 0
+        try:
+            with tarfile.open(fileobj=stream, mode="r|gz") as archive:
+                for member in archive:
+                    relative_path = member.name.split("/", 1)[1] if "/" in member.name else ""
+                    if not relative_path or not (member.isfile() or member.isdir()):
+                        continue
+                    member.name = relative_path
+                    try:
+                        archive.extract(member, path=temp_dir, filter="data")
+                    except tarfile.FilterError as e:
+                        logger.warning(f"Skipping unsafe archive member '{relative_path}': {e}")
+                        continue
+                    if member.isfile():
+                        total_bytes += member.size
+                        file_count += 1
+            with open(temp_dir / MARKER_FILENAME, "w") as f:
+                json.dump({"owner": owner, "repo": repo, "commitSha": commit_sha, "bytes": total_bytes,
+                           "files": file_count, "createdAt": time.time()}, f)
+            with self._lock:
+                if target.exists():  # Another process finished the same snapshot first
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                else:
+                    os.replace(temp_dir, target)
+        except (tarfile.TarError, EOFError, OSError) as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise SnapshotError(f"Could not extract tarball for {owner}/{repo}@{commit_sha}: {e}") from e
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        logger.info(f"Stored snapshot of {owner}/{repo}@{commit_sha}: {file_count} files, {total_bytes} bytes.")
+        self.evict(keep=target)
+        return target
+
+    def read_file(self, owner: str, repo: str, commit_sha: str, file_path: str) -> Optional[bytes]:
+        """
+        Returns a file's contents from a snapshot, or None if the snapshot or the file is missing.
+
+        Raises:
+            SnapshotError: If file_path points outside the snapshot.
+        """
+        snapshot = self.path_for(owner, repo, commit_sha)
+        marker = snapshot / MARKER_FILENAME
+        if not marker.exists():
+            return None
+        path = (snapshot / file_path.lstrip("/")).resolve()
+        if snapshot.resolve() not in path.parents:
+            raise SnapshotError(f"Path '{file_path}' is outside the repository.")
+        try:
+            contents = path.read_bytes()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+        try:
+            os.utime(marker)  # Marks the snapshot as recently used
+        except OSError:
+            pass
+        return contents
+
+    def snapshots(self) -> List[Tuple[Path, int, float]]:
+        """Complete snapshots as (directory, bytes, last used), least recently used first."""
+        found = []
+        for marker in self.root.glob(f"*/*/*/{MARKER_FILENAME}"):
+            try:
+                with open(marker) as f:
+                    size = json.load(f).get("bytes", 0)
+                found.append((marker.parent, size, marker.stat().st_mtime))
+            except (OSError, ValueError):
+                continue
+        found.sort(key=lambda snapshot: snapshot[2])
+        return found
+
+    def evict(self, keep: Optional[Path] = None) -> List[Path]:
+        """Deletes least recently used snapshots (never `keep`) until the cache fits in max_bytes."""
+        with self._lock:
+            snapshots = self.snapshots()
+            total = sum(size for _, size, _ in snapshots)
+            evicted = []
+            for directory, size, _ in snapshots:
+                if total <= self.max_bytes:
+                    break
+                if keep is not None and directory == keep:
+                    continue
+                # Remove the marker first so a concurrent reader sees the snapshot as gone, not half-deleted.
+                try:
+                    (directory / MARKER_FILENAME).unlink()
+                except FileNotFoundError:
+                    continue
+                shutil.rmtree(directory, ignore_errors=True)
+                total -= size
+                evicted.append(directory)
+            if evicted:
+                logger.info(f"Evicted {len(evicted)} repository snapshot(s); {total} bytes remain.")
+            return evicted
+
+    def stats(self) -> Dict[str, int]:
+        snapshots = self.snapshots()
+        return {"snapshots": len(snapshots), "bytes": sum(size for _, size, _ in snapshots), "maxBytes": self.max_bytes}
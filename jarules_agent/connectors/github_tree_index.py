@@ -0,0 +1,154 @@
+# jarules_agent/connectors/github_tree_index.py
+
+"""
+In-memory index of every path in a GitHub repository at one commit.
+
+Built from a single `git/trees/{sha}?recursive=1` response, it answers
+listings, existence checks and glob queries locally instead of making one
+`/contents/` request per directory (which also truncates at 1000 entries).
+"""
+
+import fnmatch
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class _Node:
+    __slots__ = ("name", "type", "mode", "sha", "size", "children")
+
+    def __init__(self, name: str, type: str = "tree", mode: Optional[str] = None, sha: Optional[str] = None,
+                 size: Optional[int] = None):
+        self.name = name
+        self.type = type
+        self.mode = mode
+        self.sha = sha
+        self.size = size
+        self.children: Dict[str, "_Node"] = {}
+
+
+class RepoTreeIndex:
+    """
+    Prefix trie of a repository's paths, one node per path segment, holding each entry's type
+    ('blob', 'tree' or 'commit' for submodules), mode, object SHA and (for blobs) size.
+    """
+
+    def __init__(self, commit_sha: str, entries: Iterable[Dict[str, Any]], tree_sha: Optional[str] = None):
+        """
+        Args:
+            commit_sha: The commit the entries were read from; the index is valid while the branch points here.
+            entries: Tree entries as returned by the GitHub trees API (dicts with 'path', 'type', 'mode', 'sha'
+                     and, for blobs, 'size').
+            tree_sha: Optional. SHA of the root tree.
+        """
+        self.commit_sha = commit_sha
+        self.tree_sha = tree_sha
+        self._root = _Node("", sha=tree_sha)
+        self._count = 0
+        for entry in entries:
+            self._insert(entry)
+
+    def _insert(self, entry: Dict[str, Any]) -> None:
+        node = self._root
+        *parents, name = entry["path"].split("/")
+        for part in parents:
+            node = node.children.setdefault(part, _Node(part))
+        child = node.children.get(name)
+        if child is None:
+            child = node.children[name] = _Node(name)
+            self._count += 1
+        child.type = entry.get("type", "blob")
+        child.mode = entry.get("mode")
+        child.sha = entry.get("sha")
+        child.size = entry.get("size")
+
+    def _find(self, path: str) -> Optional[_Node]:
+        node = self._root
+        for part in (p for p in path.strip("/").split("/") if p):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def __len__(self) -> int:
+        return self._count
+
+    def exists(self, path: str) -> bool:
+        return self._find(path) is not None
+
+    def is_dir(self, path: str) -> bool:
+        node = self._find(path)
+        return node is not None and node.type == "tree"
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Returns {'path', 'type', 'mode', 'sha', 'size'} for path, or None if it does not exist."""
+        node = self._find(path)
+        if node is None or node is self._root:
+            return None
+        return {"path": path.strip("/"), "type": node.type, "mode": node.mode, "sha": node.sha, "size": node.size}
+
+    def list_dir(self, path: str = "") -> Optional[List[str]]:
+        """
+        Names of the entries directly in directory `path` (sorted), like GitHubClient.list_repo_files.
+
+        Returns:
+            The list of names, or None if path does not exist or is not a directory.
+        """
+        node = self._find(path)
+        if node is None or node.type != "tree":
+            return None
+        return sorted(node.children)
+
+    def walk(self, path: str = "", include_dirs: bool = False) -> Iterator[str]:
+        """Yields every file path under `path` (and directory paths too if include_dirs), depth first, sorted."""
+        node = self._find(path)
+        if node is None:
+            return
+        prefix = path.strip("/")
+        if node.type != "tree":
+            yield prefix
+            return
+        yield from self._walk(node, prefix, include_dirs)
+
+    def _walk(self, node: _Node, prefix: str, include_dirs: bool) -> Iterator[str]:
+        for name in sorted(node.children):
+            child = node.children[name]
+            child_path = f"{prefix}/{name}" if prefix else name
+            if child.type == "tree":
+                if include_dirs:
+                    yield child_path
+                yield from self._walk(child, child_path, include_dirs)
+            else:
+                yield child_path
+
+    def glob(self, pattern: str) -> List[str]:
+        """
+        Paths matching a glob pattern, sorted. Each '/'-separated segment is matched with fnmatch rules
+        ('*', '?', '[...]'), and a '**' segment matches any number of directories, so 'src/**/*.py' finds
+        every Python file under src. Only the trie branches a pattern can match are visited.
+        """
+        segments = [segment for segment in pattern.strip("/").split("/") if segment]
+        matches = set()
+        self._glob(self._root, "", segments, matches)
+        return sorted(matches)
+
+    def _glob(self, node: _Node, prefix: str, segments: List[str], matches: set) -> None:
+        if not segments:
+            if node is not self._root:
+                matches.add(prefix)
+            return
+        segment, rest = segments[0], segments[1:]
+        if segment == "**":
+            self._glob(node, prefix, rest, matches)  # '**' matching no directories
+            for name, child in node.children.items():
+                if child.type == "tree":
+                    self._glob(child, f"{prefix}/{name}" if prefix else name, segments, matches)
+                elif not rest:
+                    matches.add(f"{prefix}/{name}" if prefix else name)
+            return
+        if not any(char in segment for char in "*?["):
+            child = node.children.get(segment)
+            if child is not None:
+                self._glob(child, f"{prefix}/{segment}" if prefix else segment, rest, matches)
+            return
+        for name, child in node.children.items():
+            if fnmatch.fnmatchcase(name, segment):
+                self._glob(child, f"{prefix}/{name}" if prefix else name, rest, matches)
@@ -118,6 +118,8 @@ class OllamaConnector(BaseLLMConnector): # BaseLLMConnector now expects model_na
     Connector for interacting with local LLMs through the Ollama API.
     """
 
+    PROVIDER_NAME = "ollama"
+
     def __init__(self, model_name: Optional[str] = None, **kwargs: Any): # Updated signature
         """
         Initializes the OllamaConnector.
@@ -218,9 +220,18 @@ class OllamaConnector(BaseLLMConnector): # BaseLLMConnector now expects model_na
         logger.debug(f"Ollama request to {actual_endpoint}. Payload: {json.dumps(payload, indent=2)}")
 
         try:
-            response = await self.client.post(actual_endpoint, json=payload)
-            response.raise_for_status()
-            response_data = response.json()
+            with self._track_request() as observation:
+                response = await self.client.post(actual_endpoint, json=payload)
+                response.raise_for_status()
+                response_data = response.json()
+                # Durations are reported in nanoseconds; model load plus prompt evaluation
+                # is the time before the first output token.
+                first_token_ns = (response_data.get("load_duration") or 0) + (response_data.get("prompt_eval_duration") or 0)
+                observation.record_usage(
+                    prompt_tokens=response_data.get("prompt_eval_count"),
+                    completion_tokens=response_data.get("eval_count"),
+                    time_to_first_token=first_token_ns / 1e9 if first_token_ns else None,
+                )
 
             if actual_endpoint == "/api/chat":
                 # For /api/chat, the response structure is like:
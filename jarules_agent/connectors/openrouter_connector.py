@@ -19,6 +19,7 @@ class OpenRouterConnector(BaseLLMConnector):
     Connector for interacting with various LLMs through the OpenRouter API.
     """
 
+    PROVIDER_NAME = "openrouter"
     DEFAULT_API_BASE_URL = "https://openrouter.ai/api/v1"
     DEFAULT_MODEL_NAME = "gryphe/mythomax-l2-13b" # A free model for default
 
@@ -80,10 +81,13 @@ class OpenRouterConnector(BaseLLMConnector):
 
         logger.debug(f"OpenRouter request payload: {json.dumps(payload, indent=2)}")
         try:
-            response = await self.client.post("/chat/completions", json=payload)
-            response.raise_for_status()
-
-            response_data = response.json()
+            with self._track_request() as observation:
+                response = await self.client.post("/chat/completions", json=payload)
+                response.raise_for_status()
+                response_data = response.json()
+                usage = response_data.get("usage") if isinstance(response_data, dict) else None
+                if isinstance(usage, dict):
+                    observation.record_usage(prompt_tokens=usage.get("prompt_tokens"), completion_tokens=usage.get("completion_tokens"))
 
             if not response_data.get("choices") or not response_data["choices"][0].get("message") \
                or "content" not in response_data["choices"][0]["message"]:
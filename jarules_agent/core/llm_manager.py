@@ -2,7 +2,12 @@
 
 import yaml
 import os
-from typing import Optional, Dict, Any
+import asyncio
+import functools
+import inspect
+import time
+import uuid
+from typing import Optional, Dict, Any, List, Tuple
 
 # Assuming BaseLLMConnector and GeminiClient will be discoverable by Python's import system.
 # Adjust relative paths if necessary based on final project structure.
@@ -31,6 +36,10 @@ class LLMProviderNotImplementedError(LLMManagerError, NotImplementedError):
     """Raised when a requested LLM provider's connector is not implemented."""
     pass
 
+class LLMRequestCancelledError(LLMManagerError):
+    """Raised when an in-flight LLM request is cancelled via LLMManager.cancel_request()."""
+    pass
+
 
 class LLMManager:
     """
@@ -53,6 +62,10 @@ class LLMManager:
         self.active_provider_id: Optional[str] = None
         self.user_state_file_path = Path.home() / ".jarules" / "user_state.json"
         self._default_provider_from_config: Optional[str] = None # Store the default from config
+        self._config_file_signature: Optional[Tuple[int, int]] = None # (mtime_ns, size) of the last loaded config
+        self._retired_connectors: List[BaseLLMConnector] = [] # Replaced by a reload, closed once drained
+        self._inflight_calls: Dict[str, asyncio.Future] = {} # request_id -> running connector call
+        self._cancelled_request_ids: set = set()
 
         # Mapping of provider names to connector classes
         self.connector_map = {
@@ -63,31 +76,10 @@ class LLMManager:
         }
 
         try:
-            if not os.path.exists(self.config_path):
-                raise LLMConfigError(f"LLM configuration file not found at: {self.config_path}")
-            
-            with open(self.config_path, 'r') as f:
-                full_config = yaml.safe_load(f)
-            
-            if not full_config or 'llm_configs' not in full_config:
-                raise LLMConfigError(f"Invalid LLM configuration: 'llm_configs' key missing in {self.config_path}")
-
-            for conf in full_config['llm_configs']:
-                if not isinstance(conf, dict) or 'id' not in conf or 'provider' not in conf:
-                    raise LLMConfigError(f"Invalid LLM entry in {self.config_path}: missing 'id' or 'provider'. Entry: {conf}")
-                if not conf.get('enabled', False): # Skip disabled configurations
-                    print(f"LLMManager: Skipping disabled configuration with id '{conf['id']}'.")
-                    continue
-                self._llm_configs[conf['id']] = conf
-            
-            if not self._llm_configs:
-                logger.warning(f"LLMManager: No enabled LLM configurations found in {self.config_path}.")
-
-            # Set active_provider_id from default_provider in config
-            default_provider_id = full_config.get('default_provider')
+            self._llm_configs, default_provider_from_config = self._read_config_file()
+            self._config_file_signature = self._get_config_file_signature()
 
             # Determine default provider from config first
-            default_provider_from_config = full_config.get('default_provider')
             if default_provider_from_config and default_provider_from_config in self._llm_configs:
                 self._default_provider_from_config = default_provider_from_config
                 logger.info(f"LLMManager: Default provider from config identified as '{self._default_provider_from_config}'.")
@@ -130,6 +122,183 @@ class LLMManager:
         except Exception as e: # Catch other unexpected errors during init
             raise LLMManagerError(f"An unexpected error occurred during LLMManager initialization: {e}") from e
 
+    def _read_config_file(self) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
+        """
+        Reads and validates the LLM configuration file.
+
+        Returns:
+            A tuple of (enabled configurations keyed by id, default_provider from the file).
+
+        Raises:
+            LLMConfigError: If the config file is not found or is structurally invalid.
+            yaml.YAMLError: If the file cannot be parsed (callers wrap this).
+        """
+        if not os.path.exists(self.config_path):
+            raise LLMConfigError(f"LLM configuration file not found at: {self.config_path}")
+
+        with open(self.config_path, 'r') as f:
+            full_config = yaml.safe_load(f)
+
+        if not full_config or 'llm_configs' not in full_config:
+            raise LLMConfigError(f"Invalid LLM configuration: 'llm_configs' key missing in {self.config_path}")
+
+        llm_configs: Dict[str, Dict[str, Any]] = {}
+        for conf in full_config['llm_configs']:
+            if not isinstance(conf, dict) or 'id' not in conf or 'provider' not in conf:
+                raise LLMConfigError(f"Invalid LLM entry in {self.config_path}: missing 'id' or 'provider'. Entry: {conf}")
+            if not conf.get('enabled', False): # Skip disabled configurations
+                print(f"LLMManager: Skipping disabled configuration with id '{conf['id']}'.")
+                continue
+            llm_configs[conf['id']] = conf
+
+        if not llm_configs:
+            logger.warning(f"LLMManager: No enabled LLM configurations found in {self.config_path}.")
+
+        return llm_configs, full_config.get('default_provider')
+
+    def _get_config_file_signature(self) -> Optional[Tuple[int, int]]:
+        """Returns (mtime_ns, size) of the config file, or None if it cannot be stat'ed."""
+        try:
+            stat_result = os.stat(self.config_path)
+        except OSError:
+            return None
+        return (stat_result.st_mtime_ns, stat_result.st_size)
+
+    def config_changed_on_disk(self) -> bool:
+        """Returns True if the config file's mtime or size differs from the last load."""
+        signature = self._get_config_file_signature()
+        return signature is not None and signature != self._config_file_signature
+
+    def reload_config(self) -> Dict[str, List[str]]:
+        """
+        Re-reads the configuration file and applies it incrementally.
+
+        Only connectors whose configuration entry changed (or was removed/disabled) are
+        dropped from the cache; they are moved to a retired list so in-flight requests can
+        finish before `drain_retired_connectors` closes them. Connectors for unchanged
+        entries are kept as-is, so their pooled HTTP clients stay warm.
+
+        Returns:
+            A dict with 'added', 'removed', 'changed' and 'unchanged' config ids.
+
+        Raises:
+            LLMConfigError: If the new file is missing or invalid. The current
+                            configuration is left untouched in that case.
+        """
+        signature = self._get_config_file_signature()
+        try:
+            new_configs, new_default_provider = self._read_config_file()
+        except yaml.YAMLError as e:
+            raise LLMConfigError(f"Error parsing LLM configuration file {self.config_path}: {e}") from e
+
+        old_configs = self._llm_configs
+        diff: Dict[str, List[str]] = {
+            "added": sorted(set(new_configs) - set(old_configs)),
+            "removed": sorted(set(old_configs) - set(new_configs)),
+            "changed": sorted(cid for cid in set(old_configs) & set(new_configs) if old_configs[cid] != new_configs[cid]),
+        }
+        diff["unchanged"] = sorted(cid for cid in set(old_configs) & set(new_configs) if old_configs[cid] == new_configs[cid])
+
+        for config_id in diff["removed"] + diff["changed"]:
+            connector = self._loaded_connectors.pop(config_id, None)
+            if connector is not None:
+                logger.info(f"LLMManager: Retiring connector for '{config_id}' after config reload.")
+                self._retired_connectors.append(connector)
+
+        self._llm_configs = new_configs
+        self._config_file_signature = signature
+
+        if new_default_provider and new_default_provider in new_configs:
+            self._default_provider_from_config = new_default_provider
+        else:
+            if new_default_provider:
+                logger.warning(
+                    f"LLMManager: Default provider ID '{new_default_provider}' from config is not found "
+                    f"among enabled configurations or is invalid."
+                )
+            self._default_provider_from_config = None
+
+        if self.active_provider_id and self.active_provider_id not in new_configs:
+            logger.warning(
+                f"LLMManager: Active provider '{self.active_provider_id}' was removed or disabled by config reload. Falling back."
+            )
+            self.active_provider_id = self._default_provider_from_config
+            self._save_user_state(self.active_provider_id)
+        elif self.active_provider_id is None and self._default_provider_from_config:
+            self.active_provider_id = self._default_provider_from_config
+
+        logger.info(
+            f"LLMManager: Reloaded {self.config_path}. Added: {diff['added']}, removed: {diff['removed']}, "
+            f"changed: {diff['changed']}, unchanged: {len(diff['unchanged'])}."
+        )
+        return diff
+
+    def reload_if_changed(self) -> Optional[Dict[str, List[str]]]:
+        """
+        Reloads the configuration if the file changed on disk. Returns the diff, or None if unchanged.
+
+        Raises:
+            LLMConfigError: If the changed file is invalid. The file is not retried until it changes
+                            again, so pollers report each bad edit once.
+        """
+        if not self.config_changed_on_disk():
+            return None
+        signature = self._get_config_file_signature()
+        try:
+            return self.reload_config()
+        except LLMConfigError:
+            self._config_file_signature = signature
+            raise
+
+    async def drain_retired_connectors(self, timeout: float = 30.0, poll_interval: float = 0.05) -> int:
+        """
+        Waits for retired connectors to finish their in-flight requests, then closes them.
+
+        Connectors still busy after `timeout` seconds are closed anyway.
+
+        Returns:
+            The number of connectors closed.
+        """
+        retired, self._retired_connectors = self._retired_connectors, []
+        deadline = time.monotonic() + timeout
+        for connector in retired:
+            while getattr(connector, "inflight_requests", 0) > 0 and time.monotonic() < deadline:
+                await asyncio.sleep(poll_interval)
+            if getattr(connector, "inflight_requests", 0) > 0:
+                logger.warning(f"LLMManager: Closing retired connector {type(connector).__name__} with requests still in flight.")
+            close = getattr(connector, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"LLMManager: Error closing retired connector {type(connector).__name__}: {e}")
+        return len(retired)
+
+    async def watch_config(self, poll_interval: float = 2.0, drain_timeout: float = 30.0, stop_event: Optional[asyncio.Event] = None):
+        """
+        Watches the config file for changes and applies them with `reload_config`.
+
+        Polls the file's mtime/size every `poll_interval` seconds until `stop_event`
+        is set (or the task is cancelled). Invalid edits are logged and skipped, so a
+        half-saved file never tears down the working configuration.
+        """
+        while stop_event is None or not stop_event.is_set():
+            try:
+                if self.reload_if_changed() is not None:
+                    await self.drain_retired_connectors(timeout=drain_timeout)
+            except LLMConfigError as e:
+                logger.error(f"LLMManager: Ignoring invalid configuration change: {e}")
+            if stop_event is None:
+                await asyncio.sleep(poll_interval)
+            else:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
     def get_available_configs(self) -> Dict[str, Dict[str, Any]]:
         """Returns a dictionary of all enabled LLM configurations."""
         return self._llm_configs.copy()
@@ -268,3 +437,83 @@ class LLMManager:
 
         self._loaded_connectors[target_provider_id] = connector
         return connector
+
+    async def call_connector(self, method_name: str, *args: Any, provider_id: Optional[str] = None,
+                             request_id: Optional[str] = None, **kwargs: Any) -> Any:
+        """
+        Runs a connector method (e.g. 'generate_code') as a cancellable request.
+
+        The call is registered under `request_id` so that `cancel_request` can abort it.
+        Cancelling an async connector cancels its pending `await`, which makes httpx close
+        the upstream connection and release its pool slot immediately. Synchronous
+        connectors (Gemini) run in the default executor; cancelling them returns control
+        to the caller right away, but the blocking SDK call finishes in the background.
+
+        Args:
+            method_name: Name of the connector method to invoke.
+            *args: Positional arguments for the connector method.
+            provider_id: Config id of the connector to use. Defaults to the active provider.
+            request_id: Optional id for cancellation. A UUID is generated when omitted.
+            **kwargs: Keyword arguments for the connector method.
+
+        Returns:
+            Whatever the connector method returns.
+
+        Raises:
+            LLMRequestCancelledError: If the request was cancelled via `cancel_request`.
+            LLMManagerError / LLMConfigError: If the connector cannot be loaded.
+        """
+        client = self.get_llm_client(provider_id)
+        method = getattr(client, method_name, None)
+        if method is None:
+            raise LLMManagerError(f"Connector {type(client).__name__} has no method '{method_name}'.")
+
+        request_id = request_id or str(uuid.uuid4())
+        if request_id in self._inflight_calls:
+            raise LLMManagerError(f"A request with id '{request_id}' is already in flight.")
+
+        loop = asyncio.get_running_loop()
+        if inspect.iscoroutinefunction(method):
+            call: asyncio.Future = asyncio.ensure_future(method(*args, **kwargs))
+        else:
+            call = loop.run_in_executor(None, functools.partial(method, *args, **kwargs))
+
+        self._inflight_calls[request_id] = call
+        try:
+            return await call
+        except asyncio.CancelledError:
+            if request_id in self._cancelled_request_ids:
+                raise LLMRequestCancelledError(f"Request '{request_id}' was cancelled.") from None
+            call.cancel()
+            raise
+        finally:
+            self._inflight_calls.pop(request_id, None)
+            self._cancelled_request_ids.discard(request_id)
+
+    async def generate_code(self, user_prompt: str, provider_id: Optional[str] = None,
+                            request_id: Optional[str] = None, **kwargs: Any) -> Optional[str]:
+        """Cancellable shortcut for `call_connector('generate_code', ...)`."""
+        return await self.call_connector("generate_code", user_prompt, provider_id=provider_id, request_id=request_id, **kwargs)
+
+    def cancel_request(self, request_id: str) -> bool:
+        """
+        Cancels an in-flight request started with `call_connector`.
+
+        Returns:
+            True if a running request was found and cancelled, False otherwise.
+        """
+        call = self._inflight_calls.get(request_id)
+        if call is None or call.done():
+            return False
+        logger.info(f"LLMManager: Cancelling request '{request_id}'.")
+        self._cancelled_request_ids.add(request_id)
+        call.cancel()
+        return True
+
+    def cancel_all_requests(self) -> int:
+        """Cancels every in-flight request. Returns the number of requests cancelled."""
+        return sum(1 for request_id in list(self._inflight_calls) if self.cancel_request(request_id))
+
+    def get_inflight_request_ids(self) -> List[str]:
+        """Returns the ids of requests currently in flight."""
+        return list(self._inflight_calls)
@@ -0,0 +1,486 @@
+# jarules_agent/core/metrics.py
+
+"""
+In-process metrics registry for LLM connector calls.
+
+Connectors record latency, time-to-first-token and token usage through
+`BaseLLMConnector._track_request`. The registry can be rendered in the
+Prometheus text exposition format, written to a file, or flushed to
+~/.jarules so that short-lived bridge processes accumulate into one view
+that `get_metrics_wrapper.py` reports to the Electron UI.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: flushes from concurrent processes are not serialised.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = Path.home() / ".jarules"
+METRICS_JSON_FILENAME = "metrics.json"
+METRICS_PROM_FILENAME = "metrics.prom"
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+LabelValues = Tuple[str, ...]
+
+
+class MetricsError(Exception):
+    """Raised for invalid metric definitions or observations."""
+    pass
+
+
+class _Metric:
+    """Common state for a labelled metric family."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = lock
+        self._series: Dict[LabelValues, Any] = {}
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise MetricsError(f"Metric '{self.name}' expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _format_labels(self, values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.label_names, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = [f'{key}="{_escape_label_value(value)}"' for key, value in pairs]
+        return "{" + ",".join(escaped) + "}"
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise MetricsError(f"Counter '{self.name}' cannot be decreased (got {amount}).")
+        key = self._label_values(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._series.get(self._label_values(labels), 0.0)
+
+    def _render(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {_format_number(value)}" for key, value in sorted(self._series.items())]
+
+    def _dump(self) -> List[Dict[str, Any]]:
+        return [{"labels": list(key), "value": value} for key, value in self._series.items()]
+
+    def _merge(self, series: List[Dict[str, Any]]) -> None:
+        for item in series:
+            key = tuple(item["labels"])
+            self._series[key] = self._series.get(key, 0.0) + item["value"]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set, as in the Prometheus data model."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], lock: threading.Lock,
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names, lock)
+        if list(buckets) != sorted(buckets) or not buckets:
+            raise MetricsError(f"Histogram '{name}' buckets must be a non-empty ascending sequence.")
+        self.buckets = tuple(float(b) for b in buckets)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._series[key] = series
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    series["counts"][index] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def summary(self, **labels: Any) -> Dict[str, float]:
+        """Returns count, sum and mean for one label set."""
+        series = self._series.get(self._label_values(labels))
+        if not series:
+            return {"count": 0, "sum": 0.0, "mean": 0.0}
+        return {"count": series["count"], "sum": series["sum"], "mean": series["sum"] / series["count"]}
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """
+        Estimates the q-quantile (0 <= q <= 1) for one label set by linear interpolation
+        within buckets, like PromQL's histogram_quantile. Returns None without observations.
+        Observations above the largest bucket are reported as that bucket's upper bound.
+        """
+        series = self._series.get(self._label_values(labels))
+        if not series or not series["count"]:
+            return None
+        return _bucket_quantile(q, self.buckets, series["counts"], series["count"])
+
+    def _render(self) -> List[str]:
+        lines = []
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', _format_number(upper_bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', '+Inf'))} {series['count']}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_number(series['sum'])}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {series['count']}")
+        return lines
+
+    def _dump(self) -> List[Dict[str, Any]]:
+        return [{"labels": list(key), **series} for key, series in self._series.items()]
+
+    def _merge(self, series_list: List[Dict[str, Any]]) -> None:
+        for item in series_list:
+            if len(item["counts"]) != len(self.buckets):
+                logger.warning(f"Skipping stored series for '{self.name}': bucket layout changed.")
+                continue
+            key = tuple(item["labels"])
+            series = self._series.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            series["counts"] = [a + b for a, b in zip(series["counts"], item["counts"])]
+            series["sum"] += item["sum"]
+            series["count"] += item["count"]
+
+
+class MetricsRegistry:
+    """Holds metric families and renders or persists them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names, self._lock))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, self._lock, buckets=buckets))
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                raise MetricsError(f"Metric '{metric.name}' is already registered with a different definition.")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Drops all recorded observations, keeping the metric definitions."""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric._series.clear()
+
+    def render_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._metrics):
+                metric = self._metrics[name]
+                lines.append(f"# HELP {name} {metric.documentation}")
+                lines.append(f"# TYPE {name} {metric.metric_type}")
+                lines.extend(metric._render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a JSON-serialisable dump of every metric family."""
+        with self._lock:
+            return {
+                name: {
+                    "type": metric.metric_type,
+                    "help": metric.documentation,
+                    "label_names": list(metric.label_names),
+                    "series": metric._dump(),
+                }
+                for name, metric in self._metrics.items()
+            }
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Adds the observations of a snapshot (as returned by `snapshot`) to this registry."""
+        with self._lock:
+            for name, data in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None or metric.metric_type != data.get("type") \
+                        or list(metric.label_names) != data.get("label_names"):
+                    logger.debug(f"Ignoring unknown or mismatched stored metric '{name}'.")
+                    continue
+                metric._merge(data.get("series", []))
+
+    def write_prometheus(self, path: os.PathLike) -> None:
+        """Writes the Prometheus text rendering to `path` atomically (e.g. for node_exporter's textfile collector)."""
+        _atomic_write(Path(path), self.render_prometheus())
+
+    def flush(self, directory: Optional[os.PathLike] = None) -> Path:
+        """
+        Merges this process's observations into the metrics store on disk and resets them.
+
+        The store accumulates across processes: every Electron bridge call is its own
+        Python process, so each one flushes before exiting.
+
+        Args:
+            directory: Optional. Directory holding metrics.json / metrics.prom. Defaults to ~/.jarules.
+
+        Returns:
+            The path of the JSON store.
+        """
+        directory = Path(directory) if directory is not None else METRICS_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        json_path = directory / METRICS_JSON_FILENAME
+        with _file_lock(directory / (METRICS_JSON_FILENAME + ".lock")):
+            combined = MetricsRegistry()
+            for name, metric in self._metrics.items():
+                combined._register(_clone_definition(metric, combined._lock))
+            combined.merge_snapshot(load_snapshot(json_path))
+            combined.merge_snapshot(self.snapshot())
+            _atomic_write(json_path, json.dumps(combined.snapshot()))
+            combined.write_prometheus(directory / METRICS_PROM_FILENAME)
+        self.reset()
+        return json_path
+
+
+def load_snapshot(path: os.PathLike) -> Dict[str, Any]:
+    """Reads a stored snapshot, returning an empty one if the file is missing or unreadable."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not read metrics store {path}: {e}")
+        return {}
+
+
+class RequestObservation:
+    """
+    Collects the numbers for one provider call. Yielded by `BaseLLMConnector._track_request`;
+    connectors fill in usage once the response has been parsed.
+    """
+
+    def __init__(self, provider: str, model: str, operation: str):
+        self.provider = provider
+        self.model = model
+        self.operation = operation
+        self.started_at = time.perf_counter()
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.time_to_first_token: Optional[float] = None
+
+    def record_usage(self, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None,
+                     time_to_first_token: Optional[float] = None) -> None:
+        """Stores usage reported by the provider. Missing or non-numeric values are left unset."""
+        if _is_number(prompt_tokens):
+            self.prompt_tokens = int(prompt_tokens)
+        if _is_number(completion_tokens):
+            self.completion_tokens = int(completion_tokens)
+        if _is_number(time_to_first_token):
+            self.time_to_first_token = float(time_to_first_token)
+
+    def mark_first_token(self) -> None:
+        """Records time-to-first-token as now, for callers that see the first streamed byte."""
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self.started_at
+
+
+def define_llm_metrics(registry: MetricsRegistry) -> None:
+    """Registers the LLM connector metric families on `registry`."""
+    registry.counter(
+        "jarules_llm_requests_total", "LLM provider requests by outcome.",
+        ("provider", "model", "operation", "outcome"))
+    registry.histogram(
+        "jarules_llm_request_latency_seconds", "Wall-clock latency of successful LLM provider requests.",
+        ("provider", "model", "operation"))
+    registry.histogram(
+        "jarules_llm_time_to_first_token_seconds", "Time until the provider produced the first output token.",
+        ("provider", "model"))
+    registry.counter(
+        "jarules_llm_tokens_total", "Tokens reported by LLM providers.",
+        ("provider", "model", "kind"))
+    registry.histogram(
+        "jarules_llm_completion_tokens", "Completion tokens per LLM request.",
+        ("provider", "model"), buckets=TOKEN_BUCKETS)
+
+
+REGISTRY = MetricsRegistry()
+define_llm_metrics(REGISTRY)
+
+
+def load_registry(directory: Optional[os.PathLike] = None) -> MetricsRegistry:
+    """Builds a registry holding the metrics accumulated on disk by `MetricsRegistry.flush`."""
+    directory = Path(directory) if directory is not None else METRICS_DIR
+    registry = MetricsRegistry()
+    define_llm_metrics(registry)
+    registry.merge_snapshot(load_snapshot(directory / METRICS_JSON_FILENAME))
+    return registry
+
+
+def summarize_llm_metrics(registry: MetricsRegistry) -> List[Dict[str, Any]]:
+    """
+    Condenses the LLM metrics into one row per (provider, model) for display.
+
+    Returns:
+        A list of dicts with request counts by outcome, mean/p50/p95 latency in seconds,
+        mean time-to-first-token (None if the provider does not report it) and token totals.
+    """
+    requests = registry.get("jarules_llm_requests_total")
+    latency = registry.get("jarules_llm_request_latency_seconds")
+    ttft = registry.get("jarules_llm_time_to_first_token_seconds")
+    tokens = registry.get("jarules_llm_tokens_total")
+
+    rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def row_for(provider: str, model: str) -> Dict[str, Any]:
+        if (provider, model) not in rows:
+            rows[(provider, model)] = {
+                "provider": provider, "model": model,
+                "requests": {"ok": 0, "error": 0, "cancelled": 0},
+                "latency_mean_seconds": None, "latency_p50_seconds": None, "latency_p95_seconds": None,
+                "ttft_mean_seconds": None, "prompt_tokens": 0, "completion_tokens": 0,
+                "_latency": {"counts": [0] * len(latency.buckets), "sum": 0.0, "count": 0},
+            }
+        return rows[(provider, model)]
+
+    for (provider, model, _operation, outcome), value in requests._series.items():
+        counts = row_for(provider, model)["requests"]
+        counts[outcome] = counts.get(outcome, 0) + int(value)
+    for (provider, model, _operation), series in latency._series.items():
+        merged = row_for(provider, model)["_latency"]
+        merged["counts"] = [a + b for a, b in zip(merged["counts"], series["counts"])]
+        merged["sum"] += series["sum"]
+        merged["count"] += series["count"]
+    for (provider, model), series in ttft._series.items():
+        if series["count"]:
+            row_for(provider, model)["ttft_mean_seconds"] = series["sum"] / series["count"]
+    for (provider, model, kind), value in tokens._series.items():
+        key = f"{kind}_tokens"
+        row = row_for(provider, model)
+        row[key] = row.get(key, 0) + int(value)
+
+    for row in rows.values():
+        merged = row.pop("_latency")
+        if merged["count"]:
+            row["latency_mean_seconds"] = merged["sum"] / merged["count"]
+            row["latency_p50_seconds"] = _bucket_quantile(0.5, latency.buckets, merged["counts"], merged["count"])
+            row["latency_p95_seconds"] = _bucket_quantile(0.95, latency.buckets, merged["counts"], merged["count"])
+    return sorted(rows.values(), key=lambda r: (r["provider"], r["model"]))
+
+
+@contextlib.contextmanager
+def observe_request(provider: str, model: str, operation: str,
+                    registry: Optional[MetricsRegistry] = None) -> Iterator[RequestObservation]:
+    """
+    Times a provider call and records its outcome and usage into the registry.
+
+    The outcome label is 'ok', 'error' or 'cancelled'.
+    """
+    registry = registry or REGISTRY
+    observation = RequestObservation(provider, model, operation)
+    outcome = "ok"
+    try:
+        yield observation
+    except BaseException as e:
+        outcome = "cancelled" if isinstance(e, (asyncio.CancelledError, KeyboardInterrupt)) else "error"
+        raise
+    finally:
+        _record(registry, observation, outcome, time.perf_counter() - observation.started_at)
+
+
+def _record(registry: MetricsRegistry, observation: RequestObservation, outcome: str, elapsed: float) -> None:
+    provider, model = observation.provider, observation.model
+    registry.get("jarules_llm_requests_total").inc(provider=provider, model=model, operation=observation.operation, outcome=outcome)
+    if outcome != "ok":
+        return
+    registry.get("jarules_llm_request_latency_seconds").observe(elapsed, provider=provider, model=model, operation=observation.operation)
+    if observation.time_to_first_token is not None:
+        registry.get("jarules_llm_time_to_first_token_seconds").observe(observation.time_to_first_token, provider=provider, model=model)
+    tokens = registry.get("jarules_llm_tokens_total")
+    if observation.prompt_tokens is not None:
+        tokens.inc(observation.prompt_tokens, provider=provider, model=model, kind="prompt")
+    if observation.completion_tokens is not None:
+        tokens.inc(observation.completion_tokens, provider=provider, model=model, kind="completion")
+        registry.get("jarules_llm_completion_tokens").observe(observation.completion_tokens, provider=provider, model=model)
+
+
+def _clone_definition(metric: _Metric, lock: threading.Lock) -> _Metric:
+    if isinstance(metric, Histogram):
+        return Histogram(metric.name, metric.documentation, metric.label_names, lock, buckets=metric.buckets)
+    return type(metric)(metric.name, metric.documentation, metric.label_names, lock)
+
+
+def _bucket_quantile(q: float, buckets: Sequence[float], counts: Sequence[int], total: int) -> float:
+    if not 0.0 <= q <= 1.0:
+        raise MetricsError(f"Quantile must be between 0 and 1, got {q}.")
+    rank = q * total
+    cumulative = 0
+    lower_bound = 0.0
+    for upper_bound, count in zip(buckets, counts):
+        if count and cumulative + count >= rank:
+            return lower_bound + (upper_bound - lower_bound) * (rank - cumulative) / count
+        cumulative += count
+        lower_bound = upper_bound
+    return buckets[-1]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def _file_lock(lock_path: Path) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+
+# Add the parent directory to the Python path to allow sibling imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from git_task_runners.git_object_reader import GitObjectReader
+from git_task_runners.git_utils import GitError
+from git_task_runners.parallel_task_orchestrator import agent_branch_name
+
+logger = logging.getLogger(__name__)
+
+# Long-lived companion to get_file_content_wrapper.py. Electron starts it once and sends one JSON request
+# per line on stdin; each reply is one JSON line on stdout carrying the request's "id". Requests are
+# handled concurrently and share one persistent `git cat-file` reader (and blob cache) per repository,
+# so opening an agent's file does not start an interpreter or a git process.
+#
+# Request:  {"id": 1, "command": "get_file_content", "runId": ..., "agentId": ..., "filePath": ..., "repoPath": ...}
+#           {"id": 2, "command": "cache_info"}
+# Response: {"id": 1, "success": true, "content": "..."} or {"id": 1, "success": false, "error": "..."}
+
+
+class FileContentServer:
+    def __init__(self, write_response):
+        self.write_response = write_response
+        self.readers = {}  # repo path -> GitObjectReader
+
+    def _reader_for(self, repo_path):
+        repo_path = os.path.abspath(repo_path)
+        if repo_path not in self.readers:
+            self.readers[repo_path] = GitObjectReader(repo_path)
+        return self.readers[repo_path]
+
+    async def get_file_content(self, run_id, agent_id, file_path, repo_path):
+        branch_name = agent_branch_name(run_id, agent_id)
+        try:
+            contents = await self._reader_for(repo_path).read_blob(f"{branch_name}:{file_path}")
+        except GitError as e:
+            return {"success": False, "error": f"Could not read file from branch: {e}"}
+        try:
+            return {"success": True, "content": contents.decode('utf-8')}
+        except UnicodeDecodeError:
+            return {"success": False, "error": f"File '{file_path}' is not a text file."}
+
+    async def handle(self, request):
+        request_id = request.get("id")
+        command = request.get("command", "get_file_content")
+        try:
+            if command == "get_file_content":
+                missing = [key for key in ("runId", "agentId", "filePath", "repoPath") if not request.get(key)]
+                if missing:
+                    result = {"success": False, "error": f"Missing fields: {', '.join(missing)}."}
+                else:
+                    result = await self.get_file_content(request["runId"], request["agentId"],
+                                                         request["filePath"], request["repoPath"])
+            elif command == "cache_info":
+                result = {"success": True, "repositories": {path: reader.cache_info() for path, reader in self.readers.items()}}
+            else:
+                result = {"success": False, "error": f"Unknown command: {command}"}
+        except Exception as e:
+            logger.error(f"Unexpected error handling request {request_id}: {e}", exc_info=True)
+            result = {"success": False, "error": f"Unexpected error: {e}"}
+        self.write_response({"id": request_id, **result})
+
+    async def close(self):
+        await asyncio.gather(*(reader.close() for reader in self.readers.values()))
+
+
+def _write_stdout(payload):
+    print(json.dumps(payload), flush=True)
+
+
+async def serve(stream_reader, write_response=_write_stdout):
+    """Handles requests from stream_reader until it reaches EOF, then waits for in-flight requests."""
+    server = FileContentServer(write_response)
+    tasks = set()
+    try:
+        while True:
+            line = await stream_reader.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                write_response({"id": None, "success": False, "error": "Invalid JSON request."})
+                continue
+            task = asyncio.create_task(server.handle(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        await server.close()
+
+
+async def main():
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    loop = asyncio.get_running_loop()
+    stream_reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stream_reader), sys.stdin)
+    await serve(stream_reader)
+
+if __name__ == "__main__":
+    asyncio.run(main())
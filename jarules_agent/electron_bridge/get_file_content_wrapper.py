@@ -1,3 +1,4 @@
+import asyncio
 import json
 import sys
 import os
@@ -7,6 +8,13 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from git_task_runners.parallel_task_orchestrator import ParallelTaskManager
 
+async def read_file(run_id, agent_id, file_path, repo_path):
+    manager = ParallelTaskManager(repo_path=repo_path)
+    try:
+        return await manager.get_file_content(run_id, agent_id, file_path)
+    finally:
+        await manager.close()
+
 def main():
     if len(sys.argv) != 5:
         print(json.dumps({"success": False, "error": "Invalid arguments. Expected runId, agentId, filePath, repoPath."}))
@@ -17,8 +25,7 @@ def main():
     file_path = sys.argv[3]
     repo_path = sys.argv[4]
 
-    manager = ParallelTaskManager(repo_path=repo_path)
-    result = manager.get_file_content(run_id, agent_id, file_path)
+    result = asyncio.run(read_file(run_id, agent_id, file_path, repo_path))
 
     print(json.dumps(result))
 
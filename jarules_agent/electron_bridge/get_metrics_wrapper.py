@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+
+# Adjust path (similar to other wrappers)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from jarules_agent.core import metrics
+except ModuleNotFoundError:
+    print(json.dumps({"error": True, "message": "ModuleNotFoundError: Could not import jarules_agent.core.metrics.", "details": "Python environment or script path issue."}))
+    sys.exit(1)
+
+
+def get_metrics(reset: bool = False):
+    """
+    Reports the LLM call metrics accumulated in ~/.jarules/metrics.json by previous prompts.
+    Outputs JSON: {"summary": [...], "prometheus": "<text exposition>", "metrics_file": "..."}
+    With reset=True the stored metrics are cleared after being reported.
+    """
+    try:
+        registry = metrics.load_registry()
+        output = {
+            "summary": metrics.summarize_llm_metrics(registry),
+            "prometheus": registry.render_prometheus(),
+            "metrics_file": str(metrics.METRICS_DIR / metrics.METRICS_JSON_FILENAME),
+        }
+        if reset:
+            for filename in (metrics.METRICS_JSON_FILENAME, metrics.METRICS_PROM_FILENAME):
+                try:
+                    os.remove(metrics.METRICS_DIR / filename)
+                except FileNotFoundError:
+                    pass
+    except Exception as e:
+        output = {"error": True, "message": "Failed to read LLM metrics.", "details": str(e)}
+
+    print(json.dumps(output))
+
+
+if __name__ == '__main__':
+    get_metrics(reset="--reset" in sys.argv[1:])
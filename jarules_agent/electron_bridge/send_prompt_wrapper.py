@@ -3,6 +3,7 @@ import os
 import sys
 import argparse
 import asyncio
+import signal
 from pathlib import Path # Added pathlib
 from typing import List, Dict, Optional # For type hinting
 
@@ -13,20 +14,41 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 try:
-    from jarules_agent.core.llm_manager import LLMManager, LLMConfigError, LLMManagerError
+    from jarules_agent.core.llm_manager import LLMManager, LLMConfigError, LLMManagerError, LLMRequestCancelledError
     from jarules_agent.connectors.base_llm_connector import LLMConnectorError
+    from jarules_agent.core import metrics
 except ModuleNotFoundError:
     print(json.dumps({"error": True, "message": "ModuleNotFoundError: Could not import LLMManager or related classes.", "details": "Python environment or script path issue."}))
     sys.stdout.flush()
     sys.exit(1)
 
-import time
 
 # --- Configuration File Paths ---
 JARULES_DIR = Path.home() / ".jarules"
 CHAT_HISTORY_FILE = JARULES_DIR / "chat_history.json"
 USER_STATE_FILE = JARULES_DIR / "user_state.json"
 DEFAULT_CONTEXT_MESSAGE_COUNT = 10 # Default number of past messages to include if not in user_state.json
+PROMPT_REQUEST_ID = "electron-prompt" # One prompt per wrapper process; Electron cancels it by signalling the process
+CANCEL_SIGNALS = [sig for sig in (getattr(signal, "SIGTERM", None), getattr(signal, "SIGINT", None)) if sig is not None]
+
+def install_cancel_handlers(manager: "LLMManager") -> None:
+    """
+    Routes SIGTERM/SIGINT from Electron ('stop-llm-generation') to LLMManager.cancel_request,
+    so the in-flight connector call is aborted and its upstream connection closed.
+    If no connector call is in flight yet (e.g. the simulated stream), the prompt task itself is cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    prompt_task = asyncio.current_task()
+
+    def cancel_prompt():
+        if not manager.cancel_request(PROMPT_REQUEST_ID) and prompt_task is not None:
+            prompt_task.cancel()
+
+    for sig in CANCEL_SIGNALS:
+        try:
+            loop.add_signal_handler(sig, cancel_prompt)
+        except (NotImplementedError, RuntimeError): # e.g. Windows event loops
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(cancel_prompt))
 
 def load_chat_history(history_file_path: Path, num_messages: int) -> List[Dict[str, str]]:
     """
@@ -112,11 +134,12 @@ async def send_prompt_to_llm_streaming(prompt: str, provider_id: str):
             sys.stdout.flush()
             return
 
+        install_cancel_handlers(manager)
         print(json.dumps({"type": "stream_start"}))
         sys.stdout.flush()
 
         if provider_id == "ollama_default_local":
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
             # Simulate history usage in log or output
             history_notice = f"(Simulating with history of {len(loaded_history)} messages) " if loaded_history else ""
             simulated_text = f"Simulated streaming for '{prompt}' from {provider_id} {history_notice}: "
@@ -127,13 +150,12 @@ async def send_prompt_to_llm_streaming(prompt: str, provider_id: str):
                 full_response_text += chunk_text
                 print(json.dumps({"type": "chunk", "token": chunk_text}))
                 sys.stdout.flush()
-                time.sleep(0.05)
+                await asyncio.sleep(0.05)
             print(json.dumps({"type": "done", "full_response": full_response_text.strip()}))
             sys.stdout.flush()
         else:
-            llm_client = manager.get_llm_client(provider_id=provider_id)
-            # Pass the loaded_history to generate_code
-            response_text = await llm_client.generate_code(prompt, history=loaded_history)
+            # Pass the loaded_history to generate_code; routed through LLMManager so it can be cancelled
+            response_text = await manager.generate_code(prompt, provider_id=provider_id, request_id=PROMPT_REQUEST_ID, history=loaded_history)
 
             if response_text is None: # Handle cases where connector might return None (e.g. safety block)
                 print(json.dumps({"type": "error", "message": "LLM did not return a response.", "details": "The response from the LLM client was None."}))
@@ -148,6 +170,10 @@ async def send_prompt_to_llm_streaming(prompt: str, provider_id: str):
             print(json.dumps({"type": "done", "full_response": response_text}))
             sys.stdout.flush()
 
+    except (LLMRequestCancelledError, asyncio.CancelledError):
+        print(json.dumps({"type": "cancelled", "message": "Generation cancelled by user."}))
+        print(json.dumps({"type": "done", "full_response": None, "cancelled": True, "message": "Generation cancelled by user."}))
+        sys.stdout.flush()
     except LLMManagerError as e:
         print(json.dumps({"type": "error", "message": "LLMManager Error", "details": str(e)}))
         sys.stdout.flush()
@@ -161,7 +187,11 @@ async def send_prompt_to_llm_streaming(prompt: str, provider_id: str):
         # Ensure a "done" message is sent if an error occurred mid-stream before "done" was naturally reached.
         # This might be complex if stream_start wasn't even sent.
         # For now, individual error handlers send their own type:error and main.js interprets that as an end.
-        pass
+        # Each prompt runs in its own process, so persist this call's latency/usage for get_metrics_wrapper.py.
+        try:
+            metrics.REGISTRY.flush()
+        except OSError as e:
+            print(f"Warning: could not persist LLM metrics: {e}", file=sys.stderr)
 
 
 if __name__ == '__main__':
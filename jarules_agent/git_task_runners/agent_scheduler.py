@@ -0,0 +1,165 @@
+# jarules_agent/git_task_runners/agent_scheduler.py
+import asyncio
+import bisect
+import itertools
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+# Per-provider caps on agents running at once. Local models share one machine; hosted APIs rate-limit.
+DEFAULT_PROVIDER_LIMITS = {
+    "ollama": 2,
+    "gemini": 8,
+    "openrouter": 8,
+    "claude": 4,
+}
+DEFAULT_PROVIDER_LIMIT = 4  # Providers not listed above
+UNKNOWN_PROVIDER = "unknown"  # Jobs that name no provider; only the global limit applies to them
+
+
+class SchedulerError(Exception):
+    """Custom exception for agent scheduler errors."""
+    pass
+
+
+class _Ticket:
+    """A queued or running agent job."""
+
+    def __init__(self, key, run_id, agent_id, provider, priority):
+        self.key = key
+        self.run_id = run_id
+        self.agent_id = agent_id
+        self.provider = provider
+        self.priority = priority
+        self.admitted = asyncio.get_running_loop().create_future()
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class AgentScheduler:
+    """
+    Admits agent jobs under a global concurrency limit and per-provider limits.
+
+    Waiting jobs are ordered by priority (higher first), then round-robin across runs: the n-th job of
+    every run goes before the (n+1)-th job of any run, so one large run cannot starve runs queued after
+    it, and within a round jobs are admitted first come, first served. A job whose provider is at its
+    limit does not block jobs for other providers behind it.
+    """
+
+    def __init__(self, max_concurrency, provider_limits=None, default_provider_limit=DEFAULT_PROVIDER_LIMIT):
+        if max_concurrency < 1:
+            raise SchedulerError(f"max_concurrency must be at least 1, got {max_concurrency}.")
+        self.max_concurrency = max_concurrency
+        self.provider_limits = dict(DEFAULT_PROVIDER_LIMITS)
+        if provider_limits:
+            self.provider_limits.update(provider_limits)
+        self.default_provider_limit = default_provider_limit
+        self._queue = []  # _Tickets sorted by key
+        self._running = set()
+        self._seq = itertools.count()
+        self._run_rounds = defaultdict(int)  # run_id -> jobs submitted so far (its next round number)
+
+    def provider_limit(self, provider):
+        if provider == UNKNOWN_PROVIDER:
+            return self.provider_limits.get(UNKNOWN_PROVIDER, self.max_concurrency)
+        return self.provider_limits.get(provider, self.default_provider_limit)
+
+    async def run(self, job_factory, run_id, agent_id, provider=None, priority=0, on_queued=None):
+        """
+        Waits for a slot, then runs the job.
+
+        Args:
+            job_factory (callable): Returns the awaitable to run once admitted.
+            run_id (str): Run the job belongs to (fairness is between runs).
+            agent_id (str): Agent the job is for (for logging and reporting).
+            provider (str, optional): LLM provider the job calls; subject to that provider's limit.
+            priority (int): Higher priorities are admitted first. Defaults to 0.
+            on_queued (callable, optional): Called with (position, depth) if the job has to wait.
+
+        Returns:
+            Whatever the job returns.
+        """
+        provider = provider or UNKNOWN_PROVIDER
+        round_number = self._run_rounds[run_id]
+        self._run_rounds[run_id] += 1
+        ticket = _Ticket((-priority, round_number, next(self._seq)), run_id, agent_id, provider, priority)
+        bisect.insort(self._queue, ticket)
+        self._dispatch()
+
+        if not ticket.admitted.done():
+            logger.info(f"RID={run_id} AID={agent_id} - Queued for {provider} (position {self._queue.index(ticket) + 1} of {len(self._queue)}).")
+            if on_queued:
+                on_queued(self._queue.index(ticket) + 1, len(self._queue))
+        try:
+            await ticket.admitted
+        except asyncio.CancelledError:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                self._forget_run_if_idle(run_id)
+            elif ticket in self._running:
+                self._release(ticket)
+            raise
+
+        try:
+            return await job_factory()
+        finally:
+            self._release(ticket)
+
+    def _dispatch(self):
+        """Admits waiting jobs, in order, while there is global and per-provider capacity."""
+        if len(self._running) >= self.max_concurrency or not self._queue:
+            return
+        running_by_provider = self._count(self._running, "provider")
+        for ticket in list(self._queue):
+            if len(self._running) >= self.max_concurrency:
+                break
+            if running_by_provider[ticket.provider] >= self.provider_limit(ticket.provider):
+                continue
+            self._queue.remove(ticket)
+            self._running.add(ticket)
+            running_by_provider[ticket.provider] += 1
+            ticket.admitted.set_result(None)
+
+    def _release(self, ticket):
+        self._running.discard(ticket)
+        self._forget_run_if_idle(ticket.run_id)
+        self._dispatch()
+
+    def _forget_run_if_idle(self, run_id):
+        if not any(t.run_id == run_id for t in self._running) and not any(t.run_id == run_id for t in self._queue):
+            self._run_rounds.pop(run_id, None)
+
+    @staticmethod
+    def _count(tickets, attribute):
+        counts = defaultdict(int)
+        for ticket in tickets:
+            counts[getattr(ticket, attribute)] += 1
+        return counts
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def snapshot(self):
+        """Current load, for status reporting: totals plus per-provider and per-run breakdowns."""
+        queued_by_provider = self._count(self._queue, "provider")
+        running_by_provider = self._count(self._running, "provider")
+        queued_by_run = self._count(self._queue, "run_id")
+        running_by_run = self._count(self._running, "run_id")
+        return {
+            "maxConcurrency": self.max_concurrency,
+            "running": len(self._running),
+            "queued": len(self._queue),
+            "providers": {
+                provider: {"running": running_by_provider[provider], "queued": queued_by_provider[provider],
+                           "limit": self.provider_limit(provider)}
+                for provider in sorted(set(queued_by_provider) | set(running_by_provider))
+            },
+            "runs": {
+                run_id: {"running": running_by_run[run_id], "queued": queued_by_run[run_id]}
+                for run_id in sorted(set(queued_by_run) | set(running_by_run))
+            },
+        }
@@ -0,0 +1,116 @@
+# jarules_agent/git_task_runners/agent_update_stream.py
+import asyncio
+import json
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+DEFAULT_UPDATE_INTERVAL = 0.1  # Seconds between flushes of coalesced agent updates
+TERMINAL_AGENT_STATUSES = ("completed", "error", "cancelled")
+# Result fields that can be large; they are held back until the agent reaches a terminal status.
+DEFERRED_FIELDS = ("solutionSummary", "keyFilePaths", "committedFiles")
+IDENTITY_FIELDS = ("runId", "agentId", "status")  # Sent with every update, changed or not
+_NOT_SENT = object()
+
+
+def _write_stdout_lines(lines):
+    # sys.stdout is looked up on every write so redirection (and test capture) applies.
+    sys.stdout.write("".join(f"{line}\n" for line in lines))
+    sys.stdout.flush()
+
+
+class AgentUpdateStream:
+    """
+    Coalesces agent status updates before they are written (as JSON lines) for the Electron UI.
+
+    Updates for the same agent that arrive within one interval are merged, and each flush sends one
+    message per agent carrying only the fields that changed since that agent's last message (plus its
+    run ID, agent ID and status). Large result fields are only sent with the agent's final update.
+
+    Writes happen in a thread, one batch at a time. While a write is blocked on a slow reader, new
+    updates keep merging into the pending state instead of queueing, so a slow consumer gets fewer,
+    coarser messages and memory stays bounded by the number of agents.
+    """
+
+    def __init__(self, write_lines=_write_stdout_lines, interval=DEFAULT_UPDATE_INTERVAL):
+        self.write_lines = write_lines
+        self.interval = interval
+        self._pending = {}  # (run_id, agent_id) -> merged fields not yet sent
+        self._deferred = {}  # (run_id, agent_id) -> DEFERRED_FIELDS held until the agent finishes
+        self._received = {}  # (run_id, agent_id) -> updates merged into the pending state
+        self._sent = {}  # (run_id, agent_id) -> fields as of the last message sent
+        self._write_lock = asyncio.Lock()
+        self._flush_task = None
+        self.updates_received = 0
+        self.messages_sent = 0
+
+    def publish(self, update):
+        """Queues an agent update (a dict with 'runId', 'agentId' and 'status') for the next flush."""
+        key = (update.get("runId"), update.get("agentId"))
+        pending = self._pending.setdefault(key, {})
+        if update.get("status") in TERMINAL_AGENT_STATUSES:
+            pending.update(self._deferred.pop(key, {}))
+            pending.update(update)
+        else:
+            deferred = self._deferred.setdefault(key, {})
+            for name, value in update.items():
+                (deferred if name in DEFERRED_FIELDS else pending)[name] = value
+        self._received[key] = self._received.get(key, 0) + 1
+        self.updates_received += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        # Runs only while there is something to send; publish() starts it again.
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def _take_messages(self):
+        messages = []
+        for key, fields in self._pending.items():
+            sent = self._sent.setdefault(key, {})
+            data = {name: value for name, value in fields.items()
+                    if name in IDENTITY_FIELDS or sent.get(name, _NOT_SENT) != value}
+            sent.update(fields)
+            messages.append({"type": "agent_update", "data": data, "coalesced": self._received.pop(key, 1)})
+        self._pending = {}
+        return messages
+
+    async def flush(self, extra_messages=()):
+        """Sends pending agent updates, then extra_messages, in order."""
+        async with self._write_lock:
+            messages = self._take_messages() + list(extra_messages)
+            if not messages:
+                return
+            lines = [json.dumps(message) for message in messages]
+            try:
+                # Shielded so that close() cancelling the flush task cannot drop messages already taken.
+                await asyncio.shield(asyncio.to_thread(self.write_lines, lines))
+            except (BrokenPipeError, OSError, ValueError) as e:
+                logger.error(f"Could not write {len(lines)} update(s): {e}")
+                return
+            self.messages_sent += len(lines)
+
+    async def send(self, message):
+        """Sends a message (such as a run status) right away, after any agent updates still pending."""
+        await self.flush(extra_messages=[message])
+
+    def forget_run(self, run_id):
+        """Drops what was last sent for a run's agents once the run is over."""
+        for state in (self._sent, self._deferred):
+            for key in [key for key in state if key[0] == run_id]:
+                del state[key]
+
+    async def close(self):
+        """Sends anything still pending and stops the flush task."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush()
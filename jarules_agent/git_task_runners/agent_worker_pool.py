@@ -0,0 +1,283 @@
+# jarules_agent/git_task_runners/agent_worker_pool.py
+import asyncio
+import itertools
+import json
+import logging
+import os
+import signal
+import sys
+
+try:
+    from . import run_llm_on_branch
+except ImportError:
+    import run_llm_on_branch
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+WORKER_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "run_llm_on_branch.py")
+MAX_DEFAULT_WORKERS = 32
+SHUTDOWN_TIMEOUT_SECONDS = 5.0
+
+
+class WorkerPoolError(Exception):
+    """Custom exception for agent worker pool errors."""
+    pass
+
+
+def default_pool_size():
+    """
+    Default number of workers. Agent jobs mostly wait on git subprocesses and LLM calls, so the pool is
+    sized like an I/O-bound thread pool (cores + 4) rather than to the core count alone, and capped.
+    """
+    return min(MAX_DEFAULT_WORKERS, (os.cpu_count() or 1) + 4)
+
+
+class _Worker:
+    """One long-lived `run_llm_on_branch.py --worker` process."""
+
+    def __init__(self, worker_id, process):
+        self.worker_id = worker_id
+        self.process = process
+        self.jobs_completed = 0
+        self.stderr_task = None
+
+    @property
+    def alive(self):
+        return self.process.returncode is None
+
+    def kill(self):
+        """
+        Kills the worker and everything it started (git, LLM client processes): workers lead their own
+        process group, so one signal reaches the whole tree. Falls back to killing just the worker where
+        process groups are not available.
+        """
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                return
+            except ProcessLookupError:
+                return
+            except PermissionError as e:
+                logger.warning(f"Could not kill process group of agent worker {self.worker_id}: {e}")
+        if self.alive:
+            self.process.kill()
+
+
+class AgentWorkerPool:
+    """
+    Pool of pre-started worker processes that run agent jobs.
+
+    Each worker has already paid interpreter start-up and imports by the time it receives a job, and is
+    reused for later jobs. Jobs are sent as one JSON line on the worker's stdin; the worker answers with
+    the usual agent status updates (same JSON schema as a standalone run_llm_on_branch.py) followed by a
+    `job_done` line. A worker that dies mid-job is reported as an agent error and replaced.
+    """
+
+    def __init__(self, size=None, python_executable=None, worker_script=WORKER_SCRIPT_PATH, env=None):
+        self.size = size or default_pool_size()
+        if self.size < 1:
+            raise WorkerPoolError(f"Worker pool size must be at least 1, got {self.size}.")
+        self.python_executable = python_executable or sys.executable
+        self.worker_script = worker_script
+        self.env = env
+        self._workers = []
+        self._idle = None
+        self._ids = itertools.count(1)
+        self._job_ids = itertools.count(1)
+        self._spawning = 0
+        self._started = False
+        self._closed = False
+        self.respawn_count = 0
+
+    @property
+    def workers(self):
+        """Currently running workers (for status and tests)."""
+        return list(self._workers)
+
+    async def start(self, size=None):
+        """
+        Starts workers so that jobs submitted afterwards do not wait for interpreter start-up.
+        Starting is non-blocking: workers import in the background while the caller carries on.
+
+        Args:
+            size (int, optional): Start only this many workers now (capped at the pool size); the rest
+                                  are started on demand. Defaults to the full pool.
+        """
+        if self._closed:
+            raise WorkerPoolError("Cannot start a closed worker pool.")
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        target = min(self.size, size or self.size)
+        while len(self._workers) + self._spawning < target:
+            self._idle.put_nowait(await self._spawn())
+        self._started = True
+
+    async def _spawn(self):
+        worker_id = next(self._ids)
+        self._spawning += 1  # Reserve the slot while the process starts, so concurrent callers cannot overshoot
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.python_executable, "-u", self.worker_script, run_llm_on_branch.WORKER_FLAG,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self.env,
+                start_new_session=True,  # Own process group, so kill() also reaches the worker's children
+            )
+        finally:
+            self._spawning -= 1
+        worker = _Worker(worker_id, process)
+        worker.stderr_task = asyncio.create_task(self._drain_stderr(worker))
+        self._workers.append(worker)
+        logger.info(f"Started agent worker {worker_id} (pid {process.pid}).")
+        return worker
+
+    async def _drain_stderr(self, worker):
+        """Forwards a worker's log output to this process's log so its pipe never fills up."""
+        while True:
+            line_bytes = await worker.process.stderr.readline()
+            if not line_bytes:
+                break
+            line = line_bytes.decode('utf-8', errors='replace').rstrip()
+            if line:
+                logger.debug(f"[worker {worker.worker_id}] {line}")
+
+    async def _acquire(self):
+        if not self._started:
+            await self.start(size=1)
+        # Grow lazily up to the pool size when every existing worker is busy.
+        if self._idle.empty() and len(self._workers) + self._spawning < self.size:
+            return await self._spawn()
+        worker = await self._idle.get()
+        if not worker.alive:
+            return await self._replace(worker)
+        return worker
+
+    def _release(self, worker):
+        if self._closed or not worker.alive or worker not in self._workers:
+            return
+        self._idle.put_nowait(worker)
+
+    async def _replace(self, worker):
+        self._retire(worker)
+        self.respawn_count += 1
+        logger.warning(f"Agent worker {worker.worker_id} exited with code {worker.process.returncode}; starting a replacement.")
+        return await self._spawn()
+
+    def _retire(self, worker):
+        if worker in self._workers:
+            self._workers.remove(worker)
+
+    async def run_job(self, job, callback):
+        """
+        Runs one agent job on a pooled worker.
+
+        Args:
+            job (dict): Must contain every key in run_llm_on_branch.JOB_FIELDS.
+            callback (callable): Called with each status update dict the worker reports.
+
+        Returns:
+            bool: True if the worker reported success, False if the task failed or the worker died.
+
+        Raises:
+            WorkerPoolError: If the job is missing fields or the pool is closed.
+        """
+        if self._closed:
+            raise WorkerPoolError("Cannot submit jobs to a closed worker pool.")
+        missing = [field for field in run_llm_on_branch.JOB_FIELDS if field not in job]
+        if missing:
+            raise WorkerPoolError(f"Agent job is missing fields: {', '.join(missing)}")
+
+        job_id = next(self._job_ids)
+        payload = {field: job[field] for field in run_llm_on_branch.JOB_FIELDS}
+        payload["jobId"] = job_id
+        worker = await self._acquire()
+        try:
+            try:
+                worker.process.stdin.write((json.dumps(payload) + "\n").encode('utf-8'))
+                await worker.process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                worker = await self._replace(worker)
+                logger.warning(f"Resubmitting job {job_id} after worker pipe error: {e}")
+                try:
+                    worker.process.stdin.write((json.dumps(payload) + "\n").encode('utf-8'))
+                    await worker.process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError) as e:
+                    # The replacement is unusable too. Refill the slot (or jobs queued in _acquire() hang)
+                    # and report the job as failed rather than retrying forever.
+                    error_msg = f"Could not send the task to agent worker {worker.worker_id}: {e}"
+                    logger.error(f"RID={job['run_id']} AID={job['agent_id']} - {error_msg}")
+                    self._retire(worker)
+                    worker.kill()
+                    await worker.process.wait()
+                    if not self._closed:
+                        self.respawn_count += 1
+                        worker = await self._spawn()
+                    callback({"status": "error", "runId": job["run_id"], "agentId": job["agent_id"],
+                              "errorMessage": error_msg, "errorDetails": str(e)})
+                    return False
+
+            while True:
+                line_bytes = await worker.process.stdout.readline()
+                if not line_bytes:
+                    await worker.process.wait()
+                    error_msg = f"Agent worker {worker.worker_id} exited unexpectedly (code {worker.process.returncode}) while running the task."
+                    logger.error(f"RID={job['run_id']} AID={job['agent_id']} - {error_msg}")
+                    callback({"status": "error", "runId": job["run_id"], "agentId": job["agent_id"],
+                              "errorMessage": error_msg, "errorDetails": f"exit code {worker.process.returncode}"})
+                    worker = await self._replace(worker)
+                    return False
+                line = line_bytes.decode('utf-8').strip()
+                if not line:
+                    continue
+                try:
+                    update = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"RID={job['run_id']} AID={job['agent_id']} - Non-JSON output from worker {worker.worker_id}: {line}")
+                    continue
+                if update.get("type") == "job_done":
+                    if update.get("jobId") != job_id:
+                        continue
+                    worker.jobs_completed += 1
+                    return bool(update.get("success"))
+                callback(update)
+        except asyncio.CancelledError:
+            # The worker is still busy with the abandoned job, so it cannot be reused. Waiting for it to
+            # exit means nothing is still writing to the job's worktree once cancellation returns.
+            logger.warning(f"Job {job_id} cancelled; killing agent worker {worker.worker_id} and its process group.")
+            self._retire(worker)
+            worker.kill()
+            await worker.process.wait()
+            # Jobs queued in _acquire() are waiting on _idle, so the slot must be refilled or they hang.
+            if not self._closed:
+                self.respawn_count += 1
+                self._idle.put_nowait(await self._spawn())
+            raise
+        finally:
+            self._release(worker)
+
+    async def close(self, timeout=SHUTDOWN_TIMEOUT_SECONDS):
+        """Stops all workers: closes their stdin so they exit, and kills any that do not within `timeout`."""
+        self._closed = True
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            if worker.alive and worker.process.stdin and not worker.process.stdin.is_closing():
+                worker.process.stdin.close()
+        for worker in workers:
+            try:
+                await asyncio.wait_for(worker.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Agent worker {worker.worker_id} did not exit in {timeout}s; killing it.")
+                worker.kill()
+                await worker.process.wait()
+            if worker.stderr_task:
+                await worker.stderr_task
+        logger.info(f"Agent worker pool closed ({len(workers)} workers, {self.respawn_count} respawned).")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,128 @@
+# jarules_agent/git_task_runners/archive_cache.py
+import logging
+import os
+import tempfile
+import threading
+
+try:
+    from . import git_utils
+except ImportError:
+    import git_utils
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+DEFAULT_ARCHIVE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".jarules", "archive_cache")
+DEFAULT_ARCHIVE_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+ARCHIVE_FORMAT = "zip"
+
+
+class ArchiveCache:
+    """
+    Zip archives of git trees, stored on disk under the tree's SHA.
+
+    Two branches (or two runs) with identical contents share one archive, and asking for the same tree
+    again returns the existing file without running git. Files are written to a temp name and renamed
+    into place, so a reader never sees a partial archive. When the cache grows past max_bytes the least
+    recently used archives (by modification time, refreshed on every hit) are deleted.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_ARCHIVE_CACHE_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir or DEFAULT_ARCHIVE_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, tree_sha):
+        return os.path.join(self.cache_dir, f"{tree_sha}.{ARCHIVE_FORMAT}")
+
+    def get_archive(self, treeish, repo_path=None):
+        """
+        Returns (path, tree_sha, cache_hit) for an archive of treeish, creating it if it is not cached.
+
+        Archives are keyed by tree SHA but made from the commit treeish points at, so entries carry the
+        commit time. A commit with the same tree as an archived one is served that archive.
+
+        Raises:
+            GitError: If treeish does not name a tree or git archive fails.
+        """
+        commit_sha, tree_sha = git_utils.resolve_commit_and_tree(treeish, repo_path=repo_path)
+        path = self.path_for(tree_sha)
+        try:
+            os.utime(path)  # Marks it recently used
+            self.hits += 1
+            logger.info(f"Archive cache hit for '{treeish}' (tree {tree_sha}).")
+            return path, tree_sha, True
+        except FileNotFoundError:
+            pass
+
+        self.misses += 1
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{tree_sha}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                git_utils.stream_archive(commit_sha or tree_sha, output, archive_format=ARCHIVE_FORMAT, repo_path=repo_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        logger.info(f"Archived '{treeish}' (tree {tree_sha}) to '{path}' ({os.path.getsize(path)} bytes).")
+        self.evict(keep=path)
+        return path, tree_sha, False
+
+    def entries(self):
+        """Cached archives as (path, size, mtime), least recently used first."""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(f".{ARCHIVE_FORMAT}"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def evict(self, keep=None):
+        """
+        Deletes least recently used archives until the cache fits in max_bytes.
+
+        Args:
+            keep (str, optional): Path never to evict (the archive just handed out).
+
+        Returns:
+            list: Paths that were deleted.
+        """
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            evicted = []
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted.append(path)
+            if evicted:
+                logger.info(f"Evicted {len(evicted)} archive(s) from {self.cache_dir}; {total} bytes remain.")
+            return evicted
+
+    def cache_info(self):
+        entries = self.entries()
+        return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries), "maxBytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
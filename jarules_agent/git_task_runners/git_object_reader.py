@@ -0,0 +1,199 @@
+# jarules_agent/git_task_runners/git_object_reader.py
+import asyncio
+import collections
+import logging
+import os
+
+try:
+    from .git_utils import GitError
+except ImportError:
+    from git_utils import GitError
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_MAX_ITEM_BYTES = 8 * 1024 * 1024  # Larger blobs are returned but not cached
+
+
+class _BatchProcess:
+    """
+    One long-lived `git cat-file --batch` or `--batch-check` process.
+
+    Requests are pipelined: each caller writes its line and queues a future, and a single reader task
+    resolves the futures in order as git answers (git replies strictly in request order). Many concurrent
+    lookups therefore share one process without waiting for each other's round trips.
+    """
+
+    def __init__(self, repo_path, mode):
+        self.repo_path = repo_path
+        self.mode = mode  # "--batch" (header and contents) or "--batch-check" (header only)
+        self._process = None
+        self._pending = collections.deque()
+        self._reader_task = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def running(self):
+        return self._process is not None and self._process.returncode is None
+
+    async def _ensure_started(self):
+        async with self._start_lock:
+            if self.running:
+                return
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    'git', 'cat-file', self.mode,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    cwd=self.repo_path
+                )
+            except FileNotFoundError:
+                raise GitError("Git command not found. Ensure Git is installed and in PATH.")
+            logger.info(f"Started 'git cat-file {self.mode}' (pid {self._process.pid}) for repo: {self.repo_path}")
+            self._pending = collections.deque()  # Per process, so a dying reader only fails its own requests
+            self._reader_task = asyncio.create_task(self._read_responses(self._process, self._pending))
+
+    async def request(self, object_name):
+        """
+        Returns (object_id, object_type, size, contents) for object_name, or None if it does not exist.
+        contents is None in --batch-check mode.
+        """
+        if '\n' in object_name:
+            raise GitError(f"Object names cannot contain newlines: {object_name!r}")
+        await self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        process = self._process
+        # Queue and write without awaiting in between, so queue order always matches request order.
+        self._pending.append(future)
+        if process.stdin.is_closing():
+            future.set_exception(GitError(f"git cat-file {self.mode} process for {self.repo_path} is shutting down."))
+            return await future
+        process.stdin.write(object_name.encode('utf-8') + b'\n')
+        try:
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            if not future.done():
+                future.set_exception(GitError(f"git cat-file process exited: {e}"))
+        return await future
+
+    async def _read_responses(self, process, pending):
+        try:
+            while True:
+                header = await process.stdout.readline()
+                if not header:
+                    break
+                future = pending.popleft()
+                parts = header.decode('utf-8', errors='replace').split()
+                if len(parts) == 2 and parts[1] in ('missing', 'ambiguous'):
+                    result = None
+                elif len(parts) == 3:
+                    object_id, object_type, size = parts[0], parts[1], int(parts[2])
+                    contents = None
+                    if self.mode == '--batch':
+                        contents = (await process.stdout.readexactly(size + 1))[:-1]  # Drop trailing newline
+                    result = (object_id, object_type, size, contents)
+                else:
+                    raise GitError(f"Unexpected 'git cat-file' output: {header!r}")
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.error(f"'git cat-file {self.mode}' reader for {self.repo_path} failed: {e}")
+        finally:
+            # Fail whatever is still waiting; the next request starts a fresh process.
+            while pending:
+                future = pending.popleft()
+                if not future.done():
+                    future.set_exception(GitError(f"git cat-file {self.mode} process for {self.repo_path} exited."))
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+    async def close(self):
+        if self._process is None:
+            return
+        if self._process.returncode is None and not self._process.stdin.is_closing():
+            self._process.stdin.close()
+        if self._reader_task:
+            await self._reader_task
+        self._process = None
+
+
+class GitObjectReader:
+    """
+    Reads blobs from a repository through persistent `git cat-file` processes, with an LRU cache of
+    blob contents keyed by object ID.
+
+    Names like 'branch:path' are resolved on every call with `--batch-check` (branches move), while the
+    contents of a resolved object ID never change and are served from the cache when possible.
+    """
+
+    def __init__(self, repo_path, cache_max_bytes=DEFAULT_CACHE_MAX_BYTES, cache_max_item_bytes=DEFAULT_CACHE_MAX_ITEM_BYTES):
+        self.repo_path = os.path.abspath(repo_path)
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_max_item_bytes = min(cache_max_item_bytes, cache_max_bytes)
+        self._check = _BatchProcess(self.repo_path, '--batch-check')
+        self._contents = _BatchProcess(self.repo_path, '--batch')
+        self._cache = collections.OrderedDict()  # object id -> bytes, least recently used first
+        self._cache_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def resolve(self, object_name):
+        """
+        Returns (object_id, object_type, size) for a name such as 'branch:path/to/file', or None if it does not exist.
+        """
+        result = await self._check.request(object_name)
+        return result[:3] if result else None
+
+    async def read_blob(self, object_name):
+        """
+        Returns the contents of the blob `object_name` names, as bytes.
+
+        Raises:
+            GitError: If the object does not exist, is not a blob, or git fails.
+        """
+        resolved = await self.resolve(object_name)
+        if resolved is None:
+            raise GitError(f"Object '{object_name}' does not exist in repo: {self.repo_path}")
+        object_id, object_type, size = resolved
+        if object_type != 'blob':
+            raise GitError(f"Object '{object_name}' is a {object_type}, not a file.")
+
+        cached = self._cache.get(object_id)
+        if cached is not None:
+            self._cache.move_to_end(object_id)
+            self.cache_hits += 1
+            return cached
+
+        self.cache_misses += 1
+        result = await self._contents.request(object_id)
+        if result is None:  # Pruned between the two requests
+            raise GitError(f"Object '{object_name}' ({object_id}) disappeared from repo: {self.repo_path}")
+        contents = result[3]
+        self._remember(object_id, contents)
+        return contents
+
+    def _remember(self, object_id, contents):
+        if len(contents) > self.cache_max_item_bytes or object_id in self._cache:
+            return
+        self._cache[object_id] = contents
+        self._cache_bytes += len(contents)
+        while self._cache_bytes > self.cache_max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+
+    def cache_info(self):
+        return {"entries": len(self._cache), "bytes": self._cache_bytes, "maxBytes": self.cache_max_bytes,
+                "hits": self.cache_hits, "misses": self.cache_misses}
+
+    async def close(self):
+        """Stops the git processes. The reader restarts them if used again."""
+        await asyncio.gather(self._check.close(), self._contents.close())
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -1,11 +1,12 @@
-```python
 # jarules_agent/git_task_runners/git_utils.py
+import asyncio
 import subprocess
 import logging
 import shlex
 import os
 import sys
 import time
+import weakref
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +14,10 @@ class GitError(Exception):
     """Custom exception for Git command errors."""
     pass
 
-def _run_git_command(command_list, cwd=None, check_return_code=True):
+def _run_git_command(command_list, cwd=None, check_return_code=True, input_text=None):
     """
     Helper function to run a Git command and handle common errors.
+    input_text, if given, is written to the command's stdin.
     """
     if cwd is None:
         pass # Will use current CWD of the process
@@ -28,7 +30,8 @@ def _run_git_command(command_list, cwd=None, check_return_code=True):
             capture_output=True,
             text=True,
             check=False,
-            cwd=cwd
+            cwd=cwd,
+            input=input_text
         )
 
         if check_return_code and process.returncode != 0:
@@ -147,6 +150,234 @@ def delete_branch(branch_name, force=False, repo_path=None):
     _run_git_command(command, cwd=repo_path)
     logger.info(f"Successfully deleted branch '{branch_name}'.")
 
+def _ref_patterns(branch_names):
+    return [f'refs/heads/{name}' for name in branch_names]
+
+def _parse_for_each_ref(output):
+    refs = {}
+    for line in output.splitlines():
+        if line:
+            oid, refname = line.split(' ', 1)
+            refs[refname] = oid
+    return refs
+
+def _format_ref_deletions(refs):
+    # One `delete <ref> <old-oid>` per line; update-ref --stdin applies them as a single transaction,
+    # and the old value makes it fail rather than delete a ref that moved since it was read.
+    return "".join(f"delete {refname} {oid}\n" for refname, oid in refs.items())
+
+def list_refs(patterns=("refs/heads/",), repo_path=None):
+    """
+    Snapshots refs with a single `git for-each-ref`.
+
+    Args:
+        patterns (iterable): for-each-ref patterns (a ref prefix such as 'refs/heads/', a full ref name or a glob).
+
+    Returns:
+        dict: Full ref name (e.g. 'refs/heads/main') -> object ID.
+    """
+    output = _run_git_command(['git', 'for-each-ref', '--format=%(objectname) %(refname)', *patterns], cwd=repo_path)
+    return _parse_for_each_ref(output)
+
+def delete_refs(refs, repo_path=None):
+    """
+    Deletes refs in one atomic `git update-ref --stdin` transaction: either all are deleted or none.
+
+    Args:
+        refs (dict): Full ref name -> the object ID it is expected to point to (as returned by list_refs).
+    """
+    if not refs:
+        return
+    logger.info(f"Deleting {len(refs)} ref(s) in one transaction in repo: {repo_path or 'current CWD'}")
+    _run_git_command(['git', 'update-ref', '--stdin'], cwd=repo_path, input_text=_format_ref_deletions(refs))
+
+def delete_branches(branch_names, repo_path=None):
+    """
+    Force-deletes several branches using two git processes in total, whatever their number:
+    one for-each-ref snapshot and one update-ref transaction. Branches that do not exist are skipped.
+
+    Returns:
+        list: The branch names that were deleted.
+    """
+    if not branch_names:
+        return []
+    snapshot = list_refs(_ref_patterns(branch_names), repo_path=repo_path)
+    existing = [name for name in branch_names if f'refs/heads/{name}' in snapshot]
+    delete_refs({f'refs/heads/{name}': snapshot[f'refs/heads/{name}'] for name in existing}, repo_path=repo_path)
+    return existing
+
+def add_worktree(worktree_path, new_branch_name, base_branch_name=None, repo_path=None):
+    """
+    Creates a new branch checked out in its own linked worktree at worktree_path.
+    The worktree shares the repository's object store, so it is cheap to create, and it has
+    its own HEAD and index, so work in it never touches the main checkout.
+    If base_branch_name is provided, checks it exists and branches from it; otherwise from HEAD.
+    """
+    command = ['git', 'worktree', 'add', '-b', new_branch_name, os.path.abspath(worktree_path)]
+
+    if base_branch_name:
+        if not branch_exists(base_branch_name, repo_path=repo_path):
+            error_msg = f"Base branch '{base_branch_name}' does not exist. Cannot create worktree for '{new_branch_name}' from it."
+            logger.error(error_msg)
+            raise GitError(error_msg)
+        command.append(base_branch_name)
+
+    logger.info(f"Creating worktree '{worktree_path}' on new branch '{new_branch_name}' in repo: {repo_path or 'current CWD'}")
+    parent_dir = os.path.dirname(os.path.abspath(worktree_path))
+    os.makedirs(parent_dir, exist_ok=True)
+    _run_git_command(command, cwd=repo_path)
+    logger.info(f"Successfully created worktree '{worktree_path}' for branch '{new_branch_name}'.")
+    return os.path.abspath(worktree_path)
+
+def remove_worktree(worktree_path, force=True, repo_path=None):
+    """Removes a linked worktree and its directory. The branch it had checked out is kept."""
+    logger.info(f"Removing worktree '{worktree_path}' (force={force}) in repo: {repo_path or 'current CWD'}")
+    command = ['git', 'worktree', 'remove']
+    if force:
+        command.append('--force')
+    command.append(os.path.abspath(worktree_path))
+    _run_git_command(command, cwd=repo_path)
+    logger.info(f"Successfully removed worktree '{worktree_path}'.")
+
+def prune_worktrees(repo_path=None):
+    """Drops administrative records of worktrees whose directories no longer exist."""
+    logger.info(f"Pruning stale worktrees in repo: {repo_path or 'current CWD'}")
+    _run_git_command(['git', 'worktree', 'prune'], cwd=repo_path)
+
+def list_worktrees(repo_path=None):
+    """Returns the absolute paths of all worktrees of the repository, the main one first."""
+    output = _run_git_command(['git', 'worktree', 'list', '--porcelain'], cwd=repo_path)
+    return [line[len('worktree '):] for line in output.splitlines() if line.startswith('worktree ')]
+
+# --- Async API ---
+# Same operations for callers running an asyncio event loop (e.g. ParallelTaskManager). Commands run via
+# asyncio.create_subprocess_exec, so the loop keeps serving other work while git runs, and at most
+# ASYNC_GIT_CONCURRENCY git processes run at once per event loop.
+
+ASYNC_GIT_CONCURRENCY = 8
+_async_git_semaphores = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+
+def _get_async_git_semaphore():
+    """Returns the git concurrency semaphore of the running event loop (semaphores are loop-bound)."""
+    loop = asyncio.get_running_loop()
+    semaphore = _async_git_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(ASYNC_GIT_CONCURRENCY)
+        _async_git_semaphores[loop] = semaphore
+    return semaphore
+
+async def _run_git_command_async(command_list, cwd=None, check_return_code=True, input_text=None):
+    """
+    Async counterpart of _run_git_command: returns stripped stdout, or the CompletedProcess
+    when check_return_code is False. Raises GitError like the sync version.
+    """
+    logger.debug(f"Running Git command (async): \"{' '.join(command_list)}\" in CWD: \"{cwd or os.getcwd()}\"")
+    try:
+        async with _get_async_git_semaphore():
+            process = await asyncio.create_subprocess_exec(
+                *command_list,
+                stdin=asyncio.subprocess.PIPE if input_text is not None else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd
+            )
+            stdout_bytes, stderr_bytes = await process.communicate(
+                input_text.encode('utf-8') if input_text is not None else None
+            )
+    except FileNotFoundError:
+        logger.error("Git command not found. Ensure Git is installed and in PATH.")
+        raise GitError("Git command not found. Ensure Git is installed and in PATH.")
+    except OSError as e:
+        logger.error(f"An unexpected error occurred while running git command \"{' '.join(command_list)}\": {e}")
+        raise GitError(f"An unexpected error occurred running \"{' '.join(command_list)}\": {e}")
+
+    stdout = stdout_bytes.decode('utf-8', errors='replace')
+    stderr = stderr_bytes.decode('utf-8', errors='replace')
+    if check_return_code and process.returncode != 0:
+        error_message = (
+            f"Git command \"{' '.join(command_list)}\" failed with exit code {process.returncode}.\n"
+            f"Stderr: {stderr.strip()}"
+        )
+        logger.error(error_message)
+        raise GitError(error_message)
+
+    if stderr and not check_return_code:
+        logger.debug(f"Git command stderr: {stderr.strip()}")
+
+    logger.debug(f"Git command stdout: {stdout.strip() if stdout else '<no stdout>'}")
+    if not check_return_code:
+        return subprocess.CompletedProcess(command_list, process.returncode, stdout, stderr)
+    return stdout.strip()
+
+async def branch_exists_async(branch_name, repo_path=None):
+    """Async branch_exists."""
+    try:
+        process = await _run_git_command_async(['git', 'rev-parse', '--verify', '--quiet', f'refs/heads/{branch_name}'],
+                                               cwd=repo_path, check_return_code=False)
+        return process.returncode == 0
+    except GitError:
+        return False
+
+async def get_current_branch_async(repo_path=None):
+    """Async get_current_branch."""
+    return await _run_git_command_async(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], cwd=repo_path)
+
+async def list_refs_async(patterns=("refs/heads/",), repo_path=None):
+    """Async list_refs."""
+    output = await _run_git_command_async(['git', 'for-each-ref', '--format=%(objectname) %(refname)', *patterns],
+                                          cwd=repo_path)
+    return _parse_for_each_ref(output)
+
+async def delete_refs_async(refs, repo_path=None):
+    """Async delete_refs."""
+    if not refs:
+        return
+    logger.info(f"Deleting {len(refs)} ref(s) in one transaction in repo: {repo_path or 'current CWD'}")
+    await _run_git_command_async(['git', 'update-ref', '--stdin'], cwd=repo_path, input_text=_format_ref_deletions(refs))
+
+async def delete_branches_async(branch_names, repo_path=None):
+    """Async delete_branches."""
+    if not branch_names:
+        return []
+    snapshot = await list_refs_async(_ref_patterns(branch_names), repo_path=repo_path)
+    existing = [name for name in branch_names if f'refs/heads/{name}' in snapshot]
+    await delete_refs_async({f'refs/heads/{name}': snapshot[f'refs/heads/{name}'] for name in existing},
+                            repo_path=repo_path)
+    return existing
+
+async def add_worktree_async(worktree_path, new_branch_name, base_branch_name=None, repo_path=None):
+    """Async add_worktree."""
+    command = ['git', 'worktree', 'add', '-b', new_branch_name, os.path.abspath(worktree_path)]
+    if base_branch_name:
+        if not await branch_exists_async(base_branch_name, repo_path=repo_path):
+            error_msg = f"Base branch '{base_branch_name}' does not exist. Cannot create worktree for '{new_branch_name}' from it."
+            logger.error(error_msg)
+            raise GitError(error_msg)
+        command.append(base_branch_name)
+
+    logger.info(f"Creating worktree '{worktree_path}' on new branch '{new_branch_name}' in repo: {repo_path or 'current CWD'}")
+    os.makedirs(os.path.dirname(os.path.abspath(worktree_path)), exist_ok=True)
+    await _run_git_command_async(command, cwd=repo_path)
+    return os.path.abspath(worktree_path)
+
+async def remove_worktree_async(worktree_path, force=True, repo_path=None):
+    """Async remove_worktree."""
+    logger.info(f"Removing worktree '{worktree_path}' (force={force}) in repo: {repo_path or 'current CWD'}")
+    command = ['git', 'worktree', 'remove']
+    if force:
+        command.append('--force')
+    command.append(os.path.abspath(worktree_path))
+    await _run_git_command_async(command, cwd=repo_path)
+
+async def prune_worktrees_async(repo_path=None):
+    """Async prune_worktrees."""
+    await _run_git_command_async(['git', 'worktree', 'prune'], cwd=repo_path)
+
+async def list_worktrees_async(repo_path=None):
+    """Async list_worktrees."""
+    output = await _run_git_command_async(['git', 'worktree', 'list', '--porcelain'], cwd=repo_path)
+    return [line[len('worktree '):] for line in output.splitlines() if line.startswith('worktree ')]
+
 def archive_branch_to_zip(branch_name, output_zip_path, repo_path=None):
     """
     Archives the specified branch to a zip file using 'git archive'.
@@ -175,6 +406,85 @@ def archive_branch_to_zip(branch_name, output_zip_path, repo_path=None):
         logger.error(error_message)
         raise GitError(error_message)
 
+def resolve_tree(treeish, repo_path=None):
+    """
+    Returns the SHA of the tree `treeish` (a branch, commit or tree) points at.
+
+    Raises:
+        GitError: If treeish does not name a tree.
+    """
+    result = _run_git_command(['git', 'rev-parse', '--verify', '--quiet', f'{treeish}^{{tree}}'],
+                              cwd=repo_path, check_return_code=False)
+    tree_sha = result.stdout.strip()
+    if result.returncode != 0 or not tree_sha:
+        error_msg = f"'{treeish}' does not name a tree in repo: {repo_path or 'current CWD'}"
+        logger.error(error_msg)
+        raise GitError(error_msg)
+    return tree_sha
+
+def resolve_commit_and_tree(treeish, repo_path=None):
+    """
+    Returns (commit_sha, tree_sha) for `treeish`. commit_sha is None if treeish names a bare tree.
+
+    Raises:
+        GitError: If treeish does not name a commit or a tree.
+    """
+    result = _run_git_command(['git', 'log', '-1', '--format=%H %T', f'{treeish}^{{commit}}', '--'],
+                              cwd=repo_path, check_return_code=False)
+    fields = result.stdout.split()
+    if result.returncode == 0 and len(fields) == 2:
+        return fields[0], fields[1]
+    return None, resolve_tree(treeish, repo_path=repo_path)
+
+def stream_archive(treeish, output_stream, archive_format='zip', repo_path=None, chunk_size=64 * 1024):
+    """
+    Writes `git archive` output for treeish to a binary file object as git produces it, without a temp file.
+
+    Entries are stamped with the commit time when treeish is a commit (or a branch), so archiving the
+    same commit always gives the same bytes. Archiving a bare tree SHA stamps the current time instead.
+
+    Returns:
+        int: Number of bytes written.
+
+    Raises:
+        GitError: If git fails. Bytes already written to output_stream are not retracted.
+    """
+    command = ['git', 'archive', f'--format={archive_format}', treeish]
+    logger.debug(f"Streaming Git command: \"{' '.join(command)}\" in CWD: \"{repo_path or os.getcwd()}\"")
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=repo_path)
+    except FileNotFoundError:
+        logger.error("Git command not found. Ensure Git is installed and in PATH.")
+        raise GitError("Git command not found. Ensure Git is installed and in PATH.")
+
+    written = 0
+    try:
+        while True:
+            chunk = process.stdout.read(chunk_size)
+            if not chunk:
+                break
+            output_stream.write(chunk)
+            written += len(chunk)
+    except BaseException:
+        # The consumer went away (or failed); don't leave git blocked on a full pipe.
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        process.stdout.close()
+    stderr = process.stderr.read().decode('utf-8', errors='replace')
+    process.stderr.close()
+    process.wait()
+
+    if process.returncode != 0:
+        error_message = (
+            f"Git command \"{' '.join(command)}\" failed with exit code {process.returncode}.\n"
+            f"Stderr: {stderr.strip()}"
+        )
+        logger.error(error_message)
+        raise GitError(error_message)
+    return written
+
 if __name__ == '__main__':
     if not logger.handlers:
         handler = logging.StreamHandler(sys.stdout)
@@ -275,5 +585,3 @@ if __name__ == '__main__':
             logger.info(f"Cleaning up: Deleting test zip '{zip_file_full_path}'")
             os.remove(zip_file_full_path)
         logger.info("git_utils.py revision tests finished.")
-
-```
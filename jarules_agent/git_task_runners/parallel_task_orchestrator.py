@@ -2,6 +2,8 @@ import asyncio
 import json
 import logging
 import os
+import shutil
+import signal
 import sys
 import uuid
 from collections import defaultdict
@@ -9,60 +11,183 @@ import argparse
 
 try:
     from . import git_utils
+    from .agent_scheduler import AgentScheduler
+    from .agent_update_stream import AgentUpdateStream, DEFAULT_UPDATE_INTERVAL
+    from .archive_cache import ArchiveCache
+    from .git_object_reader import GitObjectReader
+    from .agent_worker_pool import AgentWorkerPool, default_pool_size
+    from .run_store import RunStore, RunStoreError
 except ImportError:
     import git_utils
+    from agent_scheduler import AgentScheduler
+    from agent_update_stream import AgentUpdateStream, DEFAULT_UPDATE_INTERVAL
+    from archive_cache import ArchiveCache
+    from git_object_reader import GitObjectReader
+    from agent_worker_pool import AgentWorkerPool, default_pool_size
+    from run_store import RunStore, RunStoreError
 
 logger = logging.getLogger(__name__)
 
 # Configuration
 RUN_LLM_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "run_llm_on_branch.py")
-DEFAULT_TEMP_DIR = os.path.join(os.path.expanduser("~"), ".jarules", "temp_archives")
+DEFAULT_WORKTREE_DIR = os.path.join(os.path.expanduser("~"), ".jarules", "worktrees")
+DEFAULT_AGENT_TIMEOUT_SECONDS = 30 * 60  # Running time allowed per agent (queue time not included)
+DEFAULT_RUN_TIMEOUT_SECONDS = 2 * 60 * 60  # Wall-clock time allowed per run, queueing included
 
 # --- Helper Functions ---
 
-def report_run_status(run_id, status, **kwargs):
-    """Reports the overall status of the parallel run."""
-    payload = {"runId": run_id, "overallStatus": status}
-    payload.update(kwargs)
-    print(json.dumps(payload), flush=True)
-
-async def _read_stream(stream, run_id, agent_id, callback):
-    """Reads and processes lines from a subprocess stream."""
-    while True:
-        line_bytes = await stream.readline()
-        if not line_bytes:
-            break
-        line = line_bytes.decode('utf-8').strip()
-        if line:
-            try:
-                update_data = json.loads(line)
-                callback(update_data)
-            except json.JSONDecodeError:
-                logger.warning(f"RID={run_id} AID={agent_id} - Non-JSON output from subprocess: {line}")
+def agent_branch_name(run_id, agent_id):
+    """Name of the branch an agent works on during a run."""
+    return f"agent-{agent_id}-{run_id[:8]}"
+
+def _remove_directories(paths):
+    """Deletes directory trees, logging rather than raising on failure."""
+    for path in paths:
+        try:
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Could not remove directory '{path}': {e}")
 
 def _get_python_executable():
     """Returns the path to the current Python executable."""
     return sys.executable
 
 class ParallelTaskManager:
-    def __init__(self, repo_path="."):
+    def __init__(self, repo_path=".", worktree_root=None, worker_pool=None, pool_size=None,
+                 scheduler=None, max_concurrency=None, provider_limits=None, run_store=None, archive_cache=None,
+                 update_stream=None, update_interval=DEFAULT_UPDATE_INTERVAL,
+                 agent_timeout=DEFAULT_AGENT_TIMEOUT_SECONDS, run_timeout=DEFAULT_RUN_TIMEOUT_SECONDS):
         self.repo_path = os.path.abspath(repo_path)
+        self.worktree_root = os.path.abspath(worktree_root or DEFAULT_WORKTREE_DIR)
         self.active_runs = {}
-
-    async def start_run(self, task_prompt, selected_agents, base_branch):
+        # active_runs holds live state for runs in this process; the run store keeps every run's state
+        # durably, so other processes (and this one, after a run is cleaned up) can still look it up.
+        self.run_store = run_store or RunStore()
+        # Store writes from the event loop run in a thread, one batch at a time and in the order queued,
+        # so a busy database never stalls agent updates.
+        self._store_writes = []  # (method_name, args, kwargs) not yet written
+        self._store_write_task = None
+        self.archive_cache = archive_cache or ArchiveCache()
+        self._object_reader = None  # Persistent `git cat-file` reader for get_file_content, started on first use
+        # Agent updates for the UI are coalesced per agent and written at most once per interval.
+        self.update_stream = update_stream or AgentUpdateStream(interval=update_interval)
+        # Deadlines in seconds; None disables them. An agent dict's 'timeout' overrides agent_timeout.
+        self.agent_timeout = agent_timeout
+        self.run_timeout = run_timeout
+        # All runs on this manager share one scheduler, which caps agents running at once overall and
+        # per provider. The worker pool is sized to match so it never becomes a second, hidden limit.
+        self.max_concurrency = max_concurrency or pool_size or default_pool_size()
+        self.scheduler = scheduler or AgentScheduler(self.max_concurrency, provider_limits=provider_limits)
+        # Agents run on pre-started workers; a pool passed in is shared and left for the caller to close.
+        self.worker_pool = worker_pool
+        self.pool_size = pool_size or self.max_concurrency
+        self._owns_worker_pool = worker_pool is None
+
+    def _persist(self, method_name, *args, **kwargs):
+        """Writes to the run store. A store failure is logged but never stops a run."""
+        try:
+            getattr(self.run_store, method_name)(*args, **kwargs)
+        except RunStoreError as e:
+            logger.error(f"Run store update '{method_name}' failed: {e}")
+
+    def _persist_later(self, method_name, *args, **kwargs):
+        """Queues a run store write from the event loop without waiting for it."""
+        self._store_writes.append((method_name, args, kwargs))
+        if self._store_write_task is None or self._store_write_task.done():
+            self._store_write_task = asyncio.get_running_loop().create_task(self._write_queued_store_writes())
+
+    async def _write_queued_store_writes(self):
+        while self._store_writes:
+            writes, self._store_writes = self._store_writes, []
+            # Shielded so that cancelling the caller cannot drop writes already taken from the queue.
+            await asyncio.shield(asyncio.to_thread(self._persist_batch, writes))
+
+    def _persist_batch(self, writes):
+        for method_name, args, kwargs in writes:
+            self._persist(method_name, *args, **kwargs)
+
+    async def _persist_async(self, method_name, *args, **kwargs):
+        """Writes to the run store in a thread, after every write queued before it."""
+        self._persist_later(method_name, *args, **kwargs)
+        await self.flush_store_writes()
+
+    async def flush_store_writes(self):
+        """Waits until every queued run store write has been made."""
+        while self._store_write_task is not None and not self._store_write_task.done():
+            await asyncio.shield(self._store_write_task)
+
+    async def report_run_status(self, run_id, status, **kwargs):
+        """Reports the overall status of the parallel run, after any agent updates still pending."""
+        payload = {"runId": run_id, "overallStatus": status}
+        payload.update(kwargs)
+        await self.update_stream.send(payload)
+
+    async def _ensure_worker_pool(self, agent_count):
+        """Creates the worker pool if needed and starts up to `agent_count` workers in the background."""
+        if self.worker_pool is None:
+            self.worker_pool = AgentWorkerPool(size=self.pool_size, python_executable=_get_python_executable(),
+                                               worker_script=RUN_LLM_SCRIPT_PATH)
+        await self.worker_pool.start(size=agent_count)
+        return self.worker_pool
+
+    async def close(self):
+        """
+        Sends any agent updates still pending, finishes queued run store writes and shuts down the worker
+        pool if this manager created it.
+        """
+        await self.update_stream.close()
+        await self.flush_store_writes()
+        if self.worker_pool is not None and self._owns_worker_pool:
+            await self.worker_pool.close()
+            self.worker_pool = None
+        if self._object_reader is not None:
+            await self._object_reader.close()
+            self._object_reader = None
+
+    def _worktree_path(self, run_id, agent_id):
+        """Directory of the linked worktree an agent works in for a given run."""
+        return os.path.join(self.worktree_root, run_id[:8], agent_id)
+
+    async def start_run(self, task_prompt, selected_agents, base_branch, priority=0):
+        """
+        Runs the task once per selected agent, each on its own branch and worktree.
+
+        Agents still running when the run's deadline passes, or when cancel_run() is called, are stopped
+        (their worker and its whole process group are killed) and the run is cleaned up straight away.
+
+        Args:
+            task_prompt (str): The task for every agent.
+            selected_agents (list): Agent dicts with 'id' and optionally 'provider', 'priority' and 'timeout'.
+            base_branch (str): Branch every agent branches from.
+            priority (int): Scheduling priority for this run's agents unless an agent sets its own.
+                            Higher runs first. Defaults to 0.
+        """
         run_id = str(uuid.uuid4())
+        loop = asyncio.get_running_loop()
+        # The run deadline is wall-clock from here, so it also covers worktree setup.
+        deadline = loop.time() + self.run_timeout if self.run_timeout else None
+        deadline_reason = f"Run exceeded its {self.run_timeout}s deadline."
         self.active_runs[run_id] = {
             "status": "starting",
             "agents": {agent['id']: {"status": "queued"} for agent in selected_agents},
-            "tasks": []
+            "worktrees": {},
+            "tasks": [],
+            "cancelReason": None
         }
-        report_run_status(run_id, "starting", message="Parallel run initiated.")
+        await self._persist_async("create_run", run_id, self.repo_path, task_prompt, base_branch, [
+            {"agent_id": agent['id'], "provider": agent.get('provider'), "branch_name": agent_branch_name(run_id, agent['id'])}
+            for agent in selected_agents
+        ])
+        await self.report_run_status(run_id, "starting", message="Parallel run initiated.")
 
         try:
-            original_branch = git_utils.get_current_branch(repo_path=self.repo_path)
+            original_branch = await git_utils.get_current_branch_async(repo_path=self.repo_path)
         except git_utils.GitError as e:
             logger.error(f"Failed to get current branch: {e}")
-            report_run_status(run_id, "error", errorMessage="Failed to get current git branch.", errorDetails=str(e))
+            await self._persist_async("update_run_status", run_id, "error", message="Failed to get current git branch.")
+            await self.report_run_status(run_id, "error", errorMessage="Failed to get current git branch.", errorDetails=str(e))
             return
 
         def process_update_callback(update):
@@ -70,63 +195,156 @@ class ParallelTaskManager:
             agent_id = update.get("agentId")
             if agent_id in self.active_runs[run_id]["agents"]:
                 self.active_runs[run_id]["agents"][agent_id] = update
-            print(json.dumps({"type": "agent_update", "data": update}), flush=True)
+                self._persist_later("record_agent_update", run_id, agent_id, update)
+            self.update_stream.publish(update)
 
-        agent_tasks = []
+        # Workers boot (interpreter start-up and imports) while the worktrees are being created.
+        await self._ensure_worker_pool(min(len(selected_agents), self.max_concurrency))
+
+        # Every agent gets its own worktree (own HEAD and index, shared object store), created up
+        # front and sequentially since `git worktree add` takes a repository-wide lock.
+        agent_tasks = {}  # task -> agent id
         for agent in selected_agents:
             agent_id = agent['id']
-            branch_name = f"agent-{agent_id}-{run_id[:8]}"
-
-            command = [
-                _get_python_executable(),
-                RUN_LLM_SCRIPT_PATH,
-                "--task_prompt", task_prompt,
-                "--branch_name", branch_name,
-                "--base_branch", base_branch,
-                "--run_id", run_id,
-                "--agent_id", agent_id,
-                "--llm_config_id", agent.get('id', 'default'),
-                "--repo_path", self.repo_path,
-            ]
-
-            agent_tasks.append(self._run_agent_task(run_id, agent_id, command, process_update_callback))
-
-        self.active_runs[run_id]["tasks"] = agent_tasks
-        await asyncio.gather(*agent_tasks)
+            if deadline is not None and loop.time() >= deadline:
+                self.cancel_run(run_id, reason=deadline_reason)
+            if self.active_runs[run_id]["cancelReason"]:
+                process_update_callback({"status": "cancelled", "runId": run_id, "agentId": agent_id,
+                                         "message": self.active_runs[run_id]["cancelReason"]})
+                continue
+            branch_name = agent_branch_name(run_id, agent_id)
+            try:
+                worktree_path = await git_utils.add_worktree_async(
+                    self._worktree_path(run_id, agent_id), branch_name,
+                    base_branch_name=base_branch, repo_path=self.repo_path
+                )
+            except git_utils.GitError as e:
+                logger.error(f"RID={run_id} AID={agent_id} - Failed to create worktree: {e}")
+                process_update_callback({"status": "error", "runId": run_id, "agentId": agent_id,
+                                         "errorMessage": "Failed to create git worktree for agent.", "errorDetails": str(e)})
+                continue
+            self.active_runs[run_id]["worktrees"][agent_id] = worktree_path
+            await self._persist_async("set_agent_worktree", run_id, agent_id, worktree_path)
+
+            job = {
+                "task_prompt": task_prompt,
+                "branch_name": branch_name,
+                "base_branch": base_branch,
+                "run_id": run_id,
+                "agent_id": agent_id,
+                "llm_config_id": agent.get('id', 'default'),
+                "repo_path": worktree_path,
+            }
+
+            task = asyncio.create_task(self._run_agent_task(run_id, agent_id, job, process_update_callback,
+                                                            provider=agent.get('provider'),
+                                                            priority=agent.get('priority', priority),
+                                                            timeout=agent.get('timeout', self.agent_timeout)))
+            agent_tasks[task] = agent_id
+            self.active_runs[run_id]["tasks"].append(task)
+
+        if self.active_runs[run_id]["cancelReason"]:  # Cancelled while worktrees were being created
+            self.cancel_run(run_id)
+        self.active_runs[run_id]["status"] = "running"
+        await self._persist_async("update_run_status", run_id, "running")
+        if agent_tasks:
+            remaining = max(0.0, deadline - loop.time()) if deadline is not None else None
+            _, pending = await asyncio.wait(agent_tasks, timeout=remaining)
+            if pending:
+                self.cancel_run(run_id, reason=deadline_reason)
+                await asyncio.wait(pending)
+
+        cancel_reason = self.active_runs[run_id]["cancelReason"]
+        for task, agent_id in agent_tasks.items():
+            if task.cancelled():
+                process_update_callback({"status": "cancelled", "runId": run_id, "agentId": agent_id,
+                                         "message": cancel_reason or "Agent task was cancelled."})
+            elif task.exception() is not None:
+                logger.error(f"RID={run_id} AID={agent_id} - Agent task failed: {task.exception()}")
+                process_update_callback({"status": "error", "runId": run_id, "agentId": agent_id,
+                                         "errorMessage": "Agent task failed.", "errorDetails": str(task.exception())})
 
         # Final cleanup and status report
-        self.cleanup_run(run_id, original_branch)
-        report_run_status(run_id, "completed", message="All agents have finished processing.")
-
-    async def _run_agent_task(self, run_id, agent_id, command, callback):
-        """Creates and manages a single agent subprocess."""
-        process = await asyncio.create_subprocess_exec(
-            *command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=self.repo_path
-        )
-
-        # Concurrently read stdout and stderr
-        await asyncio.gather(
-            _read_stream(process.stdout, run_id, agent_id, callback),
-            _read_stream(process.stderr, run_id, agent_id, callback) # Also process stderr for JSON error reports
+        await self.cleanup_run(run_id, original_branch)
+        if cancel_reason:
+            await self._persist_async("update_run_status", run_id, "cancelled", message=cancel_reason)
+            await self.report_run_status(run_id, "cancelled", message=cancel_reason)
+        else:
+            await self._persist_async("update_run_status", run_id, "completed", message="All agents have finished processing.")
+            await self.report_run_status(run_id, "completed", message="All agents have finished processing.")
+        self.update_stream.forget_run(run_id)
+
+    def cancel_run(self, run_id, reason="Run cancelled."):
+        """
+        Stops a run in this process: queued agents are dropped and running agents are killed along with
+        their process groups. start_run() then cleans up the run's worktrees and branches and reports it
+        as cancelled.
+
+        Returns:
+            bool: True if the run was active here, False otherwise.
+        """
+        run = self.active_runs.get(run_id)
+        if run is None:
+            return False
+        if not run["cancelReason"]:
+            run["cancelReason"] = reason
+            logger.warning(f"Cancelling run {run_id}: {reason}")
+        for task in run["tasks"]:
+            task.cancel()
+        return True
+
+    def cancel_all_runs(self, reason="Run cancelled."):
+        for run_id in list(self.active_runs):
+            self.cancel_run(run_id, reason=reason)
+
+    async def _run_agent_task(self, run_id, agent_id, job, callback, provider=None, priority=0, timeout=None):
+        """
+        Runs a single agent job on a pooled worker once the scheduler admits it. The job is stopped, and
+        reported as an error, if it runs longer than `timeout` seconds.
+        """
+        def report_queued(position, depth):
+            callback({"status": "queued", "runId": run_id, "agentId": agent_id,
+                      "message": f"Waiting for a free slot ({position} of {depth} queued).",
+                      "queuePosition": position, "queueDepth": depth})
+
+        async def run_with_deadline():
+            try:
+                return await asyncio.wait_for(self.worker_pool.run_job(job, callback), timeout)
+            except asyncio.TimeoutError:
+                error_msg = f"Agent exceeded its {timeout}s deadline and was stopped."
+                logger.error(f"RID={run_id} AID={agent_id} - {error_msg}")
+                callback({"status": "error", "runId": run_id, "agentId": agent_id,
+                          "errorMessage": error_msg, "errorDetails": "timeout"})
+                return False
+
+        success = await self.scheduler.run(
+            run_with_deadline, run_id, agent_id,
+            provider=provider, priority=priority, on_queued=report_queued
         )
-
-        await process.wait()
-        logger.info(f"Subprocess for agent {agent_id} (run {run_id}) finished with exit code {process.returncode}.")
-
-    def cleanup_run(self, run_id, original_branch):
-        """Cleans up branches created during a run."""
-        logger.info(f"Cleaning up run {run_id}. Switching back to '{original_branch}'.")
+        logger.info(f"Agent {agent_id} (run {run_id}) finished on worker pool, success={success}.")
+        return success
+
+    async def cleanup_run(self, run_id, original_branch):
+        """Removes the worktrees and branches created during a run."""
+        logger.info(f"Cleaning up run {run_id}.")
+        run_data = self.active_runs.get(run_id, {})
+        # Deleting the worktree directories and pruning once costs one git process for the whole run,
+        # instead of one `git worktree remove` per agent.
+        worktrees = run_data.get("worktrees", {})
+        await asyncio.to_thread(_remove_directories, list(worktrees.values()))
         try:
-            git_utils.switch_branch(original_branch, repo_path=self.repo_path)
-            run_data = self.active_runs.get(run_id, {})
-            for agent_id in run_data.get("agents", {}):
-                branch_name = f"agent-{agent_id}-{run_id[:8]}"
-                if git_utils.branch_exists(branch_name, repo_path=self.repo_path):
-                    logger.info(f"Deleting branch: {branch_name}")
-                    git_utils.delete_branch(branch_name, force=True, repo_path=self.repo_path)
+            await git_utils.prune_worktrees_async(repo_path=self.repo_path)
+            run_worktree_dir = os.path.join(self.worktree_root, run_id[:8])
+            if os.path.isdir(run_worktree_dir) and not os.listdir(run_worktree_dir):
+                os.rmdir(run_worktree_dir)
+
+            # Agents work in their own worktrees, so the main checkout should still be where it was.
+            current_branch = await git_utils.get_current_branch_async(repo_path=self.repo_path)
+            if current_branch != original_branch:
+                logger.warning(f"Main checkout moved from '{original_branch}' to '{current_branch}' during run {run_id}.")
+            branch_names = [agent_branch_name(run_id, agent_id) for agent_id in run_data.get("agents", {})]
+            deleted = await git_utils.delete_branches_async(branch_names, repo_path=self.repo_path)
+            logger.info(f"Deleted branches: {deleted}")
         except git_utils.GitError as e:
             logger.error(f"Error during cleanup for run {run_id}: {e}")
         finally:
@@ -134,15 +352,29 @@ class ParallelTaskManager:
                 del self.active_runs[run_id]
 
     def get_run_status(self, run_id):
-        return self.active_runs.get(run_id, {"status": "not_found"})
+        """Live status for runs in this process; otherwise the stored state of the run, from any process."""
+        run = self.active_runs.get(run_id)
+        if run is not None:
+            return {**run, "scheduler": self.scheduler.snapshot()}
+        try:
+            stored = self.run_store.get_run(run_id)
+        except RunStoreError as e:
+            return {"status": "error", "error": str(e)}
+        return stored or {"status": "not_found"}
 
     def get_agent_outputs(self, run_id, agent_id):
         """Retrieves the final outputs of a specific agent task."""
         run = self.active_runs.get(run_id)
-        if not run:
-            return {"success": False, "error": "Run not found."}
+        if run:
+            agent_data = run["agents"].get(agent_id)
+        else:
+            try:
+                if self.run_store.get_run(run_id, include_agents=False) is None:
+                    return {"success": False, "error": "Run not found."}
+                agent_data = self.run_store.get_agent(run_id, agent_id)
+            except RunStoreError as e:
+                return {"success": False, "error": f"Could not read run store: {e}"}
 
-        agent_data = run["agents"].get(agent_id)
         if not agent_data or agent_data.get("status") != "completed":
             return {"success": False, "error": "Agent task not completed or not found."}
 
@@ -152,30 +384,89 @@ class ParallelTaskManager:
             "keyFilePaths": agent_data.get("keyFilePaths", [])
         }
 
-    def get_file_content(self, run_id, agent_id, file_path):
-        branch_name = f"agent-{agent_id}-{run_id[:8]}"
+    async def get_file_content(self, run_id, agent_id, file_path):
+        """Reads a file from an agent's branch through the manager's persistent `git cat-file` reader."""
+        if self._object_reader is None:
+            self._object_reader = GitObjectReader(self.repo_path)
+        branch_name = agent_branch_name(run_id, agent_id)
         try:
-            content = git_utils._run_git_command(['git', 'show', f'{branch_name}:{file_path}'], cwd=self.repo_path)
-            return {"success": True, "content": content}
+            contents = await self._object_reader.read_blob(f"{branch_name}:{file_path}")
         except git_utils.GitError as e:
             return {"success": False, "error": f"Could not read file from branch: {e}"}
+        try:
+            return {"success": True, "content": contents.decode('utf-8')}
+        except UnicodeDecodeError:
+            return {"success": False, "error": f"File '{file_path}' is not a text file."}
+
+    def _stored_zip_artifact(self, run_id, agent_id):
+        """The zip recorded for an agent earlier, if it is still in the archive cache."""
+        try:
+            artifact = self.run_store.get_artifact(run_id, agent_id, "zip")
+        except RunStoreError as e:
+            logger.error(f"Could not look up zip artifact for run {run_id}, agent {agent_id}: {e}")
+            return None
+        if artifact and os.path.exists(artifact["path"]):
+            return artifact
+        return None
 
     def create_zip_archive(self, run_id, agent_id):
-        branch_name = f"agent-{agent_id}-{run_id[:8]}"
-        os.makedirs(DEFAULT_TEMP_DIR, exist_ok=True)
+        """
+        Returns a zip of the agent's branch from the archive cache, creating it if that tree is not cached.
+
+        If the branch is gone (runs delete their branches on cleanup), an archive recorded for the agent
+        earlier is returned while it is still cached.
+        """
+        branch_name = agent_branch_name(run_id, agent_id)
         zip_filename = f"run_{run_id}_agent_{agent_id}_{branch_name}.zip"
-        output_zip_path = os.path.join(DEFAULT_TEMP_DIR, zip_filename)
 
         try:
-            git_utils.archive_branch_to_zip(branch_name, output_zip_path, repo_path=self.repo_path)
-            return {"success": True, "downloadPath": output_zip_path, "filename": zip_filename}
+            path, tree_sha, cache_hit = self.archive_cache.get_archive(branch_name, repo_path=self.repo_path)
+        except git_utils.GitError as e:
+            artifact = self._stored_zip_artifact(run_id, agent_id)
+            if artifact is None:
+                return {"success": False, "error": f"Failed to create zip archive: {e}"}
+            metadata = artifact["metadata"] or {}
+            return {"success": True, "downloadPath": artifact["path"], "filename": metadata.get("filename", zip_filename),
+                    "treeSha": metadata.get("treeSha"), "cached": True}
+
+        self._persist("record_artifact", run_id, agent_id, "zip", path, {"filename": zip_filename, "treeSha": tree_sha})
+        return {"success": True, "downloadPath": path, "filename": zip_filename, "treeSha": tree_sha, "cached": cache_hit}
+
+    def stream_zip_archive(self, run_id, agent_id, output_stream):
+        """
+        Writes a zip of the agent's branch to a binary file object without creating a temp file.
+        A cached archive of the same tree is copied instead of running git archive.
+        """
+        branch_name = agent_branch_name(run_id, agent_id)
+        commit_sha = None
+        try:
+            commit_sha, tree_sha = git_utils.resolve_commit_and_tree(branch_name, repo_path=self.repo_path)
+        except git_utils.GitError as e:
+            artifact = self._stored_zip_artifact(run_id, agent_id)
+            if artifact is None:
+                return {"success": False, "error": f"Failed to stream zip archive: {e}"}
+            cached_path = artifact["path"]
+            tree_sha = (artifact["metadata"] or {}).get("treeSha")
+        else:
+            cached_path = self.archive_cache.path_for(tree_sha)
+
+        try:
+            with open(cached_path, 'rb') as cached:
+                shutil.copyfileobj(cached, output_stream)
+                return {"success": True, "bytes": cached.tell(), "treeSha": tree_sha, "cached": True}
+        except FileNotFoundError:
+            if commit_sha is None:
+                return {"success": False, "error": f"Archive for branch '{branch_name}' is no longer available."}
+        try:
+            written = git_utils.stream_archive(commit_sha, output_stream, repo_path=self.repo_path)
         except git_utils.GitError as e:
-            return {"success": False, "error": f"Failed to create zip archive: {e}"}
+            return {"success": False, "error": f"Failed to stream zip archive: {e}"}
+        return {"success": True, "bytes": written, "treeSha": tree_sha, "cached": False}
 
 
 async def main():
     parser = argparse.ArgumentParser(description="Orchestrate parallel LLM tasks on Git branches.")
-    parser.add_argument("command", choices=['start', 'status', 'get_outputs', 'get_file', 'create_zip'])
+    parser.add_argument("command", choices=['start', 'status', 'get_outputs', 'get_file', 'create_zip', 'history'])
     parser.add_argument("--run_id", help="The ID of the run for status/output commands.")
     parser.add_argument("--agent_id", help="The ID of the agent for output commands.")
     parser.add_argument("--file_path", help="The path of the file to retrieve content for.")
@@ -183,13 +474,32 @@ async def main():
     parser.add_argument("--agents", help="A JSON string of selected agents for the 'start' command.")
     parser.add_argument("--base_branch", default="main", help="The base branch for the 'start' command.")
     parser.add_argument("--repo_path", default=".", help="Path to the git repository.")
+    parser.add_argument("--priority", type=int, default=0, help="Scheduling priority of the run's agents (higher runs first).")
+    parser.add_argument("--max_concurrency", type=int, help="Maximum agents running at once. Defaults to the worker pool size.")
+    parser.add_argument("--limit", type=int, default=50, help="Number of runs to list for the 'history' command.")
+    parser.add_argument("--update_interval", type=float, default=DEFAULT_UPDATE_INTERVAL,
+                        help="Seconds over which agent updates are coalesced before being written.")
+    parser.add_argument("--agent_timeout", type=float, default=DEFAULT_AGENT_TIMEOUT_SECONDS,
+                        help="Seconds each agent may run before it is stopped (0 for no limit).")
+    parser.add_argument("--run_timeout", type=float, default=DEFAULT_RUN_TIMEOUT_SECONDS,
+                        help="Seconds the whole run may take before remaining agents are stopped (0 for no limit).")
+    parser.add_argument("--stream", action="store_true", help="For 'create_zip': write the zip to stdout instead of the archive cache.")
+    parser.add_argument("--provider_limits", help='JSON object of per-provider concurrency limits, e.g. \'{"ollama": 1}\'.')
 
     args = parser.parse_args()
 
     # Basic logging setup
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-    manager = ParallelTaskManager(repo_path=args.repo_path)
+    try:
+        provider_limits = json.loads(args.provider_limits) if args.provider_limits else None
+    except json.JSONDecodeError:
+        print(json.dumps({"success": False, "error": "Invalid JSON in --provider_limits argument."}))
+        sys.exit(1)
+
+    manager = ParallelTaskManager(repo_path=args.repo_path, max_concurrency=args.max_concurrency,
+                                  provider_limits=provider_limits, update_interval=args.update_interval,
+                                  agent_timeout=args.agent_timeout or None, run_timeout=args.run_timeout or None)
 
     if args.command == 'start':
         if not args.task_prompt or not args.agents:
@@ -201,10 +511,40 @@ async def main():
             print(json.dumps({"success": False, "error": "Invalid JSON in --agents argument."}))
             sys.exit(1)
 
-        await manager.start_run(args.task_prompt, selected_agents, args.base_branch)
-
-    # Note: The other commands are designed to be called from another process, not via CLI like this.
-    # This is a simplified CLI for testing the 'start' command.
+        # Electron cancels a run by terminating this process; stop the agents and clean up before exiting.
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signal_number, manager.cancel_all_runs, f"Run cancelled by signal {signal_number.name}.")
+            except (NotImplementedError, RuntimeError):  # Signal handlers are not available on every platform
+                pass
+        try:
+            await manager.start_run(args.task_prompt, selected_agents, args.base_branch, priority=args.priority)
+        finally:
+            await manager.close()
+
+    elif args.command == 'history':
+        print(json.dumps({"success": True, "runs": manager.run_store.list_runs(limit=args.limit, repo_path=args.repo_path)}))
+    elif not args.run_id:
+        print(json.dumps({"success": False, "error": f"Missing --run_id for {args.command} command."}))
+        sys.exit(1)
+    elif args.command == 'status':
+        print(json.dumps(manager.get_run_status(args.run_id)))
+    elif args.command == 'get_outputs':
+        print(json.dumps(manager.get_agent_outputs(args.run_id, args.agent_id)))
+    elif args.command == 'get_file':
+        try:
+            print(json.dumps(await manager.get_file_content(args.run_id, args.agent_id, args.file_path)))
+        finally:
+            await manager.close()
+    elif args.command == 'create_zip' and args.stream:
+        result = manager.stream_zip_archive(args.run_id, args.agent_id, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+        if not result["success"]:
+            print(json.dumps(result), file=sys.stderr)
+            sys.exit(1)
+    elif args.command == 'create_zip':
+        print(json.dumps(manager.create_zip_archive(args.run_id, args.agent_id)))
 
 if __name__ == "__main__":
     # Example Usage from CLI for testing the 'start' command:
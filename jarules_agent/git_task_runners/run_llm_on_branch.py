@@ -1,4 +1,3 @@
-```python
 # jarules_agent/git_task_runners/run_llm_on_branch.py
 import argparse
 import json
@@ -19,6 +18,8 @@ logger = logging.getLogger(__name__)
 SOLUTION_SUMMARY_FILENAME = "solution_summary.md"
 KEY_FILES_SECTION_HEADER = "Key Output Files:" # Expected header in solution_summary.md
 PRIMARY_OUTPUT_FILENAME_TEMPLATE = "llm_output_{agent_id}.txt"
+WORKER_FLAG = "--worker" # Run as a pooled worker that takes jobs from stdin (see agent_worker_pool.py)
+JOB_FIELDS = ("task_prompt", "branch_name", "base_branch", "run_id", "agent_id", "llm_config_id", "repo_path")
 
 def report_status(status, run_id, agent_id, **kwargs):
     """Helper function to print status updates as JSON to stdout."""
@@ -148,6 +149,28 @@ A primary output file and an example Vue component were created.
     return [primary_output_filename, example_code_file_abs, summary_filename_abs]
 
 
+def _configure_logging(run_id, agent_id, stream):
+    """Sets up (or re-targets) this script's log handler, tagging lines with the run and agent IDs."""
+    # TODO: LOGGING STRATEGY - Consider a more centralized logging setup, potentially configured
+    # by the main application (e.g., Electron app) and passed to scripts, or using environment
+    # variables more extensively for log levels and formats.
+    log_level_str = os.environ.get("LOG_LEVEL", "INFO").upper()
+    log_level = getattr(logging, log_level_str, logging.INFO)
+    # Include run_id and agent_id in log format for better traceability in parallel runs
+    formatter = logging.Formatter(f'%(asctime)s - %(levelname)s - RID={run_id} AID={agent_id} - %(name)s - %(message)s')
+    if logger.handlers: # Ensure handlers are not added multiple times if script is re-run/imported
+        for handler in logger.handlers:
+            handler.setFormatter(formatter)
+        return
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.setLevel(log_level)
+    # Also configure root logger if this script is the main entry point, for git_utils logs
+    if __name__ == "__main__":
+        logging.getLogger().addHandler(handler) # Add handler to root logger
+        logging.getLogger().setLevel(log_level) # Set level for root logger
+
 def main():
     parser = argparse.ArgumentParser(description="Run an LLM task on a specific Git branch.")
     parser.add_argument("--task_prompt", required=True, help="The detailed prompt for the LLM task.")
@@ -159,29 +182,53 @@ def main():
     parser.add_argument("--repo_path", default=".", help="Path to the repository root. Defaults to current directory.")
     args = parser.parse_args()
 
-    # TODO: LOGGING STRATEGY - Consider a more centralized logging setup, potentially configured
-    # by the main application (e.g., Electron app) and passed to scripts, or using environment
-    # variables more extensively for log levels and formats.
-    log_level_str = os.environ.get("LOG_LEVEL", "INFO").upper()
-    log_level = getattr(logging, log_level_str, logging.INFO)
-    if not logger.handlers: # Ensure handlers are not added multiple times if script is re-run/imported
-        handler = logging.StreamHandler(sys.stdout)
-        # Include run_id and agent_id in log format for better traceability in parallel runs
-        handler.setFormatter(logging.Formatter(f'%(asctime)s - %(levelname)s - RID={args.run_id} AID={args.agent_id} - %(name)s - %(message)s'))
-        logger.addHandler(handler)
-        logger.setLevel(log_level)
-        # Also configure root logger if this script is the main entry point, for git_utils logs
-        if __name__ == "__main__":
-            logging.getLogger().addHandler(handler) # Add handler to root logger
-            logging.getLogger().setLevel(log_level) # Set level for root logger
+    _configure_logging(args.run_id, args.agent_id, sys.stdout)
+    if not run_task(args):
+        sys.exit(1)
 
+def worker_main():
+    """
+    Pooled worker loop. Reads one JSON job per line from stdin (the JOB_FIELDS plus a 'jobId'),
+    runs it exactly like a standalone invocation, and ends each job with a
+    {"type": "job_done", "jobId": ..., "success": ...} line on stdout. Status updates use the same
+    JSON schema as the standalone script; logs go to stderr so stdout stays machine-readable.
+    Exits when stdin is closed.
+    """
+    _configure_logging("-", "-", sys.stderr)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+            args = argparse.Namespace(**{field: job[field] for field in JOB_FIELDS})
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            logger.error(f"Worker received an invalid job, skipping: {e}")
+            print(json.dumps({"type": "job_done", "jobId": None, "success": False,
+                              "errorMessage": f"Invalid job: {e}"}), flush=True)
+            continue
+        _configure_logging(args.run_id, args.agent_id, sys.stderr)
+        success = run_task(args)
+        print(json.dumps({"type": "job_done", "jobId": job.get("jobId"), "success": success}), flush=True)
+
+def run_task(args):
+    """
+    Runs one agent task: prepares the branch, interacts with the LLM, commits the outputs and
+    reports progress as JSON status lines on stdout.
+
+    Args:
+        args: Namespace with the JOB_FIELDS attributes.
+
+    Returns:
+        bool: True if the task completed, False if an error was reported.
+    """
     try:
         validated_repo_path = validate_repo_path(args.repo_path)
         logger.info(f"Validated repo path: {validated_repo_path}")
     except ValueError as e:
         logger.error(f"Invalid repo_path: {e}")
         report_status("error", args.run_id, args.agent_id, errorMessage=f"Invalid repo_path: {e}", errorDetails=str(e))
-        sys.exit(1)
+        return False
 
     logger.info(f"Script started. Task for LLM: '{args.task_prompt[:100]}...' on branch '{args.branch_name}'")
     report_status("starting", args.run_id, args.agent_id, message="Script initialized, preparing branch.")
@@ -261,19 +308,21 @@ def main():
                       committedFiles=committed_files_final_list # List of files actually committed
                      )
         logger.info("Task completed successfully.")
+        return True
 
     except git_utils.GitError as e:
         error_msg = f"A Git operation failed: {e}"
         logger.error(error_msg, exc_info=True)
         report_status("error", args.run_id, args.agent_id, errorMessage=error_msg, errorDetails=str(e))
-        sys.exit(1)
+        return False
     except Exception as e:
         error_msg = f"An unexpected error occurred in run_llm_on_branch.py: {e}"
         logger.error(error_msg, exc_info=True)
         report_status("error", args.run_id, args.agent_id, errorMessage=error_msg, errorDetails=str(e))
-        sys.exit(1)
+        return False
 
 if __name__ == "__main__":
-    main()
-
-```
+    if sys.argv[1:] == [WORKER_FLAG]:
+        worker_main()
+    else:
+        main()
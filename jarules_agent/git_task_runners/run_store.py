@@ -0,0 +1,235 @@
+# jarules_agent/git_task_runners/run_store.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+DEFAULT_DB_FILENAME = "runs.sqlite3"
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    repo_path TEXT NOT NULL,
+    task_prompt TEXT,
+    base_branch TEXT,
+    status TEXT NOT NULL,
+    message TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs (created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_repo_created_at ON runs (repo_path, created_at);
+
+CREATE TABLE IF NOT EXISTS agents (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    agent_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    provider TEXT,
+    branch_name TEXT,
+    worktree_path TEXT,
+    solution_summary TEXT,
+    key_file_paths TEXT,
+    committed_files TEXT,
+    error_message TEXT,
+    last_update TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, agent_id)
+);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    agent_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    metadata TEXT,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, agent_id, kind)
+);
+"""
+
+# Terminal run statuses; anything else means the run is (or was, if its process died) in progress.
+FINISHED_RUN_STATUSES = ("completed", "error", "cancelled")
+
+
+class RunStoreError(Exception):
+    """Custom exception for run store errors."""
+    pass
+
+
+def default_db_path():
+    return os.path.join(os.path.expanduser("~"), ".jarules", DEFAULT_DB_FILENAME)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class RunStore:
+    """
+    Durable record of parallel runs, their agents and their artifacts, in SQLite.
+
+    Every process (the orchestrator, the bridge wrappers) opens the same database file. WAL journaling lets
+    readers query while a run is writing updates, and every lookup is by primary key or index.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = os.path.abspath(db_path or default_db_path())
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            logger.error(f"Could not open run store at {self.db_path}: {e}")
+            raise RunStoreError(f"Could not open run store at {self.db_path}: {e}") from e
+
+    def _execute(self, sql, params=()):
+        try:
+            with self._lock, self._conn:
+                return self._conn.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.error(f"Run store query failed: {e}")
+            raise RunStoreError(f"Run store query failed: {e}") from e
+
+    def _fetchone(self, sql, params=()):
+        try:
+            with self._lock:
+                return self._conn.execute(sql, params).fetchone()
+        except sqlite3.Error as e:
+            raise RunStoreError(f"Run store query failed: {e}") from e
+
+    def _fetchall(self, sql, params=()):
+        try:
+            with self._lock:
+                return self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            raise RunStoreError(f"Run store query failed: {e}") from e
+
+    # --- Writes ---
+
+    def create_run(self, run_id, repo_path, task_prompt, base_branch, agents, status="starting"):
+        """
+        Records a new run and its agents (all 'queued').
+
+        Args:
+            agents (list): Dicts with 'agent_id' and optionally 'provider' and 'branch_name'.
+        """
+        now = _now()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO runs (run_id, repo_path, task_prompt, base_branch, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, os.path.abspath(repo_path), task_prompt, base_branch, status, now, now))
+                self._conn.executemany(
+                    "INSERT INTO agents (run_id, agent_id, status, provider, branch_name, updated_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                    [(run_id, a["agent_id"], a.get("provider"), a.get("branch_name"), now) for a in agents])
+        except sqlite3.Error as e:
+            logger.error(f"Could not record run {run_id}: {e}")
+            raise RunStoreError(f"Could not record run {run_id}: {e}") from e
+
+    def update_run_status(self, run_id, status, message=None):
+        now = _now()
+        finished_at = now if status in FINISHED_RUN_STATUSES else None
+        self._execute(
+            "UPDATE runs SET status = ?, message = COALESCE(?, message), updated_at = ?, "
+            "finished_at = COALESCE(?, finished_at) WHERE run_id = ?",
+            (status, message, now, finished_at, run_id))
+
+    def set_agent_worktree(self, run_id, agent_id, worktree_path):
+        self._execute("UPDATE agents SET worktree_path = ?, updated_at = ? WHERE run_id = ? AND agent_id = ?",
+                      (worktree_path, _now(), run_id, agent_id))
+
+    def record_agent_update(self, run_id, agent_id, update):
+        """
+        Stores an agent status update (the JSON the agent reported). Result fields are only overwritten
+        when the update carries them.
+        """
+        self._execute(
+            "UPDATE agents SET status = COALESCE(?, status), "
+            "solution_summary = COALESCE(?, solution_summary), key_file_paths = COALESCE(?, key_file_paths), "
+            "committed_files = COALESCE(?, committed_files), error_message = COALESCE(?, error_message), "
+            "last_update = ?, updated_at = ? WHERE run_id = ? AND agent_id = ?",
+            (update.get("status"), update.get("solutionSummary"),
+             json.dumps(update["keyFilePaths"]) if "keyFilePaths" in update else None,
+             json.dumps(update["committedFiles"]) if "committedFiles" in update else None,
+             update.get("errorMessage"), json.dumps(update), _now(), run_id, agent_id))
+
+    def record_artifact(self, run_id, agent_id, kind, path, metadata=None):
+        """Records (or replaces) an artifact such as a zip archive produced for an agent."""
+        self._execute(
+            "INSERT OR REPLACE INTO artifacts (run_id, agent_id, kind, path, metadata, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (run_id, agent_id, kind, path, json.dumps(metadata) if metadata is not None else None, _now()))
+
+    def delete_run(self, run_id):
+        self._execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    # --- Reads ---
+
+    @staticmethod
+    def _run_dict(row):
+        return {"runId": row["run_id"], "repoPath": row["repo_path"], "taskPrompt": row["task_prompt"],
+                "baseBranch": row["base_branch"], "status": row["status"], "message": row["message"],
+                "createdAt": row["created_at"], "updatedAt": row["updated_at"], "finishedAt": row["finished_at"]}
+
+    @staticmethod
+    def _agent_dict(row):
+        return {"agentId": row["agent_id"], "status": row["status"], "provider": row["provider"],
+                "branchName": row["branch_name"], "worktreePath": row["worktree_path"],
+                "solutionSummary": row["solution_summary"],
+                "keyFilePaths": json.loads(row["key_file_paths"]) if row["key_file_paths"] else [],
+                "committedFiles": json.loads(row["committed_files"]) if row["committed_files"] else [],
+                "errorMessage": row["error_message"], "updatedAt": row["updated_at"]}
+
+    def get_run(self, run_id, include_agents=True):
+        """Returns the run as a dict (with an 'agents' mapping unless include_agents is False), or None."""
+        row = self._fetchone("SELECT * FROM runs WHERE run_id = ?", (run_id,))
+        if row is None:
+            return None
+        run = self._run_dict(row)
+        if include_agents:
+            rows = self._fetchall("SELECT * FROM agents WHERE run_id = ? ORDER BY agent_id", (run_id,))
+            run["agents"] = {r["agent_id"]: self._agent_dict(r) for r in rows}
+        return run
+
+    def get_agent(self, run_id, agent_id):
+        row = self._fetchone("SELECT * FROM agents WHERE run_id = ? AND agent_id = ?", (run_id, agent_id))
+        return self._agent_dict(row) if row else None
+
+    def get_artifact(self, run_id, agent_id, kind):
+        row = self._fetchone("SELECT * FROM artifacts WHERE run_id = ? AND agent_id = ? AND kind = ?",
+                             (run_id, agent_id, kind))
+        if row is None:
+            return None
+        return {"path": row["path"], "createdAt": row["created_at"],
+                "metadata": json.loads(row["metadata"]) if row["metadata"] else None}
+
+    def list_runs(self, limit=50, repo_path=None, before=None):
+        """
+        Run history, newest first (without agents). Pass the last 'createdAt' seen as `before` to page.
+        """
+        clauses, params = [], []
+        if repo_path:
+            clauses.append("repo_path = ?")
+            params.append(os.path.abspath(repo_path))
+        if before:
+            clauses.append("created_at < ?")
+            params.append(before)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._fetchall(f"SELECT * FROM runs {where}ORDER BY created_at DESC LIMIT ?", (*params, limit))
+        return [self._run_dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
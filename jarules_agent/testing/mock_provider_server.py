@@ -0,0 +1,756 @@
+# jarules_agent/testing/mock_provider_server.py
+
+"""
+Local stand-in for the LLM provider APIs used by the connectors.
+
+The server speaks the wire formats of:
+    - Ollama:            POST /api/generate, POST /api/chat, GET /api/tags (NDJSON streaming)
+    - OpenAI/OpenRouter: POST .../chat/completions, GET .../models (SSE streaming)
+    - Anthropic:         POST .../v1/messages (SSE event streaming)
+    - Gemini (REST):     POST /v1beta/models/{model}:generateContent and :streamGenerateContent
+
+It runs over real sockets with HTTP/1.1 keep-alive and chunked responses, so connection
+pooling, streaming, timeouts and backpressure in the connectors are exercised end to end.
+Latency, token rate, error injection and 429 rate limiting are configurable, and a seed
+makes fault injection and latency reproducible.
+
+Usage:
+    async with MockProviderServer(MockProviderConfig(latency=0.05, token_rate=200)) as server:
+        connector = OllamaConnector(api_base_url=server.url, model_name="mock-model")
+
+    python -m jarules_agent.testing.mock_provider_server --port 8089 --latency uniform:0.05,0.3
+"""
+
+import argparse
+import asyncio
+import collections
+import dataclasses
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAMES = ["mock-model", "llama3", "gpt-4o-mini", "claude-3-haiku-20240307", "gemini-1.5-flash-latest"]
+
+_VOCABULARY = (
+    "def return import class self value result data config request response token model "
+    "async await list dict str int None True False if else for while try except with yield "
+    "print logger error path file branch commit agent prompt stream chunk"
+).split()
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+class MockServerError(Exception):
+    """Raised for invalid mock server configuration."""
+    pass
+
+
+class LatencyDistribution:
+    """
+    Samples a delay in seconds.
+
+    Kinds:
+        fixed      value
+        uniform    low, high
+        normal     mean, stddev (clamped at 0)
+        lognormal  median, sigma (heavy tail, typical for LLM latency)
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, kind: str = "fixed", a: float = 0.0, b: float = 0.0):
+        if kind not in self.KINDS:
+            raise MockServerError(f"Unknown latency distribution '{kind}'. Expected one of {self.KINDS}.")
+        self.kind = kind
+        self.a = float(a)
+        self.b = float(b)
+
+    @classmethod
+    def from_spec(cls, spec: Union[None, float, str, Dict[str, Any], "LatencyDistribution"]) -> "LatencyDistribution":
+        """
+        Builds a distribution from a number (fixed seconds), a 'kind:a,b' string
+        (e.g. 'uniform:0.1,0.5') or a dict like {"kind": "normal", "a": 0.2, "b": 0.05}.
+        """
+        if spec is None:
+            return cls()
+        if isinstance(spec, LatencyDistribution):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls("fixed", spec)
+        if isinstance(spec, dict):
+            return cls(spec.get("kind", "fixed"), spec.get("a", 0.0), spec.get("b", 0.0))
+        if isinstance(spec, str):
+            kind, _, params = spec.partition(":")
+            if not params:
+                try:
+                    return cls("fixed", float(kind))
+                except ValueError:
+                    raise MockServerError(f"Invalid latency spec '{spec}'.")
+            values = [float(v) for v in params.split(",")]
+            return cls(kind, *values[:2])
+        raise MockServerError(f"Invalid latency spec {spec!r}.")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            value = self.a
+        elif self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        else:
+            value = self.a * math.exp(rng.gauss(0.0, self.b)) if self.a > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self) -> str:
+        return f"LatencyDistribution({self.kind!r}, {self.a}, {self.b})"
+
+
+@dataclasses.dataclass
+class MockProviderConfig:
+    """
+    Behaviour of the mock server.
+
+    Attributes:
+        latency: Delay before the response starts (time to first byte). Number, spec string or LatencyDistribution.
+        token_rate: Tokens per second for generated output; None sends all tokens at once.
+        completion_tokens: Tokens generated per response (capped by the request's max tokens).
+        error_rate: Probability of a 500 response.
+        rate_limit_rate: Probability of a 429 response.
+        rate_limit_rps: If set, a token bucket of this many requests/second; excess requests get 429.
+        rate_limit_burst: Bucket size for rate_limit_rps. Defaults to max(1, rate_limit_rps).
+        retry_after: Seconds advertised in the Retry-After header of 429 responses.
+        disconnect_rate: Probability of dropping the connection halfway through a streamed response.
+        seed: Seed for latency and fault injection. Generated text depends only on the prompt.
+        model_names: Models reported by the listing endpoints.
+    """
+    latency: Any = 0.0
+    token_rate: Optional[float] = None
+    completion_tokens: int = 32
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    rate_limit_rps: Optional[float] = None
+    rate_limit_burst: Optional[float] = None
+    retry_after: float = 1.0
+    disconnect_rate: float = 0.0
+    seed: Optional[int] = None
+    model_names: List[str] = dataclasses.field(default_factory=lambda: list(DEFAULT_MODEL_NAMES))
+
+    def __post_init__(self):
+        self.latency = LatencyDistribution.from_spec(self.latency)
+        for name in ("error_rate", "rate_limit_rate", "disconnect_rate"):
+            value = getattr(self, name)
+            if not 0.0 <= value <= 1.0:
+                raise MockServerError(f"{name} must be between 0 and 1, got {value}.")
+        if self.token_rate is not None and self.token_rate <= 0:
+            raise MockServerError(f"token_rate must be positive, got {self.token_rate}.")
+        if self.completion_tokens < 1:
+            raise MockServerError(f"completion_tokens must be at least 1, got {self.completion_tokens}.")
+
+
+class _HttpRequest:
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+    def json(self) -> Dict[str, Any]:
+        if not self.body:
+            return {}
+        data = json.loads(self.body)
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object.")
+        return data
+
+
+class _ClientDisconnected(Exception):
+    pass
+
+
+class _ChunkedWriter:
+    """Writes a chunked HTTP body, awaiting drain() on every chunk so slow readers apply backpressure."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+
+    async def write(self, data: bytes) -> None:
+        if self._writer.is_closing():
+            raise _ClientDisconnected()
+        self._writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        try:
+            await self._writer.drain()
+        except ConnectionError as e:
+            raise _ClientDisconnected() from e
+
+    async def end(self) -> None:
+        self._writer.write(b"0\r\n\r\n")
+        await self._writer.drain()
+
+
+class MockProviderServer:
+    """
+    asyncio HTTP server emulating the provider APIs. Start it with `await start()` or
+    `async with`, or from synchronous code with `start_in_thread()` / `stop_thread()`.
+    """
+
+    def __init__(self, config: Optional[MockProviderConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockProviderConfig()
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._rng = random.Random(self.config.seed)
+        self._bucket_tokens = 0.0
+        self._bucket_updated_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._thread_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connection_tasks: set = set()
+        self.reset_stats()
+
+    # --- Lifecycle ---
+
+    async def start(self) -> "MockProviderServer":
+        if self._server is not None:
+            raise MockServerError("Mock provider server is already running.")
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._bucket_tokens = self._bucket_capacity()
+        self._bucket_updated_at = time.monotonic()
+        logger.info(f"Mock provider server listening on {self.url}")
+        return self
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._connection_tasks):
+            task.cancel()
+        await asyncio.gather(*self._connection_tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        logger.info("Mock provider server stopped.")
+
+    async def __aenter__(self) -> "MockProviderServer":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    def start_in_thread(self) -> "MockProviderServer":
+        """Runs the server on its own event loop in a daemon thread (for synchronous callers)."""
+        if self._thread is not None:
+            raise MockServerError("Mock provider server thread is already running.")
+        started = threading.Event()
+        errors: List[BaseException] = []
+        loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread_loop = loop
+        self._thread = threading.Thread(target=run, name="mock-provider-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            self._thread.join()
+            self._thread = None
+            raise errors[0]
+        return self
+
+    def stop_thread(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._thread_loop.call_soon_threadsafe(self._thread_loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+        self._thread_loop = None
+
+    # --- Addresses for connector configs ---
+
+    @property
+    def url(self) -> str:
+        """Base URL; use as Ollama's api_base_url."""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        """Use as OpenRouter's api_base_url."""
+        return f"{self.url}/v1"
+
+    @property
+    def anthropic_base_url(self) -> str:
+        """Use as Claude's api_base_url (the SDK appends /v1/messages)."""
+        return self.url
+
+    @property
+    def gemini_endpoint(self) -> str:
+        """Use as Gemini's api_endpoint (REST transport)."""
+        return self.url
+
+    # --- Statistics ---
+
+    def reset_stats(self) -> None:
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "by_route": collections.Counter(),
+            "by_status": collections.Counter(),
+            "disconnects": 0,
+            "connections_opened": 0,
+            "active_connections": 0,
+            "max_active_connections": 0,
+            "active_requests": 0,
+            "max_active_requests": 0,
+        }
+
+    # --- Connection handling ---
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connection_tasks.add(task)
+        self.stats["connections_opened"] += 1
+        self.stats["active_connections"] += 1
+        self.stats["max_active_connections"] = max(self.stats["max_active_connections"], self.stats["active_connections"])
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    break
+                if request is None:
+                    break
+                self.stats["active_requests"] += 1
+                self.stats["max_active_requests"] = max(self.stats["max_active_requests"], self.stats["active_requests"])
+                try:
+                    keep_alive = await self._dispatch(request, writer)
+                except _ClientDisconnected:
+                    keep_alive = False
+                finally:
+                    self.stats["active_requests"] -= 1
+                if not keep_alive:
+                    break
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.stats["active_connections"] -= 1
+            self._connection_tasks.discard(task)
+            writer.close()
+
+    async def _dispatch(self, request: _HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        self.stats["requests"] += 1
+        route = _route(request.method, request.path)
+        self.stats["by_route"][route or "unknown"] += 1
+        keep_alive = request.keep_alive
+
+        if route is None:
+            return await self._send_json(writer, 404, {"error": f"No mock route for {request.method} {request.path}"}, keep_alive)
+        if route in ("ollama_tags", "openai_models", "gemini_models"):
+            return await self._send_json(writer, 200, self._model_listing(route), keep_alive)
+
+        try:
+            body = request.json()
+        except ValueError as e:
+            return await self._send_json(writer, 400, _error_body(route, 400, f"Invalid JSON body: {e}"), keep_alive)
+
+        # Fault injection and latency are drawn in arrival order from the seeded generator.
+        rate_limited = not self._take_bucket_token() or self._rng.random() < self.config.rate_limit_rate
+        failed = self._rng.random() < self.config.error_rate
+        disconnect = self._rng.random() < self.config.disconnect_rate
+        delay = self.config.latency.sample(self._rng)
+
+        if rate_limited:
+            headers = {"Retry-After": _format_retry_after(self.config.retry_after)}
+            return await self._send_json(writer, 429, _error_body(route, 429, "Rate limit exceeded (mock)."), keep_alive, headers)
+        await asyncio.sleep(delay)
+        if failed:
+            return await self._send_json(writer, 500, _error_body(route, 500, "Injected server error (mock)."), keep_alive)
+
+        generation = _Generation(route, body, request, self.config, delay)
+        if generation.stream:
+            return await self._stream(writer, generation, keep_alive, disconnect)
+        if self.config.token_rate:
+            await asyncio.sleep(len(generation.tokens) / self.config.token_rate)
+        return await self._send_json(writer, 200, generation.full_response(), keep_alive)
+
+    async def _stream(self, writer: asyncio.StreamWriter, generation: "_Generation", keep_alive: bool, disconnect: bool) -> bool:
+        headers = {"Content-Type": generation.stream_content_type, "Transfer-Encoding": "chunked", "Cache-Control": "no-cache"}
+        writer.write(_response_head(200, headers, keep_alive))
+        body = _ChunkedWriter(writer)
+        interval = 1.0 / self.config.token_rate if self.config.token_rate else 0.0
+        cut_at = len(generation.tokens) // 2 if disconnect else None
+
+        for payload in generation.stream_prelude():
+            await body.write(payload)
+        for index, token in enumerate(generation.tokens):
+            if cut_at is not None and index == cut_at:
+                self.stats["disconnects"] += 1
+                self.stats["by_status"]["disconnect"] += 1
+                writer.transport.abort()
+                raise _ClientDisconnected()
+            if interval:
+                await asyncio.sleep(interval)
+            await body.write(generation.stream_token(index, token))
+        for payload in generation.stream_epilogue():
+            await body.write(payload)
+        await body.end()
+        self.stats["by_status"][200] += 1
+        return keep_alive
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool,
+                         extra_headers: Optional[Dict[str, str]] = None) -> bool:
+        data = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(data))}
+        headers.update(extra_headers or {})
+        writer.write(_response_head(status, headers, keep_alive) + data)
+        try:
+            await writer.drain()
+        except ConnectionError as e:
+            raise _ClientDisconnected() from e
+        self.stats["by_status"][status] += 1
+        return keep_alive
+
+    def _bucket_capacity(self) -> float:
+        if not self.config.rate_limit_rps:
+            return 0.0
+        return self.config.rate_limit_burst or max(1.0, self.config.rate_limit_rps)
+
+    def _take_bucket_token(self) -> bool:
+        if not self.config.rate_limit_rps:
+            return True
+        now = time.monotonic()
+        self._bucket_tokens = min(self._bucket_capacity(), self._bucket_tokens + (now - self._bucket_updated_at) * self.config.rate_limit_rps)
+        self._bucket_updated_at = now
+        if self._bucket_tokens >= 1.0:
+            self._bucket_tokens -= 1.0
+            return True
+        return False
+
+    def _model_listing(self, route: str) -> Dict[str, Any]:
+        names = self.config.model_names
+        if route == "ollama_tags":
+            return {"models": [{"name": name, "model": name, "size": 0, "digest": _digest(name)} for name in names]}
+        if route == "gemini_models":
+            return {"models": [{"name": f"models/{name}", "supportedGenerationMethods": ["generateContent"]} for name in names]}
+        return {"object": "list", "data": [{"id": name, "object": "model", "owned_by": "mock"} for name in names]}
+
+
+class _Generation:
+    """A single generated response, rendered in the route's wire format."""
+
+    def __init__(self, route: str, body: Dict[str, Any], request: _HttpRequest, config: MockProviderConfig, first_token_delay: float):
+        self.route = route
+        self.body = body
+        self.model = body.get("model") or _gemini_model_from_path(request.path) or config.model_names[0]
+        self.id = uuid.uuid4().hex[:24]
+        self.created = int(time.time())
+        self.first_token_delay = first_token_delay
+        self.token_rate = config.token_rate
+        prompt_text = " ".join(_collect_strings(body))
+        self.prompt_tokens = max(1, len(prompt_text.split()))
+        self.tokens = _generate_tokens(prompt_text, min(config.completion_tokens, _requested_max_tokens(route, body) or config.completion_tokens))
+        self.text = "".join(self.tokens)
+        if route.startswith("ollama"):
+            self.stream = body.get("stream", True) is not False  # Ollama streams unless told otherwise
+        elif route == "gemini_stream":
+            self.stream = True
+        else:
+            self.stream = bool(body.get("stream"))
+        self.sse_gemini = route == "gemini_stream" and request.query.get("alt") == "sse"
+
+    @property
+    def stream_content_type(self) -> str:
+        if self.route.startswith("ollama"):
+            return "application/x-ndjson"
+        if self.route == "gemini_stream" and not self.sse_gemini:
+            return "application/json"
+        return "text/event-stream"
+
+    # Non-streaming bodies
+
+    def full_response(self) -> Dict[str, Any]:
+        if self.route == "ollama_generate":
+            return {"model": self.model, "created_at": _iso_now(), "response": self.text, "done": True, **self._ollama_stats()}
+        if self.route == "ollama_chat":
+            return {"model": self.model, "created_at": _iso_now(), "message": {"role": "assistant", "content": self.text},
+                    "done": True, **self._ollama_stats()}
+        if self.route == "openai_chat":
+            return {
+                "id": f"chatcmpl-{self.id}", "object": "chat.completion", "created": self.created, "model": self.model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self.text}, "finish_reason": "stop"}],
+                "usage": self._openai_usage(),
+            }
+        if self.route == "anthropic_messages":
+            return {
+                "id": f"msg_{self.id}", "type": "message", "role": "assistant", "model": self.model,
+                "content": [{"type": "text", "text": self.text}], "stop_reason": "end_turn", "stop_sequence": None,
+                "usage": {"input_tokens": self.prompt_tokens, "output_tokens": len(self.tokens)},
+            }
+        return self._gemini_chunk(self.text, final=True)
+
+    # Streaming bodies
+
+    def stream_prelude(self) -> List[bytes]:
+        if self.route == "anthropic_messages":
+            message = {"id": f"msg_{self.id}", "type": "message", "role": "assistant", "model": self.model, "content": [],
+                       "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": self.prompt_tokens, "output_tokens": 1}}
+            return [_sse({"type": "message_start", "message": message}, "message_start"),
+                    _sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}, "content_block_start")]
+        if self.route == "gemini_stream" and not self.sse_gemini:
+            return [b"["]
+        return []
+
+    def stream_token(self, index: int, token: str) -> bytes:
+        if self.route == "ollama_generate":
+            return _ndjson({"model": self.model, "created_at": _iso_now(), "response": token, "done": False})
+        if self.route == "ollama_chat":
+            return _ndjson({"model": self.model, "created_at": _iso_now(), "message": {"role": "assistant", "content": token}, "done": False})
+        if self.route == "openai_chat":
+            delta = {"role": "assistant", "content": token} if index == 0 else {"content": token}
+            return _sse(self._openai_chunk(delta, None))
+        if self.route == "anthropic_messages":
+            return _sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}}, "content_block_delta")
+        chunk = self._gemini_chunk(token, final=False)
+        if self.sse_gemini:
+            return _sse(chunk)
+        return (b"," if index else b"") + json.dumps(chunk).encode() + b"\n"
+
+    def stream_epilogue(self) -> List[bytes]:
+        if self.route == "ollama_generate":
+            return [_ndjson({"model": self.model, "created_at": _iso_now(), "response": "", "done": True, **self._ollama_stats()})]
+        if self.route == "ollama_chat":
+            return [_ndjson({"model": self.model, "created_at": _iso_now(), "message": {"role": "assistant", "content": ""},
+                             "done": True, **self._ollama_stats()})]
+        if self.route == "openai_chat":
+            final = self._openai_chunk({}, "stop")
+            final["usage"] = self._openai_usage()
+            return [_sse(final), b"data: [DONE]\n\n"]
+        if self.route == "anthropic_messages":
+            return [_sse({"type": "content_block_stop", "index": 0}, "content_block_stop"),
+                    _sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                          "usage": {"output_tokens": len(self.tokens)}}, "message_delta"),
+                    _sse({"type": "message_stop"}, "message_stop")]
+        final = self._gemini_chunk("", final=True)
+        if self.sse_gemini:
+            return [_sse(final)]
+        return [b"," + json.dumps(final).encode() + b"]"]
+
+    # Format helpers
+
+    def _ollama_stats(self) -> Dict[str, Any]:
+        eval_seconds = len(self.tokens) / self.token_rate if self.token_rate else 0.0
+        return {
+            "done_reason": "stop",
+            "total_duration": int((self.first_token_delay + eval_seconds) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": self.prompt_tokens,
+            "prompt_eval_duration": int(self.first_token_delay * 1e9),
+            "eval_count": len(self.tokens),
+            "eval_duration": int(eval_seconds * 1e9),
+        }
+
+    def _openai_usage(self) -> Dict[str, int]:
+        return {"prompt_tokens": self.prompt_tokens, "completion_tokens": len(self.tokens),
+                "total_tokens": self.prompt_tokens + len(self.tokens)}
+
+    def _openai_chunk(self, delta: Dict[str, Any], finish_reason: Optional[str]) -> Dict[str, Any]:
+        return {"id": f"chatcmpl-{self.id}", "object": "chat.completion.chunk", "created": self.created, "model": self.model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+    def _gemini_chunk(self, text: str, final: bool) -> Dict[str, Any]:
+        candidate: Dict[str, Any] = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+        chunk: Dict[str, Any] = {"candidates": [candidate], "modelVersion": self.model}
+        if final:
+            candidate["finishReason"] = "STOP"
+            chunk["usageMetadata"] = {"promptTokenCount": self.prompt_tokens, "candidatesTokenCount": len(self.tokens),
+                                      "totalTokenCount": self.prompt_tokens + len(self.tokens)}
+        return chunk
+
+
+# --- Routing and wire helpers ---
+
+def _route(method: str, path: str) -> Optional[str]:
+    if path.startswith("/v1beta/") or path.startswith("/v1/models/") and ":" in path:
+        if method == "POST" and path.endswith(":generateContent"):
+            return "gemini_generate"
+        if method == "POST" and path.endswith(":streamGenerateContent"):
+            return "gemini_stream"
+        if method == "GET" and path.rstrip("/").endswith("/models"):
+            return "gemini_models"
+        return None
+    if method == "GET" and path == "/api/tags":
+        return "ollama_tags"
+    if method == "POST" and path == "/api/generate":
+        return "ollama_generate"
+    if method == "POST" and path == "/api/chat":
+        return "ollama_chat"
+    if method == "POST" and path.endswith("/chat/completions"):
+        return "openai_chat"
+    if method == "GET" and path.endswith("/models"):
+        return "openai_models"
+    if method == "POST" and path.endswith("/messages"):
+        return "anthropic_messages"
+    return None
+
+
+def _error_body(route: str, status: int, message: str) -> Dict[str, Any]:
+    if route.startswith("ollama"):
+        return {"error": message}
+    if route.startswith("anthropic"):
+        error_type = {429: "rate_limit_error", 400: "invalid_request_error"}.get(status, "api_error")
+        return {"type": "error", "error": {"type": error_type, "message": message}}
+    if route.startswith("gemini"):
+        status_name = {429: "RESOURCE_EXHAUSTED", 400: "INVALID_ARGUMENT"}.get(status, "INTERNAL")
+        return {"error": {"code": status, "message": message, "status": status_name}}
+    error_type = {429: "rate_limit_exceeded", 400: "invalid_request_error"}.get(status, "server_error")
+    return {"error": {"message": message, "type": error_type, "code": status}}
+
+
+def _requested_max_tokens(route: str, body: Dict[str, Any]) -> Optional[int]:
+    if route.startswith("ollama"):
+        value = (body.get("options") or {}).get("num_predict")
+    elif route.startswith("gemini"):
+        value = (body.get("generationConfig") or body.get("generation_config") or {}).get("maxOutputTokens")
+    else:
+        value = body.get("max_tokens") or body.get("max_completion_tokens")
+    return value if isinstance(value, int) and value > 0 else None
+
+
+def _collect_strings(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [s for key, item in value.items() if key not in ("model", "role") for s in _collect_strings(item)]
+    if isinstance(value, list):
+        return [s for item in value for s in _collect_strings(item)]
+    return []
+
+
+def _generate_tokens(prompt_text: str, count: int) -> List[str]:
+    """Deterministic pseudo-text: the same prompt always yields the same tokens, regardless of arrival order."""
+    rng = random.Random(hashlib.sha256(prompt_text.encode()).hexdigest())
+    return [("" if i == 0 else " ") + rng.choice(_VOCABULARY) for i in range(count)]
+
+
+def _gemini_model_from_path(path: str) -> Optional[str]:
+    if "/models/" not in path:
+        return None
+    return path.split("/models/", 1)[1].split(":", 1)[0] or None
+
+
+def _digest(name: str) -> str:
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+def _iso_now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def _format_retry_after(seconds: float) -> str:
+    return str(max(0, math.ceil(seconds)))
+
+
+def _sse(payload: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n".encode()
+
+
+def _ndjson(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload).encode() + b"\n"
+
+
+def _response_head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[_HttpRequest]:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise ValueError(f"Malformed request line: {request_line!r}")
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip(), 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b"".join(chunks)
+    else:
+        body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+    return _HttpRequest(method, target, headers, body)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local mock LLM provider server (Ollama, OpenAI/OpenRouter, Anthropic, Gemini).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="0", help="Time to first byte: seconds, or 'uniform:LOW,HIGH', 'normal:MEAN,STD', 'lognormal:MEDIAN,SIGMA'.")
+    parser.add_argument("--token-rate", type=float, default=None, help="Generated tokens per second (default: unlimited).")
+    parser.add_argument("--completion-tokens", type=int, default=32)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rps", type=float, default=None)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    config = MockProviderConfig(
+        latency=args.latency, token_rate=args.token_rate, completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, rate_limit_rps=args.rate_limit_rps,
+        retry_after=args.retry_after, disconnect_rate=args.disconnect_rate, seed=args.seed,
+    )
+
+    async def serve():
+        async with MockProviderServer(config, host=args.host, port=args.port):
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import asyncio
+import unittest
+
+from jarules_agent.git_task_runners.agent_scheduler import AgentScheduler, SchedulerError
+
+
+class TestAgentScheduler(unittest.TestCase):
+
+    def _run(self, coro):
+        return asyncio.run(coro)
+
+    async def _gate_jobs(self, scheduler, specs):
+        """
+        Submits one job per (run_id, agent_id, provider, priority) spec. Each job records when it starts and
+        then waits on its own event. Returns (start order, events, tasks).
+        """
+        started, events, tasks = [], {}, []
+
+        def make_job(agent_id):
+            async def job():
+                started.append(agent_id)
+                await events[agent_id].wait()
+                return agent_id
+            return job
+
+        for run_id, agent_id, provider, priority in specs:
+            events[agent_id] = asyncio.Event()
+            tasks.append(asyncio.create_task(scheduler.run(make_job(agent_id), run_id, agent_id,
+                                                           provider=provider, priority=priority)))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return started, events, tasks
+
+    async def _finish(self, agent_id, events):
+        events[agent_id].set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    def test_global_limit_and_fifo_within_run(self):
+        async def scenario():
+            scheduler = AgentScheduler(max_concurrency=2, provider_limits={"p": 10})
+            started, events, tasks = await self._gate_jobs(scheduler, [("r1", f"a{i}", "p", 0) for i in range(5)])
+            self.assertEqual(started, ["a0", "a1"])
+            self.assertEqual(scheduler.snapshot()["queued"], 3)
+            await self._finish("a1", events)
+            self.assertEqual(started, ["a0", "a1", "a2"])
+            for agent_id in ("a0", "a2", "a3", "a4"):
+                await self._finish(agent_id, events)
+            self.assertEqual(await asyncio.gather(*tasks), [f"a{i}" for i in range(5)])
+            self.assertEqual(scheduler.snapshot()["running"], 0)
+
+        self._run(scenario())
+
+    def test_provider_limit_does_not_block_other_providers(self):
+        async def scenario():
+            scheduler = AgentScheduler(max_concurrency=4, provider_limits={"ollama": 1, "claude": 4})
+            specs = [("r1", "o1", "ollama", 0), ("r1", "o2", "ollama", 0), ("r1", "c1", "claude", 0)]
+            started, events, tasks = await self._gate_jobs(scheduler, specs)
+            self.assertEqual(started, ["o1", "c1"])
+            snapshot = scheduler.snapshot()
+            self.assertEqual(snapshot["providers"]["ollama"], {"running": 1, "queued": 1, "limit": 1})
+            for agent_id in ("o1", "o2", "c1"):
+                await self._finish(agent_id, events)
+            await asyncio.gather(*tasks)
+            self.assertEqual(started, ["o1", "c1", "o2"])
+
+        self._run(scenario())
+
+    def test_priority_then_round_robin_between_runs(self):
+        async def scenario():
+            scheduler = AgentScheduler(max_concurrency=1, provider_limits={"p": 10})
+            specs = [("blocker", "x", "p", 0)]
+            specs += [("big", f"big{i}", "p", 0) for i in range(3)]
+            specs += [("small", f"small{i}", "p", 0) for i in range(2)]
+            specs += [("urgent", "urgent0", "p", 5)]
+            started, events, tasks = await self._gate_jobs(scheduler, specs)
+            for agent_id in ["x", "urgent0", "big0", "small0", "big1", "small1", "big2"]:
+                await self._finish(agent_id, events)
+            await asyncio.gather(*tasks)
+            return started
+
+        self.assertEqual(self._run(scenario()),
+                         ["x", "urgent0", "big0", "small0", "big1", "small1", "big2"])
+
+    def test_on_queued_reports_position_and_depth(self):
+        async def scenario():
+            scheduler = AgentScheduler(max_concurrency=1, provider_limits={"p": 10})
+            reports = []
+            release = asyncio.Event()
+
+            async def job():
+                await release.wait()
+
+            tasks = [asyncio.create_task(scheduler.run(job, "r1", f"a{i}", provider="p",
+                                                       on_queued=lambda pos, depth, i=i: reports.append((i, pos, depth))))
+                     for i in range(3)]
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(*tasks)
+            return reports
+
+        self.assertEqual(self._run(scenario()), [(1, 1, 1), (2, 2, 2)])
+
+    def test_cancelled_waiting_job_leaves_queue(self):
+        async def scenario():
+            scheduler = AgentScheduler(max_concurrency=1, provider_limits={"p": 10})
+            started, events, tasks = await self._gate_jobs(scheduler, [("r1", "a0", "p", 0), ("r1", "a1", "p", 0)])
+            tasks[1].cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await tasks[1]
+            self.assertEqual(scheduler.queue_depth, 0)
+            await self._finish("a0", events)
+            await tasks[0]
+            self.assertEqual(scheduler.snapshot(), {"maxConcurrency": 1, "running": 0, "queued": 0,
+                                                    "providers": {}, "runs": {}})
+
+        self._run(scenario())
+
+    def test_provider_defaults(self):
+        scheduler = AgentScheduler(max_concurrency=16, provider_limits={"ollama": 1})
+        self.assertEqual(scheduler.provider_limit("ollama"), 1)
+        self.assertEqual(scheduler.provider_limit("claude"), 4)
+        self.assertEqual(scheduler.provider_limit("some-new-provider"), 4)
+        self.assertEqual(scheduler.provider_limit("unknown"), 16)
+
+    def test_invalid_limit_raises(self):
+        with self.assertRaises(SchedulerError):
+            AgentScheduler(max_concurrency=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
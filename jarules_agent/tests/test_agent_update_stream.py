@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+import unittest
+
+from jarules_agent.git_task_runners.agent_update_stream import AgentUpdateStream
+
+
+def _update(status, agent_id="a1", **fields):
+    return {"status": status, "runId": "run-1", "agentId": agent_id, **fields}
+
+
+class TestAgentUpdateStream(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.lines = []
+        self.stream = AgentUpdateStream(write_lines=self.lines.extend, interval=0.01)
+
+    def messages(self):
+        return [json.loads(line) for line in self.lines]
+
+    async def test_updates_within_an_interval_are_coalesced_per_agent(self):
+        for i in range(10):
+            self.stream.publish(_update("processing", message=f"step {i}"))
+        self.stream.publish(_update("starting", agent_id="a2"))
+        await self.stream.flush()
+
+        messages = self.messages()
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0]["data"], _update("processing", message="step 9"))
+        self.assertEqual(messages[0]["coalesced"], 10)
+        self.assertEqual(messages[1]["data"]["agentId"], "a2")
+
+    async def test_only_changed_fields_are_resent(self):
+        self.stream.publish(_update("processing", message="working", progress=10))
+        await self.stream.flush()
+        self.stream.publish(_update("processing", message="working", progress=20))
+        await self.stream.flush()
+
+        self.assertEqual(self.messages()[1]["data"], _update("processing", progress=20))
+
+    async def test_large_fields_are_sent_once_with_the_final_update(self):
+        self.stream.publish(_update("processing", solutionSummary="draft", keyFilePaths=["a.py"]))
+        await self.stream.flush()
+        self.assertNotIn("solutionSummary", self.messages()[0]["data"])
+
+        self.stream.publish(_update("completed", message="done"))
+        await self.stream.flush()
+        final = self.messages()[1]["data"]
+        self.assertEqual(final["solutionSummary"], "draft")
+        self.assertEqual(final["keyFilePaths"], ["a.py"])
+        self.assertEqual(final["status"], "completed")
+
+    async def test_pending_updates_are_flushed_on_the_interval(self):
+        self.stream.publish(_update("processing"))
+        for _ in range(100):
+            if self.lines:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(len(self.lines), 1)
+
+    async def test_run_status_is_sent_after_pending_agent_updates(self):
+        self.stream.publish(_update("completed", solutionSummary="done"))
+        await self.stream.send({"runId": "run-1", "overallStatus": "completed"})
+
+        messages = self.messages()
+        self.assertEqual(messages[0]["type"], "agent_update")
+        self.assertEqual(messages[1], {"runId": "run-1", "overallStatus": "completed"})
+
+    async def test_slow_writer_gets_fewer_coarser_messages(self):
+        release = threading.Event()
+        written = []
+
+        def slow_write(lines):
+            release.wait(5)
+            written.extend(lines)
+
+        stream = AgentUpdateStream(write_lines=slow_write, interval=0.001)
+        stream.publish(_update("processing", progress=0))
+        await asyncio.sleep(0.05)  # The first write is now blocked
+        for progress in range(1, 200):
+            stream.publish(_update("processing", progress=progress))
+            await asyncio.sleep(0)
+        release.set()
+        await stream.close()
+
+        messages = [json.loads(line) for line in written]
+        self.assertLessEqual(len(messages), 3)
+        self.assertEqual(messages[-1]["data"]["progress"], 199)
+        self.assertEqual(sum(m["coalesced"] for m in messages), 200)
+
+    async def test_write_failures_are_logged_not_raised(self):
+        def broken_write(lines):
+            raise BrokenPipeError("closed")
+
+        stream = AgentUpdateStream(write_lines=broken_write)
+        stream.publish(_update("processing"))
+        with self.assertLogs("jarules_agent.git_task_runners.agent_update_stream", level="ERROR"):
+            await stream.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
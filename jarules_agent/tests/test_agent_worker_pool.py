@@ -0,0 +1,215 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from unittest.mock import Mock
+
+from jarules_agent.git_task_runners.agent_worker_pool import AgentWorkerPool, WorkerPoolError
+
+# Speaks the worker protocol without doing any git work. A job whose prompt is "crash" kills the
+# worker mid-job; "fail" reports an error; "hang" starts a child process and never finishes.
+FAKE_WORKER = textwrap.dedent("""
+    import json, os, subprocess, sys, time
+    for line in sys.stdin:
+        job = json.loads(line)
+        ids = {"runId": job["run_id"], "agentId": job["agent_id"]}
+        print(json.dumps(dict(status="starting", **ids)), flush=True)
+        if job["task_prompt"] == "crash":
+            os._exit(3)
+        if job["task_prompt"] == "hang":
+            child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+            print(json.dumps(dict(status="processing", childPid=child.pid, **ids)), flush=True)
+            time.sleep(60)
+        ok = job["task_prompt"] != "fail"
+        print(json.dumps(dict(status="completed" if ok else "error", pid=os.getpid(), **ids)), flush=True)
+        print(json.dumps({"type": "job_done", "jobId": job["jobId"], "success": ok}), flush=True)
+""")
+
+
+def process_is_running(pid):
+    """True if pid is a live (not zombie) process."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+    except OSError:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        return True
+
+
+def make_job(agent_id, prompt="do work"):
+    return {"task_prompt": prompt, "branch_name": f"agent-{agent_id}", "base_branch": "main", "run_id": "run1",
+            "agent_id": agent_id, "llm_config_id": agent_id, "repo_path": "."}
+
+
+class TestAgentWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.worker_script = os.path.join(self.temp_dir, "fake_worker.py")
+        with open(self.worker_script, "w") as f:
+            f.write(FAKE_WORKER)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _pool(self, size):
+        return AgentWorkerPool(size=size, python_executable=sys.executable, worker_script=self.worker_script)
+
+    def test_jobs_reuse_warm_workers_and_forward_updates(self):
+        async def scenario():
+            updates = []
+            async with self._pool(2) as pool:
+                self.assertEqual(len(pool.workers), 2)
+                results = await asyncio.gather(*(pool.run_job(make_job(f"a{i}"), updates.append) for i in range(6)))
+                self.assertEqual(len(pool.workers), 2)
+                self.assertEqual(sum(w.jobs_completed for w in pool.workers), 6)
+            return results, updates
+
+        results, updates = asyncio.run(scenario())
+
+        self.assertEqual(results, [True] * 6)
+        completed = [u for u in updates if u["status"] == "completed"]
+        self.assertEqual(sorted(u["agentId"] for u in completed), [f"a{i}" for i in range(6)])
+        self.assertEqual(len({u["pid"] for u in completed}), 2)
+        self.assertFalse(any(u.get("type") == "job_done" for u in updates))
+
+    def test_failed_job_returns_false_and_keeps_worker(self):
+        async def scenario():
+            async with self._pool(1) as pool:
+                failed = await pool.run_job(make_job("a1", "fail"), lambda update: None)
+                ok = await pool.run_job(make_job("a2"), lambda update: None)
+                return failed, ok, pool.respawn_count
+
+        self.assertEqual(asyncio.run(scenario()), (False, True, 0))
+
+    def test_crashed_worker_is_reported_and_replaced(self):
+        async def scenario():
+            updates = []
+            async with self._pool(1) as pool:
+                crashed = await pool.run_job(make_job("a1", "crash"), updates.append)
+                ok = await pool.run_job(make_job("a2"), updates.append)
+                return crashed, ok, pool.respawn_count, len(pool.workers), updates
+
+        crashed, ok, respawns, worker_count, updates = asyncio.run(scenario())
+
+        self.assertFalse(crashed)
+        self.assertTrue(ok)
+        self.assertEqual(respawns, 1)
+        self.assertEqual(worker_count, 1)
+        error = next(u for u in updates if u["agentId"] == "a1" and u["status"] == "error")
+        self.assertIn("exited unexpectedly", error["errorMessage"])
+
+    def test_pool_grows_lazily_up_to_size(self):
+        async def scenario():
+            pool = self._pool(3)
+            try:
+                await pool.start(size=1)
+                self.assertEqual(len(pool.workers), 1)
+                await asyncio.gather(*(pool.run_job(make_job(f"a{i}"), lambda update: None) for i in range(8)))
+                return len(pool.workers)
+            finally:
+                await pool.close()
+
+        self.assertLessEqual(asyncio.run(scenario()), 3)
+
+    def test_invalid_job_and_closed_pool_raise(self):
+        async def scenario():
+            pool = self._pool(1)
+            with self.assertRaises(WorkerPoolError):
+                await pool.run_job({"agent_id": "a1"}, lambda update: None)
+            await pool.close()
+            with self.assertRaises(WorkerPoolError):
+                await pool.run_job(make_job("a1"), lambda update: None)
+
+        asyncio.run(scenario())
+        with self.assertRaises(WorkerPoolError):
+            AgentWorkerPool(size=-1)
+
+    @unittest.skipUnless(hasattr(os, "killpg"), "process groups are POSIX-only")
+    def test_cancelled_job_kills_worker_process_group(self):
+        async def scenario():
+            updates = []
+            async with self._pool(1) as pool:
+                task = asyncio.create_task(pool.run_job(make_job("a1", "hang"), updates.append))
+                while not any("childPid" in u for u in updates):
+                    await asyncio.sleep(0.01)
+                worker_pid = pool.workers[0].process.pid
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+                self.assertEqual(len(pool.workers), 1)
+                self.assertNotEqual(pool.workers[0].process.pid, worker_pid)
+                ok = await pool.run_job(make_job("a2"), lambda update: None)
+            return worker_pid, updates[-1]["childPid"], ok
+
+        worker_pid, child_pid, ok = asyncio.run(scenario())
+        self.assertTrue(ok)
+        self.assertFalse(process_is_running(worker_pid))
+        for _ in range(100):  # The orphaned child is reaped asynchronously
+            if not process_is_running(child_pid):
+                break
+            time.sleep(0.05)
+        self.assertFalse(process_is_running(child_pid))
+
+    @unittest.skipUnless(hasattr(os, "killpg"), "process groups are POSIX-only")
+    def test_cancelled_job_frees_slot_for_queued_job(self):
+        async def scenario():
+            updates = []
+            async with self._pool(1) as pool:
+                hung = asyncio.create_task(pool.run_job(make_job("a1", "hang"), updates.append))
+                while not any("childPid" in u for u in updates):
+                    await asyncio.sleep(0.01)
+                queued = asyncio.create_task(pool.run_job(make_job("a2"), updates.append))
+                await asyncio.sleep(0.05)
+                self.assertFalse(queued.done())
+                hung.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await hung
+                ok = await asyncio.wait_for(queued, 10)
+                return ok, len(pool.workers), pool.respawn_count
+
+        self.assertEqual(asyncio.run(scenario()), (True, 1, 1))
+
+    def test_job_fails_and_slot_is_refilled_when_replacement_pipe_also_breaks(self):
+        async def scenario():
+            updates = []
+            broken = []
+            pool = self._pool(1)
+            spawn = pool._spawn
+
+            async def spawn_with_broken_stdin():  # The first worker and its replacement cannot take jobs
+                worker = await spawn()
+                if len(broken) < 2:
+                    worker.process.stdin.write = Mock(side_effect=BrokenPipeError("pipe closed"))
+                    broken.append(worker.process.pid)
+                return worker
+
+            pool._spawn = spawn_with_broken_stdin
+            async with pool:
+                first = asyncio.create_task(pool.run_job(make_job("a1"), updates.append))
+                queued = asyncio.create_task(pool.run_job(make_job("a2"), updates.append))
+                failed = await asyncio.wait_for(first, 10)
+                ok = await asyncio.wait_for(queued, 10)
+                return failed, ok, pool.respawn_count, len(pool.workers), broken, updates
+
+        failed, ok, respawns, worker_count, broken, updates = asyncio.run(scenario())
+
+        self.assertFalse(failed)
+        self.assertTrue(ok)
+        self.assertEqual((respawns, worker_count), (2, 1))
+        self.assertFalse(process_is_running(broken[1]))  # The replacement was killed, not leaked
+        error = next(u for u in updates if u["agentId"] == "a1" and u["status"] == "error")
+        self.assertIn("Could not send the task", error["errorMessage"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from jarules_agent.git_task_runners import git_utils
+from jarules_agent.git_task_runners.archive_cache import ArchiveCache
+from jarules_agent.tests.test_git_utils import _git, make_test_repo
+
+
+class TestArchiveCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        make_test_repo(self.repo)
+        self.cache = ArchiveCache(os.path.join(self.temp_dir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _commit_on_new_branch(self, branch, filename, contents):
+        _git(self.repo, "checkout", "-q", "-b", branch, "main")
+        with open(os.path.join(self.repo, filename), "w") as f:
+            f.write(contents)
+        _git(self.repo, "add", filename)
+        _git(self.repo, "commit", "-q", "-m", f"Add {filename}")
+        _git(self.repo, "checkout", "-q", "main")
+
+    def test_identical_trees_share_one_archive(self):
+        _git(self.repo, "branch", "copy-of-main", "main")
+        path, tree_sha, hit = self.cache.get_archive("main", repo_path=self.repo)
+        self.assertFalse(hit)
+        self.assertEqual(os.path.basename(path), f"{tree_sha}.zip")
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.read("README.md"), b"test repository\n")
+
+        with patch.object(git_utils, "stream_archive", wraps=git_utils.stream_archive) as stream_archive:
+            second_path, second_tree, hit = self.cache.get_archive("copy-of-main", repo_path=self.repo)
+        self.assertTrue(hit)
+        self.assertEqual((second_path, second_tree), (path, tree_sha))
+        stream_archive.assert_not_called()
+        self.assertEqual(self.cache.cache_info()["entries"], 1)
+        self.assertEqual(os.listdir(self.cache.cache_dir), [f"{tree_sha}.zip"])  # No temp files left behind
+
+    def test_archives_carry_the_commit_time_and_are_reproducible(self):
+        with patch.dict(os.environ, {"GIT_COMMITTER_DATE": "2001-02-03T04:05:06Z", "GIT_AUTHOR_DATE": "2001-02-03T04:05:06Z"}):
+            self._commit_on_new_branch("old", "old.txt", "old")
+        path, tree_sha, _ = self.cache.get_archive("old", repo_path=self.repo)
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual({info.date_time[0] for info in archive.infolist()}, {2001})
+        self.assertEqual(git_utils.resolve_commit_and_tree(tree_sha, repo_path=self.repo), (None, tree_sha))
+
+    def test_least_recently_used_archives_are_evicted(self):
+        self._commit_on_new_branch("b1", "one.txt", "1" * 5000)
+        self._commit_on_new_branch("b2", "two.txt", "2" * 5000)
+        first, _, _ = self.cache.get_archive("main", repo_path=self.repo)
+        second, _, _ = self.cache.get_archive("b1", repo_path=self.repo)
+        os.utime(first, (1, 1))
+        os.utime(second, (2, 2))
+        self.cache.get_archive("main", repo_path=self.repo)  # Hit: main becomes most recently used
+
+        self.cache.max_bytes = os.path.getsize(first) + os.path.getsize(second)
+        third, _, _ = self.cache.get_archive("b2", repo_path=self.repo)
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertTrue(os.path.exists(third))
+
+    def test_archive_just_created_is_kept_even_if_over_limit(self):
+        self.cache.max_bytes = 1
+        path, _, _ = self.cache.get_archive("main", repo_path=self.repo)
+        self.assertTrue(os.path.exists(path))
+
+    def test_unknown_branch_raises_and_leaves_no_files(self):
+        with self.assertRaises(git_utils.GitError):
+            self.cache.get_archive("no-such-branch", repo_path=self.repo)
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_streamed_archive_matches_cached_archive(self):
+        path, tree_sha, _ = self.cache.get_archive("main", repo_path=self.repo)
+        output = io.BytesIO()
+        written = git_utils.stream_archive("main", output, repo_path=self.repo)
+        with open(path, "rb") as f:
+            self.assertEqual(output.getvalue(), f.read())
+        self.assertEqual(written, len(output.getvalue()))
+
+
+if __name__ == '__main__':
+    unittest.main()
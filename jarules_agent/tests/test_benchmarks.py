@@ -0,0 +1,38 @@
+import unittest
+
+from benchmarks.common import make_result, percentile
+from benchmarks.compare import compare_reports
+
+
+class TestBenchmarkHelpers(unittest.TestCase):
+
+    def test_percentile_interpolates(self):
+        values = [4.0, 1.0, 3.0, 2.0]
+        self.assertEqual(percentile(values, 0), 1.0)
+        self.assertEqual(percentile(values, 100), 4.0)
+        self.assertAlmostEqual(percentile(values, 50), 2.5)
+        with self.assertRaises(ValueError):
+            percentile([], 50)
+
+    def test_compare_reports_flags_regressions_by_params(self):
+        baseline = {"results": [
+            make_result("history", "save_message", [1.0, 1.0], {"messages": 1000}),
+            make_result("history", "save_message", [2.0, 2.0], {"messages": 10000}),
+            {"suite": "orchestrator", "name": "start_run", "params": {}, "skipped": True, "reason": "n/a"},
+        ]}
+        candidate = {"results": [
+            make_result("history", "save_message", [1.5, 1.5], {"messages": 1000}),
+            make_result("history", "save_message", [1.0, 1.0], {"messages": 10000}),
+        ]}
+
+        rows = compare_reports(baseline, candidate, metric="p50", threshold=0.1)
+
+        by_size = {row["params"]["messages"]: row for row in rows}
+        self.assertEqual(set(by_size), {1000, 10000})
+        self.assertEqual(by_size[1000]["status"], "regression")
+        self.assertAlmostEqual(by_size[1000]["change"], 0.5)
+        self.assertEqual(by_size[10000]["status"], "improvement")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -77,7 +77,7 @@ class TestClaudeConnector(unittest.IsolatedAsyncioTestCase):
         self.MockAsyncAnthropicClient.assert_called_once_with(
             api_key=self.mock_api_key,
             timeout=self.base_config["request_timeout"],
-            custom_headers=expected_custom_headers
+            default_headers=expected_custom_headers
         )
         self.assertTrue(hasattr(self.connector, "logger"), "Connector should have a logger attribute")
 
@@ -85,6 +85,10 @@ class TestCLI(unittest.TestCase):
         self.assertIn("Available commands:", output)
         self.assertIn("set-model <provider_id>", output) # Check for new commands in help
         self.assertIn("get-model", output)
+        lines = output.splitlines()
+        for command in ("gh_ls", "gh_read", "gh_find", "gh_fetch", "gh_mirror", "gh_branches", "gh_download"):
+            index = next(i for i, line in enumerate(lines) if line.strip().startswith(command + " "))
+            self.assertIn(f"Example: {command} ", lines[index + 1])  # Each example sits under its own command
 
 
     @patch('jarules_agent.connectors.github_connector.GitHubClient')
@@ -98,6 +102,29 @@ class TestCLI(unittest.TestCase):
         self.assertIn("Exiting JaRules CLI. Goodbye!", output)
         self.assertEqual(mock_input.call_count, 1)
 
+    @patch('jarules_agent.connectors.github_connector.GitHubClient')
+    @patch('jarules_agent.ui.cli.LLMManager')
+    @patch('builtins.input')
+    def test_config_changes_are_reloaded_before_each_command(self, mock_input, MockLLMManagerClass, MockGitHubClientClass):
+        from unittest.mock import AsyncMock
+        mock_llm_manager, _, _ = self._setup_cli_mocks(MockLLMManagerClass, MockGitHubClientClass)
+        mock_llm_manager.reload_if_changed.side_effect = [
+            {"added": ["new"], "removed": [], "changed": ["ollama_default_local"], "unchanged": ["keep"]},
+            LLMConfigError("bad yaml"),
+            None,
+        ]
+        mock_llm_manager.drain_retired_connectors = AsyncMock(return_value=1)
+
+        mock_input.side_effect = ["get-model", "get-model", "exit"]
+        run_cli()
+        output = self.mock_stdout.getvalue()
+
+        self.assertEqual(mock_llm_manager.reload_if_changed.call_count, 3)
+        mock_llm_manager.drain_retired_connectors.assert_awaited_once()
+        self.assertIn("LLM configuration reloaded (added: new; changed: ollama_default_local).", output)
+        self.assertIn("Ignoring invalid change to the LLM configuration: bad yaml", output)
+        self.assertEqual(output.count("Currently active model configuration:"), 2)
+
     # Helper (if not already present or adapt existing setup for mocks)
     def _setup_cli_mocks(self, MockLLMManagerClass, MockGitHubClientClass, llm_client_spec=BaseLLMConnector, llm_model_name="mocked-model"):
         # Create a consistent mock for GitHubClient that can be used and configured
@@ -106,6 +133,7 @@ class TestCLI(unittest.TestCase):
         
         mock_llm_manager_instance = MockLLMManagerClass.return_value
         mock_llm_manager_instance.active_provider_id = "test_default_active_id" # Simulate an active provider
+        mock_llm_manager_instance.reload_if_changed.return_value = None # Config file unchanged on disk
 
         mock_active_llm_client = MagicMock(spec=llm_client_spec)
         if llm_model_name is not None:
@@ -793,5 +821,82 @@ class TestCLI(unittest.TestCase):
         mock_gh_instance.read_repo_file.assert_called_once_with(owner='owner', repo='repo', file_path='path/to/file.txt')
         self.assertIn("Content of 'owner/repo/path/to/file.txt':", output)
 
+    @patch('builtins.input')
+    @patch('jarules_agent.connectors.github_connector.GitHubClient')
+    @patch('jarules_agent.ui.cli.LLMManager')
+    def test_gh_find_success(self, MockLLMManagerClass, MockGitHubClientClass, mock_input):
+        _, _, mock_gh_instance = self._setup_cli_mocks(MockLLMManagerClass, MockGitHubClientClass)
+        mock_gh_instance.get_repo_tree_index.return_value.glob.return_value = ['docs/a.md', 'README.md']
+        mock_input.side_effect = ['gh_find owner/repo@dev "**/*.md"', "exit"]
+        run_cli()
+        output = self.mock_stdout.getvalue()
+        mock_gh_instance.get_repo_tree_index.assert_called_once_with(owner='owner', repo='repo', branch_name='dev')
+        mock_gh_instance.get_repo_tree_index.return_value.glob.assert_called_once_with('**/*.md')
+        self.assertIn("2 path(s) matching '**/*.md':", output)
+        self.assertIn("  docs/a.md", output)
+
+    @patch('builtins.input')
+    @patch('jarules_agent.connectors.github_connector.GitHubClient')
+    @patch('jarules_agent.ui.cli.LLMManager')
+    def test_gh_find_usage(self, MockLLMManagerClass, MockGitHubClientClass, mock_input):
+        _, _, mock_gh_instance = self._setup_cli_mocks(MockLLMManagerClass, MockGitHubClientClass)
+        mock_input.side_effect = ["gh_find owner", "exit"]
+        run_cli()
+        self.assertIn("Usage: gh_find <owner>/<repo>[@<branch>] <pattern>", self.mock_stdout.getvalue())
+        mock_gh_instance.get_repo_tree_index.assert_not_called()
+
+    @patch('builtins.input')
+    @patch('jarules_agent.connectors.github_connector.GitHubClient')
+    @patch('jarules_agent.ui.cli.LLMManager')
+    def test_gh_fetch_success(self, MockLLMManagerClass, MockGitHubClientClass, mock_input):
+        _, _, mock_gh_instance = self._setup_cli_mocks(MockLLMManagerClass, MockGitHubClientClass)
+        mock_gh_instance.fetch_repo_snapshot.return_value = "abc123"
+        mock_input.side_effect = ["gh_fetch owner/repo@dev", "gh_fetch owner", "exit"]
+        run_cli()
+        output = self.mock_stdout.getvalue()
+        mock_gh_instance.fetch_repo_snapshot.assert_called_once_with(owner='owner', repo='repo', ref='dev')
+        self.assertIn("Snapshot of 'owner/repo' at abc123 is ready", output)
+        self.assertIn("Usage: gh_fetch <owner>/<repo>[@<ref>]", output)
+
+    @patch('builtins.input')
+    @patch('jarules_agent.connectors.github_connector.GitHubClient')
+    @patch('jarules_agent.ui.cli.LLMManager')
+    def test_gh_mirror(self, MockLLMManagerClass, MockGitHubClientClass, mock_input):
+        _, _, mock_gh_instance = self._setup_cli_mocks(MockLLMManagerClass, MockGitHubClientClass)
+        mock_gh_instance.mirror_repo.return_value = "abc123"
+        mock_input.side_effect = ["gh_mirror owner/repo", "gh_mirror owner", "exit"]
+        run_cli()
+        output = self.mock_stdout.getvalue()
+        mock_gh_instance.mirror_repo.assert_called_once_with(owner='owner', repo='repo')
+        self.assertIn("Mirror of 'owner/repo' is at abc123", output)
+        self.assertIn("Usage: gh_mirror <owner>/<repo>", output)
+
+    @patch('builtins.input')
+    @patch('jarules_agent.connectors.github_connector.GitHubClient')
+    @patch('jarules_agent.ui.cli.LLMManager')
+    def test_gh_branches(self, MockLLMManagerClass, MockGitHubClientClass, mock_input):
+        _, _, mock_gh_instance = self._setup_cli_mocks(MockLLMManagerClass, MockGitHubClientClass)
+        mock_gh_instance.iter_branches.return_value = iter([{"name": "main"}, {"name": "dev"}])
+        mock_input.side_effect = ["gh_branches owner/repo", "gh_branches owner", "exit"]
+        run_cli()
+        output = self.mock_stdout.getvalue()
+        mock_gh_instance.iter_branches.assert_called_once_with(owner='owner', repo='repo')
+        self.assertIn("  main\n  dev\n2 branch(es).", output)
+        self.assertIn("Usage: gh_branches <owner>/<repo>", output)
+
+    @patch('builtins.input')
+    @patch('jarules_agent.connectors.github_connector.GitHubClient')
+    @patch('jarules_agent.ui.cli.LLMManager')
+    def test_gh_download(self, MockLLMManagerClass, MockGitHubClientClass, mock_input):
+        _, _, mock_gh_instance = self._setup_cli_mocks(MockLLMManagerClass, MockGitHubClientClass)
+        mock_gh_instance.download_repo_file.return_value = 2048
+        mock_input.side_effect = ['gh_download owner/repo/img/logo.png "out/logo.png"', "gh_download owner/repo", "exit"]
+        run_cli()
+        output = self.mock_stdout.getvalue()
+        mock_gh_instance.download_repo_file.assert_called_once_with(owner='owner', repo='repo', file_path='img/logo.png',
+                                                                    destination='out/logo.png')
+        self.assertIn("Downloaded 2048 bytes to 'out/logo.png'.", output)
+        self.assertIn("Usage: gh_download <owner>/<repo>/<file_path> <local_path>", output)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from jarules_agent.electron_bridge import file_content_server
+from jarules_agent.tests.test_git_utils import _git, make_test_repo
+
+
+class TestFileContentServer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        make_test_repo(self.repo)
+        self.run_id = "12345678-run"
+        _git(self.repo, "branch", "agent-a1-12345678")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def _serve(self, requests):
+        stream = asyncio.StreamReader()
+        for request in requests:
+            stream.feed_data((request if isinstance(request, str) else json.dumps(request)).encode() + b"\n")
+        stream.feed_eof()
+        responses = []
+        await file_content_server.serve(stream, responses.append)
+        return {response["id"]: response for response in responses}
+
+    async def test_serves_file_content_by_request_id(self):
+        base = {"command": "get_file_content", "runId": self.run_id, "agentId": "a1", "repoPath": self.repo}
+        responses = await self._serve([
+            {"id": 1, **base, "filePath": "README.md"},
+            {"id": 2, **base, "filePath": "missing.txt"},
+            {"id": 3, **base, "filePath": "README.md"},
+            {"id": 4, "command": "cache_info"},
+            {"id": 5, "command": "get_file_content", "runId": self.run_id},
+            {"id": 6, "command": "bogus"},
+            "not json",
+        ])
+
+        self.assertEqual(responses[1], {"id": 1, "success": True, "content": "test repository\n"})
+        self.assertFalse(responses[2]["success"])
+        self.assertIn("Could not read file from branch", responses[2]["error"])
+        self.assertEqual(responses[3]["content"], "test repository\n")
+        self.assertTrue(responses[4]["success"])
+        self.assertIn("Missing fields", responses[5]["error"])
+        self.assertIn("Unknown command", responses[6]["error"])
+        self.assertFalse(responses[None]["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
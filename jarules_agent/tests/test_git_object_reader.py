@@ -0,0 +1,86 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from jarules_agent.git_task_runners.git_object_reader import GitObjectReader
+from jarules_agent.git_task_runners.git_utils import GitError
+from jarules_agent.tests.test_git_utils import _git, make_test_repo
+
+
+class TestGitObjectReader(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        make_test_repo(self.repo)
+        _git(self.repo, "checkout", "-q", "-b", "agent-a")
+        os.makedirs(os.path.join(self.repo, "src"))
+        for i in range(20):
+            with open(os.path.join(self.repo, "src", f"file_{i}.txt"), "w") as f:
+                f.write(f"contents {i}\n" * (i + 1))
+        with open(os.path.join(self.repo, "binary.bin"), "wb") as f:
+            f.write(bytes(range(256)))
+        _git(self.repo, "add", ".")
+        _git(self.repo, "commit", "-q", "-m", "agent work")
+        _git(self.repo, "checkout", "-q", "main")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def test_reads_blobs_and_caches_by_object_id(self):
+        async with GitObjectReader(self.repo) as reader:
+            self.assertEqual(await reader.read_blob("agent-a:src/file_1.txt"), b"contents 1\ncontents 1\n")
+            self.assertEqual(await reader.read_blob("agent-a:binary.bin"), bytes(range(256)))
+            self.assertEqual(await reader.read_blob("agent-a:src/file_1.txt"), b"contents 1\ncontents 1\n")
+            self.assertEqual(await reader.read_blob("main:README.md"), b"test repository\n")
+            info = reader.cache_info()
+
+        self.assertEqual((info["hits"], info["misses"], info["entries"]), (1, 3, 3))
+
+    async def test_concurrent_requests_share_one_process_and_keep_order(self):
+        async with GitObjectReader(self.repo) as reader:
+            names = [f"agent-a:src/file_{i}.txt" for i in range(20)]
+            results = await asyncio.gather(*(reader.read_blob(name) for name in names))
+            pids = {reader._check._process.pid, reader._contents._process.pid}
+
+        self.assertEqual(results, [(f"contents {i}\n" * (i + 1)).encode() for i in range(20)])
+        self.assertEqual(len(pids), 2)
+
+    async def test_missing_and_non_blob_objects_raise(self):
+        async with GitObjectReader(self.repo) as reader:
+            self.assertIsNone(await reader.resolve("agent-a:nope.txt"))
+            with self.assertRaises(GitError):
+                await reader.read_blob("agent-a:nope.txt")
+            with self.assertRaises(GitError):
+                await reader.read_blob("agent-a:src")
+            with self.assertRaises(GitError):
+                await reader.read_blob("agent-a:bad\nname")
+            # The process survives errors and keeps serving.
+            self.assertEqual(await reader.read_blob("main:README.md"), b"test repository\n")
+
+    async def test_branch_moves_are_seen_and_lru_evicts(self):
+        reader = GitObjectReader(self.repo, cache_max_bytes=40)
+        try:
+            self.assertEqual(await reader.read_blob("main:README.md"), b"test repository\n")
+            with open(os.path.join(self.repo, "README.md"), "w") as f:
+                f.write("updated readme\n")
+            _git(self.repo, "commit", "-q", "-am", "update")
+            self.assertEqual(await reader.read_blob("main:README.md"), b"updated readme\n")
+            await reader.read_blob("agent-a:src/file_0.txt")
+            self.assertLessEqual(reader.cache_info()["bytes"], 40)
+            self.assertEqual(reader.cache_info()["entries"], 2)  # Oldest README version was evicted
+        finally:
+            await reader.close()
+
+    async def test_restarts_after_close(self):
+        reader = GitObjectReader(self.repo)
+        await reader.read_blob("main:README.md")
+        await reader.close()
+        self.assertEqual(await reader.read_blob("agent-a:src/file_2.txt"), b"contents 2\n" * 3)
+        await reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
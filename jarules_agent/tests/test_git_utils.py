@@ -0,0 +1,205 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from jarules_agent.git_task_runners import git_utils
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def make_test_repo(path):
+    """Initialises a repository at `path` with one commit on 'main'."""
+    os.makedirs(path, exist_ok=True)
+    _git(path, "init", "-q", "-b", "main")
+    _git(path, "config", "user.email", "test@example.com")
+    _git(path, "config", "user.name", "Test")
+    with open(os.path.join(path, "README.md"), "w") as f:
+        f.write("test repository\n")
+    _git(path, "add", "README.md")
+    _git(path, "commit", "-q", "-m", "initial")
+
+
+class TestGitWorktrees(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        make_test_repo(self.repo)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_add_worktree_creates_branch_without_touching_main_checkout(self):
+        worktree = os.path.join(self.temp_dir, "worktrees", "agent1")
+
+        result = git_utils.add_worktree(worktree, "agent-1", base_branch_name="main", repo_path=self.repo)
+
+        self.assertEqual(result, os.path.abspath(worktree))
+        self.assertTrue(os.path.isfile(os.path.join(worktree, "README.md")))
+        self.assertEqual(git_utils.get_current_branch(repo_path=worktree), "agent-1")
+        self.assertEqual(git_utils.get_current_branch(repo_path=self.repo), "main")
+        self.assertIn(os.path.realpath(worktree), [os.path.realpath(p) for p in git_utils.list_worktrees(repo_path=self.repo)])
+
+    def test_commits_in_separate_worktrees_do_not_interfere(self):
+        first = git_utils.add_worktree(os.path.join(self.temp_dir, "wt", "a"), "agent-a", "main", repo_path=self.repo)
+        second = git_utils.add_worktree(os.path.join(self.temp_dir, "wt", "b"), "agent-b", "main", repo_path=self.repo)
+        for worktree, name in ((first, "a.txt"), (second, "b.txt")):
+            with open(os.path.join(worktree, name), "w") as f:
+                f.write(name)
+            git_utils.commit_changes(f"add {name}", repo_path=worktree, file_patterns_to_add=[name])
+
+        self.assertEqual(_git(self.repo, "ls-tree", "--name-only", "agent-a").split(), ["README.md", "a.txt"])
+        self.assertEqual(_git(self.repo, "ls-tree", "--name-only", "agent-b").split(), ["README.md", "b.txt"])
+        self.assertEqual(_git(self.repo, "status", "--porcelain"), "")
+
+    def test_add_worktree_missing_base_branch_raises(self):
+        with self.assertRaises(git_utils.GitError) as cm:
+            git_utils.add_worktree(os.path.join(self.temp_dir, "wt"), "agent-x", "no-such-base", repo_path=self.repo)
+        self.assertIn("no-such-base", str(cm.exception))
+        self.assertFalse(git_utils.branch_exists("agent-x", repo_path=self.repo))
+
+    def test_remove_worktree_keeps_branch_and_allows_deletion(self):
+        worktree = git_utils.add_worktree(os.path.join(self.temp_dir, "wt"), "agent-1", "main", repo_path=self.repo)
+        with open(os.path.join(worktree, "untracked.txt"), "w") as f:
+            f.write("dirty")
+
+        git_utils.remove_worktree(worktree, force=True, repo_path=self.repo)
+        git_utils.prune_worktrees(repo_path=self.repo)
+
+        self.assertFalse(os.path.exists(worktree))
+        self.assertEqual(len(git_utils.list_worktrees(repo_path=self.repo)), 1)
+        self.assertTrue(git_utils.branch_exists("agent-1", repo_path=self.repo))
+        git_utils.delete_branch("agent-1", force=True, repo_path=self.repo)
+        self.assertFalse(git_utils.branch_exists("agent-1", repo_path=self.repo))
+
+
+class TestBatchedRefOperations(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        make_test_repo(self.repo)
+        for name in ("agent-a-run1", "agent-b-run1", "agent-c-run2"):
+            _git(self.repo, "branch", name)
+        self.head = _git(self.repo, "rev-parse", "HEAD")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_list_refs_snapshots_matching_refs(self):
+        refs = git_utils.list_refs(["refs/heads/agent-*-run1", "refs/heads/main"], repo_path=self.repo)
+        self.assertEqual(refs, {"refs/heads/agent-a-run1": self.head, "refs/heads/agent-b-run1": self.head,
+                                "refs/heads/main": self.head})
+
+    def test_delete_branches_uses_two_processes(self):
+        with patch.object(git_utils, "_run_git_command", wraps=git_utils._run_git_command) as run:
+            deleted = git_utils.delete_branches(["agent-a-run1", "agent-b-run1", "missing"], repo_path=self.repo)
+
+        self.assertEqual(deleted, ["agent-a-run1", "agent-b-run1"])
+        self.assertEqual([call.args[0][1] for call in run.call_args_list], ["for-each-ref", "update-ref"])
+        self.assertEqual(sorted(git_utils.list_refs(repo_path=self.repo)), ["refs/heads/agent-c-run2", "refs/heads/main"])
+
+    def test_delete_refs_is_atomic_and_checks_old_value(self):
+        refs = git_utils.list_refs(["refs/heads/agent-*"], repo_path=self.repo)
+        _git(self.repo, "commit", "-q", "--allow-empty", "-m", "moves main")
+        _git(self.repo, "branch", "-f", "agent-b-run1", "main")  # agent-b moved after the snapshot
+
+        with self.assertRaises(git_utils.GitError):
+            git_utils.delete_refs(refs, repo_path=self.repo)
+
+        self.assertEqual(len(git_utils.list_refs(["refs/heads/agent-*"], repo_path=self.repo)), 3)
+
+    def test_empty_inputs_spawn_nothing(self):
+        with patch.object(git_utils, "_run_git_command") as run:
+            self.assertEqual(git_utils.delete_branches([], repo_path=self.repo), [])
+            git_utils.delete_refs({}, repo_path=self.repo)
+        run.assert_not_called()
+
+
+class TestGitUtilsAsync(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        make_test_repo(self.repo)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def test_basic_queries(self):
+        self.assertEqual(await git_utils.get_current_branch_async(repo_path=self.repo), "main")
+        self.assertTrue(await git_utils.branch_exists_async("main", repo_path=self.repo))
+        self.assertFalse(await git_utils.branch_exists_async("missing", repo_path=self.repo))
+
+    async def test_failed_command_raises_git_error(self):
+        with self.assertRaises(git_utils.GitError) as cm:
+            await git_utils._run_git_command_async(['git', 'checkout', 'missing'], cwd=self.repo)
+        self.assertIn("failed with exit code", str(cm.exception))
+        result = await git_utils._run_git_command_async(['git', 'checkout', 'missing'], cwd=self.repo, check_return_code=False)
+        self.assertNotEqual(result.returncode, 0)
+
+    async def test_worktree_lifecycle_and_batch_branch_delete(self):
+        paths = [await git_utils.add_worktree_async(os.path.join(self.temp_dir, "wt", f"a{i}"), f"agent-{i}", "main",
+                                                    repo_path=self.repo) for i in range(3)]
+        self.assertEqual(len(await git_utils.list_worktrees_async(repo_path=self.repo)), 4)
+
+        await asyncio.gather(*(git_utils.remove_worktree_async(p, repo_path=self.repo) for p in paths))
+        await git_utils.prune_worktrees_async(repo_path=self.repo)
+        deleted = await git_utils.delete_branches_async(["agent-0", "agent-1", "agent-2", "never-created"],
+                                                        repo_path=self.repo)
+
+        self.assertEqual(deleted, ["agent-0", "agent-1", "agent-2"])
+        self.assertEqual(len(await git_utils.list_worktrees_async(repo_path=self.repo)), 1)
+        self.assertEqual(await git_utils.delete_branches_async(["never-created"], repo_path=self.repo), [])
+
+    async def test_async_ref_batch_matches_sync(self):
+        for name in ("agent-1", "agent-2"):
+            _git(self.repo, "branch", name)
+        refs = await git_utils.list_refs_async(["refs/heads/agent-*"], repo_path=self.repo)
+        self.assertEqual(sorted(refs), ["refs/heads/agent-1", "refs/heads/agent-2"])
+
+        await git_utils.delete_refs_async(refs, repo_path=self.repo)
+
+        self.assertEqual(await git_utils.list_refs_async(["refs/heads/agent-*"], repo_path=self.repo), {})
+
+    async def test_concurrency_is_bounded(self):
+        active, peak = 0, 0
+        original_exec = asyncio.create_subprocess_exec
+
+        async def tracking_exec(*args, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                process = await original_exec(*args, **kwargs)
+                original_communicate = process.communicate
+
+                async def communicate(input=None):
+                    try:
+                        await asyncio.sleep(0.01)
+                        return await original_communicate(input)
+                    finally:
+                        nonlocal active
+                        active -= 1
+                process.communicate = communicate
+                return process
+            except Exception:
+                active -= 1
+                raise
+
+        with patch.object(git_utils, "ASYNC_GIT_CONCURRENCY", 2), \
+             patch("asyncio.create_subprocess_exec", side_effect=tracking_exec):
+            results = await asyncio.gather(*(git_utils.branch_exists_async("main", repo_path=self.repo) for _ in range(8)))
+
+        self.assertEqual(results, [True] * 8)
+        self.assertLessEqual(peak, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+# jarules_agent/tests/test_github_async_connector.py
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import httpx
+
+from jarules_agent.connectors.github_async_connector import AsyncGitHubClient
+from jarules_agent.connectors.github_http_cache import GitHubHttpCache
+
+BASE = "https://api.github.com/repos/o/r"
+
+
+class FakeGitHub:
+    """Answers GitHub REST calls for one repository from memory, recording requests and peak concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.files = {"README.md": "hello", "src/app.py": "print('hi')\n"}
+        self.large_files = {}
+        self.directories = {}  # Directory path -> entry names the contents API returns for it
+        self.commit_tree = []  # Entries of the recursive tree of commit-1
+        self.commit_tree_truncated = False
+        self.base_blobs = {}
+        self.blobs = {}
+
+    async def handler(self, request):
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.respond(request)
+        finally:
+            self.in_flight -= 1
+
+    def respond(self, request):
+        if request.url.host == "raw.githubusercontent.com":
+            return httpx.Response(200, text=self.large_files[request.url.path.split("/main/", 1)[1]])
+        path = request.url.path.replace("/repos/o/r", "", 1)
+        if request.method == "GET" and path.startswith("/contents/"):
+            name = path[len("/contents/"):]
+            if name in self.directories:
+                return httpx.Response(200, json=[{"name": entry, "type": "file"} for entry in self.directories[name]])
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            if name in self.large_files:
+                return httpx.Response(200, json={"type": "file", "content": "", "encoding": "none",
+                                                 "download_url": f"https://raw.githubusercontent.com/o/r/main/{name}"})
+            if name not in self.files:
+                return httpx.Response(404, json={"message": "Not Found"})
+            content = base64.b64encode(self.files[name].encode("utf-8")).decode("ascii")
+            return httpx.Response(200, json={"type": "file", "content": content}, headers={"ETag": '"v1"'})
+        if request.method == "GET" and path.startswith("/git/refs/heads/"):
+            if path.endswith("/main"):
+                return httpx.Response(200, json={"object": {"sha": "commit-1"}})
+            return httpx.Response(404, json={"message": "Not Found"})
+        if request.method == "GET" and path == "":
+            return httpx.Response(200, json={"default_branch": "main"})
+        if request.method == "GET" and path == "/git/trees/commit-1":
+            return httpx.Response(200, json={"sha": "tree-1", "tree": self.commit_tree, "truncated": self.commit_tree_truncated})
+        if request.method == "GET" and path == "/git/commits/commit-1":
+            return httpx.Response(200, json={"tree": {"sha": "tree-1"}})
+        if request.method == "GET" and path == "/git/trees/tree-1":
+            tree = [{"path": name, "type": "blob", "mode": "100644", "sha": sha} for name, sha in self.base_blobs.items()]
+            return httpx.Response(200, json={"sha": "tree-1", "tree": tree, "truncated": False})
+        if request.method == "POST" and path == "/git/blobs":
+            body = json.loads(request.read())
+            sha = f"blob-{len(self.blobs)}"
+            self.blobs[sha] = body
+            return httpx.Response(201, json={"sha": sha})
+        if request.method == "POST" and path == "/git/trees":
+            self.tree = json.loads(request.read())
+            return httpx.Response(201, json={"sha": "tree-2"})
+        if request.method == "POST" and path == "/git/commits":
+            return httpx.Response(201, json={"sha": "commit-2", "tree": {"sha": "tree-2"}})
+        if request.method == "PATCH" and path == "/git/refs/heads/main":
+            return httpx.Response(200, json={"object": {"sha": "commit-2"}})
+        if request.method == "POST" and path == "/git/refs":
+            return httpx.Response(422, json={"message": "Reference already exists"})
+        if request.method == "POST" and path == "/pulls":
+            return httpx.Response(422, json={"message": "Validation Failed",
+                                             "errors": [{"message": "No commits between main and main"}]})
+        return httpx.Response(500, json={"message": f"Unexpected {request.method} {path}"})
+
+
+class TestAsyncGitHubClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.github = FakeGitHub(delay=0.01)
+        self.client = AsyncGitHubClient(token="token-a", use_cache=False, http2=False,
+                                        transport=httpx.MockTransport(self.github.handler))
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_read_and_list(self):
+        self.assertEqual(await self.client.read_repo_file("o", "r", "README.md"), "hello")
+        self.assertIsNone(await self.client.read_repo_file("o", "r", "missing.txt"))
+        self.assertEqual(await self.client.get_branch_sha("o", "r", "main"), "commit-1")
+        self.assertIsNone(await self.client.get_branch_sha("o", "r", "gone"))
+        self.assertEqual(self.github.requests[0].headers["Authorization"], "token token-a")
+
+    async def test_large_directories_are_listed_from_the_git_tree(self):
+        limit = AsyncGitHubClient.CONTENTS_LISTING_LIMIT
+        names = [f"f{i:04d}.txt" for i in range(limit + 5)]
+        self.github.directories["big"] = names[:limit]  # The contents API stops at its limit
+        self.github.commit_tree = [{"path": f"big/{name}", "type": "blob"} for name in names]
+        self.github.directories["small"] = ["a.txt"]
+
+        self.assertEqual(await self.client.list_repo_files("o", "r", "small"), ["a.txt"])
+        self.assertEqual(len(self.github.requests), 1)
+        self.assertEqual(sorted(await self.client.list_repo_files("o", "r", "big")), names)
+
+        self.github.requests.clear()
+        self.github.commit_tree_truncated = True
+        self.assertEqual(await self.client.list_repo_files("o", "r", "big"), names[:limit])
+        self.assertEqual(len(self.github.requests), 4)  # Contents, repository, branch, tree: no level-by-level walk
+
+    async def test_files_over_one_megabyte_are_read_from_download_url(self):
+        self.github.large_files["big.txt"] = "x" * 2048
+
+        self.assertEqual(await self.client.read_repo_file("o", "r", "big.txt"), "x" * 2048)
+        self.assertEqual(self.github.requests[-1].url.host, "raw.githubusercontent.com")
+
+    async def test_concurrent_fan_out_is_bounded(self):
+        self.github.files.update({f"f{i}.txt": f"file {i}" for i in range(12)})
+        paths = [f"f{i}.txt" for i in range(12)] + ["missing.txt"]
+
+        contents = await self.client.read_repo_files("o", "r", paths, concurrency=4)
+
+        self.assertEqual(contents["f7.txt"], "file 7")
+        self.assertIsNone(contents["missing.txt"])
+        self.assertEqual(list(contents), paths)
+        self.assertEqual(self.github.max_in_flight, 4)
+
+    async def test_commit_files_inlines_reuses_and_uploads_concurrently(self):
+        unchanged = b"\x00same"
+        self.github.base_blobs["same.bin"] = hashlib.sha1(b"blob %d\x00" % len(unchanged) + unchanged).hexdigest()
+        binary = bytes(range(256)) * 4
+        file_changes = [
+            {"path": "small.txt", "content": "small"},
+            {"path": "a.bin", "content": binary},
+            {"path": "b.bin", "content": binary[::-1]},
+            {"path": "same.bin", "content": unchanged},
+        ]
+
+        success, result = await self.client.commit_files("o", "r", "main", file_changes, "Msg")
+
+        self.assertTrue(success, result)
+        self.assertEqual(result["sha"], "commit-2")
+        self.assertEqual(len(self.github.blobs), 2)
+        self.assertIn({"encoding": "base64", "content": base64.b64encode(binary).decode("ascii")}, self.github.blobs.values())
+        tree = {element["path"]: element for element in self.github.tree["tree"]}
+        self.assertEqual(tree["small.txt"]["content"], "small")
+        self.assertEqual(tree["same.bin"]["sha"], self.github.base_blobs["same.bin"])
+        self.assertEqual({tree["a.bin"]["sha"], tree["b.bin"]["sha"]}, {"blob-0", "blob-1"})
+        self.assertEqual(self.github.max_in_flight, 2)  # The two uploads overlapped
+
+    async def test_errors_are_reported_like_the_sync_client(self):
+        success, result = await self.client.create_branch("o", "r", "feature", "main")
+        self.assertFalse(success)
+        self.assertEqual(result["reason"], "branch_already_exists_or_invalid_sha")
+
+        success, result = await self.client.create_pull_request("o", "r", "main", "main", "Title")
+        self.assertFalse(success)
+        self.assertEqual(result["reason"], "no_diff")
+        self.assertEqual(result["specific_error"], "No commits between main and main")
+
+        success, result = await self.client.commit_files("o", "r", "gone", [{"path": "a", "content": "b"}], "Msg")
+        self.assertFalse(success)
+        self.assertEqual(result["step"], "get_branch_sha")
+
+    async def test_not_modified_responses_are_served_from_the_http_cache(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        cache = GitHubHttpCache(os.path.join(temp_dir, "cache.sqlite3"))
+        self.addCleanup(cache.close)
+        async with AsyncGitHubClient(token="token-a", http_cache=cache, http2=False,
+                                     transport=httpx.MockTransport(self.github.handler)) as client:
+            self.assertEqual(await client.read_repo_file("o", "r", "README.md"), "hello")
+            self.assertEqual(await client.read_repo_file("o", "r", "README.md"), "hello")
+        self.assertEqual(self.github.requests[1].headers["If-None-Match"], '"v1"')
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    async def test_http_cache_calls_run_off_the_event_loop(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        cache = GitHubHttpCache(os.path.join(temp_dir, "cache.sqlite3"))
+        self.addCleanup(cache.close)
+        calls = []
+
+        def recording(name, method):
+            def call(*args):
+                calls.append((name, threading.get_ident()))
+                return method(*args)
+            return call
+
+        for name in ("get", "put", "touch"):
+            setattr(cache, name, recording(name, getattr(cache, name)))
+        async with AsyncGitHubClient(token="token-a", http_cache=cache, http2=False,
+                                     transport=httpx.MockTransport(self.github.handler)) as client:
+            await client.read_repo_file("o", "r", "README.md")
+            await client.read_repo_file("o", "r", "README.md")
+
+        self.assertEqual([name for name, _ in calls], ["get", "put", "get", "touch"])
+        self.assertNotIn(threading.get_ident(), {thread for _, thread in calls})
+
+
+if __name__ == '__main__':
+    unittest.main()
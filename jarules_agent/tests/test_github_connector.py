@@ -3,6 +3,12 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import base64
+import io
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 import requests # For requests.exceptions.RequestException
 
 # Adjust import path
@@ -12,11 +18,13 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 try:
     from jarules_agent.connectors.github_connector import GitHubClient
+    from jarules_agent.connectors.github_tree_index import RepoTreeIndex
 except ModuleNotFoundError:
     # This path adjustment might be necessary if the above doesn't work in all execution contexts
     # e.g. if CWD is 'jarules_agent'
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from connectors.github_connector import GitHubClient
+    from connectors.github_tree_index import RepoTreeIndex
 
 
 class TestGitHubClient(unittest.TestCase):
@@ -60,6 +68,42 @@ class TestGitHubClient(unittest.TestCase):
         self.assertEqual(files, expected_files)
         mock_request.assert_called_once_with("GET", f"https://api.github.com/repos/{self.owner}/{self.repo}/contents/some/path")
 
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    def test_list_repo_files_uses_an_index_already_built_for_the_branch(self, mock_request):
+        """Test that a cached tree index answers listings while the branch has not moved."""
+        self.client_no_token._tree_indexes[(self.owner, self.repo, "main")] = RepoTreeIndex("commit-1", [
+            {'path': 'docs/a.md', 'type': 'blob'}, {'path': 'docs/img', 'type': 'tree'}])
+        repo_details = self.MockResponse({"default_branch": "main"}, 200)
+        mock_request.side_effect = [repo_details, self.MockResponse({"object": {"sha": "commit-1"}}, 200),
+                                    repo_details, self.MockResponse({"object": {"sha": "commit-2"}}, 200),
+                                    self.MockResponse([{'name': 'b.md'}], 200)]
+
+        self.assertEqual(self.client_no_token.list_repo_files(self.owner, self.repo, "docs"), ['a.md', 'img'])
+        self.assertEqual(self.client_no_token.list_repo_files(self.owner, self.repo, "docs"), ['b.md'])  # Branch moved
+        self.assertEqual(mock_request.call_count, 5)
+        self.assertTrue(mock_request.call_args_list[-1].args[1].endswith("/contents/docs"))
+
+    def test_list_repo_files_does_not_walk_truncated_trees(self):
+        """Test that a large directory in a truncated tree falls back to the contents listing."""
+        self.client_no_token.CONTENTS_LISTING_LIMIT = 2
+        responses = {
+            "/contents/big": self.MockResponse([{'name': 'a'}, {'name': 'b'}], 200),
+            f"/repos/{self.owner}/{self.repo}": self.MockResponse({"default_branch": "main"}, 200),
+            "/git/refs/heads/main": self.MockResponse({"object": {"sha": "commit-1"}}, 200),
+            "/git/trees/commit-1": self.MockResponse({"sha": "tree-1", "tree": [], "truncated": True}, 200),
+        }
+        requested = []
+
+        def fake_request(method, url, **kwargs):
+            requested.append(url)
+            return next(response for suffix, response in responses.items() if url.endswith(suffix))
+
+        with patch.object(GitHubClient, "_request", side_effect=fake_request), \
+                patch('sys.stdout', new_callable=io.StringIO):
+            self.assertEqual(self.client_no_token.list_repo_files(self.owner, self.repo, "big"), ['a', 'b'])
+        self.assertEqual(len(requested), 4)
+        self.assertEqual(self.client_no_token._tree_indexes, {})
+
     @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
     def test_list_repo_files_api_error(self, mock_request):
         """Test listing repository files when API returns an error."""
@@ -99,6 +143,17 @@ class TestGitHubClient(unittest.TestCase):
         self.assertEqual(content, file_content)
         mock_request.assert_called_once_with("GET", f"https://api.github.com/repos/{self.owner}/{self.repo}/contents/path/to/script.py")
 
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    def test_read_repo_file_at_ref(self, mock_request):
+        """Test that a ref is passed as the contents API's ref parameter."""
+        encoded_content = base64.b64encode(b"dev version").decode('utf-8')
+        mock_request.return_value = self.MockResponse(json_data={'type': 'file', 'content': encoded_content}, status_code=200)
+
+        content = self.client_no_token.read_repo_file(self.owner, self.repo, "README.md", ref="dev")
+        self.assertEqual(content, "dev version")
+        mock_request.assert_called_once_with("GET", f"https://api.github.com/repos/{self.owner}/{self.repo}/contents/README.md",
+                                             params={"ref": "dev"})
+
     @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
     def test_read_repo_file_uses_download_url(self, mock_request):
         """Test reading file content using download_url if 'content' is missing or problematic."""
@@ -189,6 +244,176 @@ class TestGitHubClient(unittest.TestCase):
         self.assertNotIn('Authorization', called_kwargs['headers'])
         self.assertEqual(called_kwargs['headers']['Accept'], "application/vnd.github.v3+json")
 
+    # --- Tests for download_repo_file ---
+    @staticmethod
+    def raw_response(data, status_code=200):
+        response = requests.Response()
+        response.status_code = status_code
+        response.raw = io.BytesIO(data)
+        return response
+
+    @patch('requests.request')
+    def test_download_repo_file_streams_raw_bytes(self, mock_actual_request_call):
+        """Test that files are streamed in chunks with the raw media type, to a file object, a path or memory."""
+        data = bytes(range(256)) * 40
+        mock_actual_request_call.side_effect = lambda *args, **kwargs: self.raw_response(data)
+
+        class ChunkRecorder(io.BytesIO):
+            largest_write = 0
+
+            def write(self, chunk):
+                self.largest_write = max(self.largest_write, len(chunk))
+                return super().write(chunk)
+
+        output = ChunkRecorder()
+        written = self.client_no_token.download_repo_file(self.owner, self.repo, "img/logo.png", output, ref="dev", chunk_size=1000)
+        self.assertEqual((written, output.getvalue(), output.largest_write), (len(data), data, 1000))
+        args, kwargs = mock_actual_request_call.call_args
+        self.assertEqual(args, ("GET", f"https://api.github.com/repos/{self.owner}/{self.repo}/contents/img/logo.png"))
+        self.assertEqual((kwargs["headers"]["Accept"], kwargs["params"], kwargs["stream"]),
+                         ("application/vnd.github.raw", {"ref": "dev"}, True))
+
+        self.assertEqual(self.client_no_token.download_repo_file(self.owner, self.repo, "img/logo.png"), data)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = os.path.join(temp_dir, "out", "logo.png")
+            self.assertEqual(self.client_no_token.download_repo_file(self.owner, self.repo, "img/logo.png", destination), len(data))
+            with open(destination, "rb") as f:
+                self.assertEqual(f.read(), data)
+            self.assertEqual(os.listdir(os.path.dirname(destination)), ["logo.png"])
+        self.assertIsNone(self.client_no_token.download_repo_file(self.owner, self.repo, "img/logo.png", as_text=True))
+
+    @patch('requests.request')
+    def test_download_repo_file_falls_back_to_blobs_api(self, mock_actual_request_call):
+        """Test that a file the contents API refuses as too large is fetched by blob SHA."""
+        mock_actual_request_call.side_effect = [self.raw_response(b'{"message": "too_large"}', 403),
+                                                self.raw_response("h\u00e9llo".encode("utf-8"))]
+        index = MagicMock()
+        index.get.return_value = {"path": "big.txt", "type": "blob", "sha": "blob123"}
+        with patch.object(GitHubClient, "get_repo_tree_index", return_value=index) as mock_index:
+            text = self.client_no_token.download_repo_file(self.owner, self.repo, "big.txt", as_text=True)
+
+        self.assertEqual(text, "h\u00e9llo")
+        mock_index.assert_called_once_with(self.owner, self.repo, None)
+        self.assertEqual(mock_actual_request_call.call_args.args[1],
+                         f"https://api.github.com/repos/{self.owner}/{self.repo}/git/blobs/blob123")
+
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    def test_read_repo_file_large_file_without_content(self, mock_request):
+        """Test that the empty content the contents API sends for files over 1 MB is not mistaken for an empty file."""
+        download_url = "https://raw.githubusercontent.com/o/r/main/big.txt"
+        mock_request.side_effect = [
+            self.MockResponse(json_data={'type': 'file', 'content': '', 'encoding': 'none', 'download_url': download_url}, status_code=200),
+            self.MockResponse(json_data=None, status_code=200, text_data="large contents"),
+        ]
+        self.assertEqual(self.client_no_token.read_repo_file(self.owner, self.repo, "big.txt"), "large contents")
+        mock_request.assert_called_with("GET", download_url)
+
+    # --- Tests for get_repo_tree_index ---
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    def test_get_repo_tree_index_reuses_index_until_branch_moves(self, mock_request):
+        """Test that the tree is fetched once per branch SHA, with one recursive call."""
+        shas = iter(["sha1", "sha1", "sha2"])
+        tree_calls = []
+
+        def side_effect_func(method, url, **kwargs):
+            if url.endswith("/git/refs/heads/main"):
+                return self.MockResponse(json_data={"object": {"sha": next(shas)}}, status_code=200)
+            if "/git/trees/" in url:
+                tree_calls.append((url, kwargs))
+                return self.MockResponse(json_data={"sha": "tree-" + url.rsplit("/", 1)[1], "truncated": False, "tree": [
+                    {"path": "src", "type": "tree", "mode": "040000", "sha": "t1"},
+                    {"path": "src/app.py", "type": "blob", "mode": "100644", "sha": "b1", "size": 3}]}, status_code=200)
+            raise ValueError(f"Unexpected URL: {url}")
+
+        mock_request.side_effect = side_effect_func
+        first = self.client_no_token.get_repo_tree_index(self.owner, self.repo, "main")
+        second = self.client_no_token.get_repo_tree_index(self.owner, self.repo, "main")
+        third = self.client_no_token.get_repo_tree_index(self.owner, self.repo, "main")
+
+        self.assertIs(first, second)
+        self.assertIsNot(second, third)
+        self.assertEqual((first.commit_sha, third.commit_sha), ("sha1", "sha2"))
+        self.assertEqual(first.list_dir("src"), ["app.py"])
+        self.assertEqual(tree_calls, [
+            (f"https://api.github.com/repos/{self.owner}/{self.repo}/git/trees/sha1", {"params": {"recursive": "1"}}),
+            (f"https://api.github.com/repos/{self.owner}/{self.repo}/git/trees/sha2", {"params": {"recursive": "1"}}),
+        ])
+
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    def test_get_repo_tree_index_truncated_tree_and_default_branch(self, mock_request):
+        """Test the level-by-level fallback for truncated trees and default branch lookup."""
+        base = f"https://api.github.com/repos/{self.owner}/{self.repo}"
+        responses = {
+            base: {"default_branch": "trunk"},
+            f"{base}/git/refs/heads/trunk": {"object": {"sha": "c1"}},
+            f"{base}/git/trees/c1": {"sha": "root", "truncated": True, "tree": []},
+            f"{base}/git/trees/root": {"sha": "root", "tree": [
+                {"path": "a.txt", "type": "blob", "sha": "b1", "size": 1},
+                {"path": "lib", "type": "tree", "sha": "t-lib"}]},
+            f"{base}/git/trees/t-lib": {"sha": "t-lib", "tree": [{"path": "b.txt", "type": "blob", "sha": "b2", "size": 2}]},
+        }
+        mock_request.side_effect = lambda method, url, **kwargs: self.MockResponse(json_data=responses[url], status_code=200)
+
+        index = self.client_no_token.get_repo_tree_index(self.owner, self.repo)
+        self.assertEqual(list(index.walk()), ["a.txt", "lib/b.txt"])
+        self.assertEqual(index.tree_sha, "root")
+
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    def test_get_repo_tree_index_branch_not_found(self, mock_request):
+        """Test that a missing branch yields None without fetching a tree."""
+        mock_request.side_effect = requests.exceptions.HTTPError("404 Client Error", response=self.MockResponse(json_data={}, status_code=404))
+        self.assertIsNone(self.client_no_token.get_repo_tree_index(self.owner, self.repo, "missing"))
+        mock_request.assert_called_once()
+
+    # --- Tests for fetch_repo_snapshot ---
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    def test_fetch_repo_snapshot_serves_reads_from_disk(self, mock_request):
+        """Test that one tarball download replaces per-file contents requests, and is reused by commit SHA."""
+        from jarules_agent.connectors.github_snapshot_cache import RepoSnapshotCache
+        from jarules_agent.tests.test_github_snapshot_cache import make_tarball
+        import tempfile
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        base = f"https://api.github.com/repos/{self.owner}/{self.repo}"
+        tarball = MagicMock(raw=make_tarball({"README.md": b"hello", "bin/logo.png": b"\x89PNG"}))
+
+        def side_effect_func(method, url, **kwargs):
+            if url == f"{base}/git/refs/heads/main":
+                return self.MockResponse(json_data={"object": {"sha": "a" * 40}}, status_code=200)
+            if url == f"{base}/tarball/{'a' * 40}":
+                self.assertEqual(kwargs, {"stream": True})
+                return tarball
+            raise ValueError(f"Unexpected URL: {url}")
+
+        mock_request.side_effect = side_effect_func
+        client = GitHubClient(snapshot_cache=RepoSnapshotCache(root=temp_dir.name))
+        self.assertEqual(client.fetch_repo_snapshot(self.owner, self.repo, "main"), "a" * 40)
+        tarball.close.assert_called_once()
+        mock_request.reset_mock()
+
+        self.assertEqual(client.read_repo_file(self.owner, self.repo, "README.md"), "hello")
+        self.assertEqual(client.read_repo_file(self.owner, self.repo, "bin/logo.png"), "\ufffdPNG")
+        self.assertIsNone(client.read_repo_file(self.owner, self.repo, "missing.txt"))
+        mock_request.assert_not_called()
+
+        # A full commit SHA needs no request at all once its snapshot is cached.
+        other_client = GitHubClient(snapshot_cache=RepoSnapshotCache(root=temp_dir.name))
+        self.assertEqual(other_client.fetch_repo_snapshot(self.owner, self.repo, "a" * 40), "a" * 40)
+        self.assertEqual(other_client.read_repo_file(self.owner, self.repo, "README.md"), "hello")
+        mock_request.assert_not_called()
+
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    def test_fetch_repo_snapshot_download_error(self, mock_request):
+        """Test that a failed download leaves read_repo_file on the contents API."""
+        def side_effect_func(method, url, **kwargs):
+            if "/tarball/" in url:
+                raise requests.exceptions.ConnectionError("connection reset")
+            return self.MockResponse(json_data={"object": {"sha": "b" * 40}}, status_code=200)
+
+        mock_request.side_effect = side_effect_func
+        self.assertIsNone(self.client_no_token.fetch_repo_snapshot(self.owner, self.repo, "main"))
+        self.assertEqual(self.client_no_token._snapshots, {})
+
     # --- Tests for get_branch_sha ---
     @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
     def test_get_branch_sha_success(self, mock_request):
@@ -323,8 +548,7 @@ class TestGitHubClient(unittest.TestCase):
         mock_request.side_effect = [
             # 2. Get Base Tree SHA (from commit details)
             self.MockResponse({"tree": {"sha": "base_tree_sha_456"}}, 200),
-            # 3. Create Blob
-            self.MockResponse({"sha": "blob_sha_789"}, 201),
+            # 3. Small text files are inlined in the tree, so no blob is created
             # 4. Create New Tree
             self.MockResponse({"sha": "new_tree_sha_abc"}, 201),
             # 5. Create New Commit
@@ -343,11 +567,9 @@ class TestGitHubClient(unittest.TestCase):
         
         expected_calls = [
             unittest.mock.call("GET", f"https://api.github.com/repos/{owner}/{repo}/git/commits/latest_commit_sha_123"),
-            unittest.mock.call("POST", f"https://api.github.com/repos/{owner}/{repo}/git/blobs", 
-                               json={"content": "Hello World", "encoding": "utf-8"}),
             unittest.mock.call("POST", f"https://api.github.com/repos/{owner}/{repo}/git/trees", 
                                json={"base_tree": "base_tree_sha_456", 
-                                     "tree": [{"path": "test.txt", "mode": "100644", "type": "blob", "sha": "blob_sha_789"}]}),
+                                     "tree": [{"path": "test.txt", "mode": "100644", "type": "blob", "content": "Hello World"}]}),
             unittest.mock.call("POST", f"https://api.github.com/repos/{owner}/{repo}/git/commits", 
                                json={"message": commit_message, "tree": "new_tree_sha_abc", "parents": ["latest_commit_sha_123"]}),
             unittest.mock.call("PATCH", f"https://api.github.com/repos/{owner}/{repo}/git/refs/heads/{branch}", 
@@ -371,8 +593,6 @@ class TestGitHubClient(unittest.TestCase):
         
         mock_request.side_effect = [
             self.MockResponse({"tree": {"sha": "base_tree_sha_xyz"}}, 200), # Get base tree
-            self.MockResponse({"sha": "blob_sha_file1"}, 201),             # Create blob for file1
-            self.MockResponse({"sha": "blob_sha_file2"}, 201),             # Create blob for file2
             self.MockResponse({"sha": "new_tree_sha_pqr"}, 201),            # Create new tree
             self.MockResponse({"sha": "new_commit_sha_stu", "html_url": "url"}, 201), # Create new commit
             self.MockResponse({}, 200)                                      # Update ref
@@ -384,12 +604,12 @@ class TestGitHubClient(unittest.TestCase):
         self.assertEqual(result["sha"], "new_commit_sha_stu")
 
         expected_tree_elements = [
-            {"path": "file1.txt", "mode": "100644", "type": "blob", "sha": "blob_sha_file1"},
-            {"path": "docs/file2.md", "mode": "100644", "type": "blob", "sha": "blob_sha_file2"}
+            {"path": "file1.txt", "mode": "100644", "type": "blob", "content": "Content 1"},
+            {"path": "docs/file2.md", "mode": "100644", "type": "blob", "content": "# Markdown"}
         ]
         # Check the tree creation call specifically for the tree elements
-        # The fourth call to mock_request is tree creation (index 3)
-        actual_tree_call = mock_request.call_args_list[3] # POST for tree
+        # The second call to mock_request is tree creation (index 1)
+        actual_tree_call = mock_request.call_args_list[1] # POST for tree
         # Extract the json parameter from the call kwargs
         actual_tree_json = actual_tree_call.kwargs['json'] if 'json' in actual_tree_call.kwargs else actual_tree_call[1]['json']
         self.assertEqual(actual_tree_json['tree'], expected_tree_elements)
@@ -413,10 +633,11 @@ class TestGitHubClient(unittest.TestCase):
         mock_get_branch_sha.return_value = "latest_commit_sha_123"
         mock_request.side_effect = [
             self.MockResponse({"tree": {"sha": "base_tree_sha_456"}}, 200), # Get base tree
+            self.MockResponse({"sha": "base_tree_sha_456", "tree": []}, 200), # Base tree entries, to skip existing blobs
             requests.exceptions.HTTPError("Error creating blob", response=self.MockResponse({}, 500)) # Blob creation fails
         ]
         
-        file_changes = [{"path": "fail.txt", "content": "..."}]
+        file_changes = [{"path": "fail.bin", "content": b"\x00binary"}]
         success, result = self.client_no_token.commit_files(self.owner, self.repo, "main", file_changes, "Msg")
 
         self.assertFalse(success)
@@ -430,7 +651,6 @@ class TestGitHubClient(unittest.TestCase):
         mock_get_branch_sha.return_value = "latest_commit_sha_123"
         mock_request.side_effect = [
             self.MockResponse({"tree": {"sha": "base_tree_sha_456"}}, 200),
-            self.MockResponse({"sha": "blob_sha_789"}, 201), # Blob creation
             requests.exceptions.HTTPError("Error creating tree", response=self.MockResponse({}, 500)) # Tree creation fails
         ]
 
@@ -448,7 +668,6 @@ class TestGitHubClient(unittest.TestCase):
         mock_get_branch_sha.return_value = "latest_commit_sha_123"
         mock_request.side_effect = [
             self.MockResponse({"tree": {"sha": "base_tree_sha_456"}}, 200),
-            self.MockResponse({"sha": "blob_sha_789"}, 201),
             self.MockResponse({"sha": "new_tree_sha_abc"}, 201), # Tree creation
             requests.exceptions.HTTPError("Error creating commit", response=self.MockResponse({}, 500)) # Commit creation fails
         ]
@@ -466,7 +685,6 @@ class TestGitHubClient(unittest.TestCase):
         mock_get_branch_sha.return_value = "latest_commit_sha_123"
         mock_request.side_effect = [
             self.MockResponse({"tree": {"sha": "base_tree_sha_456"}}, 200),
-            self.MockResponse({"sha": "blob_sha_789"}, 201),
             self.MockResponse({"sha": "new_tree_sha_abc"}, 201),
             self.MockResponse({"sha": "new_commit_sha_def"}, 201), # Commit creation
             requests.exceptions.HTTPError("Error updating ref", response=self.MockResponse({}, 422)) # Ref update fails (e.g. not fast-forward)
@@ -479,6 +697,67 @@ class TestGitHubClient(unittest.TestCase):
         self.assertEqual(result["step"], "update_ref_http_error")
         self.assertEqual(result["reason"], "not_a_fast_forward_or_other_issue")
 
+    @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
+    @patch('jarules_agent.connectors.github_connector.GitHubClient.get_branch_sha')
+    def test_commit_files_uploads_blobs_concurrently_and_skips_existing(self, mock_get_branch_sha, mock_request):
+        """Test that unchanged blobs are reused, large files are uploaded in parallel, and binary files are streamed as base64."""
+        import hashlib
+        import tempfile
+        import threading
+        owner, repo = self.owner, self.repo
+        base = f"https://api.github.com/repos/{owner}/{repo}"
+        binary = bytes(range(256)) * 1000
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(binary)
+        self.addCleanup(os.remove, f.name)
+        large_text = "x" * (GitHubClient.INLINE_CONTENT_MAX_BYTES + 1)
+        unchanged = b"\x00same"
+        unchanged_sha = hashlib.sha1(b"blob %d\0" % len(unchanged) + unchanged).hexdigest()
+        file_changes = [
+            {"path": "small.txt", "content": "small"},
+            {"path": "large.txt", "content": large_text},
+            {"path": "logo.bin", "source_path": f.name, "mode": "100755"},
+            {"path": "same.bin", "content": unchanged},
+        ]
+        mock_get_branch_sha.return_value = "commit_sha"
+        both_uploading = threading.Barrier(2, timeout=5)
+        uploaded = {}
+
+        def side_effect_func(method, url, **kwargs):
+            if url == f"{base}/git/commits/commit_sha":
+                return self.MockResponse({"tree": {"sha": "base_tree"}}, 200)
+            if url == f"{base}/git/trees/base_tree":
+                return self.MockResponse({"sha": "base_tree", "tree": [
+                    {"path": "same.bin", "type": "blob", "mode": "100644", "sha": unchanged_sha, "size": len(unchanged)}]}, 200)
+            if url == f"{base}/git/blobs":
+                both_uploading.wait()  # Fails unless the two uploads are in flight at the same time
+                if "json" in kwargs:
+                    uploaded["large.txt"] = kwargs["json"]
+                    return self.MockResponse({"sha": "blob_large"}, 201)
+                self.assertEqual(kwargs["headers"], {"Content-Type": "application/json"})
+                uploaded["logo.bin"] = json.loads(b"".join(kwargs["data"]))
+                return self.MockResponse({"sha": "blob_logo"}, 201)
+            if url == f"{base}/git/trees":
+                uploaded["tree"] = kwargs["json"]
+                return self.MockResponse({"sha": "new_tree"}, 201)
+            if url == f"{base}/git/commits":
+                return self.MockResponse({"sha": "new_commit"}, 201)
+            return self.MockResponse({}, 200)
+
+        mock_request.side_effect = side_effect_func
+        success, result = self.client_no_token.commit_files(owner, repo, "main", file_changes, "Msg")
+
+        self.assertTrue(success, result)
+        self.assertEqual(uploaded["large.txt"], {"content": large_text, "encoding": "utf-8"})
+        self.assertEqual(uploaded["logo.bin"], {"encoding": "base64", "content": base64.b64encode(binary).decode("ascii")})
+        self.assertEqual(uploaded["tree"]["tree"], [
+            {"path": "small.txt", "mode": "100644", "type": "blob", "content": "small"},
+            {"path": "large.txt", "mode": "100644", "type": "blob", "sha": "blob_large"},
+            {"path": "logo.bin", "mode": "100755", "type": "blob", "sha": "blob_logo"},
+            {"path": "same.bin", "mode": "100644", "type": "blob", "sha": unchanged_sha},
+        ])
+        self.assertEqual(sum(1 for c in mock_request.call_args_list if c.args[1] == f"{base}/git/blobs"), 2)
+
     # --- Tests for create_pull_request ---
     @patch('jarules_agent.connectors.github_connector.GitHubClient._request')
     def test_create_pull_request_success(self, mock_request):
@@ -611,5 +890,111 @@ class TestGitHubClient(unittest.TestCase):
         self.assertIn("Connection timed out", result.get("error", ""))
 
 
+class StubPaginatedServer:
+    """Serves /repos/o/r/branches in pages linked with `Link: rel="next"`, recording which pages were requested."""
+
+    def __init__(self, total=250, failing_page=None):
+        self.total = total
+        self.failing_page = failing_page
+        self.requested = []
+        self.page_requested = {}  # page number -> Event set when it is requested
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                page, per_page = int(query.get("page", ["1"])[0]), int(query["per_page"][0])
+                stub.requested.append(page)
+                stub.event(page).set()
+                if page == stub.failing_page:
+                    self._reply(500, {"message": "Server Error"}, {})
+                    return
+                start = (page - 1) * per_page
+                items = [{"name": f"branch-{i}"} for i in range(start, min(start + per_page, stub.total))]
+                headers = {}
+                if start + per_page < stub.total:
+                    headers["Link"] = (f'<{stub.base_url}/repos/o/r/branches?per_page={per_page}&page={page + 1}>; rel="next", '
+                                       f'<{stub.base_url}/repos/o/r/branches?per_page={per_page}&page=99>; rel="last"')
+                self._reply(200, items, headers)
+
+            def _reply(self, status, payload, headers):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def event(self, page):
+        return self.page_requested.setdefault(page, threading.Event())
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestGitHubClientPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = StubPaginatedServer()
+        self.addCleanup(self.stub.close)
+        self.client = GitHubClient(use_cache=False)
+        self.client.BASE_API_URL = self.stub.base_url
+
+    def test_follows_next_links_to_the_last_page(self):
+        branches = [branch["name"] for branch in self.client.iter_branches("o", "r")]
+
+        self.assertEqual(branches, [f"branch-{i}" for i in range(250)])
+        self.assertEqual(self.stub.requested, [1, 2, 3])
+
+    def test_next_page_is_prefetched_while_the_current_one_is_consumed(self):
+        branches = self.client.iter_branches("o", "r", per_page=50)
+        self.assertEqual(next(branches)["name"], "branch-0")
+        self.assertTrue(self.stub.event(2).wait(5))  # Requested before the caller reached the end of page 1
+        self.assertFalse(self.stub.event(3).is_set())
+        branches.close()
+
+        without_prefetch = self.client.iter_branches("o", "r", per_page=50, prefetch=False)
+        self.stub.page_requested.clear()
+        next(without_prefetch)
+        self.assertFalse(self.stub.event(2).wait(0.2))
+        without_prefetch.close()
+
+    def test_stopping_early_sends_no_further_requests(self):
+        for page in self.client.iter_pages(f"{self.stub.base_url}/repos/o/r/branches", per_page=10):
+            break
+        self.assertEqual(len(page), 10)
+        self.assertTrue(self.stub.event(2).wait(5))  # The prefetch already in flight
+        self.assertEqual(self.stub.requested, [1, 2])
+
+    def test_failed_page_raises_instead_of_truncating(self):
+        self.stub.failing_page = 2
+        branches = []
+        with patch('sys.stdout', new_callable=io.StringIO), self.assertRaises(requests.exceptions.HTTPError):
+            for branch in self.client.iter_branches("o", "r"):
+                branches.append(branch)
+        self.assertEqual(len(branches), 100)
+
+    def test_list_repo_files_lists_large_directories_from_the_tree(self):
+        self.client.CONTENTS_LISTING_LIMIT = 3
+        listing = TestGitHubClient.MockResponse([{"name": "a"}, {"name": "b"}, {"name": "c"}], 200)
+        mock_index = MagicMock()
+        mock_index.list_dir.return_value = ["a", "b", "c", "d"]
+        with patch.object(GitHubClient, "_request", return_value=listing), \
+                patch.object(GitHubClient, "get_repo_tree_index", return_value=mock_index), \
+                patch('sys.stdout', new_callable=io.StringIO):
+            self.assertEqual(self.client.list_repo_files("o", "r", "/big/"), ["a", "b", "c", "d"])
+        mock_index.list_dir.assert_called_once_with("big")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,135 @@
+# jarules_agent/tests/test_github_graphql.py
+
+import json
+import re
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from jarules_agent.connectors.github_connector import GitHubClient
+from jarules_agent.connectors.github_graphql import (
+    LOOKUP_OBJECT, LOOKUP_REF, GitHubGraphQLError, build_lookup_query, parse_lookup_response, split_by_cost)
+
+FILES = {
+    "main:README.md": {"text": "hello", "isBinary": False, "isTruncated": False, "byteSize": 5},
+    "main:src/app.py": {"text": "print('hi')\n", "isBinary": False, "isTruncated": False, "byteSize": 12},
+    "main:logo.png": {"text": None, "isBinary": True, "isTruncated": False, "byteSize": 900},
+    "main:src": {},  # A tree: the `... on Blob` fragment selects nothing
+}
+REFS = {"refs/heads/main": "sha-main", "refs/heads/dev": "sha-dev"}
+_LOOKUP_PATTERN = re.compile(r"(l\d+): (object|ref)\(\w+: \$(v\d+)\)")
+
+
+class StubGraphQLServer:
+    """A local stand-in for GitHub's GraphQL endpoint, answering repository object and ref lookups."""
+
+    def __init__(self, max_lookups=None):
+        self.max_lookups = max_lookups  # Larger queries get a 502, as GitHub does when a query times out
+        self.queries = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.queries.append((body, self.headers.get("Authorization")))
+                lookups = _LOOKUP_PATTERN.findall(body["query"])
+                if stub.max_lookups is not None and len(lookups) > stub.max_lookups:
+                    self._reply(502, {"message": "Server Error"})
+                    return
+                variables = body["variables"]
+                repository = {}
+                for alias, kind, variable in lookups:
+                    value = variables[variable]
+                    if kind == "object":
+                        repository[alias] = FILES.get(value)
+                    else:
+                        repository[alias] = {"target": {"oid": REFS[value]}} if value in REFS else None
+                self._reply(200, {"data": {"repository": repository}})
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/graphql"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestGraphQLQueries(unittest.TestCase):
+
+    def test_build_lookup_query_passes_values_as_variables(self):
+        body = build_lookup_query("o", "r", [(LOOKUP_OBJECT, 'main:we"ird.txt'), (LOOKUP_REF, "refs/heads/main")])
+        self.assertIn("l0: object(expression: $v0) { ... on Blob {", body["query"])
+        self.assertIn("l1: ref(qualifiedName: $v1) { target { oid } }", body["query"])
+        self.assertEqual(body["variables"], {"owner": "o", "name": "r", "v0": 'main:we"ird.txt', "v1": "refs/heads/main"})
+
+    def test_split_by_cost(self):
+        lookups = [(LOOKUP_OBJECT, "a"), (LOOKUP_OBJECT, "b"), (LOOKUP_REF, "c"), (LOOKUP_REF, "d"), (LOOKUP_OBJECT, "e")]
+        self.assertEqual(split_by_cost(lookups, max_cost=4), [[0], [1, 2], [3, 4]])
+        self.assertEqual(split_by_cost(lookups, max_cost=100), [[0, 1, 2, 3, 4]])
+
+    def test_parse_lookup_response(self):
+        self.assertEqual(parse_lookup_response({"data": {"repository": {"l0": {"text": "x"}, "l1": None}}}, 2),
+                         [{"text": "x"}, None])
+        with self.assertRaises(GitHubGraphQLError) as context:
+            parse_lookup_response({"data": None, "errors": [{"type": "NOT_FOUND", "message": "Could not resolve"}]}, 1)
+        self.assertFalse(context.exception.splittable)
+        with self.assertRaises(GitHubGraphQLError) as context:
+            parse_lookup_response({"errors": [{"type": "MAX_NODE_LIMIT_EXCEEDED", "message": "too many"}]}, 1)
+        self.assertTrue(context.exception.splittable)
+
+
+class TestGitHubClientBatchReads(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = StubGraphQLServer()
+        self.client = GitHubClient(token="token-a", use_cache=False)
+        self.client.GRAPHQL_URL = self.stub.url
+
+    def tearDown(self):
+        self.stub.close()
+
+    def test_read_repo_files_in_one_query(self):
+        with patch.object(GitHubClient, "read_repo_file", return_value="<binary>") as mock_read:
+            contents = self.client.read_repo_files("o", "r", ["README.md", "src/app.py", "missing.txt", "src", "logo.png"],
+                                                   ref="main")
+
+        self.assertEqual(contents, {"README.md": "hello", "src/app.py": "print('hi')\n", "missing.txt": None,
+                                    "src": None, "logo.png": "<binary>"})
+        self.assertEqual(len(self.stub.queries), 1)
+        self.assertEqual(self.stub.queries[0][1], "token token-a")
+        mock_read.assert_called_once_with("o", "r", "logo.png", ref="main")  # Binary blobs come through REST
+
+    def test_queries_are_split_by_cost_and_on_timeouts(self):
+        self.stub.max_lookups = 2
+        self.client.GRAPHQL_MAX_QUERY_COST = 4  # At most 4 branch lookups per query
+
+        shas = self.client.get_branch_shas("o", "r", ["main", "dev", "gone", "main", "dev", "main"])
+
+        self.assertEqual(shas, {"main": "sha-main", "dev": "sha-dev", "gone": None})
+        # One query of three lookups, rejected with a 502, then split into queries of one and two.
+        self.assertEqual([len(body["variables"]) - 2 for body, _ in self.stub.queries], [3, 1, 2])
+
+    def test_falls_back_to_rest_without_a_token(self):
+        client = GitHubClient(use_cache=False)
+        client.GRAPHQL_URL = self.stub.url
+        with patch.object(GitHubClient, "get_branch_sha", side_effect=["sha-main", None]) as mock_get_branch_sha:
+            self.assertEqual(client.get_branch_shas("o", "r", ["main", "gone"]), {"main": "sha-main", "gone": None})
+        self.assertEqual(mock_get_branch_sha.call_count, 2)
+        self.assertEqual(self.stub.queries, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# jarules_agent/tests/test_github_http_cache.py
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from jarules_agent.connectors.github_connector import GitHubClient
+from jarules_agent.connectors.github_http_cache import GitHubHttpCache
+
+
+def make_response(status_code, body=b"", headers=None, url="https://api.github.com/x"):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    response.url = url
+    return response
+
+
+class TestGitHubHttpCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, "cache", "github.sqlite3")
+        self.cache = GitHubHttpCache(self.cache_path)
+        self.client = GitHubClient(token="token-a", http_cache=self.cache)
+        self.url = "https://api.github.com/repos/o/r/git/refs/heads/main"
+        self.body = json.dumps({"object": {"sha": "abc123"}}).encode("utf-8")
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch('requests.request')
+    def test_not_modified_response_is_served_from_cache(self, mock_request):
+        mock_request.side_effect = [
+            make_response(200, self.body, {"ETag": '"v1"', "Content-Type": "application/json; charset=utf-8"}),
+            make_response(304, b"", {"ETag": '"v1"'}),
+        ]
+
+        self.assertEqual(self.client.get_branch_sha("o", "r", "main"), "abc123")
+        self.assertEqual(self.client.get_branch_sha("o", "r", "main"), "abc123")
+
+        first_headers = mock_request.call_args_list[0].kwargs["headers"]
+        second_headers = mock_request.call_args_list[1].kwargs["headers"]
+        self.assertNotIn("If-None-Match", first_headers)
+        self.assertEqual(second_headers["If-None-Match"], '"v1"')
+        self.assertEqual(second_headers["Authorization"], "token token-a")
+        self.assertNotIn("If-None-Match", self.client.headers)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    @patch('requests.request')
+    def test_cached_response_looks_like_the_original(self, mock_request):
+        mock_request.side_effect = [
+            make_response(200, self.body, {"ETag": '"v1"', "Content-Type": "application/json; charset=utf-8"}),
+            make_response(304),
+        ]
+        self.client._request("GET", self.url)
+        response = self.client._request("GET", self.url)
+
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"object": {"sha": "abc123"}})
+        self.assertEqual(response.headers["etag"], '"v1"')
+        self.assertEqual(response.encoding, "utf-8")
+
+    @patch('requests.request')
+    def test_changed_resource_replaces_cached_entry(self, mock_request):
+        mock_request.side_effect = [
+            make_response(200, b'{"v": 1}', {"ETag": '"v1"'}),
+            make_response(200, b'{"v": 2}', {"ETag": '"v2"'}),
+            make_response(304),
+        ]
+        self.client._request("GET", self.url)
+        self.assertEqual(self.client._request("GET", self.url).json(), {"v": 2})
+        self.assertEqual(self.client._request("GET", self.url).json(), {"v": 2})
+        self.assertEqual(mock_request.call_args_list[2].kwargs["headers"]["If-None-Match"], '"v2"')
+
+    @patch('requests.request')
+    def test_cache_is_shared_across_clients_but_not_across_tokens(self, mock_request):
+        mock_request.side_effect = [make_response(200, self.body, {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+                                    make_response(304), make_response(200, self.body)]
+        self.client._request("GET", self.url)
+
+        other_session = GitHubClient(token="token-a", http_cache=GitHubHttpCache(self.cache_path))
+        self.assertTrue(other_session._request("GET", self.url).from_cache)
+        self.assertEqual(mock_request.call_args_list[1].kwargs["headers"]["If-Modified-Since"], "Mon, 01 Jan 2024 00:00:00 GMT")
+
+        other_token = GitHubClient(token="token-b", http_cache=GitHubHttpCache(self.cache_path))
+        other_token._request("GET", self.url)
+        self.assertNotIn("If-Modified-Since", mock_request.call_args_list[2].kwargs["headers"])
+        other_session.http_cache.close()
+        other_token.http_cache.close()
+
+    @patch('requests.request')
+    def test_uncacheable_requests_do_not_touch_disk(self, mock_request):
+        mock_request.side_effect = [make_response(200, self.body), make_response(201, self.body, {"ETag": '"v1"'})]
+        self.client._request("GET", self.url)  # No validators
+        self.client._request("POST", self.url, json={})
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    @patch('requests.request')
+    def test_caching_can_be_disabled(self, mock_request):
+        client = GitHubClient(use_cache=False)
+        mock_request.return_value = make_response(200, self.body, {"ETag": '"v1"'})
+        client._request("GET", self.url)
+        self.assertIsNone(client.http_cache)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = GitHubHttpCache(self.cache_path, max_bytes=250)
+        for name in ("a", "b", "c"):
+            self.assertTrue(cache.put(name, f"https://x/{name}", 200, {"ETag": name}, b"x" * 100))
+            if name == "b":
+                self.assertIsNotNone(cache.get("a"))
+                cache.touch("a")
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertFalse(cache.put("big", "https://x/big", 200, {"ETag": "big"}, b"x" * 300))
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
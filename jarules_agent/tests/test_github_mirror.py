@@ -0,0 +1,168 @@
+# jarules_agent/tests/test_github_mirror.py
+
+import io
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from jarules_agent.connectors.github_connector import GitHubClient
+from jarules_agent.connectors.github_mirror import GitMirrorBackend, MirrorError
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args], cwd=cwd,
+                          check=True, capture_output=True).stdout.decode("utf-8").strip()
+
+
+class MirrorTestCase(unittest.TestCase):
+    """Builds an upstream repository o/r under a temp dir and a backend mirroring it over file://."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.upstream = self.temp_dir / "upstream" / "o" / "r"
+        self.upstream.mkdir(parents=True)
+        git(self.upstream, "init", "--quiet", "--initial-branch=main")
+        self.commit({"README.md": "hello\n", "src/app.py": "print('hi')\n", "logo.bin": "\x00\x01"})
+        git(self.upstream, "branch", "dev")
+        self.backend = GitMirrorBackend(root=self.temp_dir / "mirrors",
+                                        remote_url_template=f"file://{self.temp_dir}/upstream/{{owner}}/{{repo}}")
+
+    def commit(self, files, message="Change"):
+        for name, text in files.items():
+            path = self.upstream / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+        git(self.upstream, "add", "-A")
+        git(self.upstream, "commit", "--quiet", "-m", message)
+        return git(self.upstream, "rev-parse", "HEAD")
+
+
+class TestGitMirrorBackend(MirrorTestCase):
+
+    def test_reads_and_listings_come_from_the_mirror(self):
+        self.assertFalse(self.backend.has_mirror("o", "r"))
+        self.assertTrue(self.backend.refresh("o", "r"))
+        self.assertTrue(self.backend.has_mirror("o", "r"))
+
+        self.assertEqual(self.backend.resolve("o", "r"), git(self.upstream, "rev-parse", "HEAD"))
+        self.assertEqual(sorted(self.backend.list_dir("o", "r")), ["README.md", "logo.bin", "src"])
+        self.assertEqual(self.backend.list_dir("o", "r", "/src/"), ["app.py"])
+        self.assertIsNone(self.backend.list_dir("o", "r", "README.md"))
+        self.assertEqual(self.backend.read_files("o", "r", ["README.md", "logo.bin", "src", "missing.txt"], ref="dev"),
+                         {"README.md": b"hello\n", "logo.bin": b"\x00\x01", "src": None, "missing.txt": None})
+        with self.assertRaises(MirrorError):
+            self.backend.read_file("o", "r", "README.md", ref="no-such-branch")
+        with self.assertRaises(MirrorError):
+            self.backend.path_for("o", "../r")
+
+    def test_refresh_fetches_incrementally_once_stale(self):
+        now = [1000.0]
+        self.backend.clock = lambda: now[0]
+        self.backend.refresh("o", "r")
+        self.commit({"README.md": "changed\n"})
+        git(self.upstream, "branch", "-D", "dev")
+
+        self.assertFalse(self.backend.refresh("o", "r"))  # Within refresh_interval: served as last fetched
+        self.assertEqual(self.backend.read_file("o", "r", "README.md"), b"hello\n")
+
+        now[0] += self.backend.refresh_interval
+        self.assertTrue(self.backend.refresh("o", "r"))
+        self.assertEqual(self.backend.read_file("o", "r", "README.md"), b"changed\n")
+        with self.assertRaises(MirrorError):  # Pruned along with the upstream branch
+            self.backend.resolve("o", "r", "dev")
+        refs = git(self.backend.path_for("o", "r"), "for-each-ref", "--format=%(refname)")
+        self.assertEqual(refs, "refs/heads/main")
+
+    def test_concurrent_refreshes_share_one_fetch(self):
+        self.backend.refresh("o", "r")
+        fetches = []
+        original_fetch = self.backend._fetch
+
+        def slow_fetch(*args):
+            fetches.append(args)
+            time.sleep(0.2)
+            original_fetch(*args)
+
+        results = []
+        with patch.object(self.backend, "_fetch", side_effect=slow_fetch):
+            threads = [threading.Thread(target=lambda: results.append(self.backend.refresh("o", "r", force=True)))
+                       for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(results, [True] * 5)
+
+    def test_failed_clone_leaves_no_mirror(self):
+        with self.assertRaises(MirrorError):
+            self.backend.refresh("o", "missing")
+        self.assertFalse(self.backend.has_mirror("o", "missing"))
+        self.assertEqual(list((self.temp_dir / "mirrors" / "o").iterdir()), [])
+
+    def test_token_is_passed_in_the_environment_only(self):
+        self.backend.token = "secret-token"
+        env = self.backend._git_env()
+        self.assertEqual(env["GIT_CONFIG_KEY_0"], "http.extraHeader")
+        self.assertTrue(env["GIT_CONFIG_VALUE_0"].startswith("Authorization: Basic "))
+        self.backend.refresh("o", "r")
+        config = (self.backend.path_for("o", "r") / "config").read_text()
+        self.assertNotIn("secret-token", config)
+        self.assertNotIn("Authorization", config)
+
+
+class TestGitHubClientMirrorReads(MirrorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = GitHubClient(use_cache=False, mirror_backend=self.backend)
+
+    def test_mirrored_repo_is_served_without_api_requests(self):
+        with patch.object(GitHubClient, "_request", side_effect=AssertionError("unexpected API request")):
+            self.assertEqual(self.client.mirror_repo("o", "r"), git(self.upstream, "rev-parse", "HEAD"))
+            self.assertEqual(self.client.read_repo_file("o", "r", "README.md"), "hello\n")
+            self.assertIsNone(self.client.read_repo_file("o", "r", "src"))
+            self.assertEqual(self.client.list_repo_files("o", "r", "src"), ["app.py"])
+            self.assertEqual(self.client.list_repo_files("o", "r", "missing"), [])
+            self.assertEqual(self.client.read_repo_files("o", "r", ["README.md", "missing.txt"], ref="dev"),
+                             {"README.md": "hello\n", "missing.txt": None})
+
+    def test_stale_mirror_is_served_when_fetch_fails(self):
+        self.client.mirror_repo("o", "r")
+        self.backend.refresh_interval = 0
+        shutil.rmtree(self.upstream)
+        with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout, \
+                patch.object(GitHubClient, "_request", side_effect=AssertionError("unexpected API request")):
+            self.assertEqual(self.client.read_repo_file("o", "r", "README.md"), "hello\n")
+        self.assertIn("serving it as last fetched", mock_stdout.getvalue())
+
+    def test_unknown_ref_falls_back_to_the_api(self):
+        self.client.mirror_repo("o", "r")
+
+        class MockResponse:
+            def json(self):
+                return {"type": "file", "content": "ZnJvbSBhcGk=", "encoding": "base64"}
+
+        with patch('sys.stdout', new_callable=io.StringIO), \
+                patch.object(GitHubClient, "_request", return_value=MockResponse()) as mock_request:
+            self.assertEqual(self.client.read_repo_file("o", "r", "README.md", ref="abc123"), "from api")
+        mock_request.assert_called_once()
+
+    def test_unmirrored_repo_uses_the_api(self):
+        with patch.object(GitHubClient, "_request", side_effect=AssertionError("API request")) as mock_request, \
+                patch('sys.stdout', new_callable=io.StringIO):
+            with self.assertRaises(AssertionError):
+                self.client.list_repo_files("o", "other")
+        mock_request.assert_called_once()
+        self.assertFalse(self.backend.has_mirror("o", "other"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+# jarules_agent/tests/test_github_rate_limiter.py
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from jarules_agent.connectors.github_connector import GitHubClient, GitHubRateLimitError
+from jarules_agent.connectors.github_rate_limiter import (
+    PRIORITY_HIGH, PRIORITY_LOW, RESOURCE_CORE, RESOURCE_GRAPHQL, RESOURCE_SEARCH,
+    SECONDARY_LIMIT_BACKOFF_SECONDS, RateLimitScheduler, RateLimitWaitError, resource_for_url)
+
+
+def rate_headers(remaining, reset_at, limit=5000, resource="core"):
+    return {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset_at), "X-RateLimit-Resource": resource}
+
+
+def make_response(status_code, headers=None, body=b"{}"):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    return response
+
+
+class TestRateLimitScheduler(unittest.TestCase):
+
+    def test_resource_for_url(self):
+        self.assertEqual(resource_for_url("https://api.github.com/repos/o/r/contents/a"), RESOURCE_CORE)
+        self.assertEqual(resource_for_url("https://api.github.com/search/code?q=x"), RESOURCE_SEARCH)
+        self.assertEqual(resource_for_url("https://api.github.com/graphql"), RESOURCE_GRAPHQL)
+
+    def test_spreads_requests_to_the_token_with_budget(self):
+        scheduler = RateLimitScheduler(["a", "b"])
+        reset_at = time.time() + 3600
+        scheduler.update("a", RESOURCE_CORE, 200, rate_headers(0, reset_at))
+        scheduler.update("b", RESOURCE_CORE, 200, rate_headers(1000, reset_at))
+
+        self.assertEqual(scheduler.acquire(), "b")
+        self.assertEqual(scheduler.acquire(RESOURCE_SEARCH), "a")  # Search budgets are separate
+        self.assertEqual(scheduler.status()["core:#1"]["remaining"], 999)
+
+    def test_rate_limited_responses_report_how_long_to_wait(self):
+        now = time.time()
+        scheduler = RateLimitScheduler(["a"], clock=lambda: now)
+        self.assertIsNone(scheduler.update("a", RESOURCE_CORE, 200, rate_headers(10, now + 60)))
+        self.assertEqual(scheduler.update("a", RESOURCE_CORE, 403, rate_headers(0, now + 60)), 60)
+        self.assertEqual(scheduler.update("a", RESOURCE_SEARCH, 429, {"Retry-After": "5"}), 5)
+        self.assertEqual(scheduler.update("a", RESOURCE_CORE, 403, {}, "You have exceeded a secondary rate limit"),
+                         SECONDARY_LIMIT_BACKOFF_SECONDS)
+        self.assertIsNone(scheduler.update("a", RESOURCE_CORE, 403, {}, "Resource not accessible by integration"))
+        self.assertEqual(scheduler.status()["core"]["blockedUntil"], now + SECONDARY_LIMIT_BACKOFF_SECONDS)
+
+    def test_paces_requests_when_budget_is_low(self):
+        scheduler = RateLimitScheduler(["a"])
+        scheduler.update("a", RESOURCE_CORE, 200, rate_headers(2, time.time() + 0.6, limit=100))
+
+        start = time.monotonic()
+        scheduler.acquire()
+        first = time.monotonic() - start
+        scheduler.acquire()  # The last request of the window is spread over what is left of it
+        second = time.monotonic() - start
+
+        self.assertLess(first, 0.1)
+        self.assertGreater(second, 0.3)
+
+    def test_waiting_requests_are_released_by_priority(self):
+        scheduler = RateLimitScheduler(["a"])
+        scheduler.update("a", RESOURCE_CORE, 429, {"Retry-After": "0.3"})
+        order = []
+
+        def acquire(name, priority):
+            scheduler.acquire(priority=priority)
+            order.append(name)
+
+        threads = [threading.Thread(target=acquire, args=("low", PRIORITY_LOW))]
+        threads[0].start()
+        time.sleep(0.05)
+        threads.append(threading.Thread(target=acquire, args=("high", PRIORITY_HIGH)))
+        threads[1].start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(order, ["high", "low"])
+
+    def test_max_wait_fails_fast_instead_of_waiting_for_the_reset(self):
+        scheduler = RateLimitScheduler(["a"])
+        scheduler.update("a", RESOURCE_CORE, 200, rate_headers(0, time.time() + 3600))
+
+        start = time.monotonic()
+        with self.assertRaises(RateLimitWaitError) as raised:
+            scheduler.acquire(max_wait=5)
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertGreater(raised.exception.wait, 3000)
+
+        scheduler.update("a", RESOURCE_CORE, 429, {**rate_headers(4000, time.time() + 3600), "Retry-After": "0.2"})
+        self.assertEqual(scheduler.acquire(max_wait=5), "a")  # A short wait within max_wait is still taken
+
+    def test_max_wait_applies_to_async_waiters(self):
+        scheduler = RateLimitScheduler(["a"])
+        scheduler.update("a", RESOURCE_CORE, 200, rate_headers(0, time.time() + 3600))
+
+        with self.assertRaises(RateLimitWaitError):
+            asyncio.run(scheduler.acquire_async(max_wait=1))
+
+
+class TestGitHubClientRateLimits(unittest.TestCase):
+
+    @patch('requests.request')
+    def test_rate_limited_request_is_retried_with_another_token(self, mock_request):
+        client = GitHubClient(token="token-a", tokens=["token-b"], use_cache=False)
+        reset_at = time.time() + 3600
+        mock_request.side_effect = [
+            make_response(403, rate_headers(0, reset_at), b'{"message": "API rate limit exceeded"}'),
+            make_response(200, rate_headers(4999, reset_at), b'{"object": {"sha": "abc123"}}'),
+        ]
+
+        self.assertEqual(client.get_branch_sha("o", "r", "main"), "abc123")
+
+        self.assertEqual([c.kwargs["headers"]["Authorization"] for c in mock_request.call_args_list],
+                         ["token token-a", "token token-b"])
+        self.assertEqual(client.rate_limiter.status()["core"]["remaining"], 0)
+
+    @patch('requests.request')
+    def test_gives_up_after_max_retries(self, mock_request):
+        client = GitHubClient(token="token-a", use_cache=False)
+        client.MAX_RATE_LIMIT_RETRIES = 1
+        mock_request.return_value = make_response(429, {"Retry-After": "0"})
+
+        self.assertIsNone(client.get_branch_sha("o", "r", "main"))
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch('requests.request')
+    def test_interactive_requests_fail_fast_when_budget_is_exhausted(self, mock_request):
+        client = GitHubClient(token="token-a", use_cache=False)
+        client.rate_limiter.update("token-a", RESOURCE_CORE, 200, rate_headers(0, time.time() + 3600))
+
+        start = time.monotonic()
+        self.assertEqual(client.list_repo_files("o", "r", "src"), [])
+        self.assertLess(time.monotonic() - start, 1)
+        mock_request.assert_not_called()
+        with self.assertRaises(GitHubRateLimitError):
+            client._request("GET", "https://api.github.com/repos/o/r", priority=PRIORITY_HIGH)
+
+
+if __name__ == '__main__':
+    unittest.main()
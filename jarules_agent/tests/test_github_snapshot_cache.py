@@ -0,0 +1,81 @@
+# jarules_agent/tests/test_github_snapshot_cache.py
+
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+
+from jarules_agent.connectors.github_snapshot_cache import MARKER_FILENAME, RepoSnapshotCache, SnapshotError
+
+
+def make_tarball(files, prefix="owner-repo-abc1234", links=()):
+    """Builds a gzipped tarball laid out like GitHub's: everything under one top-level directory."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        directory = tarfile.TarInfo(prefix)
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for path, contents in files.items():
+            info = tarfile.TarInfo(f"{prefix}/{path}")
+            info.size = len(contents)
+            archive.addfile(info, io.BytesIO(contents))
+        for path, target in links:
+            info = tarfile.TarInfo(f"{prefix}/{path}")
+            info.type = tarfile.SYMTYPE
+            info.linkname = target
+            archive.addfile(info)
+    buffer.seek(0)
+    return buffer
+
+
+class TestRepoSnapshotCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = RepoSnapshotCache(root=self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_store_and_read(self):
+        files = {"README.md": b"hello", "src/app.py": b"print('hi')\n"}
+        path = self.cache.store_tarball("owner", "repo", "c1", make_tarball(files, links=[("escape", "/etc/passwd")]))
+
+        self.assertEqual(path, self.cache.path_for("owner", "repo", "c1"))
+        self.assertTrue(self.cache.has("owner", "repo", "c1"))
+        self.assertEqual(self.cache.read_file("owner", "repo", "c1", "/src/app.py"), b"print('hi')\n")
+        self.assertIsNone(self.cache.read_file("owner", "repo", "c1", "missing.txt"))
+        self.assertIsNone(self.cache.read_file("owner", "repo", "c1", "src"))
+        self.assertFalse(os.path.lexists(path / "escape"))  # Links are not extracted
+        self.assertIsNone(self.cache.read_file("owner", "repo", "c2", "README.md"))
+        self.assertEqual(self.cache.stats()["bytes"], 17)
+        with self.assertRaises(SnapshotError):
+            self.cache.read_file("owner", "repo", "c1", "../../other/c1/README.md")
+        with self.assertRaises(SnapshotError):
+            self.cache.path_for("owner", "..", "c1")
+
+    def test_invalid_tarball_leaves_nothing_behind(self):
+        with self.assertRaises(SnapshotError):
+            self.cache.store_tarball("owner", "repo", "c1", io.BytesIO(b"not a tarball"))
+        self.assertFalse(self.cache.has("owner", "repo", "c1"))
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir.name, "owner", "repo")), [])
+
+    def test_evicts_least_recently_used(self):
+        self.cache.max_bytes = 250
+        for index, commit in enumerate(("c1", "c2")):
+            path = self.cache.store_tarball("owner", "repo", commit, make_tarball({"data.bin": b"x" * 100}))
+            os.utime(path / MARKER_FILENAME, (1000 + index, 1000 + index))
+        self.cache.read_file("owner", "repo", "c1", "data.bin")  # c1 is now the most recently used
+
+        self.cache.store_tarball("owner", "repo", "c3", make_tarball({"data.bin": b"x" * 100}))
+
+        self.assertFalse(self.cache.has("owner", "repo", "c2"))
+        self.assertFalse(self.cache.path_for("owner", "repo", "c2").exists())
+        self.assertTrue(self.cache.has("owner", "repo", "c1"))
+        self.assertTrue(self.cache.has("owner", "repo", "c3"))
+        self.assertEqual(self.cache.stats(), {"snapshots": 2, "bytes": 200, "maxBytes": 250})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# jarules_agent/tests/test_github_tree_index.py
+
+import unittest
+
+from jarules_agent.connectors.github_tree_index import RepoTreeIndex
+
+ENTRIES = [
+    {"path": "README.md", "type": "blob", "mode": "100644", "sha": "r1", "size": 10},
+    {"path": "src", "type": "tree", "mode": "040000", "sha": "t1"},
+    {"path": "src/main.py", "type": "blob", "mode": "100644", "sha": "b1", "size": 120},
+    {"path": "src/pkg", "type": "tree", "mode": "040000", "sha": "t2"},
+    {"path": "src/pkg/__init__.py", "type": "blob", "mode": "100644", "sha": "b2", "size": 0},
+    {"path": "src/pkg/util.py", "type": "blob", "mode": "100755", "sha": "b3", "size": 64},
+    {"path": "docs/guide.md", "type": "blob", "mode": "100644", "sha": "b4", "size": 5},  # Parent listed implicitly
+    {"path": "vendor/lib", "type": "commit", "mode": "160000", "sha": "c1"},
+]
+
+
+class TestRepoTreeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = RepoTreeIndex("commit1", ENTRIES, tree_sha="root")
+
+    def test_lookup(self):
+        self.assertEqual(len(self.index), len(ENTRIES))
+        self.assertTrue(self.index.exists("src/pkg/util.py"))
+        self.assertTrue(self.index.exists("/docs/"))
+        self.assertFalse(self.index.exists("src/missing.py"))
+        self.assertTrue(self.index.is_dir("docs"))
+        self.assertFalse(self.index.is_dir("README.md"))
+        self.assertEqual(self.index.get("src/pkg/util.py"),
+                         {"path": "src/pkg/util.py", "type": "blob", "mode": "100755", "sha": "b3", "size": 64})
+        self.assertEqual(self.index.get("vendor/lib")["type"], "commit")
+        self.assertIsNone(self.index.get(""))
+
+    def test_list_dir(self):
+        self.assertEqual(self.index.list_dir(), ["README.md", "docs", "src", "vendor"])
+        self.assertEqual(self.index.list_dir("src"), ["main.py", "pkg"])
+        self.assertIsNone(self.index.list_dir("README.md"))
+        self.assertIsNone(self.index.list_dir("nope"))
+
+    def test_walk(self):
+        self.assertEqual(list(self.index.walk("src")), ["src/main.py", "src/pkg/__init__.py", "src/pkg/util.py"])
+        self.assertEqual(list(self.index.walk("src/pkg", include_dirs=True)), ["src/pkg/__init__.py", "src/pkg/util.py"])
+        self.assertEqual(list(self.index.walk("README.md")), ["README.md"])
+        self.assertEqual(list(self.index.walk("nope")), [])
+
+    def test_glob(self):
+        self.assertEqual(self.index.glob("*.md"), ["README.md"])
+        self.assertEqual(self.index.glob("**/*.md"), ["README.md", "docs/guide.md"])
+        self.assertEqual(self.index.glob("src/**/*.py"), ["src/main.py", "src/pkg/__init__.py", "src/pkg/util.py"])
+        self.assertEqual(self.index.glob("src/*/util.py"), ["src/pkg/util.py"])
+        self.assertEqual(self.index.glob("src/pkg/[_u]*.py"), ["src/pkg/__init__.py", "src/pkg/util.py"])
+        self.assertEqual(self.index.glob("docs"), ["docs"])
+        self.assertEqual(self.index.glob("nothing/**"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
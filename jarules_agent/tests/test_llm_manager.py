@@ -1,5 +1,6 @@
 # jarules_agent/tests/test_llm_manager.py
 
+import asyncio
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
 import os
@@ -10,7 +11,7 @@ from pathlib import Path
 import logging # For suppressing logger output during tests if needed
 
 # Adjust imports based on actual project structure
-from jarules_agent.core.llm_manager import LLMManager, LLMConfigError, LLMProviderNotImplementedError, LLMManagerError
+from jarules_agent.core.llm_manager import LLMManager, LLMConfigError, LLMProviderNotImplementedError, LLMManagerError, LLMRequestCancelledError
 from jarules_agent.connectors.gemini_api import GeminiClient, GeminiApiKeyError
 from jarules_agent.connectors.ollama_connector import OllamaConnector # Import other connectors
 from jarules_agent.connectors.openrouter_connector import OpenRouterConnector
@@ -433,5 +434,171 @@ class TestLLMManager(unittest.TestCase):
         self.assertIsNone(written_data["active_provider_id"]) # Ensure None was saved
 
 
+class TestLLMManagerConfigReload(unittest.TestCase):
+    """Tests for hot-reloading llm_config.yaml against a real file on disk."""
+
+    def setUp(self):
+        import tempfile
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmp_dir.name, "llm_config.yaml")
+        home_patcher = patch('jarules_agent.core.llm_manager.Path.home', return_value=Path(self.tmp_dir.name))
+        home_patcher.start()
+        self.addCleanup(home_patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _write_config(self, configs_list, default_provider=None):
+        content = {"llm_configs": configs_list}
+        if default_provider:
+            content["default_provider"] = default_provider
+        with open(self.config_path, 'w') as f:
+            yaml.dump(content, f)
+        # Bump mtime explicitly so back-to-back writes are always detected.
+        stat_result = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+
+    def _manager_with_mock_connectors(self):
+        manager = LLMManager(config_path=self.config_path)
+        manager.connector_map = {"ollama": MagicMock(side_effect=lambda config: MagicMock(spec=OllamaConnector, inflight_requests=0))}
+        return manager
+
+    def test_reload_rebuilds_only_changed_connectors(self):
+        configs = [
+            {"id": "keep", "provider": "ollama", "enabled": True, "model_name": "llama3"},
+            {"id": "change", "provider": "ollama", "enabled": True, "model_name": "llama3"},
+            {"id": "drop", "provider": "ollama", "enabled": True, "model_name": "llama3"},
+        ]
+        self._write_config(configs, default_provider="keep")
+        manager = self._manager_with_mock_connectors()
+        kept = manager.get_llm_client("keep")
+        changed = manager.get_llm_client("change")
+        dropped = manager.get_llm_client("drop")
+        self.assertFalse(manager.config_changed_on_disk())
+
+        configs[1] = dict(configs[1], model_name="llama3:70b")
+        del configs[2]
+        configs.append({"id": "new", "provider": "ollama", "enabled": True, "model_name": "phi3"})
+        self._write_config(configs, default_provider="keep")
+
+        self.assertTrue(manager.config_changed_on_disk())
+        diff = manager.reload_if_changed()
+
+        self.assertEqual(diff, {"added": ["new"], "removed": ["drop"], "changed": ["change"], "unchanged": ["keep"]})
+        self.assertIs(manager.get_llm_client("keep"), kept)
+        self.assertIsNot(manager.get_llm_client("change"), changed)
+        self.assertEqual(manager.get_available_configs()["change"]["model_name"], "llama3:70b")
+        self.assertCountEqual(manager._retired_connectors, [changed, dropped])
+        self.assertIsNone(manager.reload_if_changed())
+
+    def test_reload_falls_back_when_active_provider_removed(self):
+        self._write_config([
+            {"id": "a", "provider": "ollama", "enabled": True},
+            {"id": "b", "provider": "ollama", "enabled": True},
+        ], default_provider="a")
+        manager = self._manager_with_mock_connectors()
+        manager.set_active_provider("b")
+
+        self._write_config([{"id": "a", "provider": "ollama", "enabled": True}], default_provider="a")
+        manager.reload_config()
+        self.assertEqual(manager.active_provider_id, "a")
+
+    def test_invalid_reload_keeps_current_config(self):
+        self._write_config([{"id": "a", "provider": "ollama", "enabled": True}])
+        manager = self._manager_with_mock_connectors()
+        with open(self.config_path, 'w') as f:
+            f.write("llm_configs: [")
+        with self.assertRaises(LLMConfigError):
+            manager.reload_config()
+        self.assertIn("a", manager.get_available_configs())
+
+    def test_invalid_edit_is_reported_once_until_the_file_changes(self):
+        self._write_config([{"id": "a", "provider": "ollama", "enabled": True}])
+        manager = self._manager_with_mock_connectors()
+        with open(self.config_path, 'w') as f:
+            f.write("llm_configs: [")
+        with self.assertRaises(LLMConfigError):
+            manager.reload_if_changed()
+        self.assertIsNone(manager.reload_if_changed())
+
+        self._write_config([{"id": "b", "provider": "ollama", "enabled": True}])
+        self.assertEqual(manager.reload_if_changed()["added"], ["b"])
+
+    def test_drain_waits_for_inflight_requests_then_closes(self):
+        import asyncio
+        from unittest.mock import AsyncMock
+        self._write_config([{"id": "a", "provider": "ollama", "enabled": True}])
+        manager = self._manager_with_mock_connectors()
+        busy = MagicMock(inflight_requests=1)
+        busy.close = AsyncMock()
+        idle = MagicMock(inflight_requests=0)
+        idle.close = AsyncMock()
+        manager._retired_connectors = [busy, idle]
+
+        async def run():
+            drain = asyncio.create_task(manager.drain_retired_connectors(timeout=5, poll_interval=0.01))
+            await asyncio.sleep(0.05)
+            busy.close.assert_not_awaited()
+            busy.inflight_requests = 0
+            return await drain
+
+        closed = asyncio.run(run())
+        self.assertEqual(closed, 2)
+        busy.close.assert_awaited_once()
+        idle.close.assert_awaited_once()
+        self.assertEqual(manager._retired_connectors, [])
+
+
+class TestLLMManagerCancellation(unittest.TestCase):
+    """Tests for cancelling in-flight connector calls by request id."""
+
+    def setUp(self):
+        import tempfile
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        config_path = os.path.join(self.tmp_dir.name, "llm_config.yaml")
+        with open(config_path, 'w') as f:
+            yaml.dump({"llm_configs": [{"id": "a", "provider": "ollama", "enabled": True}]}, f)
+        home_patcher = patch('jarules_agent.core.llm_manager.Path.home', return_value=Path(self.tmp_dir.name))
+        home_patcher.start()
+        self.addCleanup(home_patcher.stop)
+
+        self.started = None
+        self.connector_cancelled = False
+        test_case = self
+
+        class SlowConnector:
+            async def generate_code(self, user_prompt, **kwargs):
+                test_case.started.set()
+                try:
+                    await asyncio.sleep(10)
+                except BaseException:
+                    test_case.connector_cancelled = True
+                    raise
+                return "never"
+
+        self.manager = LLMManager(config_path=config_path)
+        self.manager.connector_map = {"ollama": MagicMock(return_value=SlowConnector())}
+
+    def test_cancel_request_aborts_connector_call(self):
+        async def run():
+            self.started = asyncio.Event()
+            call = asyncio.create_task(self.manager.generate_code("hi", provider_id="a", request_id="req-1"))
+            await self.started.wait()
+            self.assertEqual(self.manager.get_inflight_request_ids(), ["req-1"])
+            self.assertTrue(self.manager.cancel_request("req-1"))
+            with self.assertRaises(LLMRequestCancelledError):
+                await call
+
+        asyncio.run(run())
+        self.assertTrue(self.connector_cancelled)
+        self.assertEqual(self.manager.get_inflight_request_ids(), [])
+        self.assertFalse(self.manager.cancel_request("req-1"))
+
+    def test_call_connector_returns_result_for_sync_methods(self):
+        self.manager.connector_map = {"ollama": MagicMock(return_value=MagicMock(explain_code=MagicMock(return_value="ok")))}
+        result = asyncio.run(self.manager.call_connector("explain_code", "x = 1", provider_id="a"))
+        self.assertEqual(result, "ok")
+        self.assertEqual(self.manager.get_inflight_request_ids(), [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from typing import Optional
+
+from jarules_agent.core import metrics
+from jarules_agent.core.metrics import MetricsError, MetricsRegistry, define_llm_metrics, observe_request
+from jarules_agent.connectors.base_llm_connector import BaseLLMConnector
+
+
+class _FakeConnector(BaseLLMConnector):
+    PROVIDER_NAME = "fake"
+
+    async def generate_code(self, user_prompt: str, system_instruction: Optional[str] = None, history=None, **kwargs) -> Optional[str]:
+        with self._track_request() as observation:
+            await asyncio.sleep(0)
+            if user_prompt == "fail":
+                raise RuntimeError("provider error")
+            observation.record_usage(prompt_tokens=12, completion_tokens=30, time_to_first_token=0.2)
+        return "ok"
+
+    def explain_code(self, code_snippet, system_instruction=None, history=None, **kwargs):
+        return None
+
+    def suggest_code_modification(self, code_snippet, issue_description, system_instruction=None, history=None, **kwargs):
+        return None
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        define_llm_metrics(self.registry)
+
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = self.registry.histogram("test_latency_seconds", "Test latency.", ("provider",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, provider="a")
+        histogram.observe(0.5, provider="a")
+        histogram.observe(5, provider="a")
+
+        text = self.registry.render_prometheus()
+
+        self.assertIn("# TYPE test_latency_seconds histogram", text)
+        self.assertIn('test_latency_seconds_bucket{provider="a",le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{provider="a",le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{provider="a",le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_count{provider="a"} 3', text)
+        self.assertIn('test_latency_seconds_sum{provider="a"} 5.55', text)
+
+    def test_quantile_interpolates_within_bucket(self):
+        histogram = self.registry.histogram("q_seconds", "Quantiles.", (), buckets=(1.0, 2.0))
+        for _ in range(4):
+            histogram.observe(1.5)
+        self.assertAlmostEqual(histogram.quantile(0.5), 1.5)
+        self.assertIsNone(self.registry.histogram("empty_seconds", "Empty.", ()).quantile(0.5))
+
+    def test_label_mismatch_and_redefinition_raise(self):
+        counter = self.registry.counter("c_total", "Counter.", ("provider",))
+        with self.assertRaises(MetricsError):
+            counter.inc(model="x")
+        with self.assertRaises(MetricsError):
+            self.registry.histogram("c_total", "Counter.", ("provider",))
+        self.assertIs(self.registry.counter("c_total", "Counter.", ("provider",)), counter)
+
+    def test_observe_request_records_outcomes(self):
+        with observe_request("p", "m", "generate", registry=self.registry) as observation:
+            observation.record_usage(prompt_tokens=10, completion_tokens=20)
+        with self.assertRaises(ValueError):
+            with observe_request("p", "m", "generate", registry=self.registry):
+                raise ValueError("boom")
+
+        async def cancelled_call():
+            with observe_request("p", "m", "generate", registry=self.registry):
+                await asyncio.sleep(10)
+
+        async def run():
+            task = asyncio.create_task(cancelled_call())
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        asyncio.run(run())
+
+        requests = self.registry.get("jarules_llm_requests_total")
+        for outcome in ("ok", "error", "cancelled"):
+            self.assertEqual(requests.value(provider="p", model="m", operation="generate", outcome=outcome), 1)
+        latency = self.registry.get("jarules_llm_request_latency_seconds")
+        self.assertEqual(latency.summary(provider="p", model="m", operation="generate")["count"], 1)
+        tokens = self.registry.get("jarules_llm_tokens_total")
+        self.assertEqual(tokens.value(provider="p", model="m", kind="completion"), 20)
+
+    def test_record_usage_ignores_non_numeric_values(self):
+        observation = metrics.RequestObservation("p", "m", "generate")
+        observation.record_usage(prompt_tokens=object(), completion_tokens=True, time_to_first_token=None)
+        self.assertIsNone(observation.prompt_tokens)
+        self.assertIsNone(observation.completion_tokens)
+        self.assertIsNone(observation.time_to_first_token)
+
+    def test_flush_accumulates_across_processes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for _ in range(2):
+                with observe_request("p", "m", "generate", registry=self.registry) as observation:
+                    observation.record_usage(completion_tokens=5)
+                self.registry.flush(tmp_dir)
+
+            self.assertEqual(self.registry.get("jarules_llm_requests_total")._series, {})
+            with open(os.path.join(tmp_dir, metrics.METRICS_JSON_FILENAME)) as f:
+                stored = json.load(f)
+            self.assertIn("jarules_llm_requests_total", stored)
+            with open(os.path.join(tmp_dir, metrics.METRICS_PROM_FILENAME)) as f:
+                self.assertIn('kind="completion"} 10', f.read())
+
+            summary = metrics.summarize_llm_metrics(metrics.load_registry(tmp_dir))
+            self.assertEqual(len(summary), 1)
+            self.assertEqual(summary[0]["requests"], {"ok": 2, "error": 0, "cancelled": 0})
+            self.assertEqual(summary[0]["completion_tokens"], 10)
+            self.assertIsNotNone(summary[0]["latency_p95_seconds"])
+            self.assertIsNone(summary[0]["ttft_mean_seconds"])
+
+    def test_load_registry_tolerates_corrupt_store(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, metrics.METRICS_JSON_FILENAME), 'w') as f:
+                f.write("{not json")
+            self.assertEqual(metrics.summarize_llm_metrics(metrics.load_registry(tmp_dir)), [])
+
+
+class TestConnectorInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        metrics.REGISTRY.reset()
+        self.addCleanup(metrics.REGISTRY.reset)
+
+    def test_track_request_records_into_global_registry(self):
+        connector = _FakeConnector(model_name="fake-model")
+        self.assertEqual(asyncio.run(connector.generate_code("hi")), "ok")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(connector.generate_code("fail"))
+
+        self.assertEqual(connector.inflight_requests, 0)
+        summary = metrics.summarize_llm_metrics(metrics.REGISTRY)
+        self.assertEqual(len(summary), 1)
+        row = summary[0]
+        self.assertEqual((row["provider"], row["model"]), ("fake", "fake-model"))
+        self.assertEqual(row["requests"], {"ok": 1, "error": 1, "cancelled": 0})
+        self.assertEqual(row["prompt_tokens"], 12)
+        self.assertEqual(row["completion_tokens"], 30)
+        self.assertAlmostEqual(row["ttft_mean_seconds"], 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
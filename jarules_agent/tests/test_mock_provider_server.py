@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from jarules_agent.testing.mock_provider_server import (
+    LatencyDistribution, MockProviderConfig, MockProviderServer, MockServerError
+)
+from jarules_agent.connectors.ollama_connector import OllamaConnector, OllamaApiError
+from jarules_agent.connectors.openrouter_connector import OpenRouterConnector
+from jarules_agent.connectors.claude_connector import ClaudeConnector
+
+
+class TestMockProviderConfig(unittest.TestCase):
+
+    def test_latency_spec_parsing(self):
+        self.assertEqual(LatencyDistribution.from_spec(0.25).sample(None), 0.25)
+        self.assertEqual(LatencyDistribution.from_spec("0.5").kind, "fixed")
+        uniform = LatencyDistribution.from_spec("uniform:0.1,0.2")
+        self.assertEqual((uniform.kind, uniform.a, uniform.b), ("uniform", 0.1, 0.2))
+        with self.assertRaises(MockServerError):
+            LatencyDistribution.from_spec("bogus:1,2")
+
+    def test_invalid_rates_rejected(self):
+        with self.assertRaises(MockServerError):
+            MockProviderConfig(error_rate=1.5)
+        with self.assertRaises(MockServerError):
+            MockProviderConfig(token_rate=0)
+
+
+class TestMockProviderServer(unittest.IsolatedAsyncioTestCase):
+    """Drives the real connectors and httpx against the mock server over local sockets."""
+
+    async def asyncSetUp(self):
+        self.env_patch = patch.dict(os.environ, {"OPENROUTER_API_KEY": "mock-key", "ANTHROPIC_API_KEY": "mock-key"})
+        self.env_patch.start()
+        self.server = await MockProviderServer(MockProviderConfig(completion_tokens=6, seed=7)).start()
+        self.client = httpx.AsyncClient(timeout=5)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await self.server.stop()
+        self.env_patch.stop()
+
+    async def test_ollama_connector_round_trip(self):
+        connector = OllamaConnector(model_name="llama3", api_base_url=self.server.url)
+        try:
+            first = await connector.generate_code("write a function")
+            second = await connector.generate_code("write a function")
+            tags = (await connector.client.get("/api/tags")).json()
+        finally:
+            await connector.close()
+        self.assertEqual(len(first.split()), 6)
+        self.assertEqual(first, second)  # Same prompt, same text
+        self.assertIn("llama3", [model["name"] for model in tags["models"]])
+        self.assertEqual(self.server.stats["by_route"]["ollama_generate"], 2)
+        self.assertEqual(self.server.stats["connections_opened"], 1)  # Keep-alive reused the pooled connection
+
+    async def test_openrouter_and_claude_connectors_round_trip(self):
+        openrouter = OpenRouterConnector(model_name="mock-model", api_base_url=self.server.openai_base_url)
+        claude = ClaudeConnector(model_name="mock-model", api_base_url=self.server.anthropic_base_url)
+        try:
+            self.assertEqual(len((await openrouter.generate_code("hi")).split()), 6)
+            self.assertEqual(len((await claude.generate_code("hi")).split()), 6)
+        finally:
+            await openrouter.close()
+            await claude.close()
+        self.assertEqual(self.server.stats["by_status"][200], 2)
+
+    async def test_ollama_streams_ndjson_by_default(self):
+        async with self.client.stream("POST", f"{self.server.url}/api/generate", json={"model": "llama3", "prompt": "hi"}) as response:
+            lines = [json.loads(line) async for line in response.aiter_lines() if line]
+        self.assertEqual(len(lines), 7)
+        self.assertTrue(lines[-1]["done"])
+        self.assertEqual(lines[-1]["eval_count"], 6)
+
+    async def test_openai_and_gemini_sse_streams(self):
+        body = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "stream": True, "max_tokens": 3}
+        async with self.client.stream("POST", f"{self.server.openai_base_url}/chat/completions", json=body) as response:
+            self.assertEqual(response.headers["content-type"], "text/event-stream")
+            events = [line[len("data: "):] async for line in response.aiter_lines() if line.startswith("data: ")]
+        self.assertEqual(events[-1], "[DONE]")
+        chunks = [json.loads(e) for e in events[:-1]]
+        self.assertEqual("".join(c["choices"][0]["delta"].get("content", "") for c in chunks).count(" "), 2)
+        self.assertEqual(chunks[-1]["usage"]["completion_tokens"], 3)
+
+        url = f"{self.server.gemini_endpoint}/v1beta/models/gemini-pro:streamGenerateContent?alt=sse"
+        async with self.client.stream("POST", url, json={"contents": [{"parts": [{"text": "hi"}]}]}) as response:
+            events = [json.loads(line[6:]) async for line in response.aiter_lines() if line.startswith("data: ")]
+        self.assertEqual(events[-1]["candidates"][0]["finishReason"], "STOP")
+        self.assertEqual(events[-1]["usageMetadata"]["candidatesTokenCount"], 6)
+
+    async def test_rate_limit_returns_429_with_retry_after(self):
+        await self.server.stop()
+        self.server = await MockProviderServer(MockProviderConfig(rate_limit_rps=1, rate_limit_burst=1, retry_after=2)).start()
+        url = f"{self.server.openai_base_url}/chat/completions"
+        body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+        first = await self.client.post(url, json=body)
+        second = await self.client.post(url, json=body)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(second.headers["retry-after"], "2")
+        self.assertEqual(second.json()["error"]["code"], 429)
+
+    async def test_injected_errors_surface_as_connector_errors(self):
+        await self.server.stop()
+        self.server = await MockProviderServer(MockProviderConfig(error_rate=1.0)).start()
+        connector = OllamaConnector(model_name="llama3", api_base_url=self.server.url)
+        try:
+            with self.assertRaises(OllamaApiError) as ctx:
+                await connector.generate_code("hi")
+        finally:
+            await connector.close()
+        self.assertEqual(ctx.exception.status_code, 500)
+
+    async def test_disconnect_mid_stream(self):
+        await self.server.stop()
+        self.server = await MockProviderServer(MockProviderConfig(disconnect_rate=1.0, completion_tokens=10)).start()
+        with self.assertRaises(httpx.HTTPError):
+            async with self.client.stream("POST", f"{self.server.url}/api/chat", json={"model": "m", "messages": []}) as response:
+                async for _ in response.aiter_lines():
+                    pass
+        self.assertEqual(self.server.stats["disconnects"], 1)
+
+    async def test_latency_and_token_rate_are_applied_concurrently(self):
+        await self.server.stop()
+        self.server = await MockProviderServer(MockProviderConfig(latency=0.1, token_rate=100, completion_tokens=5)).start()
+        body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            self.client.post(f"{self.server.openai_base_url}/chat/completions", json=body) for _ in range(5)
+        ])
+        elapsed = time.perf_counter() - started
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        self.assertGreaterEqual(elapsed, 0.15)  # 0.1s latency + 5 tokens at 100/s
+        self.assertLess(elapsed, 0.75)  # Requests overlap rather than queueing
+        self.assertEqual(self.server.stats["max_active_requests"], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
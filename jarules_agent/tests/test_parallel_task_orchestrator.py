@@ -0,0 +1,345 @@
+import asyncio
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from jarules_agent.git_task_runners import git_utils
+from jarules_agent.git_task_runners.agent_worker_pool import AgentWorkerPool
+from jarules_agent.git_task_runners.archive_cache import ArchiveCache
+from jarules_agent.git_task_runners.parallel_task_orchestrator import ParallelTaskManager, agent_branch_name
+from jarules_agent.git_task_runners.run_store import RunStore
+from jarules_agent.tests.test_agent_worker_pool import process_is_running
+from jarules_agent.tests.test_git_utils import _git, make_test_repo
+
+# Agents whose id starts with "slow" start a child process and never finish; others complete at once.
+SLOW_AGENT_WORKER = textwrap.dedent("""
+    import json, subprocess, sys, time
+    for line in sys.stdin:
+        job = json.loads(line)
+        ids = {"runId": job["run_id"], "agentId": job["agent_id"]}
+        if job["agent_id"].startswith("slow"):
+            child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+            print(json.dumps(dict(status="processing", childPid=child.pid, **ids)), flush=True)
+            time.sleep(60)
+        print(json.dumps(dict(status="completed", **ids)), flush=True)
+        print(json.dumps({"type": "job_done", "jobId": job["jobId"], "success": True}), flush=True)
+""")
+
+
+class TestParallelTaskManagerWorktrees(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        self.worktree_root = os.path.join(self.temp_dir, "worktrees")
+        make_test_repo(self.repo)
+        self.run_store = RunStore(os.path.join(self.temp_dir, "runs.sqlite3"))
+        self.manager = ParallelTaskManager(repo_path=self.repo, worktree_root=self.worktree_root, run_store=self.run_store)
+
+    def tearDown(self):
+        self.run_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _start_run(self, agents, base_branch="main", runs=1):
+        async def run_and_close():
+            try:
+                for _ in range(runs):
+                    await self.manager.start_run("Write a component", agents, base_branch)
+                    self.worker_pids.append({w.process.pid for w in self.manager.worker_pool.workers})
+            finally:
+                await self.manager.close()
+
+        self.worker_pids = []
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout, \
+             patch.dict(os.environ, {"LOG_LEVEL": "WARNING"}):
+            asyncio.run(run_and_close())
+        messages = []
+        for line in stdout.getvalue().splitlines():
+            try:
+                messages.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass
+        return messages
+
+    def test_agents_run_in_own_worktrees_and_are_cleaned_up(self):
+        messages = self._start_run([{"id": "a1"}, {"id": "a2"}])
+
+        completed = [m["data"] for m in messages if m.get("type") == "agent_update" and m["data"].get("status") == "completed"]
+        self.assertEqual(sorted(update["agentId"] for update in completed), ["a1", "a2"])
+        for update in completed:
+            self.assertIn(f"llm_output_{update['agentId']}.txt", update["committedFiles"])
+        self.assertEqual(messages[-1]["overallStatus"], "completed")
+
+        # Main checkout untouched, worktrees and agent branches gone.
+        self.assertEqual(git_utils.get_current_branch(repo_path=self.repo), "main")
+        self.assertEqual(git_utils._run_git_command(['git', 'status', '--porcelain'], cwd=self.repo), "")
+        self.assertEqual(len(git_utils.list_worktrees(repo_path=self.repo)), 1)
+        self.assertEqual(os.listdir(self.worktree_root), [])
+        self.assertEqual(git_utils._run_git_command(['git', 'branch', '--list', 'agent-*'], cwd=self.repo), "")
+        self.assertEqual(self.manager.active_runs, {})
+
+    def test_run_state_is_queryable_after_cleanup_from_another_manager(self):
+        messages = self._start_run([{"id": "a1", "provider": "ollama"}])
+        run_id = messages[-1]["runId"]
+
+        other = ParallelTaskManager(repo_path=self.repo, run_store=RunStore(self.run_store.db_path))
+        status = other.get_run_status(run_id)
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["agents"]["a1"]["status"], "completed")
+        self.assertEqual(status["agents"]["a1"]["provider"], "ollama")
+        outputs = other.get_agent_outputs(run_id, "a1")
+        self.assertTrue(outputs["success"])
+        self.assertIn("Solution Summary", outputs["solutionSummary"])
+        self.assertEqual(other.get_run_status("nope"), {"status": "not_found"})
+        self.assertEqual(other.get_agent_outputs("nope", "a1"), {"success": False, "error": "Run not found."})
+        other.run_store.close()
+
+    def test_run_store_writes_happen_off_the_event_loop(self):
+        threads = []
+        original_record = self.run_store.record_agent_update
+
+        def record_agent_update(*args):
+            threads.append(threading.current_thread())
+            original_record(*args)
+
+        with patch.object(self.run_store, "record_agent_update", side_effect=record_agent_update):
+            messages = self._start_run([{"id": "a1"}, {"id": "a2"}])
+
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+        status = self.manager.get_run_status(messages[-1]["runId"])
+        self.assertEqual({agent["status"] for agent in status["agents"].values()}, {"completed"})
+
+    def test_workers_are_reused_across_runs(self):
+        self.manager = ParallelTaskManager(repo_path=self.repo, worktree_root=self.worktree_root, pool_size=2,
+                                           run_store=self.run_store)
+
+        messages = self._start_run([{"id": "a1"}, {"id": "a2"}, {"id": "a3"}], runs=2)
+
+        completed = [m["data"]["agentId"] for m in messages if m.get("type") == "agent_update" and m["data"].get("status") == "completed"]
+        self.assertEqual(sorted(completed), ["a1", "a1", "a2", "a2", "a3", "a3"])
+        self.assertEqual(len(self.worker_pids[0]), 2)
+        self.assertEqual(self.worker_pids[0], self.worker_pids[1])
+        self.assertIsNone(self.manager.worker_pool)
+
+    def test_agents_beyond_concurrency_limit_are_queued(self):
+        self.manager = ParallelTaskManager(repo_path=self.repo, worktree_root=self.worktree_root,
+                                           max_concurrency=1, run_store=self.run_store)
+
+        messages = self._start_run([{"id": "a1", "provider": "ollama"}, {"id": "a2", "provider": "ollama"}])
+
+        updates = [m["data"] for m in messages if m.get("type") == "agent_update"]
+        queued = [u for u in updates if u["status"] == "queued"]
+        self.assertEqual([(u["agentId"], u["queuePosition"], u["queueDepth"]) for u in queued], [("a2", 1, 1)])
+        completed = [u["agentId"] for u in updates if u["status"] == "completed"]
+        self.assertEqual(completed, ["a1", "a2"])
+        self.assertEqual(len(self.worker_pids[0]), 1)
+
+    def test_cleanup_spawns_constant_number_of_git_processes(self):
+        async def scenario(agent_count):
+            run_id = f"{agent_count:08d}-cleanup"
+            worktrees = {}
+            for i in range(agent_count):
+                worktrees[f"a{i}"] = await git_utils.add_worktree_async(
+                    self.manager._worktree_path(run_id, f"a{i}"), f"agent-a{i}-{run_id[:8]}", "main", repo_path=self.repo)
+            self.manager.active_runs[run_id] = {"agents": {agent_id: {} for agent_id in worktrees}, "worktrees": worktrees}
+            with patch.object(git_utils, "_run_git_command_async", wraps=git_utils._run_git_command_async) as run:
+                await self.manager.cleanup_run(run_id, "main")
+            return run.call_count
+
+        self.assertEqual(asyncio.run(scenario(2)), asyncio.run(scenario(12)))
+        self.assertEqual(len(git_utils.list_worktrees(repo_path=self.repo)), 1)
+        self.assertEqual(git_utils.list_refs(["refs/heads/agent-*"], repo_path=self.repo), {})
+
+    def test_worktree_failure_reports_agent_error(self):
+        messages = self._start_run([{"id": "a1"}], base_branch="does-not-exist")
+
+        errors = [m["data"] for m in messages if m.get("type") == "agent_update" and m["data"].get("status") == "error"]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]["agentId"], "a1")
+        self.assertIn("does-not-exist", errors[0]["errorDetails"])
+        self.assertEqual(len(git_utils.list_worktrees(repo_path=self.repo)), 1)
+
+
+
+class TestParallelTaskManagerArchives(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        make_test_repo(self.repo)
+        self.run_store = RunStore(os.path.join(self.temp_dir, "runs.sqlite3"))
+        self.manager = ParallelTaskManager(repo_path=self.repo, run_store=self.run_store,
+                                           archive_cache=ArchiveCache(os.path.join(self.temp_dir, "archives")))
+        self.run_id = "0123456789abcdef"
+        self.branch = agent_branch_name(self.run_id, "a1")
+        self.run_store.create_run(self.run_id, self.repo, "task", "main", [{"agent_id": "a1"}])
+        _git(self.repo, "branch", self.branch, "main")
+
+    def tearDown(self):
+        self.run_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_zip_is_recorded_and_still_served_after_branch_is_deleted(self):
+        result = self.manager.create_zip_archive(self.run_id, "a1")
+        self.assertTrue(result["success"])
+        self.assertFalse(result["cached"])
+        self.assertEqual(result["filename"], f"run_{self.run_id}_agent_a1_{self.branch}.zip")
+        self.assertEqual(self.run_store.get_artifact(self.run_id, "a1", "zip")["metadata"]["treeSha"], result["treeSha"])
+
+        _git(self.repo, "branch", "-D", self.branch)
+        again = self.manager.create_zip_archive(self.run_id, "a1")
+        self.assertTrue(again["success"])
+        self.assertEqual((again["downloadPath"], again["treeSha"]), (result["downloadPath"], result["treeSha"]))
+        self.assertFalse(self.manager.create_zip_archive(self.run_id, "a2")["success"])
+
+    def test_file_content_is_read_through_the_persistent_object_reader(self):
+        async def scenario():
+            try:
+                first = await self.manager.get_file_content(self.run_id, "a1", "README.md")
+                missing = await self.manager.get_file_content(self.run_id, "a1", "missing.txt")
+                again = await self.manager.get_file_content(self.run_id, "a1", "README.md")
+                return first, missing, again, self.manager._object_reader.cache_info()
+            finally:
+                await self.manager.close()
+
+        with patch.object(git_utils, "_run_git_command", side_effect=AssertionError("no per-file git process")):
+            first, missing, again, cache_info = asyncio.run(scenario())
+
+        self.assertEqual(first, {"success": True, "content": "test repository\n"})
+        self.assertEqual(again, first)
+        self.assertFalse(missing["success"])
+        self.assertIn("Could not read file from branch", missing["error"])
+        self.assertEqual(cache_info["hits"], 1)
+        self.assertIsNone(self.manager._object_reader)
+
+    def test_stream_zip_archive_writes_without_caching(self):
+        output = io.BytesIO()
+        result = self.manager.stream_zip_archive(self.run_id, "a1", output)
+        self.assertTrue(result["success"])
+        self.assertFalse(result["cached"])
+        self.assertEqual(result["bytes"], len(output.getvalue()))
+        self.assertEqual(self.manager.archive_cache.entries(), [])
+
+        cached = self.manager.create_zip_archive(self.run_id, "a1")
+        second = io.BytesIO()
+        self.assertTrue(self.manager.stream_zip_archive(self.run_id, "a1", second)["cached"])
+        with open(cached["downloadPath"], "rb") as f:
+            self.assertEqual(second.getvalue(), f.read())
+        self.assertEqual(output.getvalue(), second.getvalue())
+        self.assertFalse(self.manager.stream_zip_archive(self.run_id, "missing", io.BytesIO())["success"])
+
+
+
+class TestParallelTaskManagerDeadlines(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = os.path.join(self.temp_dir, "repo")
+        self.worktree_root = os.path.join(self.temp_dir, "worktrees")
+        make_test_repo(self.repo)
+        self.worker_script = os.path.join(self.temp_dir, "slow_worker.py")
+        with open(self.worker_script, "w") as f:
+            f.write(SLOW_AGENT_WORKER)
+        self.run_store = RunStore(os.path.join(self.temp_dir, "runs.sqlite3"))
+
+    def tearDown(self):
+        self.run_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, agents, cancel_after=None, **manager_kwargs):
+        async def scenario():
+            pool = AgentWorkerPool(size=2, python_executable=sys.executable, worker_script=self.worker_script)
+            manager = ParallelTaskManager(repo_path=self.repo, worktree_root=self.worktree_root, worker_pool=pool,
+                                          run_store=self.run_store, **manager_kwargs)
+            try:
+                run = asyncio.create_task(manager.start_run("Write a component", agents, "main"))
+                if cancel_after is not None:
+                    await asyncio.sleep(cancel_after)
+                    self.assertEqual(len(manager.active_runs), 1)
+                    self.assertTrue(manager.cancel_run(next(iter(manager.active_runs)), reason="Stopped by user."))
+                started = time.monotonic()
+                await run
+                self.elapsed = time.monotonic() - started
+            finally:
+                await manager.close()
+                await pool.close()
+            self.assertEqual(manager.active_runs, {})
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            asyncio.run(scenario())
+        messages = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        statuses = {}
+        for message in messages:
+            if message.get("type") == "agent_update":
+                statuses.setdefault(message["data"]["agentId"], {}).update(message["data"])
+        return messages, statuses
+
+    def assertRunCleanedUp(self, statuses):
+        self.assertEqual(len(git_utils.list_worktrees(repo_path=self.repo)), 1)
+        self.assertEqual(os.listdir(self.worktree_root), [])
+        self.assertEqual(git_utils._run_git_command(['git', 'branch', '--list', 'agent-*'], cwd=self.repo), "")
+        for status in statuses.values():
+            if "childPid" in status:
+                for _ in range(100):
+                    if not process_is_running(status["childPid"]):
+                        break
+                    time.sleep(0.05)
+                self.assertFalse(process_is_running(status["childPid"]))
+
+    def test_agent_past_its_deadline_is_stopped(self):
+        messages, statuses = self._run([{"id": "slow1", "timeout": 0.5}, {"id": "fast"}])
+
+        self.assertEqual(statuses["fast"]["status"], "completed")
+        self.assertEqual(statuses["slow1"]["status"], "error")
+        self.assertIn("deadline", statuses["slow1"]["errorMessage"])
+        self.assertEqual(messages[-1]["overallStatus"], "completed")
+        self.assertRunCleanedUp(statuses)
+
+    def test_run_past_its_deadline_is_cancelled(self):
+        messages, statuses = self._run([{"id": "slow1"}, {"id": "slow2"}, {"id": "fast"}],
+                                       max_concurrency=2, run_timeout=0.5)
+
+        self.assertEqual(messages[-1]["overallStatus"], "cancelled")
+        self.assertIn("deadline", messages[-1]["message"])
+        self.assertEqual(statuses["slow1"]["status"], "cancelled")
+        self.assertEqual(statuses["slow2"]["status"], "cancelled")
+        self.assertRunCleanedUp(statuses)
+        run_id = messages[-1]["runId"]
+        self.assertEqual(self.run_store.get_run(run_id)["status"], "cancelled")
+
+    def test_run_deadline_includes_worktree_setup(self):
+        add_worktree_async = git_utils.add_worktree_async
+
+        async def slow_add_worktree(*args, **kwargs):
+            await asyncio.sleep(0.5)
+            return await add_worktree_async(*args, **kwargs)
+
+        with patch.object(git_utils, "add_worktree_async", side_effect=slow_add_worktree):
+            messages, statuses = self._run([{"id": "fast1"}, {"id": "fast2"}, {"id": "fast3"}], run_timeout=0.8)
+
+        self.assertEqual(messages[-1]["overallStatus"], "cancelled")
+        self.assertIn("deadline", messages[-1]["message"])
+        self.assertEqual(statuses["fast3"]["status"], "cancelled")
+        self.assertRunCleanedUp(statuses)
+
+    def test_cancel_run_stops_agents_and_cleans_up_promptly(self):
+        messages, statuses = self._run([{"id": "slow1"}, {"id": "slow2"}], cancel_after=1.0)
+
+        self.assertLess(self.elapsed, 10)
+        self.assertEqual(messages[-1]["overallStatus"], "cancelled")
+        self.assertEqual(messages[-1]["message"], "Stopped by user.")
+        self.assertEqual({s["status"] for s in statuses.values()}, {"cancelled"})
+        self.assertRunCleanedUp(statuses)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from jarules_agent.git_task_runners.run_store import RunStore, RunStoreError
+
+
+class TestRunStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "state", "runs.sqlite3")
+        self.store = RunStore(self.db_path)
+        self.store.create_run("run-1", "/repo", "Write tests", "main", [
+            {"agent_id": "a1", "provider": "ollama", "branch_name": "agent-a1-run-1"},
+            {"agent_id": "a2", "provider": "claude"},
+        ])
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_create_and_get_run(self):
+        run = self.store.get_run("run-1")
+        self.assertEqual(run["status"], "starting")
+        self.assertEqual(run["taskPrompt"], "Write tests")
+        self.assertEqual(sorted(run["agents"]), ["a1", "a2"])
+        self.assertEqual(run["agents"]["a1"]["status"], "queued")
+        self.assertEqual(run["agents"]["a1"]["branchName"], "agent-a1-run-1")
+        self.assertIsNone(self.store.get_run("missing"))
+        self.assertNotIn("agents", self.store.get_run("run-1", include_agents=False))
+
+    def test_agent_updates_keep_results(self):
+        self.store.record_agent_update("run-1", "a1", {"status": "completed", "solutionSummary": "Done",
+                                                       "keyFilePaths": ["a.py"], "committedFiles": ["a.py", "b.md"]})
+        self.store.record_agent_update("run-1", "a1", {"status": "finalized"})
+
+        agent = self.store.get_agent("run-1", "a1")
+        self.assertEqual(agent["status"], "finalized")
+        self.assertEqual(agent["solutionSummary"], "Done")
+        self.assertEqual(agent["keyFilePaths"], ["a.py"])
+        self.assertEqual(agent["committedFiles"], ["a.py", "b.md"])
+        self.assertIsNone(self.store.get_agent("run-1", "nope"))
+
+    def test_run_status_and_finish_time(self):
+        self.store.update_run_status("run-1", "running")
+        self.assertIsNone(self.store.get_run("run-1")["finishedAt"])
+        self.store.update_run_status("run-1", "completed", message="All done")
+        run = self.store.get_run("run-1")
+        self.assertEqual((run["status"], run["message"]), ("completed", "All done"))
+        self.assertIsNotNone(run["finishedAt"])
+
+    def test_state_is_visible_from_another_connection(self):
+        self.store.set_agent_worktree("run-1", "a2", "/wt/a2")
+        self.store.record_artifact("run-1", "a2", "zip", "/tmp/a2.zip", {"filename": "a2.zip"})
+
+        other = RunStore(self.db_path)
+        try:
+            self.assertEqual(other.get_agent("run-1", "a2")["worktreePath"], "/wt/a2")
+            self.assertEqual(other.get_artifact("run-1", "a2", "zip")["metadata"], {"filename": "a2.zip"})
+            self.assertIsNone(other.get_artifact("run-1", "a1", "zip"))
+        finally:
+            other.close()
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_history_is_newest_first_and_pageable(self):
+        for i in range(2, 6):
+            self.store.create_run(f"run-{i}", "/repo" if i % 2 else "/other", "task", "main", [])
+        history = self.store.list_runs(limit=3)
+        self.assertEqual([r["runId"] for r in history], ["run-5", "run-4", "run-3"])
+        self.assertEqual([r["runId"] for r in self.store.list_runs(before=history[-1]["createdAt"])], ["run-2", "run-1"])
+        self.assertEqual([r["runId"] for r in self.store.list_runs(repo_path="/other")], ["run-4", "run-2"])
+
+    def test_duplicate_run_and_delete(self):
+        with self.assertRaises(RunStoreError):
+            self.store.create_run("run-1", "/repo", "again", "main", [])
+        self.store.delete_run("run-1")
+        self.assertIsNone(self.store.get_run("run-1"))
+        self.assertIsNone(self.store.get_agent("run-1", "a1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
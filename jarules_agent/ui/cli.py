@@ -1,5 +1,6 @@
 # jarules_agent/ui/cli.py
 
+import asyncio
 import sys
 # Correcting the import path assuming jarules_agent is in PYTHONPATH
 # or the script is run from the directory containing jarules_agent.
@@ -49,6 +50,16 @@ def display_help():
     print("                                   Example: gh_ls octocat/Hello-World/docs")
     print("    gh_read <owner>/<repo>/<file_path> - Reads a file from a GitHub repository.")
     print("                                   Example: gh_read octocat/Hello-World/README.md")
+    print("    gh_find <owner>/<repo>[@<branch>] <pattern> - Finds paths matching a glob pattern in a GitHub repository.")
+    print("                                   Example: gh_find octocat/Hello-World \"**/*.md\"")
+    print("    gh_fetch <owner>/<repo>[@<ref>] - Downloads a repository snapshot; later gh_read calls for it read from disk.")
+    print("                                   Example: gh_fetch octocat/Hello-World@main")
+    print("    gh_mirror <owner>/<repo> - Creates or updates a local git mirror; later gh_ls/gh_read calls for it use git.")
+    print("                                   Example: gh_mirror octocat/Hello-World")
+    print("    gh_branches <owner>/<repo> - Lists all branches of a GitHub repository, page by page.")
+    print("                                   Example: gh_branches octocat/Hello-World")
+    print("    gh_download <owner>/<repo>/<file_path> <local_path> - Downloads a file of any size or type from a GitHub repository.")
+    print("                                   Example: gh_download octocat/Hello-World/logo.png ./logo.png")
     print("\n  AI:")
     print("    ai gencode \"<prompt_text>\"   - Generates code based on the provided prompt.")
     print("    ai explain \"<code_snippet>\"  - Explains the provided code snippet.")
@@ -82,6 +93,25 @@ def parse_quoted_args(text):
         return text.split()
 
 
+def apply_llm_config_changes(llm_manager):
+    """
+    Picks up edits to llm_config.yaml without restarting the CLI. Connectors replaced by the reload are
+    closed straight away, since no AI command is running between prompts. An invalid edit is reported
+    and the previous configuration stays in use.
+    """
+    try:
+        diff = llm_manager.reload_if_changed()
+    except LLMConfigError as e:
+        print(f"Ignoring invalid change to the LLM configuration: {e}")
+        return
+    if diff is None:
+        return
+    changed = [f"{label}: {', '.join(diff[key])}" for key, label in
+               (("added", "added"), ("removed", "removed"), ("changed", "changed")) if diff[key]]
+    print(f"LLM configuration reloaded ({'; '.join(changed) or 'no provider changes'}).")
+    asyncio.run(llm_manager.drain_retired_connectors())
+
+
 def run_cli():
     """Runs the main command-line interface loop."""
     print("Welcome to JaRules CLI!")
@@ -121,6 +151,9 @@ def run_cli():
             if not raw_input:
                 continue
 
+            if llm_manager:
+                apply_llm_config_changes(llm_manager)
+
             parts = raw_input.split()
             command = parts[0].lower()
             args = parts[1:]
@@ -218,6 +251,92 @@ def run_cli():
                         print("Usage: gh_read <owner>/<repo>/<file_path>")
                 else:
                     print("Usage: gh_read <owner>/<repo>/<file_path>")
+            elif command == "gh_find":
+                repo_spec, _, branch = args[0].partition('@') if len(args) == 2 else ("", "", "")
+                path_parts = repo_spec.split('/')
+                if len(path_parts) == 2 and all(path_parts):
+                    owner, repo = path_parts
+                    pattern = strip_quotes(args[1])
+                    try:
+                        print(f"Searching GitHub repo: {owner}/{repo}{'@' + branch if branch else ''} for '{pattern}'...")
+                        index = github_client.get_repo_tree_index(owner=owner, repo=repo, branch_name=branch or None)
+                        if index is None:
+                            print(f"Could not load the file tree of '{owner}/{repo}'.")
+                        else:
+                            matches = index.glob(pattern)
+                            if matches:
+                                print(f"\n{len(matches)} path(s) matching '{pattern}':")
+                                for match in matches:
+                                    print(f"  {match}")
+                            else:
+                                print(f"No paths matching '{pattern}' in '{owner}/{repo}'.")
+                    except Exception as e: # Catch any exception from the client
+                        print(f"Error searching GitHub repository: {e}")
+                else:
+                    print("Usage: gh_find <owner>/<repo>[@<branch>] <pattern>")
+            elif command == "gh_fetch":
+                repo_spec, _, ref = args[0].partition('@') if len(args) == 1 else ("", "", "")
+                path_parts = repo_spec.split('/')
+                if len(path_parts) == 2 and all(path_parts):
+                    owner, repo = path_parts
+                    try:
+                        print(f"Fetching snapshot of GitHub repo: {owner}/{repo}{'@' + ref if ref else ''}...")
+                        commit_sha = github_client.fetch_repo_snapshot(owner=owner, repo=repo, ref=ref or None)
+                        if commit_sha:
+                            print(f"Snapshot of '{owner}/{repo}' at {commit_sha} is ready; gh_read will serve it from disk.")
+                        else:
+                            print(f"Could not fetch a snapshot of '{owner}/{repo}'.")
+                    except Exception as e: # Catch any exception from the client
+                        print(f"Error fetching GitHub repository snapshot: {e}")
+                else:
+                    print("Usage: gh_fetch <owner>/<repo>[@<ref>]")
+            elif command == "gh_mirror":
+                path_parts = args[0].split('/') if len(args) == 1 else []
+                if len(path_parts) == 2 and all(path_parts):
+                    owner, repo = path_parts
+                    try:
+                        print(f"Mirroring GitHub repo: {owner}/{repo}...")
+                        commit_sha = github_client.mirror_repo(owner=owner, repo=repo)
+                        if commit_sha:
+                            print(f"Mirror of '{owner}/{repo}' is at {commit_sha}; gh_ls and gh_read will serve it through git.")
+                        else:
+                            print(f"Could not mirror '{owner}/{repo}'.")
+                    except Exception as e: # Catch any exception from the client
+                        print(f"Error mirroring GitHub repository: {e}")
+                else:
+                    print("Usage: gh_mirror <owner>/<repo>")
+            elif command == "gh_branches":
+                path_parts = args[0].split('/') if len(args) == 1 else []
+                if len(path_parts) == 2 and all(path_parts):
+                    owner, repo = path_parts
+                    try:
+                        print(f"\nBranches of '{owner}/{repo}':")
+                        count = 0
+                        for branch in github_client.iter_branches(owner=owner, repo=repo):
+                            print(f"  {branch.get('name')}")
+                            count += 1
+                        print(f"{count} branch(es).")
+                    except Exception as e: # Catch any exception from the client
+                        print(f"Error listing GitHub repository branches: {e}")
+                else:
+                    print("Usage: gh_branches <owner>/<repo>")
+            elif command == "gh_download":
+                path_parts = args[0].split('/') if len(args) == 2 else []
+                if len(path_parts) >= 3 and all(path_parts[:2]):
+                    owner, repo = path_parts[0], path_parts[1]
+                    file_path_in_repo = "/".join(path_parts[2:])
+                    local_path = strip_quotes(args[1])
+                    try:
+                        print(f"Downloading {owner}/{repo}/{file_path_in_repo} to '{local_path}'...")
+                        written = github_client.download_repo_file(owner=owner, repo=repo, file_path=file_path_in_repo, destination=local_path)
+                        if written is not None:
+                            print(f"Downloaded {written} bytes to '{local_path}'.")
+                        else:
+                            print(f"Could not download '{owner}/{repo}/{file_path_in_repo}'.")
+                    except Exception as e: # Catch any exception from the client
+                        print(f"Error downloading GitHub repository file: {e}")
+                else:
+                    print("Usage: gh_download <owner>/<repo>/<file_path> <local_path>")
             elif command == "set-model":
                 if not llm_manager:
                     print("LLMManager not available.")
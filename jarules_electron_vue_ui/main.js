@@ -9,6 +9,9 @@ const isDev = process.env.NODE_ENV !== 'production';
 // --- Global variables to store LLM state in main process ---
 let currentActiveModelId = null;
 let currentAvailableModels = [];
+// PythonShells running send_prompt_wrapper.py for in-flight prompts, keyed by the sending renderer's
+// webContents id, so one window stopping its generation never cancels another window's prompt.
+const activePromptShells = new Map(); // webContents id -> Set of PythonShell
 // --- Path to Python scripts ---
 // Assuming 'jarules_agent' is a sibling directory to 'jarules_electron_vue_ui'
 const jarulesAgentBaseDir = path.join(__dirname, '../../jarules_agent');
@@ -41,6 +44,72 @@ async function runPythonScript(scriptName, args = []) {
   }
 }
 
+// --- Persistent file content server ---
+// file_content_server.py stays running and answers one JSON line per request, matched by id. It keeps
+// `git cat-file` processes and a blob cache warm, so opening agent files does not start Python each time.
+const FILE_REQUEST_TIMEOUT_MS = 15000;
+let fileContentServer = null;
+let nextFileRequestId = 1;
+const pendingFileRequests = new Map(); // id -> { resolve, timer }
+
+function failPendingFileRequests(reason) {
+  for (const [id, pending] of pendingFileRequests) {
+    clearTimeout(pending.timer);
+    pending.resolve({ success: false, error: reason, serverUnavailable: true });
+    pendingFileRequests.delete(id);
+  }
+}
+
+function getFileContentServer() {
+  if (fileContentServer) return fileContentServer;
+  const shell = new PythonShell('file_content_server.py', {
+    mode: 'json',
+    pythonOptions: ['-u'],
+    scriptPath: pythonBridgeDir,
+  });
+  shell.on('message', (response) => {
+    const pending = pendingFileRequests.get(response.id);
+    if (!pending) return;
+    clearTimeout(pending.timer);
+    pendingFileRequests.delete(response.id);
+    const { id, ...result } = response;
+    pending.resolve(result);
+  });
+  shell.on('stderr', (line) => console.warn('[FileContentServer]', line));
+  shell.on('error', (err) => console.error('[FileContentServer] Error:', err));
+  shell.on('close', () => {
+    console.log('[FileContentServer] Exited.');
+    if (fileContentServer === shell) fileContentServer = null;
+    failPendingFileRequests('File content server exited.');
+  });
+  fileContentServer = shell;
+  return shell;
+}
+
+function requestFromFileContentServer(request) {
+  return new Promise((resolve) => {
+    const id = nextFileRequestId++;
+    const timer = setTimeout(() => {
+      pendingFileRequests.delete(id);
+      resolve({ success: false, error: 'Timed out waiting for file content server.', serverUnavailable: true });
+    }, FILE_REQUEST_TIMEOUT_MS);
+    pendingFileRequests.set(id, { resolve, timer });
+    try {
+      getFileContentServer().send({ id, ...request });
+    } catch (err) {
+      clearTimeout(timer);
+      pendingFileRequests.delete(id);
+      resolve({ success: false, error: err.message, serverUnavailable: true });
+    }
+  });
+}
+
+function stopFileContentServer() {
+  if (fileContentServer) {
+    fileContentServer.end(() => {}); // Closing stdin lets the server finish in-flight requests and exit
+    fileContentServer = null;
+  }
+}
 
 function createWindow() {
   // Create the browser window.
@@ -180,6 +249,11 @@ app.whenReady().then(async () => {
     };
 
     const pyshell = new PythonShell('send_prompt_wrapper.py', options);
+    const senderId = event.sender.id;
+    if (!activePromptShells.has(senderId)) {
+      activePromptShells.set(senderId, new Set());
+    }
+    activePromptShells.get(senderId).add(pyshell);
 
     // Optional: Send a message to renderer that streaming has started, if not implied by first chunk.
     // event.sender.send('llm:stream-started'); // Python script now sends a stream_start message
@@ -191,6 +265,8 @@ app.whenReady().then(async () => {
 
       if (message.type === 'chunk') {
         event.sender.send('llm:stream-chunk', message);
+      } else if (message.type === 'done' && message.cancelled) {
+        event.sender.send('llm:stream-done', { success: false, ...message });
       } else if (message.type === 'done') {
         event.sender.send('llm:stream-done', { success: true, ...message });
       } else if (message.type === 'error') {
@@ -204,6 +280,13 @@ app.whenReady().then(async () => {
     });
 
     pyshell.end(function (err, code, signal) {
+      const senderShells = activePromptShells.get(senderId);
+      if (senderShells) {
+        senderShells.delete(pyshell);
+        if (senderShells.size === 0) {
+          activePromptShells.delete(senderId);
+        }
+      }
       if (err) {
         console.error('[IPC Main] PythonShell execution finished with error:', err);
         event.sender.send('llm:stream-error', { message: err.message || 'Python script execution failed.' });
@@ -214,6 +297,25 @@ app.whenReady().then(async () => {
     });
   });
 
+  // Cancels the in-flight prompt(s) of the renderer that asked. send_prompt_wrapper.py maps SIGTERM to
+  // LLMManager.cancel_request, which aborts the connector's HTTP request and then reports a 'done'
+  // message with cancelled: true.
+  ipcMain.handle('stop-llm-generation', async (event) => {
+    console.log(`[IPC Main] Received stop-llm-generation request from renderer ${event.sender.id}.`);
+    const running = [...(activePromptShells.get(event.sender.id) || [])]
+      .filter((shell) => shell.childProcess && shell.childProcess.exitCode === null);
+    if (running.length === 0) {
+      return { success: false, error: 'No generation in progress.' };
+    }
+    try {
+      running.forEach((shell) => shell.kill('SIGTERM'));
+      return { success: true, message: 'Generation stop signal sent.' };
+    } catch (err) {
+      console.error('[IPC Main] Failed to signal prompt process:', err);
+      return { success: false, error: 'Failed to stop generation.', details: err.message || String(err) };
+    }
+  });
+
   // --- LLM Configuration IPC Handler ---
   ipcMain.handle('get-llm-config', async () => {
     try {
@@ -291,6 +393,17 @@ app.whenReady().then(async () => {
     }
   });
 
+  // --- Diagnostics: LLM call metrics ---
+  ipcMain.handle('get-llm-metrics', async (event, options = {}) => {
+    console.log('[IPC Main] Received get-llm-metrics request.');
+    const args = options && options.reset ? ['--reset'] : [];
+    const result = await runPythonScript('get_metrics_wrapper.py', args);
+    if (result && result.error) {
+      console.error('[IPC Main] Error reading LLM metrics:', result.message, result.details);
+    }
+    return result || { error: true, message: 'No output from metrics script.' };
+  });
+
   // --- Parallel Git Task IPC Handlers ---
   const activeParallelRuns = {}; // Store { runId: { shell: PythonShell, results: {} } }
 
@@ -360,8 +473,12 @@ app.whenReady().then(async () => {
 
   ipcMain.handle('get-agent-file-content', async (event, { runId, agentId, filePath }) => {
       const repoPath = path.join(__dirname, '..');
-      // This requires a new, simple wrapper script for a synchronous call.
-      const result = await runPythonScript('get_file_content_wrapper.py', [runId, agentId, filePath, repoPath]);
+      const result = await requestFromFileContentServer({ command: 'get_file_content', runId, agentId, filePath, repoPath });
+      if (result && result.serverUnavailable) {
+          // Fall back to the one-shot wrapper if the persistent server cannot be reached.
+          console.warn('[IPC Main] File content server unavailable, using one-shot wrapper:', result.error);
+          return await runPythonScript('get_file_content_wrapper.py', [runId, agentId, filePath, repoPath]);
+      }
       return result; // Expects { success: true, content: '...' } or { success: false, error: '...' }
   });
 
@@ -371,13 +488,17 @@ app.whenReady().then(async () => {
       return result; // Expects { success: true, downloadPath: '...', filename: '...' } or { success: false, error: '...' }
   });
 
-  ipcMain.on('cancel-parallel-git-run', (event, runId) => {
+  ipcMain.handle('cancel-parallel-git-run', async (event, runId) => {
       console.log(`[IPC Main] Received request to cancel run: ${runId}`);
       const run = activeParallelRuns[runId];
-      if (run && run.shell) {
-          run.shell.terminate();
-          console.log(`[IPC Main] Terminated shell for run ${runId}`);
+      if (!run || !run.shell) {
+          return { success: false, error: `Run ${runId} is not active.` };
       }
+      // SIGTERM lets the orchestrator kill each agent's process group and remove the run's
+      // worktrees and branches before it exits; it then reports the run as cancelled.
+      run.shell.terminate('SIGTERM');
+      console.log(`[IPC Main] Sent SIGTERM to orchestrator for run ${runId}`);
+      return { success: true, message: 'Cancelling run; agents are being stopped and cleaned up.' };
   });
 
 
@@ -393,6 +514,10 @@ app.whenReady().then(async () => {
 // Quit when all windows are closed, except on macOS. There, it's common
 // for applications and their menu bar to stay active until the user quits
 // explicitly with Cmd + Q.
+app.on('will-quit', () => {
+  stopFileContentServer();
+});
+
 app.on('window-all-closed', function () {
   if (process.platform !== 'darwin') app.quit();
 });
@@ -87,6 +87,7 @@ contextBridge.exposeInMainWorld('api', {
 
   // Diagnostics APIs
   runAllDiagnostics: () => ipcRenderer.invoke('run-all-diagnostics'),
+  getLlmMetrics: (options) => ipcRenderer.invoke('get-llm-metrics', options),
 
   // Sets up a global listener. App.vue should manage calling cleanup.
   onDiagnosticCheckUpdate: (callback) => ipcRenderer.on('diagnostic-check-update', (_event, value) => callback(value)),